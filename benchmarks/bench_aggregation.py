@@ -0,0 +1,88 @@
+"""
+Benchmark: daily summaries of hourly readings with aggregate_readings vs pandas groupby.
+
+Builds `--days` days of hourly readings for `--sites` sites spread over
+three time zones, then times aggregate_readings (AQI scoring, local
+calendar buckets, max/mean/p95, exceedance counts and dominant-pollutant
+frequency of 7 columns) against the same summary written as a pandas
+tz_convert + groupby over the overall AQI alone.
+
+Usage:
+    python benchmarks/bench_aggregation.py [--sites 2000] [--days 30]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.aggregation import aggregate_readings, reaggregate  # noqa: E402
+from module.core.aqi_calculators import POLLUTANT_FIELDS, calculate_all_aqi_batch  # noqa: E402
+
+T0 = 1698796800  # 2023-11-01 UTC
+ZONES = ['America/Chicago', 'Europe/Paris', 'Asia/Kolkata']
+
+
+def readings(sites, days, seed=0):
+    rng = np.random.default_rng(seed)
+    hours = days * 24
+    result = {'cell': np.repeat(np.arange(sites, dtype=np.int64), hours),
+              'dt': np.tile(T0 + 3600 * np.arange(hours, dtype=np.int64), sites)}
+    scale = np.array([12.0, 25.0, 20.0, 10.0, 400.0, 40.0])
+    for field, s in zip(POLLUTANT_FIELDS, scale):
+        result[field] = rng.gamma(3.0, s / 3, sites * hours).round(2)
+    return result
+
+
+def pandas_daily(data, tz):
+    """Reference: overall AQI daily max/mean/p95 and hours above 100 with pandas."""
+    aqi = calculate_all_aqi_batch(np.column_stack([data[f] for f in POLLUTANT_FIELDS])).max(axis=1)
+    frame = pd.DataFrame({'cell': data['cell'], 'aqi': aqi,
+                          'time': pd.to_datetime(data['dt'], unit='s', utc=True)})
+    parts = []
+    for zone in ZONES:
+        part = frame[frame['cell'].map(tz) == zone].copy()
+        part['day'] = part['time'].dt.tz_convert(zone).dt.tz_localize(None).dt.floor('D')
+        parts.append(part)
+    frame = pd.concat(parts)
+    return frame.groupby(['cell', 'day'])['aqi'].agg(
+        ['max', 'mean', lambda v: v.quantile(0.95), lambda v: (v > 100).sum()]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    data = readings(args.sites, args.days)
+    tz = {cell: ZONES[cell % len(ZONES)] for cell in range(args.sites)}
+    rows = len(data['dt'])
+
+    start = time.perf_counter()
+    daily = aggregate_readings(data, freq='day', tz=tz)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    monthly = reaggregate(daily, 'month', ['aqi_max'], thresholds={'aqi_max': [100]})
+    rollup = time.perf_counter() - start
+    print(f"{rows:,} rows, {args.sites} sites x {args.days} days in {len(ZONES)} time zones")
+    print(f"aggregate_readings (7 columns): {elapsed:.2f} s ({rows / elapsed / 1e6:.1f} M rows/s), "
+          f"{len(daily):,} daily rows; monthly days above Moderate in {rollup * 1e3:.0f} ms "
+          f"(mean {monthly['aqi_max_over_100'].mean():.1f} days)")
+
+    sample = {key: values[:min(rows, 200 * args.days * 24)] for key, values in data.items()}
+    start = time.perf_counter()
+    pandas_daily(sample, tz)
+    per_row = (time.perf_counter() - start) / len(sample['dt'])
+    print(f"pandas groupby with lambda quantile (overall AQI only): {per_row * rows:.1f} s extrapolated "
+          f"from {len(sample['dt']):,} rows ({per_row * rows / elapsed:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: AlertEngine updates vs rescanning every rule with calculate_all_aqi_values.
+
+Loads `--rules` rules over `--sites` sites (a hundred of them global, the
+rest site-specific with random metric, threshold and horizon), then feeds
+one 96-hour forecast per site twice: the first sweep fires alerts, the
+second is a revision that mostly repeats them (and must emit nothing
+new). The baseline rescans each rule's horizon point by point, as code
+calling calculate_all_aqi_values per rule would, on a sample of sites.
+
+Usage:
+    python benchmarks/bench_alerts.py [--sites 10000] [--rules 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.air_quality_api import convert_json_to_object  # noqa: E402
+from module.core.alerts import ALERT_METRICS, AlertEngine, AlertRule  # noqa: E402
+from module.core.aqi_calculators import calculate_all_aqi_values  # noqa: E402
+
+HOURS = 96
+T0 = 1700000000
+GLOBAL_RULES = 100
+
+
+def synthetic_forecast(start, rng):
+    conc = rng.gamma(2.0, [8.0, 20.0, 15.0, 10.0, 300.0, 30.0], size=(HOURS, 6)).round(2).tolist()
+    return {"coord": {"lat": 0.0, "lon": 0.0}, "list": [
+        {"dt": start + h * 3600, "main": {"aqi": 1},
+         "components": {"pm2_5": c[0], "pm10": c[1], "no2": c[2], "so2": c[3], "co": c[4], "o3": c[5],
+                        "no": 0.0, "nh3": 0.0}}
+        for h, c in enumerate(conc)
+    ]}
+
+
+def make_rules(sites, count, rng):
+    rules = []
+    for i in range(count):
+        site = None if i < GLOBAL_RULES else sites[i % len(sites)]
+        rules.append(AlertRule(
+            rule_id=str(i),
+            threshold=float(rng.choice([51, 101, 151, 201, 301])),
+            metric=str(rng.choice(ALERT_METRICS)),
+            horizon=float(rng.choice([6, 12, 24, 48])),
+            lat=None if site is None else site[0],
+            lon=None if site is None else site[1]
+        ))
+    return rules
+
+
+def rescan(rules, response, now):
+    """Baseline: every rule walks its horizon with the scalar calculator."""
+    fired = []
+    for rule in rules:
+        column = ALERT_METRICS.index(rule.metric)
+        for item in response.list:
+            if not now - 3600 <= item.dt <= now + rule.horizon * 3600:
+                continue
+            values = calculate_all_aqi_values(item.components)
+            value = max(values) if column == 0 else values[column - 1]
+            if value >= rule.threshold:
+                fired.append(rule.rule_id)
+                break
+    return fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=10000)
+    parser.add_argument('--rules', type=int, default=100000)
+    parser.add_argument('--baseline-sites', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sites = [(-60 + (i // 1000) * 0.1, -180 + (i % 1000) * 0.1) for i in range(args.sites)]
+    rules = make_rules(sites, args.rules, rng)
+    forecasts = [synthetic_forecast(T0, rng) for _ in range(32)]
+
+    start = time.perf_counter()
+    engine = AlertEngine(rules)
+    print(f"{len(engine):,} rules over {args.sites:,} sites loaded in {time.perf_counter() - start:.2f}s")
+
+    for sweep, now in (("first sweep", T0), ("revision sweep", T0 + 60)):
+        alerts = 0
+        start = time.perf_counter()
+        for i, (lat, lon) in enumerate(sites):
+            alerts += len(engine.update(lat, lon, forecasts[i % len(forecasts)], now=now))
+        elapsed = time.perf_counter() - start
+        print(f"{sweep:<15} {args.sites / elapsed:>8,.0f} updates/s  {elapsed * 1e6 / args.sites:>6.0f} µs/update  "
+              f"{alerts:,} alerts")
+
+    by_site = {}
+    for rule in rules[GLOBAL_RULES:]:
+        by_site.setdefault((rule.lat, rule.lon), []).append(rule)
+    sample = sites[:args.baseline_sites]
+    responses = [convert_json_to_object(forecasts[i % len(forecasts)]) for i in range(len(sample))]
+    start = time.perf_counter()
+    for site, response in zip(sample, responses):
+        rescan(rules[:GLOBAL_RULES] + by_site.get(site, []), response, T0)
+    elapsed = time.perf_counter() - start
+    print(f"{'rescan baseline':<15} {len(sample) / elapsed:>8,.0f} updates/s  "
+          f"{elapsed * 1e6 / len(sample):>6.0f} µs/update  (sample of {len(sample)} sites, objects prebuilt)")
+
+
+if __name__ == '__main__':
+    main()
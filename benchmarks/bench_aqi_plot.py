@@ -0,0 +1,59 @@
+"""
+Benchmark: create_aqi_plot figure build time and serialized JSON size.
+
+Usage:
+    python benchmarks/bench_aqi_plot.py [--sizes 120 10000 100000] [--runs 5] [--width 1200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.streamlit_ui.plots import create_aqi_plot  # noqa: E402
+
+
+def synthetic_series(n, seed=0):
+    """Hourly dates and a wandering AQI series spanning several categories."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    dates = [start + timedelta(hours=i) for i in range(n)]
+    aqi = np.clip(80 + np.cumsum(rng.normal(0, 4, n)), 0, 450).round(2)
+    return dates, aqi.tolist()
+
+
+def bench(n, runs, width_px):
+    dates, aqi = synthetic_series(n)
+    build, serialize = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fig = create_aqi_plot(dates, aqi, "Benchmark", width_px=width_px)
+        build.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        payload = fig.to_json()
+        serialize.append(time.perf_counter() - start)
+    return statistics.median(build), statistics.median(serialize), len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[120, 10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--width", type=int, default=1200,
+                        help="plot width in pixels driving downsampling (0 plots every point)")
+    args = parser.parse_args()
+    
+    print(f"{'points':>8}{'build (ms)':>14}{'to_json (ms)':>15}{'JSON size (KB)':>17}")
+    for n in args.sizes:
+        build, serialize, size = bench(n, args.runs, args.width or None)
+        print(f"{n:>8}{build * 1000:>14.1f}{serialize * 1000:>15.1f}{size / 1024:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
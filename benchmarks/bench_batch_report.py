@@ -0,0 +1,100 @@
+"""
+Benchmark: compute + write stage of ``clearskies batch`` with canned forecasts.
+
+The network is replaced by in-memory 96-hour forecasts, so this measures
+scoring and output only: a per-item loop producing the same columns
+(convert_json_to_object + calculate_all_aqi_values + DataFrame.to_csv)
+against run_batch_report scoring in-process and on a process pool.
+
+Usage:
+    python benchmarks/bench_batch_report.py [--locations 5000] [--processes 4] [--format .csv]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.air_quality_api import convert_json_to_object  # noqa: E402
+from module.core.aqi_calculators import POLLUTANT_FIELDS, POLLUTANT_NAMES, calculate_all_aqi_values  # noqa: E402
+from module.core.batch_report import ReportWriter, run_batch_report  # noqa: E402
+from module.streamlit_ui.aqi_display import get_aqi_category  # noqa: E402
+
+HOURS = 96
+
+
+def synthetic_forecast(lat, lon, session=None):
+    """Deterministic 96-hour forecast for a coordinate."""
+    rng = np.random.default_rng(int(abs(lat) * 1000 + abs(lon)))
+    conc = rng.gamma(2.0, [10.0, 25.0, 20.0, 15.0, 400.0, 40.0], size=(HOURS, 6)).round(2).tolist()
+    return {
+        "coord": {"lat": lat, "lon": lon},
+        "list": [
+            {"dt": 1700000000 + h * 3600, "main": {"aqi": 1},
+             "components": {"pm2_5": c[0], "pm10": c[1], "no2": c[2], "so2": c[3], "co": c[4], "o3": c[5],
+                            "no": 0.0, "nh3": 0.0}}
+            for h, c in enumerate(conc)
+        ]
+    }
+
+
+def locations(n):
+    return [{'location': f"site {i}", 'display_name': f"Site {i}", 'lat': -60 + i * 0.01, 'lon': 10.0}
+            for i in range(n)]
+
+
+def per_item_report(sites, path):
+    rows = []
+    for site in sites:
+        response = convert_json_to_object(synthetic_forecast(site['lat'], site['lon']))
+        for item in response.list:
+            values = calculate_all_aqi_values(item.components)
+            worst = int(np.argmax(values))
+            rows.append({
+                **site,
+                'time': pd.Timestamp(item.dt, unit='s', tz='UTC'),
+                'aqi': round(values[worst], 1),
+                'category': get_aqi_category(values[worst])[0],
+                'dominant_pollutant': POLLUTANT_NAMES[worst],
+                **{f'aqi_{field}': round(value, 1) for field, value in zip(POLLUTANT_FIELDS, values)}
+            })
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def pipeline_report(sites, path, processes):
+    with patch('module.core.batch_report.read_pollution_data_from_api', side_effect=synthetic_forecast):
+        with ReportWriter(path) as writer:
+            run_batch_report(sites, writer, workers=8, processes=processes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--locations', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 1) - 1))
+    parser.add_argument('--format', default='.csv', choices=['.csv', '.parquet'])
+    args = parser.parse_args()
+
+    sites = locations(args.locations)
+    print(f"{args.locations} locations x {HOURS} hours = {args.locations * HOURS} rows")
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [('per-item loop', lambda path: per_item_report(sites, path), '.csv'),
+                ('pipeline, 0 processes', lambda path: pipeline_report(sites, path, 0), args.format),
+                (f'pipeline, {args.processes} processes',
+                 lambda path: pipeline_report(sites, path, args.processes), args.format)]
+        for label, fn, ext in runs:
+            path = os.path.join(tmp, f"report{ext}")
+            start = time.perf_counter()
+            fn(path)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<24} {elapsed:7.2f} s  {os.path.getsize(path) / 2**20:6.1f} MB {ext}")
+
+
+if __name__ == '__main__':
+    main()
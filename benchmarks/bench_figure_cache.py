@@ -0,0 +1,76 @@
+"""
+Benchmark: forecast chart render path with a cold vs warm FigureCache.
+
+Measures what display_aqi_forecast does per rerun up to the hand-off to
+Streamlit: building (or loading) the figure plus the serialization that
+st.plotly_chart performs.
+
+Usage:
+    python benchmarks/bench_figure_cache.py [--sizes 120 10000] [--runs 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import plotly.io as pio
+import plotly.tools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.aqi_analysis import categorize_aqi  # noqa: E402
+from module.core.figure_cache import FigureCache, figure_from_json  # noqa: E402
+from module.streamlit_ui.plots import create_aqi_plot, forecast_figure_key  # noqa: E402
+from bench_aqi_plot import synthetic_series  # noqa: E402
+
+
+def to_streamlit_spec(fig):
+    """The serialization st.plotly_chart performs on a figure."""
+    return pio.to_json(plotly.tools.return_figure_from_figure_or_data(fig, True), validate=False)
+
+
+def render(dates, aqi, categories, cache):
+    if cache is None:
+        fig = create_aqi_plot(dates, aqi, "Benchmark", categories=categories)
+    else:
+        key = forecast_figure_key(dates, aqi, categories, "Benchmark")
+        fig = figure_from_json(cache.get_or_build(
+            key, lambda: create_aqi_plot(dates, aqi, "Benchmark", categories=categories)
+        ))
+    return to_streamlit_spec(fig)
+
+
+def bench(n, runs):
+    dates, aqi = synthetic_series(n)
+    aqi = np.asarray(aqi)
+    categories = categorize_aqi(aqi)
+    cache = FigureCache()
+    render(dates, aqi, categories, cache)  # Warm the cache
+    timings = {}
+    for label, target in (("uncached", None), ("cached", cache)):
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            render(dates, aqi, categories, target)
+            samples.append(time.perf_counter() - start)
+        timings[label] = statistics.median(samples)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[120, 10_000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'points':>8}{'uncached (ms)':>16}{'cached (ms)':>14}")
+    for n in args.sizes:
+        timings = bench(n, args.runs)
+        print(f"{n:>8}{timings['uncached'] * 1000:>16.1f}{timings['cached'] * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: incremental AQIAnalysis update vs full re-analysis of a refreshed forecast.
+
+A poll between provider runs returns the same forecast; an hourly
+refresh of a 96-hour forecast drops the oldest hour, adds a new one and
+revises some of the rest. Times analyze_air_quality on the refreshed
+forecast against update_analysis from the previous analysis, for
+several revision rates.
+
+Usage:
+    python benchmarks/bench_incremental_analysis.py [--hours 96] [--repeat 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.air_quality_api import convert_json_to_object  # noqa: E402
+from module.core.aqi_analysis import analyze_air_quality, update_analysis  # noqa: E402
+
+T0 = 1700000000
+
+
+def forecast_json(start, conc):
+    return {"coord": {"lat": 0.0, "lon": 0.0}, "list": [
+        {"dt": start + h * 3600, "main": {"aqi": 1},
+         "components": {"pm2_5": c[0], "pm10": c[1], "no2": c[2], "so2": c[3], "co": c[4], "o3": c[5],
+                        "no": 0.0, "nh3": 0.0}}
+        for h, c in enumerate(conc.tolist())
+    ]}
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--hours', type=int, default=96)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    conc = rng.gamma(2.0, [8.0, 20.0, 15.0, 10.0, 300.0, 30.0], size=(args.hours + 1, 6)).round(2)
+    old = convert_json_to_object(forecast_json(T0, conc[:-1]))
+    previous = analyze_air_quality(old.list)
+
+    print(f"{'refresh':<22} {'full µs':>8} {'update µs':>10} {'speedup':>8} {'rescored':>9}")
+    cases = [("same forecast", None)] + [(f"next hour, {share:.0%} revised", share) for share in (0.0, 0.05, 0.25, 1.0)]
+    for name, share in cases:
+        if share is None:
+            new = old.list  # Polled again before the provider's next run
+        else:
+            refreshed = conc[1:].copy()
+            revised = rng.random(args.hours - 1) < share
+            refreshed[:-1][revised] *= 1.1
+            new = convert_json_to_object(forecast_json(T0 + 3600, refreshed)).list
+        full = timed(lambda: analyze_air_quality(new), args.repeat)
+        update = timed(lambda: update_analysis(previous, new), args.repeat)
+        _, diff = update_analysis(previous, new)
+        print(f"{name:<22} {full:>8.0f} {update:>10.0f} {full / update:>7.1f}x {diff.rescored:>9}")
+
+
+if __name__ == '__main__':
+    main()
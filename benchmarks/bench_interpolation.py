@@ -0,0 +1,90 @@
+"""
+Benchmark: IDW / Gaussian interpolation of a regular grid from scattered samples.
+
+Usage:
+    python benchmarks/bench_interpolation.py [--samples 10000] [--grid 500] [--k 8] [--runs 5]
+                                             [--distribution uniform|cities|cluster|all]
+
+Samples are spread uniformly over the box, around five city centres, or in
+one dense cluster. The clustered cases crowd GridIndex's buckets, so most
+targets go to its k-d tree.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.interpolation import GridIndex, KDTreeIndex, interpolate_grid, project_km  # noqa: E402
+
+BBOX = (41.9, -93.9, 42.2, -93.4)
+DISTRIBUTIONS = ('uniform', 'cities', 'cluster')
+
+
+def synthetic_samples(n, distribution='uniform', seed=0):
+    """n random (lat, lon, aqi) samples over BBOX with a smooth plume."""
+    rng = np.random.default_rng(seed)
+    south, west, north, east = BBOX
+    if distribution == 'uniform':
+        lat = rng.uniform(south, north, n)
+        lon = rng.uniform(west, east, n)
+    else:
+        # A few hundred metres around each centre, centres away from the edges
+        centres = 5 if distribution == 'cities' else 1
+        c_lat = rng.uniform(south + 0.05, north - 0.05, centres)
+        c_lon = rng.uniform(west + 0.05, east - 0.05, centres)
+        which = rng.integers(centres, size=n)
+        lat = c_lat[which] + rng.normal(0, 0.003, n)
+        lon = c_lon[which] + rng.normal(0, 0.004, n)
+    aqi = 40 + 150 * np.exp(-((lat - 42.05) ** 2 + (lon + 93.6) ** 2) / 0.005)
+    return np.column_stack((lat, lon, aqi))
+
+
+def time_runs(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples', type=int, default=10000)
+    parser.add_argument('--grid', type=int, default=500)
+    parser.add_argument('--k', type=int, default=8)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS + ('all',), default='all')
+    args = parser.parse_args()
+
+    distributions = DISTRIBUTIONS if args.distribution == 'all' else (args.distribution,)
+    print(f"{args.samples} samples -> {args.grid}x{args.grid} grid, k={args.k}, median of {args.runs} runs")
+    for distribution in distributions:
+        print(f"{distribution}:")
+        run(synthetic_samples(args.samples, distribution), args)
+
+
+def run(samples, args):
+    shape = (args.grid, args.grid)
+    lat0 = float(samples[:, 0].mean())
+    xy = project_km(samples[:, 0], samples[:, 1], lat0)
+    south, west, north, east = BBOX
+    lat, lon = np.meshgrid(np.linspace(south, north, args.grid), np.linspace(west, east, args.grid))
+    targets = project_km(lat, lon, lat0)
+    index = GridIndex(xy)
+    print(f"  index build    {time_runs(lambda: GridIndex(xy), args.runs):8.1f} ms")
+    print(f"  k-d tree build {time_runs(lambda: KDTreeIndex(xy), args.runs):8.1f} ms")
+    print(f"  kNN query      {time_runs(lambda: index.query(targets, args.k), args.runs):8.1f} ms")
+    for method in ('idw', 'gaussian'):
+        elapsed = time_runs(lambda: interpolate_grid(samples, BBOX, shape, method=method, k=args.k), args.runs)
+        print(f"  {method:<14} {elapsed:8.1f} ms (end to end)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: top-K worst-air leaderboard, incremental heap vs rescoring every site.
+
+Builds a 96-hour forecast for each of `--sites` sites, then runs `--polls`
+polls that each refresh `--changed` random sites and read the top
+`--k` by current and by peak AQI. Compared per poll:
+
+- Leaderboard.update for the refreshed sites plus two top(k) calls
+- rescoring every site with calculate_all_aqi_values and sorting, as the
+  ops overview did (run on a sample of sites and extrapolated)
+- rescoring every site with calculate_all_aqi_batch and np.argpartition
+
+Usage:
+    python benchmarks/bench_leaderboard.py [--sites 10000] [--changed 10] [--polls 200] [--k 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.air_quality_models import PollutantComponents  # noqa: E402
+from module.core.aqi_calculators import POLLUTANT_FIELDS, calculate_all_aqi_batch, calculate_all_aqi_values  # noqa: E402
+from module.core.leaderboard import DEFAULT_HORIZON_HOURS, Leaderboard  # noqa: E402
+
+HOURS = 96
+NOW = 1700000000 // 3600 * 3600 + 600
+SCALE = np.array([12.0, 25.0, 20.0, 10.0, 400.0, 40.0])
+
+
+def forecast(rng):
+    """Raw forecast JSON with random hourly concentrations from the current hour."""
+    values = rng.gamma(3.0, SCALE / 3, size=(HOURS, len(SCALE))).round(2)
+    return {"list": [
+        {"dt": NOW - 600 + 3600 * h, "main": {"aqi": 1},
+         "components": dict(zip(POLLUTANT_FIELDS, row.tolist()), no=0.0, nh3=0.0)}
+        for h, row in enumerate(values)
+    ]}
+
+
+def rescore_loop(forecasts, k):
+    """Baseline: every site scored hour by hour with calculate_all_aqi_values, then sorted."""
+    current, peak = [], []
+    for data in forecasts:
+        hours = [max(calculate_all_aqi_values(PollutantComponents(**item['components'])))
+                 for item in data['list'][:DEFAULT_HORIZON_HOURS + 1]]
+        current.append(hours[0])
+        peak.append(max(hours))
+    return sorted(range(len(current)), key=current.__getitem__)[-k:], sorted(range(len(peak)), key=peak.__getitem__)[-k:]
+
+
+def rescore_batch(concentrations, k):
+    """Baseline: all sites scored in one batch, top k by argpartition."""
+    aqi = calculate_all_aqi_batch(concentrations.reshape(-1, len(POLLUTANT_FIELDS))).max(axis=1)
+    aqi = aqi.reshape(-1, DEFAULT_HORIZON_HOURS + 1)
+    return np.argpartition(-aqi[:, 0], k)[:k], np.argpartition(-aqi.max(axis=1), k)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=10000)
+    parser.add_argument('--changed', type=int, default=10, help="Sites refreshed per poll")
+    parser.add_argument('--polls', type=int, default=200)
+    parser.add_argument('--k', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    forecasts = [forecast(rng) for _ in range(args.sites)]
+    board = Leaderboard(clock=lambda: NOW)
+    start = time.perf_counter()
+    for site, data in enumerate(forecasts):
+        board.update(site / 100, 0.0, data)
+    fill = time.perf_counter() - start
+    print(f"{args.sites:,} sites x {HOURS} h: initial fill {fill:.1f} s ({fill / args.sites * 1e6:.0f} µs/site)")
+
+    start = time.perf_counter()
+    for _ in range(args.polls):
+        for site in rng.integers(0, args.sites, args.changed):
+            forecasts[site] = forecast(rng)
+            board.update(site / 100, 0.0, forecasts[site])
+        board.top(args.k, 'current')
+        board.top(args.k, 'peak')
+    incremental = (time.perf_counter() - start) / args.polls
+    # Generating the refreshed forecasts is not part of the leaderboard's cost
+    start = time.perf_counter()
+    for _ in range(args.polls * args.changed):
+        forecast(rng)
+    incremental -= (time.perf_counter() - start) / args.polls
+    print(f"leaderboard, {args.changed} refreshed sites + 2 top({args.k}) per poll: {incremental * 1e3:.2f} ms/poll")
+
+    sample = forecasts[:500]
+    start = time.perf_counter()
+    rescore_loop(sample, args.k)
+    loop = (time.perf_counter() - start) / len(sample) * args.sites
+    print(f"rescore all with calculate_all_aqi_values + sort: {loop:.1f} s/poll extrapolated "
+          f"({loop / incremental:,.0f}x)")
+
+    concentrations = np.array([[[item['components'][f] for f in POLLUTANT_FIELDS]
+                                for item in data['list'][:DEFAULT_HORIZON_HOURS + 1]] for data in forecasts])
+    start = time.perf_counter()
+    rescore_batch(concentrations, args.k)
+    batch = time.perf_counter() - start
+    print(f"rescore all with calculate_all_aqi_batch + argpartition: {batch * 1e3:.0f} ms/poll "
+          f"({batch / incremental:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
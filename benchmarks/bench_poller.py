@@ -0,0 +1,127 @@
+"""
+Benchmark: adaptive watchlist polling vs fixed round-robin at the same call budget.
+
+Simulates a day of polling `--sites` sites on a fake clock. A few sites
+are volatile (large, fast AQI swings); the rest are calm. Every fetch
+returns a 24-hour forecast whose error grows with lead time. Both
+schedules spend the same number of calls; the error is the gap between
+true AQI and the latest fetched forecast, sampled every 10 minutes, over
+all sites and over the volatile ones.
+
+Usage:
+    python benchmarks/bench_poller.py [--sites 200] [--calls-per-hour 200] [--volatile 0.1]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.poller import RefreshPolicy, WatchlistPoller  # noqa: E402
+
+T0 = 1700000000
+DAY = 86400
+
+
+class Clock:
+    def __init__(self):
+        self.now = float(T0)
+
+    def __call__(self):
+        return self.now
+
+
+class World:
+    """True ozone AQI per site, and forecasts of it that drift with lead time."""
+
+    def __init__(self, n, volatile, clock, seed=0):
+        rng = np.random.default_rng(seed)
+        self.clock = clock
+        self.rng = np.random.default_rng(seed + 1)
+        self.volatile = rng.random(n) < volatile
+        self.level = rng.uniform(20, 40, n)
+        self.amplitude = np.where(self.volatile, 35.0, 3.0)
+        self.period = np.where(self.volatile, rng.uniform(8, 16, n), 24.0) * 3600
+        self.phase = rng.uniform(0, 2 * math.pi, n)
+        self.skill = self.amplitude / 4  # Forecast error per lead hour
+        self.index = {}
+
+    def truth(self, i, t):
+        return self.level[i] + self.amplitude[i] * np.sin(2 * math.pi * (t - T0) / self.period[i] + self.phase[i])
+
+    def fetch(self, lat, lon):
+        i = self.index[lat, lon]
+        now = self.clock()
+        dt = np.arange(now // 3600 * 3600, now + 24 * 3600, 3600)
+        lead = np.maximum(dt - now, 0) / 3600
+        o3 = self.truth(i, dt) + self.rng.normal(0, 1, len(dt)) * self.skill[i] * lead
+        return {"list": [
+            {"dt": int(t), "main": {"aqi": 1},
+             "components": {"co": 0.0, "no": 0.0, "no2": 0.0, "o3": float(max(v, 0.0)),
+                            "so2": 0.0, "pm2_5": 0.0, "pm10": 0.0, "nh3": 0.0}}
+            for t, v in zip(dt, o3)
+        ]}
+
+
+def simulate(args, policy):
+    clock = Clock()
+    world = World(args.sites, args.volatile, clock)
+    poller = WatchlistPoller(fetch=world.fetch, policy=policy, clock=clock)
+    sites = []
+    for i in range(args.sites):
+        lat, lon = 10 + i * 0.01, 20.0
+        world.index[lat, lon] = i
+        sites.append(poller.add_site(lat, lon))
+    spacing = 3600 / args.calls_per_hour
+    errors = []
+    next_call = next_sample = clock.now
+    while clock.now < T0 + DAY:
+        if clock.now >= next_sample:
+            if clock.now >= T0 + 3600:  # Skip the start-up sweep
+                truth = world.truth(np.arange(args.sites), clock.now)
+                known = np.array([np.interp(clock.now, s.forecast_dt, s.forecast_aqi)
+                                  if s.forecast_dt is not None else np.nan for s in sites])
+                errors.append(np.abs(known - truth))
+            next_sample += 600
+        if clock.now >= next_call and poller.poll_once() is not None:
+            next_call = max(next_call, clock.now - spacing) + spacing  # Rate limit without bursts
+        wait = poller.seconds_until_due()
+        call = next_call if wait is None else max(next_call, math.ceil(clock.now + wait))
+        clock.now = max(clock.now, min(next_sample, call))
+    errors = np.array(errors)
+    return poller, errors, world.volatile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=200)
+    parser.add_argument('--calls-per-hour', type=float, default=200)
+    parser.add_argument('--volatile', type=float, default=0.1, help="Share of volatile sites")
+    args = parser.parse_args()
+
+    round_robin = args.sites / args.calls_per_hour * 3600
+    schedules = [
+        ("round-robin", RefreshPolicy(base_interval=round_robin, min_interval=round_robin,
+                                      max_interval=round_robin, calm_backoff=1.0,
+                                      volatility_scale=math.inf, aqi_scale=math.inf)),
+        ("adaptive", RefreshPolicy(base_interval=round_robin, min_interval=600,
+                                   max_interval=6 * round_robin)),
+    ]
+    print(f"{args.sites} sites, {args.calls_per_hour:.0f} calls/hour, {args.volatile:.0%} volatile, 24 h simulated")
+    print(f"{'schedule':<12} {'calls':>6} {'mean err':>9} {'p95 err':>8} {'volatile err':>13} {'calm err':>9} "
+          f"{'sim s':>6}")
+    for name, policy in schedules:
+        start = time.perf_counter()
+        poller, errors, volatile = simulate(args, policy)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} {poller.calls:>6} {np.nanmean(errors):>9.2f} {np.nanpercentile(errors, 95):>8.2f} "
+              f"{np.nanmean(errors[:, volatile]):>13.2f} {np.nanmean(errors[:, ~volatile]):>9.2f} {elapsed:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: per-card vs batched rendering of the current-conditions panels.
+
+Runs each mode as a real Streamlit script (via streamlit.testing AppTest)
+and reports rerun wall time and the number of delta messages (elements
+and layout blocks) the script sends to the browser.
+
+Usage:
+    python benchmarks/bench_pollutant_cards.py [--runs 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+SCRIPT = """
+from unittest.mock import Mock
+from module.core.aqi_analysis import analyze_air_quality
+from module.core.air_quality_models import AirQualityData, AQIInfo, PollutantComponents
+from module.streamlit_ui.aqi_display import display_pollutant_details
+from module.streamlit_ui.plots import display_current_air_quality
+
+components = PollutantComponents(co=450.0, no=0.2, no2=35.0, o3=95.0, so2=12.0,
+                                 pm2_5=28.0, pm10=60.0, nh3=1.0)
+data = Mock()
+data.list = [AirQualityData(dt=1700000000, main=AQIInfo(aqi=2), components=components)]
+analysis = analyze_air_quality(data.list)
+
+display_pollutant_details(components, None, analysis, batched={batched})
+display_current_air_quality(data, None, analysis, batched={batched})
+"""
+
+
+def count_deltas(node):
+    """Count every element and block below a node of the AppTest tree."""
+    children = getattr(node, 'children', None)
+    if not children:
+        return 1
+    return 1 + sum(count_deltas(child) for child in children.values())
+
+
+def bench(batched, runs):
+    app = AppTest.from_string(SCRIPT.format(batched=batched), default_timeout=30)
+    app.run()  # Warm-up: imports and first render
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    # The main container itself is not sent as a delta
+    messages = count_deltas(app.main) - 1
+    return statistics.median(timings), messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    
+    print(f"{'mode':<10}{'median rerun (ms)':>20}{'delta messages':>17}")
+    for label, batched in (("columns", False), ("batched", True)):
+        seconds, messages = bench(batched, args.runs)
+        print(f"{label:<10}{seconds * 1000:>20.2f}{messages:>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: RevisionStore size and read latency vs full snapshots in TimeSeriesStore.
+
+Fetches a 96-hour forecast for `--sites` sites every hour for `--days`
+days. Each refresh moves the window on an hour and revises a share of
+the remaining hours (every component of a revised hour moves by up to
+10%). Both stores receive the same fetches; reported are file sizes,
+the stored blob bytes against full float64 rows, and the time to read
+back one revision and one hour's history.
+
+Usage:
+    python benchmarks/bench_revisions.py [--sites 20] [--days 7] [--revised 0.0 0.1 0.3 1.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.revisions import RevisionStore  # noqa: E402
+from module.core.store import TimeSeriesStore  # noqa: E402
+
+HOURS = 96
+T0 = 1700000000
+FIELDS = ["pm2_5", "pm10", "no2", "so2", "co", "o3", "no", "nh3"]
+
+
+def forecast_json(start, conc):
+    return {"coord": {"lat": 0.0, "lon": 0.0}, "list": [
+        {"dt": start + h * 3600, "main": {"aqi": 2}, "components": dict(zip(FIELDS, c))}
+        for h, c in enumerate(conc.tolist())
+    ]}
+
+
+def fetches(args, share, rng):
+    """(lat, lon, forecast JSON, fetched_at) for every site and hour."""
+    steps = args.days * 24
+    for site in range(args.sites):
+        truth = rng.gamma(2.0, [8, 20, 15, 10, 300, 30, 2, 3], size=(steps + HOURS, len(FIELDS))).round(2)
+        for k in range(steps):
+            window = truth[k:k + HOURS]
+            revised = rng.random(HOURS) < share
+            window[revised] = (window[revised] * rng.uniform(0.9, 1.1, (revised.sum(), len(FIELDS)))).round(2)
+            yield 40.0 + site * 0.01, -90.0, forecast_json(T0 + k * 3600, window), T0 + k * 3600
+
+
+def timed(fn, repeat=50):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=20)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--revised', type=float, nargs='+', default=[0.0, 0.1, 0.3, 1.0],
+                        help="Shares of hours revised per refresh")
+    args = parser.parse_args()
+
+    print(f"{args.sites} sites x {args.days * 24} hourly fetches of {HOURS} h")
+    print(f"{'revised':>8} {'json MB':>8} {'full MB':>8} {'delta MB':>9} {'file %':>7} {'blob %':>7} "
+          f"{'revision ms':>12} {'history ms':>11}")
+    for share in args.revised:
+        rng = np.random.default_rng(0)
+        with tempfile.TemporaryDirectory() as tmp:
+            full = TimeSeriesStore(os.path.join(tmp, 'full.sqlite'))
+            revisions = RevisionStore(os.path.join(tmp, 'revisions.sqlite'))
+            json_bytes = 0
+            batch = []
+            for fetch in fetches(args, share, rng):
+                json_bytes += len(json.dumps(fetch[2]))
+                batch.append(fetch)
+                if len(batch) == 64:
+                    full.ingest_many(batch)
+                    revisions.ingest_many(batch)
+                    batch = []
+            full.ingest_many(batch)
+            revisions.ingest_many(batch)
+            for store in (full, revisions):
+                store._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            full_size = os.path.getsize(os.path.join(tmp, 'full.sqlite'))
+            delta_size = os.path.getsize(os.path.join(tmp, 'revisions.sqlite'))
+            stats = revisions.stats()
+
+            middle = T0 + args.days * 12 * 3600
+            revision = timed(lambda: revisions.revision(40.0, -90.0, middle))
+            history = timed(lambda: revisions.hour_history(40.0, -90.0, middle + 48 * 3600))
+            full.close()
+            revisions.close()
+        print(f"{share:>8.0%} {json_bytes / 1e6:>8.1f} {full_size / 1e6:>8.1f} {delta_size / 1e6:>9.2f} "
+              f"{delta_size / full_size:>7.1%} {stats['stored_bytes'] / stats['full_bytes']:>7.1%} "
+              f"{revision:>12.2f} {history:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
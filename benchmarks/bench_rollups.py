@@ -0,0 +1,112 @@
+"""
+Benchmark: long-range reads from rollups vs hourly rows, and retention.
+
+Ingests `--days` days of hourly readings for `--sites` sites into a
+TimeSeriesStore, a day of every site per ingest_many call, timing the
+share spent maintaining the daily and monthly rollups. Then reads a year
+of daily values for one site and monthly values for all sites, from the
+rollups and from the hourly rows (aggregated with aggregate_readings),
+and reports the bytes each read. Finally expires all but `--retain` days
+of hourly rows and reports the file size before and after.
+
+Usage:
+    python benchmarks/bench_rollups.py [--sites 100] [--days 365] [--retain 30]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.aggregation import aggregate_readings  # noqa: E402
+from module.core.rollups import ROLLUP_COLUMNS  # noqa: E402
+from module.core.store import VALUE_COLUMNS, TimeSeriesStore  # noqa: E402
+
+T0 = 1672531200  # 2023-01-01 UTC
+SCALE = {'co': 300.0, 'no': 1.0, 'no2': 20.0, 'o3': 40.0, 'so2': 10.0, 'pm2_5': 12.0, 'pm10': 25.0, 'nh3': 2.0}
+# Bytes per row: the float64 blob plus the integer keys
+HOURLY_ROW = 8 * len(VALUE_COLUMNS) + 3 * 8
+ROLLUP_ROW = 8 * len(ROLLUP_COLUMNS) + 2 * 8
+
+
+def day_of_fetches(rng, sites, day):
+    start = T0 + day * 86400
+    return [
+        (40.0 + site / 100, -90.0, {"list": [
+            {"dt": start + 3600 * h, "main": {"aqi": 2},
+             "components": {field: round(float(rng.gamma(3.0, scale / 3)), 2) for field, scale in SCALE.items()}}
+            for h in range(24)
+        ]}, start + 86400)
+        for site in range(sites)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=100)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--retain', type=int, default=30, help="Days of hourly rows to keep")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    end = T0 + args.days * 86400 - 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'readings.sqlite')
+        store = TimeSeriesStore(path)
+        update, rollup_time = store._update_rollups, [0.0]
+
+        def timed_update(*a):
+            start = time.perf_counter()
+            update(*a)
+            rollup_time[0] += time.perf_counter() - start
+
+        store._update_rollups = timed_update
+        ingest = 0.0
+        for day in range(args.days):
+            fetches = day_of_fetches(rng, args.sites, day)
+            start = time.perf_counter()
+            store.ingest_many(fetches)
+            ingest += time.perf_counter() - start
+        print(f"{args.sites} sites x {args.days} days: {len(store):,} hourly rows; ingest {ingest:.1f} s, "
+              f"of which rollup upkeep {rollup_time[0]:.1f} s ({rollup_time[0] / ingest:.0%})")
+
+        start = time.perf_counter()
+        daily = store.rollups(T0, end, lat=40.0, lon=-90.0)
+        from_rollups = time.perf_counter() - start
+        start = time.perf_counter()
+        hourly = store.location_range(40.0, -90.0, T0, end)
+        hourly['cell'] = np.zeros(len(hourly['dt']), dtype=np.int64)
+        aggregate_readings(hourly, tz='UTC', percentiles=())
+        from_hours = time.perf_counter() - start
+        print(f"one site, {len(daily['start'])} days: rollups {from_rollups * 1e3:.1f} ms, "
+              f"{len(daily['start']) * ROLLUP_ROW / 1e3:.0f} kB; hourly rows + aggregate_readings "
+              f"{from_hours * 1e3:.0f} ms, {len(hourly['dt']) * HOURLY_ROW / 1e3:.0f} kB")
+
+        start = time.perf_counter()
+        monthly = store.rollups(T0, end, freq='month')
+        from_rollups = time.perf_counter() - start
+        start = time.perf_counter()
+        hourly = store.time_range(T0, end)
+        aggregate_readings(hourly, freq='month', tz='UTC', percentiles=())
+        from_hours = time.perf_counter() - start
+        print(f"all sites by month: rollups {from_rollups * 1e3:.1f} ms, "
+              f"{len(monthly['start']) * ROLLUP_ROW / 1e3:.0f} kB; hourly rows + aggregate_readings "
+              f"{from_hours:.1f} s, {len(hourly['dt']) * HOURLY_ROW / 1e6:.0f} MB")
+
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        deleted = store.expire(args.retain, now=end)
+        elapsed = time.perf_counter() - start
+        print(f"expire to {args.retain} days: {deleted:,} rows deleted in {elapsed:.1f} s, "
+              f"file {size / 1e6:.0f} MB -> {os.path.getsize(path) / 1e6:.1f} MB; "
+              f"{len(store.rollups(T0, end, freq='month')['start'])} monthly rollups kept")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Load test: ``clearskies serve`` request throughput against local stand-ins.
+
+Starts the JSON API in a child process with an in-memory geocoder and
+canned 96-hour forecasts (no network), warms the response cache, then
+drives it from keep-alive asyncio connections and reports requests per
+second and latency percentiles per scenario:
+
+- /aqi cache hits
+- /forecast cache hits, gzip-encoded
+- /aqi revalidation with If-None-Match (304)
+- /aqi/score bulk scoring of 96 rows (computed per request)
+
+Client and server share the machine, so on a single core the numbers
+include the client's own overhead.
+
+Usage:
+    python benchmarks/bench_service.py [--connections 50] [--seconds 5] [--places 100]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.service.app import AQIService  # noqa: E402
+from module.service.server import start_server  # noqa: E402
+
+HOURS = 96
+
+
+def synthetic_forecast(lat, lon):
+    """Deterministic 96-hour forecast for a coordinate."""
+    rng = np.random.default_rng(int(abs(lat) * 1000 + abs(lon)))
+    conc = rng.gamma(2.0, [10.0, 25.0, 20.0, 15.0, 400.0, 40.0], size=(HOURS, 6)).round(2).tolist()
+    return {
+        "coord": {"lat": lat, "lon": lon},
+        "list": [
+            {"dt": 1700000000 + h * 3600, "main": {"aqi": 1},
+             "components": {"pm2_5": c[0], "pm10": c[1], "no2": c[2], "so2": c[3], "co": c[4], "o3": c[5],
+                            "no": 0.0, "nh3": 0.0}}
+            for h, c in enumerate(conc)
+        ]
+    }
+
+
+def standin_geocode(name):
+    return (40.0 + len(name) * 0.01, -90.0), name.title()
+
+
+def serve_standins(port, ready):
+    async def main():
+        service = AQIService(geocode=standin_geocode, fetch=synthetic_forecast)
+        server = await start_server(service, '127.0.0.1', port)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+    asyncio.run(main())
+
+
+def build_request(method, target, headers=(), body=b''):
+    lines = [f'{method} {target} HTTP/1.1', 'Host: localhost', *headers]
+    if body:
+        lines.append(f'Content-Length: {len(body)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head[9:12])
+    start = head.lower().find(b'content-length:') + 15
+    length = int(head[start:head.find(b'\r\n', start)])
+    await reader.readexactly(length)
+    return status
+
+
+async def drive(port, requests, connections, seconds):
+    """Send requests round-robin from each connection, one at a time, for `seconds`."""
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + seconds
+
+    async def client(offset):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            i += 1
+        writer.close()
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(connections)))
+    elapsed = time.perf_counter() - began
+    return len(latencies) / elapsed, np.percentile(latencies, [50, 99]) * 1000, statuses
+
+
+async def warm(port, targets):
+    """Request each target once so later requests hit the cache.
+
+    Returns:
+        list: ETag of each response
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    tags = []
+    for target in targets:
+        writer.write(build_request('GET', target))
+        head = await reader.readuntil(b'\r\n\r\n')
+        start = head.find(b'ETag: ') + 6
+        tags.append(head[start:head.find(b'\r\n', start)].decode())
+        start = head.lower().find(b'content-length:') + 15
+        await reader.readexactly(int(head[start:head.find(b'\r\n', start)]))
+    writer.close()
+    return tags
+
+
+async def benchmark(port, args):
+    places = [f'/aqi?lat={40 + i * 0.01:.2f}&lon=-90' for i in range(args.places)]
+    forecasts = [f'/forecast?lat={40 + i * 0.01:.2f}&lon=-90' for i in range(args.places)]
+    tags = await warm(port, places)
+    await warm(port, forecasts)
+
+    rng = np.random.default_rng(0)
+    score_body = json.dumps({'concentrations': rng.gamma(2.0, 20.0, size=(HOURS, 6)).round(2).tolist()}).encode()
+    scenarios = [
+        ('/aqi hit', [build_request('GET', t) for t in places]),
+        ('/forecast hit, gzip', [build_request('GET', t, ['Accept-Encoding: gzip']) for t in forecasts]),
+        ('/aqi 304', [build_request('GET', t, [f'If-None-Match: {tag}']) for t, tag in zip(places, tags)]),
+        (f'/aqi/score ({HOURS} rows)', [build_request('POST', '/aqi/score', body=score_body)]),
+    ]
+    print(f"{args.connections} keep-alive connections, {args.seconds:.0f}s per scenario")
+    print(f"{'scenario':<24} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}  statuses")
+    for name, requests in scenarios:
+        rate, (p50, p99), statuses = await drive(port, requests, args.connections, args.seconds)
+        print(f"{name:<24} {rate:>9,.0f} {p50:>8.2f} {p99:>8.2f}  {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--places', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve_standins, args=(args.port, ready), daemon=True)
+    server.start()
+    try:
+        if not ready.wait(10):
+            raise SystemExit("server did not start")
+        asyncio.run(benchmark(args.port, args))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == '__main__':
+    main()
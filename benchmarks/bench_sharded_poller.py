@@ -0,0 +1,102 @@
+"""
+Benchmark: sharded watchlist polling throughput vs worker processes.
+
+Every site is always due and the stand-in fetch parses a canned 96-hour
+forecast body with json.loads, so the run measures what a real watchlist
+spends CPU on: JSON parsing, AQI scoring and store writes. Prints fetches
+per second for each process count; on an N-core machine it should grow
+near-linearly up to N (store writes are serialized by SQLite and become
+the limit first; compare with --no-store).
+
+Usage:
+    python benchmarks/bench_sharded_poller.py [--sites 20000] [--processes 1 2 4] [--seconds 5]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.poller import RefreshPolicy  # noqa: E402
+from module.core.sharding import run_sharded  # noqa: E402
+from module.core.store import TimeSeriesStore  # noqa: E402
+from module.core.throttle import SharedRateLimiter  # noqa: E402
+
+HOURS = 96
+
+
+def canned_body(seed=0):
+    rng = np.random.default_rng(seed)
+    conc = rng.gamma(2.0, [10.0, 25.0, 20.0, 15.0, 400.0, 40.0], size=(HOURS, 6)).round(2).tolist()
+    return json.dumps({"coord": {"lat": 0.0, "lon": 0.0}, "list": [
+        {"dt": h * 3600, "main": {"aqi": 1},
+         "components": {"pm2_5": c[0], "pm10": c[1], "no2": c[2], "so2": c[3], "co": c[4], "o3": c[5],
+                        "no": 0.0, "nh3": 0.0}}
+        for h, c in enumerate(conc)
+    ]})
+
+
+def canned_fetch_factory():
+    """Per-process stand-in for an HTTP fetch: parse the canned body, shifted to now."""
+    import time
+    body = canned_body()
+
+    def fetch(lat, lon):
+        forecast = json.loads(body)
+        start = int(time.time()) // 3600 * 3600
+        for item in forecast['list']:
+            item['dt'] += start
+        return forecast
+
+    return fetch
+
+
+def measure(sites, processes, seconds, store_path):
+    stop = multiprocessing.Event()
+    timer = threading.Timer(seconds, stop.set)
+    timer.start()
+    summary = run_sharded(
+        sites, processes,
+        store_path=store_path,
+        fetch_factory=canned_fetch_factory,
+        limiter=SharedRateLimiter(1e9),
+        policy=RefreshPolicy(base_interval=0, min_interval=0),
+        workers=2,
+        stop=stop
+    )
+    timer.cancel()
+    return summary['calls'] / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=20000)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--no-store', action='store_true', help="Do not write readings")
+    args = parser.parse_args()
+
+    sites = [(-60 + (i // 1000) * 0.1, -180 + (i % 1000) * 0.1, f"site {i}") for i in range(args.sites)]
+    print(f"{args.sites} sites, {os.cpu_count()} CPUs, {args.seconds:.0f} s per run")
+    print(f"{'processes':>9} {'fetches/s':>10} {'speedup':>8}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for processes in args.processes:
+            store_path = None
+            if not args.no_store:
+                store_path = os.path.join(tmp, f"readings-{processes}.sqlite")
+                TimeSeriesStore(store_path).close()
+            rate = measure(sites, processes, args.seconds, store_path)
+            baseline = baseline or rate
+            print(f"{processes:>9} {rate:>10,.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
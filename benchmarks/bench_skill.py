@@ -0,0 +1,148 @@
+"""
+Benchmark: forecast skill evaluation over a month of forecasts for many sites.
+
+Synthesizes `--days` days of hourly truth per site and a 96-hour forecast
+fetched every `--every` hours whose error grows with lead time, then
+times skill_sums (sorted join, batch AQI scoring, bincount statistics)
+over all of it, fed in daily chunks of fetches. The Python-loop baseline
+(dict lookup and calculate_all_aqi_values per row) runs on a sample and
+is extrapolated. Finally evaluate_store runs on a smaller store to show
+the cost of reading rows back from SQLite.
+
+Usage:
+    python benchmarks/bench_skill.py [--sites 1000] [--days 30] [--every 6] [--store-sites 20]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.air_quality_models import PollutantComponents  # noqa: E402
+from module.core.aqi_analysis import categorize_aqi  # noqa: E402
+from module.core.aqi_calculators import POLLUTANT_FIELDS, calculate_all_aqi_values  # noqa: E402
+from module.core.skill import add_sums, evaluate_store, skill_sums, skill_table  # noqa: E402
+from module.core.store import TimeSeriesStore  # noqa: E402
+
+HOURS = 96
+T0 = 1700000000 // 3600 * 3600
+SCALE = np.array([8.0, 20.0, 15.0, 10.0, 300.0, 30.0])
+
+
+def synthesize(sites, days, every, seed=0):
+    """Truth (observations) and forecast chunks, one chunk per day of fetches."""
+    rng = np.random.default_rng(seed)
+    steps = days * 24
+    truth = rng.gamma(4.0, SCALE / 4, size=(sites, steps + HOURS, len(POLLUTANT_FIELDS))).round(2)
+    cells = np.arange(sites, dtype=np.int64) * 1000 + 7
+    dt = T0 + 3600 * np.arange(steps + HOURS)
+    observations = {'cell': np.repeat(cells, steps), 'dt': np.tile(dt[:steps], sites)}
+    observations.update((field, truth[:, :steps, i].ravel()) for i, field in enumerate(POLLUTANT_FIELDS))
+
+    def chunks():
+        for day in range(days):
+            starts = np.arange(day * 24, (day + 1) * 24, every)
+            site, start, lead = np.meshgrid(np.arange(sites), starts, np.arange(HOURS), indexing='ij')
+            site, start, lead = site.ravel(), start.ravel(), lead.ravel()
+            noise = 1 + rng.normal(0, 0.02, (len(lead), 1)) * np.sqrt(lead)[:, None]
+            values = (truth[site, start + lead] * np.abs(noise)).round(2)
+            chunk = {'cell': cells[site], 'dt': dt[start + lead], 'fetched_at': dt[start] + 600}
+            chunk.update((field, values[:, i]) for i, field in enumerate(POLLUTANT_FIELDS))
+            yield chunk
+
+    return observations, chunks
+
+
+def python_loop(forecasts, observations, max_lead=HOURS):
+    """Per-row baseline: dict join and scalar AQI for every forecast row."""
+    index = {(c, t): i for i, (c, t) in enumerate(zip(observations['cell'].tolist(), observations['dt'].tolist()))}
+    sums = {}
+    for i in range(len(forecasts['dt'])):
+        j = index.get((int(forecasts['cell'][i]), int(forecasts['dt'][i])))
+        lead = -((int(forecasts['fetched_at'][i]) - int(forecasts['dt'][i])) // 3600)
+        if j is None or not 1 <= lead <= max_lead:
+            continue
+        f = PollutantComponents(co=forecasts['co'][i], no=0, no2=forecasts['no2'][i], o3=forecasts['o3'][i],
+                                so2=forecasts['so2'][i], pm2_5=forecasts['pm2_5'][i], pm10=forecasts['pm10'][i],
+                                nh3=0)
+        o = PollutantComponents(co=observations['co'][j], no=0, no2=observations['no2'][j],
+                                o3=observations['o3'][j], so2=observations['so2'][j],
+                                pm2_5=observations['pm2_5'][j], pm10=observations['pm10'][j], nh3=0)
+        aqi_f, aqi_o = max(calculate_all_aqi_values(f)), max(calculate_all_aqi_values(o))
+        entry = sums.setdefault(lead, [0, 0.0, 0.0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += aqi_f - aqi_o
+        entry[2] += abs(aqi_f - aqi_o)
+        entry[3] += (aqi_f - aqi_o) ** 2
+        entry[4] += int(categorize_aqi(aqi_f) == categorize_aqi(aqi_o))
+    return sums
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--every', type=int, default=6, help="Hours between fetches of a site")
+    parser.add_argument('--store-sites', type=int, default=20)
+    args = parser.parse_args()
+
+    observations, chunks = synthesize(args.sites, args.days, args.every)
+    total, rows, elapsed = None, 0, 0.0
+    for chunk in chunks():
+        start = time.perf_counter()
+        total = add_sums(total, skill_sums(chunk, observations))
+        elapsed += time.perf_counter() - start
+        rows += len(chunk['dt'])
+        sample = chunk
+    table = skill_table(total)
+    aqi = table[table['variable'] == 'aqi'].set_index('lead_hours')
+    print(f"{args.sites} sites x {args.days} days, fetch every {args.every} h: {rows:,} forecast rows")
+    print(f"vectorized: {elapsed:.1f} s ({rows / elapsed / 1e6:.1f} M rows/s)")
+
+    n = 20000
+    part = {key: values[:n] for key, values in sample.items()}
+    start = time.perf_counter()
+    python_loop(part, observations)
+    per_row = (time.perf_counter() - start) / n
+    print(f"python loop: {per_row * 1e6:.0f} µs/row, ~{per_row * rows / 60:.0f} min for all rows "
+          f"({per_row * rows / elapsed:.0f}x)")
+    for lead in (1, 24, 72):
+        print(f"  lead {lead:>2} h: AQI MAE {aqi.loc[lead, 'mae']:.1f}, "
+              f"category hit rate {aqi.loc[lead, 'category_hit_rate']:.0%}")
+
+    observations, chunks = synthesize(args.store_sites, args.days, args.every, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TimeSeriesStore(os.path.join(tmp, 'readings.sqlite'))
+        for chunk in chunks():
+            keys = np.unique(np.column_stack([chunk['cell'], chunk['fetched_at']]), axis=0)
+            for cell, fetched_at in keys:
+                rows_of = np.flatnonzero((chunk['cell'] == cell) & (chunk['fetched_at'] == fetched_at))
+                forecast = {"list": [
+                    {"dt": int(chunk['dt'][i]), "main": {"aqi": 1},
+                     "components": {field: float(chunk[field][i]) for field in POLLUTANT_FIELDS}}
+                    for i in rows_of
+                ]}
+                store.ingest(40.0 + cell / 1e6, -90.0, forecast, fetched_at=int(fetched_at))
+        # Every hour's truth as the nowcast of a later fetch during that hour
+        for site in range(args.store_sites):
+            mask = observations['cell'] == site * 1000 + 7
+            for t, *values in zip(observations['dt'][mask], *(observations[f][mask] for f in POLLUTANT_FIELDS)):
+                store.ingest(40.0 + (site * 1000 + 7) / 1e6, -90.0,
+                             {"list": [{"dt": int(t), "main": {"aqi": 1},
+                                        "components": dict(zip(POLLUTANT_FIELDS, values))}]},
+                             fetched_at=int(t) + 900)
+        start = time.perf_counter()
+        evaluate_store(store, T0, T0 + args.days * 86400)
+        elapsed = time.perf_counter() - start
+        print(f"evaluate_store: {args.store_sites} sites, {len(store):,} rows in {elapsed:.1f} s "
+              f"({len(store) / elapsed / 1e6:.2f} M rows/s, mostly reading SQLite)")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: TimeSeriesStore ingest and indexed range queries.
+
+Fills a store with a year of hourly readings per site, as a poller
+fetching a 96-hour forecast every `--every` hours would, then times:
+
+- one site over the whole year (latest fetch per hour, and every fetch)
+- one site over one week
+- every site at one hour (snapshot)
+
+Usage:
+    python benchmarks/bench_store.py [--sites 100] [--every 24] [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.store import TimeSeriesStore  # noqa: E402
+
+HOURS = 96
+YEAR = 365 * 24 * 3600
+T0 = 1700000000
+
+
+def synthetic_forecast(start, rng):
+    conc = rng.gamma(2.0, [10.0, 25.0, 20.0, 15.0, 400.0, 40.0], size=(HOURS, 6)).round(2).tolist()
+    return {
+        "list": [
+            {"dt": start + h * 3600, "main": {"aqi": 1},
+             "components": {"pm2_5": c[0], "pm10": c[1], "no2": c[2], "so2": c[3], "co": c[4], "o3": c[5],
+                            "no": 0.0, "nh3": 0.0}}
+            for h, c in enumerate(conc)
+        ]
+    }
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=100)
+    parser.add_argument('--every', type=int, default=24, help="Hours between fetches of a site")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    forecasts = [synthetic_forecast(0, rng) for _ in range(16)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TimeSeriesStore(os.path.join(tmp, 'readings.sqlite'))
+        fetches = range(T0, T0 + YEAR, args.every * 3600)
+        start = time.perf_counter()
+        for site in range(args.sites):
+            for i, fetched_at in enumerate(fetches):
+                template = forecasts[(site + i) % len(forecasts)]
+                forecast = {"list": [dict(item, dt=fetched_at + item['dt']) for item in template['list']]}
+                store.ingest(40.0 + site * 0.01, -90.0, forecast, fetched_at=fetched_at)
+        elapsed = time.perf_counter() - start
+        rows = len(store)
+        size = os.path.getsize(os.path.join(tmp, 'readings.sqlite')) / 1e6
+        print(f"ingested {args.sites} sites x {len(fetches)} fetches = {rows:,} rows "
+              f"in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s), {size:.0f} MB")
+
+        lat = 40.0 + (args.sites // 2) * 0.01
+        queries = [
+            ("one site, year, latest", lambda: store.location_range(lat, -90.0, T0, T0 + YEAR)),
+            ("one site, year, every fetch",
+             lambda: store.location_range(lat, -90.0, T0, T0 + YEAR, latest=False)),
+            ("one site, week, latest", lambda: store.location_range(lat, -90.0, T0 + YEAR // 2,
+                                                                    T0 + YEAR // 2 + 7 * 86400)),
+            ("all sites at one hour", lambda: store.snapshot(T0 + YEAR // 2)),
+        ]
+        print(f"{'query':<30} {'rows':>8} {'median ms':>10}")
+        for name, query in queries:
+            ms, result = timed(query, args.repeat)
+            print(f"{name:<30} {len(result['dt']):>8,} {ms:>10.2f}")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
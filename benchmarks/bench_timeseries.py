@@ -0,0 +1,74 @@
+"""
+Benchmark: per-point AQI time-series loop vs the vectorized builder.
+
+Usage:
+    python benchmarks/bench_timeseries.py [--sizes 120 10000 100000] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.core.air_quality_models import AirQualityData, AQIInfo, PollutantComponents  # noqa: E402
+from module.core.aqi_calculators import calculate_all_aqi_values  # noqa: E402
+from module.core.timeseries import build_aqi_timeseries  # noqa: E402
+
+
+def synthetic_forecast(n, seed=0):
+    """n hourly AirQualityData entries with random concentrations."""
+    rng = np.random.default_rng(seed)
+    conc = rng.gamma(2.0, [10.0, 25.0, 20.0, 15.0, 400.0, 40.0], size=(n, 6))
+    return [
+        AirQualityData(
+            dt=1700000000 + i * 3600,
+            main=AQIInfo(aqi=1),
+            components=PollutantComponents(
+                pm2_5=row[0], pm10=row[1], no2=row[2], so2=row[3], co=row[4], o3=row[5],
+                no=0.0, nh3=0.0
+            )
+        )
+        for i, row in enumerate(conc.tolist())
+    ]
+
+
+def per_point_loop(air_quality_list):
+    """The loop calculate_aqi_over_time / calculate_max_aqi_over_time used to run."""
+    dates, max_aqi_values = [], []
+    for d in air_quality_list:
+        dates.append(datetime.fromtimestamp(d.dt))
+        max_aqi_values.append(max(calculate_all_aqi_values(d.components)))
+    return dates, max_aqi_values
+
+
+def median_time(fn, arg, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[120, 10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'points':>8}{'loop (ms)':>12}{'builder (ms)':>15}{'speedup':>10}")
+    for n in args.sizes:
+        forecast = synthetic_forecast(n)
+        loop = median_time(per_point_loop, forecast, args.runs)
+        builder = median_time(build_aqi_timeseries, forecast, args.runs)
+        print(f"{n:>8}{loop * 1000:>12.1f}{builder * 1000:>15.1f}{loop / builder:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: SVG vs WebGL draw and pan time of the forecast figure in a browser.
+
+Writes a self-contained HTML page that, when opened, draws create_aqi_plot
+at each size in both render modes, times Plotly.newPlot and a series of
+scripted pans (x-axis relayouts), and prints a table. Use it to pick
+WEBGL_POINT_THRESHOLD for the browsers operators actually use.
+
+Usage:
+    python benchmarks/bench_webgl_threshold.py [--sizes 500 1000 2000 5000 20000]
+        [--output webgl_threshold.html]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from plotly.offline import get_plotlyjs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.streamlit_ui.plots import create_aqi_plot  # noqa: E402
+from bench_aqi_plot import synthetic_series  # noqa: E402
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><script>{plotlyjs}</script></head>
+<body>
+<pre id="out">running...</pre>
+<div id="plot" style="width: 1200px; height: 500px;"></div>
+<script>
+const figures = {figures};
+const PANS = 30;
+
+async function measure(fig) {{
+  const el = document.getElementById('plot');
+  Plotly.purge(el);
+  let t = performance.now();
+  await Plotly.newPlot(el, fig.data, fig.layout);
+  const draw = performance.now() - t;
+  const x = fig.data[fig.data.length - 1].x;
+  const first = Date.parse(x[0]), last = Date.parse(x[x.length - 1]);
+  const span = (last - first) / 4;
+  t = performance.now();
+  for (let i = 0; i < PANS; i++) {{
+    const start = first + (last - first - span) * i / PANS;
+    await Plotly.relayout(el, {{'xaxis.range': [new Date(start), new Date(start + span)]}});
+  }}
+  return [draw, (performance.now() - t) / PANS];
+}}
+
+(async () => {{
+  const rows = ['  points  mode    draw (ms)  pan (ms/frame)'];
+  for (const [n, mode, fig] of figures) {{
+    const [draw, pan] = await measure(fig);
+    rows.push(`${{String(n).padStart(8)}}  ${{mode.padEnd(6)}}${{draw.toFixed(1).padStart(11)}}${{pan.toFixed(1).padStart(16)}}`);
+    document.getElementById('out').textContent = rows.join('\\n');
+  }}
+}})();
+</script></body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 5000, 20_000])
+    parser.add_argument("--output", default="webgl_threshold.html")
+    args = parser.parse_args()
+
+    figures = []
+    for n in args.sizes:
+        dates, aqi = synthetic_series(n)
+        for mode in ("svg", "webgl"):
+            fig = create_aqi_plot(dates, aqi, "Benchmark", width_px=None, render_mode=mode)
+            figures.append([n, mode, json.loads(fig.to_json())])
+
+    with open(args.output, "w", encoding="utf-8") as fh:
+        fh.write(PAGE.format(plotlyjs=get_plotlyjs(), figures=json.dumps(figures)))
+    print(f"Wrote {args.output}; open it in a browser to run the benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,31 +2,43 @@
 Air Quality Analysis - Streamlit Web Application.
 
 Main entry point for the air quality dashboard. Users enter a location
-to view current air quality and 5-day forecast with EPA AQI calculations.
+to view current air quality and 5-day forecast with EPA AQI calculations,
+switch to comparison mode to view several locations side by side, map
+AQI across a region, or rank a watchlist's sites by worst air.
 """
 
 import streamlit as st
 from module.streamlit_ui.location import get_location_data
 from module.streamlit_ui.main_display import display_air_quality_data
+from module.streamlit_ui.comparison import display_comparison_mode
+from module.streamlit_ui.region import display_region_mode
+from module.streamlit_ui.leaderboard import display_leaderboard_mode
 from module.core.aqi_calculators import calculate_all_aqi_values
-from module.core.air_quality_api import read_pollution_data_from_api, convert_json_to_object
+from module.core.background import run_in_background
+from module.streamlit_ui.caching import (
+    cached_coordinates,
+    cached_air_quality,
+    cached_aqi_analysis,
+    cached_leaderboard,
+    cached_region_sample,
+    display_cache_admin,
+    get_figure_cache
+)
 
+MODES = ("Single location", "Compare locations", "Region heatmap", "Worst air leaderboard")
 
-def fetch_air_quality_data(lat, lon):
-    """Fetch and parse air quality data from OpenWeather API.
+
+def start_air_quality_fetch(lat, lon):
+    """Start a cached air quality fetch in a background thread.
     
     Args:
         lat: Latitude
         lon: Longitude
     
     Returns:
-        AirQualityResponse object or None if fetch fails
+        Future resolving to an AirQualityResponse or None
     """
-    try:
-        json_data = read_pollution_data_from_api(lat, lon)
-        return convert_json_to_object(json_data)
-    except Exception:
-        return None
+    return run_in_background(cached_air_quality, lat, lon)
 
 
 def setup_page():
@@ -50,19 +62,47 @@ def main():
     """Main application flow."""
     setup_page()
     
-    # Step 1: Get location from user
-    lat, lon, display_name = get_location_data()
+    mode = st.sidebar.radio("Mode", MODES, key="mode")
+    if mode != MODES[0]:
+        if mode == MODES[1]:
+            display_comparison_mode(geocode=cached_coordinates, fetch=cached_air_quality)
+        elif mode == MODES[2]:
+            display_region_mode(geocode=cached_coordinates, sample=cached_region_sample)
+        else:
+            display_leaderboard_mode(load=cached_leaderboard)
+        display_cache_admin()
+        display_footer()
+        return
+    
+    # Step 1: Get location from user. The forecast fetch starts as soon as
+    # coordinates are known, so it runs while the map is being rendered.
+    prefetch = {}
+    
+    def prefetch_forecast(lat, lon):
+        prefetch[(lat, lon)] = start_air_quality_fetch(lat, lon)
+    
+    lat, lon, display_name = get_location_data(
+        on_coordinates=prefetch_forecast,
+        geocode=cached_coordinates
+    )
     
-    # Step 2: Fetch and display air quality if location valid
+    # Step 2: Collect the fetch and display air quality if location valid
     if lat and lon:
         with st.spinner("Fetching air quality data..."):
-            air_pollution_data = fetch_air_quality_data(lat, lon)
+            pending = prefetch.get((lat, lon)) or start_air_quality_fetch(lat, lon)
+            air_pollution_data = pending.result()
+            analysis = None
+            if air_pollution_data:
+                analysis = cached_aqi_analysis(air_pollution_data)
             display_air_quality_data(
                 air_pollution_data,
                 display_name,
-                calculate_all_aqi_values
+                calculate_all_aqi_values,
+                analysis,
+                get_figure_cache()
             )
     
+    display_cache_admin()
     display_footer()
 
 
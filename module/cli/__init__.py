@@ -0,0 +1,9 @@
+"""
+Command-Line Interface.
+
+Headless entry points (``clearskies <command>``) for work that does not
+belong in the Streamlit app, such as batch jobs over location inventories.
+Depends on core module for business logic.
+"""
+
+from .main import main, build_parser
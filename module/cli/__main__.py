@@ -0,0 +1,7 @@
+"""Allow running the CLI as ``python -m module.cli``."""
+
+import sys
+
+from .main import main
+
+sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+``clearskies batch`` - per-timestamp AQI report for a file of locations.
+
+Example:
+    clearskies batch sites.csv -o report.parquet --column name
+
+Input rows that already carry ``lat`` and ``lon`` columns (for example the
+output of ``clearskies geocode``) are not geocoded again. Geocodes and
+forecasts are cached on disk, so rerunning a report within the hour only
+re-scores and rewrites.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+import requests
+
+from ..core.air_quality_api import ForecastCache, OPENWEATHER_RATE_PER_SECOND
+from ..core.batch_geocoding import geocode_batch, read_location_names
+from ..core.batch_report import (
+    DEFAULT_CHUNK_LOCATIONS,
+    FORECAST_MAX_AGE_SECONDS,
+    ReportWriter,
+    run_batch_report
+)
+from ..core.geocoding import GeocodingCache, NOMINATIM_RATE_PER_SECOND
+from ..core.throttle import RateLimiter
+from .geocode import DEFAULT_CACHE_PATH, ProgressPrinter
+
+DEFAULT_FORECAST_CACHE_PATH = os.path.join("data", "forecast_cache.sqlite")
+
+
+def add_parser(subparsers):
+    """Register the batch command."""
+    parser = subparsers.add_parser(
+        "batch",
+        help="Compute AQI reports for a file of locations to CSV/Parquet",
+        description="Geocode, fetch and score the forecast of every location, "
+                    "writing one row per location and timestamp."
+    )
+    parser.add_argument("input", help="Input .txt (one name per line), .csv or .parquet file")
+    parser.add_argument("-o", "--output", required=True, help="Output .csv or .parquet file")
+    parser.add_argument("--column", help="Column holding location names (csv/parquet input)")
+    parser.add_argument("--geocode-cache", default=DEFAULT_CACHE_PATH,
+                        help=f"Geocoding cache database (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--forecast-cache", default=DEFAULT_FORECAST_CACHE_PATH,
+                        help=f"Forecast cache database (default: {DEFAULT_FORECAST_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the caches")
+    parser.add_argument("--max-age", type=float, default=FORECAST_MAX_AGE_SECONDS,
+                        help="Refetch cached forecasts older than this many seconds")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent network requests")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Scoring processes (default: CPUs - 1; 0 scores in the main process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_LOCATIONS,
+                        help="Locations scored per process-pool task")
+    parser.add_argument("--geocode-rate", type=float, default=NOMINATIM_RATE_PER_SECOND,
+                        help="Maximum Nominatim requests per second (policy limit is 1)")
+    parser.add_argument("--fetch-rate", type=float, default=OPENWEATHER_RATE_PER_SECOND,
+                        help="Maximum OpenWeather requests per second (free tier allows 1)")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per request on network errors")
+    parser.set_defaults(run=run)
+    return parser
+
+
+class ReportProgress:
+    """Print a report progress line to stderr at most every `interval` seconds."""
+
+    def __init__(self, interval=1.0, stream=None):
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self._start = time.monotonic()
+        self._last = 0.0
+
+    def __call__(self, stats):
+        now = time.monotonic()
+        finished = stats['written'] + stats['failed'] == stats['total']
+        if finished or now - self._last >= self.interval:
+            self._last = now
+            print(
+                f"fetched {stats['fetched']}/{stats['total']} "
+                f"(cached {stats['cached']}, failed {stats['failed']}), "
+                f"written {stats['written']} locations / {stats['rows']} rows "
+                f"in {now - self._start:.0f}s",
+                file=self.stream
+            )
+
+
+def read_locations(path, column=None):
+    """Read the input as location dicts, using lat/lon columns when present.
+
+    Returns:
+        tuple: (list of location dicts, or None if the input needs
+            geocoding, list of location names)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.csv', '.parquet'):
+        frame = pd.read_parquet(path) if ext == '.parquet' else pd.read_csv(path)
+        if {'lat', 'lon'} <= set(frame.columns):
+            if column is None:
+                column = 'location' if 'location' in frame.columns else frame.columns[0]
+            frame = frame.dropna(subset=['lat', 'lon'])
+            display_names = frame['display_name'] if 'display_name' in frame.columns else frame[column]
+            locations = [
+                {'location': str(name), 'display_name': str(display), 'lat': float(lat), 'lon': float(lon)}
+                for name, display, lat, lon in zip(frame[column], display_names, frame['lat'], frame['lon'])
+            ]
+            return locations, [location['location'] for location in locations]
+    return None, read_location_names(path, column=column)
+
+
+def open_cache(factory, path, disabled):
+    """Open a cache database, creating its directory, or None if disabled."""
+    if disabled:
+        return None
+    cache_dir = os.path.dirname(path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    return factory(path)
+
+
+def geocode_locations(names, cache, args, session):
+    """Geocode names for commands that take --geocode-rate/--workers/--retries.
+
+    Returns:
+        tuple: (location dicts that were found, number of failed lookups)
+    """
+    rows, stats = geocode_batch(
+        names,
+        cache=cache,
+        limiter=RateLimiter(args.geocode_rate),
+        workers=args.workers,
+        progress=ProgressPrinter(),
+        session=session,
+        retries=args.retries
+    )
+    for name, error in stats['errors']:
+        print(f"{name}: {error}", file=sys.stderr)
+    for row in rows:
+        if row['lat'] is None:
+            print(f"{row['location']}: location not found", file=sys.stderr)
+    return [row for row in rows if row['lat'] is not None], stats['failed']
+
+
+def run(args):
+    """Execute the batch command.
+
+    Returns:
+        int: 0 on success, 1 if some locations failed (rerun to retry them)
+    """
+    locations, names = read_locations(args.input, column=args.column)
+    geocode_cache = None
+    forecast_cache = open_cache(ForecastCache, args.forecast_cache, args.no_cache)
+    failed = 0
+
+    try:
+        with requests.Session() as session:
+            if locations is None:
+                geocode_cache = open_cache(GeocodingCache, args.geocode_cache, args.no_cache)
+                locations, failed = geocode_locations(names, geocode_cache, args, session)
+
+            with ReportWriter(args.output) as writer:
+                stats = run_batch_report(
+                    locations,
+                    writer,
+                    cache=forecast_cache,
+                    limiter=RateLimiter(args.fetch_rate),
+                    workers=args.workers,
+                    processes=args.processes,
+                    chunk_size=args.chunk_size,
+                    progress=ReportProgress(),
+                    session=session,
+                    retries=args.retries,
+                    max_age=args.max_age
+                )
+            failed += stats['failed']
+    except KeyboardInterrupt:
+        print("Interrupted; no report written. Cached geocodes and forecasts are kept.", file=sys.stderr)
+        return 130
+    finally:
+        for cache in (geocode_cache, forecast_cache):
+            if cache is not None:
+                cache.close()
+
+    print(f"Wrote {stats['rows']} rows for {stats['written']} locations to {args.output}", file=sys.stderr)
+    if failed:
+        print(f"{failed} locations failed; rerun to retry them", file=sys.stderr)
+        return 1
+    return 0
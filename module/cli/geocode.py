@@ -0,0 +1,116 @@
+"""
+``clearskies geocode`` - batch geocode a file of location names.
+
+Example:
+    clearskies geocode sites.csv -o sites_geocoded.parquet --column name
+
+Killing the job is safe: finished rows live in ``<output>.checkpoint``
+and rerunning the same command resumes from there.
+"""
+
+import os
+import sys
+import time
+
+import requests
+
+from ..core.batch_geocoding import (
+    GeocodeCheckpoint,
+    geocode_batch,
+    read_location_names,
+    write_geocode_results
+)
+from ..core.geocoding import GeocodingCache, NOMINATIM_RATE_PER_SECOND
+from ..core.throttle import RateLimiter
+
+DEFAULT_CACHE_PATH = os.path.join("data", "geocode_cache.sqlite")
+
+
+def add_parser(subparsers):
+    """Register the geocode command."""
+    parser = subparsers.add_parser(
+        "geocode",
+        help="Geocode a file of location names to CSV/Parquet",
+        description="Resolve location names to lat/lon/display_name via Nominatim."
+    )
+    parser.add_argument("input", help="Input .txt (one name per line), .csv or .parquet file")
+    parser.add_argument("-o", "--output", required=True, help="Output .csv or .parquet file")
+    parser.add_argument("--column", help="Column holding location names (csv/parquet input)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH,
+                        help=f"Geocoding cache database (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the cache")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent worker threads")
+    parser.add_argument("--rate", type=float, default=NOMINATIM_RATE_PER_SECOND,
+                        help="Maximum Nominatim requests per second (policy limit is 1)")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per name on network errors")
+    parser.set_defaults(run=run)
+    return parser
+
+
+class ProgressPrinter:
+    """Print a progress line to stderr at most every `interval` seconds."""
+
+    def __init__(self, interval=1.0, stream=None):
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self._last = 0.0
+
+    def __call__(self, stats):
+        now = time.monotonic()
+        finished = stats['done'] + stats['failed'] == stats['total']
+        if finished or now - self._last >= self.interval:
+            self._last = now
+            print(
+                f"geocoded {stats['done']}/{stats['total']} "
+                f"(cached {stats['cached']}, resumed {stats['resumed']}, failed {stats['failed']})",
+                file=self.stream
+            )
+
+
+def run(args):
+    """Execute the geocode command.
+    
+    Returns:
+        int: 0 on success, 1 if some names failed (rerun to retry them)
+    """
+    names = read_location_names(args.input, column=args.column)
+    
+    cache = None
+    if not args.no_cache:
+        cache_dir = os.path.dirname(args.cache)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        cache = GeocodingCache(args.cache)
+    
+    checkpoint = GeocodeCheckpoint(args.output + ".checkpoint")
+    limiter = RateLimiter(args.rate)
+    
+    try:
+        with requests.Session() as session:
+            rows, stats = geocode_batch(
+                names,
+                cache=cache,
+                limiter=limiter,
+                workers=args.workers,
+                checkpoint=checkpoint,
+                progress=ProgressPrinter(),
+                session=session,
+                retries=args.retries
+            )
+    except KeyboardInterrupt:
+        checkpoint.close()
+        print(f"Interrupted; rerun the same command to resume from {checkpoint.path}", file=sys.stderr)
+        return 130
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    write_geocode_results(rows, args.output)
+    for name, error in stats['errors']:
+        print(f"{name}: {error}", file=sys.stderr)
+    if stats['failed']:
+        checkpoint.close()
+        print(f"{stats['failed']} locations failed; rerun to retry them", file=sys.stderr)
+        return 1
+    checkpoint.remove()
+    return 0
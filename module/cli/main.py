@@ -0,0 +1,45 @@
+"""
+ClearSkies command dispatcher.
+
+Each command lives in its own module exposing ``add_parser(subparsers)``
+and ``run(args)``; this module wires them into one argparse program.
+"""
+
+import argparse
+
+from . import batch, geocode, serve, watch
+
+COMMANDS = [geocode, batch, serve, watch]
+
+
+def build_parser():
+    """Create the top-level argument parser with all subcommands.
+    
+    Returns:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog="clearskies",
+        description="ClearSkies air quality tools. Run the dashboard with `streamlit run main.py`."
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
+    for command in COMMANDS:
+        command.add_parser(subparsers)
+    return parser
+
+
+def main(argv=None):
+    """Parse arguments and run the selected command.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    
+    Returns:
+        int: Process exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.run(args)
@@ -0,0 +1,96 @@
+"""
+``clearskies serve`` - run the JSON API.
+
+Example:
+    clearskies serve --port 8080
+    curl 'http://127.0.0.1:8080/aqi?lat=42.03&lon=-93.62'
+
+Geocodes and forecasts go through the same on-disk caches and rate limits
+as the batch commands, so the service and batch jobs share one upstream
+budget when pointed at the same files.
+"""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from ..core.air_quality_api import ForecastCache, OPENWEATHER_RATE_PER_SECOND
+from ..core.batch_report import FORECAST_MAX_AGE_SECONDS, fetch_forecast
+from ..core.geocoding import GeocodingCache, NOMINATIM_RATE_PER_SECOND, geocode_location
+from ..core.store import TimeSeriesStore
+from ..core.throttle import RateLimiter
+from ..service.app import AQIService, RESPONSE_TTL_SECONDS
+from ..service.server import start_server
+from .batch import DEFAULT_FORECAST_CACHE_PATH, open_cache
+from .geocode import DEFAULT_CACHE_PATH
+
+
+def add_parser(subparsers):
+    """Register the serve command."""
+    parser = subparsers.add_parser(
+        "serve",
+        help="Run the AQI JSON API over HTTP",
+        description="Serve /aqi, /forecast, /aqi/batch, /aqi/score and /leaderboard as JSON."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--geocode-cache", default=DEFAULT_CACHE_PATH,
+                        help=f"Geocoding cache database (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--forecast-cache", default=DEFAULT_FORECAST_CACHE_PATH,
+                        help=f"Forecast cache database (default: {DEFAULT_FORECAST_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk caches")
+    parser.add_argument("--store", help="Time-series store written by 'clearskies watch'; "
+                                        "/leaderboard then ranks its sites too")
+    parser.add_argument("--ttl", type=float, default=RESPONSE_TTL_SECONDS,
+                        help="Seconds a response is served from memory")
+    parser.add_argument("--workers", type=int, default=8, help="Threads for upstream requests")
+    parser.add_argument("--geocode-rate", type=float, default=NOMINATIM_RATE_PER_SECOND,
+                        help="Maximum Nominatim requests per second (policy limit is 1)")
+    parser.add_argument("--fetch-rate", type=float, default=OPENWEATHER_RATE_PER_SECOND,
+                        help="Maximum OpenWeather requests per second (free tier allows 1)")
+    parser.set_defaults(run=run)
+    return parser
+
+
+async def serve(service, host, port):
+    server = await start_server(service, host, port)
+    print(f"Serving on http://{host}:{server.sockets[0].getsockname()[1]}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def run(args):
+    """Execute the serve command.
+
+    Returns:
+        int: 0 after Ctrl+C
+    """
+    geocode_cache = open_cache(GeocodingCache, args.geocode_cache, args.no_cache)
+    forecast_cache = open_cache(ForecastCache, args.forecast_cache, args.no_cache)
+    geocode_limiter = RateLimiter(args.geocode_rate)
+    fetch_limiter = RateLimiter(args.fetch_rate)
+    session = requests.Session()
+    executor = ThreadPoolExecutor(max_workers=max(1, args.workers))
+
+    def geocode(name):
+        return geocode_location(name, cache=geocode_cache, limiter=geocode_limiter, session=session)[0]
+
+    def fetch(lat, lon):
+        return fetch_forecast(lat, lon, cache=forecast_cache, limiter=fetch_limiter, session=session,
+                              retries=0, max_age=FORECAST_MAX_AGE_SECONDS)[0]
+
+    store = TimeSeriesStore(args.store) if args.store else None
+    service = AQIService(geocode=geocode, fetch=fetch, executor=executor, response_ttl=args.ttl, store=store)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("Stopped.", file=sys.stderr)
+    finally:
+        executor.shutdown(wait=False)
+        session.close()
+        for cache in (geocode_cache, forecast_cache, store):
+            if cache is not None:
+                cache.close()
+    return 0
@@ -0,0 +1,168 @@
+"""
+``clearskies watch`` - keep a watchlist of sites fresh within the API quota.
+
+Example:
+    clearskies watch sites_geocoded.parquet --store data/readings.sqlite --calls-per-day 20000
+
+Replaces a cron loop over read_pollution_data_from_api: sites are polled
+from a priority heap, volatile or unhealthy sites more often and calm ones
+less, and every fetch lands in the time-series store. With --processes N
+the watchlist is sharded across N worker processes sharing the quota.
+With --rules, threshold alerts are printed to stdout as JSON lines.
+"""
+
+import dataclasses
+import functools
+import json
+import os
+import sys
+
+import requests
+
+from ..core.air_quality_api import OPENWEATHER_RATE_PER_SECOND
+from ..core.alerts import AlertEngine, read_rules
+from ..core.batch_report import fetch_forecast
+from ..core.geocoding import GeocodingCache, NOMINATIM_RATE_PER_SECOND
+from ..core.poller import RefreshPolicy, WatchlistPoller
+from ..core.sharding import run_sharded
+from ..core.store import TimeSeriesStore
+from ..core.throttle import RateLimiter, SharedRateLimiter
+from .batch import geocode_locations, open_cache, read_locations
+from .geocode import DEFAULT_CACHE_PATH
+
+DEFAULT_STORE_PATH = os.path.join("data", "readings.sqlite")
+
+
+def add_parser(subparsers):
+    """Register the watch command."""
+    parser = subparsers.add_parser(
+        "watch",
+        help="Poll a watchlist of locations into the time-series store",
+        description="Refresh every location on an adaptive schedule within the API quota."
+    )
+    parser.add_argument("input", help="Input .txt (one name per line), .csv or .parquet file")
+    parser.add_argument("--column", help="Column holding location names (csv/parquet input)")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH,
+                        help=f"Time-series store database (default: {DEFAULT_STORE_PATH})")
+    parser.add_argument("--geocode-cache", default=DEFAULT_CACHE_PATH,
+                        help=f"Geocoding cache database (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the geocoding cache")
+    parser.add_argument("--rate", type=float, default=OPENWEATHER_RATE_PER_SECOND,
+                        help="Maximum OpenWeather requests per second (free tier allows 1)")
+    parser.add_argument("--calls-per-day", type=float,
+                        help="Daily call budget; lowers the request rate to fit it")
+    parser.add_argument("--min-interval", type=float, default=10,
+                        help="Shortest refresh interval in minutes")
+    parser.add_argument("--base-interval", type=float, default=60,
+                        help="Refresh interval in minutes of a calm site with no extra demand")
+    parser.add_argument("--max-interval", type=float, default=360,
+                        help="Longest refresh interval in minutes")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent network requests per process")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes; the watchlist is sharded across them")
+    parser.add_argument("--geocode-rate", type=float, default=NOMINATIM_RATE_PER_SECOND,
+                        help="Maximum Nominatim requests per second (policy limit is 1)")
+    parser.add_argument("--retries", type=int, default=2, help="Geocoding retries on network errors")
+    parser.add_argument("--report-every", type=float, default=60, help="Seconds between status lines")
+    parser.add_argument("--rules", help="Alert rules .csv/.parquet (rule_id, threshold[, metric, horizon, "
+                                        "hysteresis, lat, lon]); alerts go to stdout as JSON lines")
+    parser.set_defaults(run=run)
+    return parser
+
+
+def quota_rate(rate, calls_per_day=None):
+    """Requests per second allowed by both the rate cap and the daily budget."""
+    if calls_per_day:
+        rate = min(rate, calls_per_day / 86400)
+    return rate
+
+
+def session_fetch():
+    """Build a ``fetch(lat, lon)`` with its own HTTP session (one per worker process)."""
+    session = requests.Session()
+
+    def fetch(lat, lon):
+        return fetch_forecast(lat, lon, session=session, retries=0)[0]
+
+    return fetch
+
+
+def alert_printer(rules, stream=None):
+    """Build an ``on_fetch`` callback printing the alerts of `rules` as JSON lines."""
+    engine = AlertEngine(rules)
+
+    def on_fetch(site, forecast, fetched_at):
+        for alert in engine.update(site.lat, site.lon, forecast, now=fetched_at):
+            print(json.dumps(dataclasses.asdict(alert)), file=stream or sys.stdout, flush=True)
+
+    return on_fetch
+
+
+def print_summary(summary, stream=None):
+    """Print one status line of a watchlist freshness summary (stderr by default)."""
+    print(
+        f"{summary['sites']} sites, {summary['overdue']} overdue, {summary['never_fetched']} never fetched; "
+        f"age median {summary['median_age'] / 60:.0f} min, p95 {summary['p95_age'] / 60:.0f} min; "
+        f"{summary['calls']} calls ({summary['calls_per_hour']:.0f}/h)",
+        file=stream or sys.stderr
+    )
+
+
+def run(args):
+    """Execute the watch command.
+
+    Returns:
+        int: 0 after Ctrl+C, 1 if no location could be resolved
+    """
+    locations, names = read_locations(args.input, column=args.column)
+    rules = read_rules(args.rules) if args.rules else None
+    store = open_cache(TimeSeriesStore, args.store, False)
+    geocode_cache = None
+    session = requests.Session()
+    try:
+        if locations is None:
+            geocode_cache = open_cache(GeocodingCache, args.geocode_cache, args.no_cache)
+            locations, _ = geocode_locations(names, geocode_cache, args, session)
+        if not locations:
+            print("No locations to watch", file=sys.stderr)
+            return 1
+
+        policy = RefreshPolicy(
+            base_interval=args.base_interval * 60,
+            min_interval=args.min_interval * 60,
+            max_interval=args.max_interval * 60
+        )
+        rate = quota_rate(args.rate, args.calls_per_day)
+        if args.processes > 1:
+            sites = [(location['lat'], location['lon'], location['location']) for location in locations]
+            print(f"Watching {len(sites)} sites in {args.processes} processes; Ctrl+C to stop", file=sys.stderr)
+            summary = run_sharded(
+                sites, args.processes,
+                store_path=args.store,
+                fetch_factory=session_fetch,
+                limiter=SharedRateLimiter(rate),
+                policy=policy,
+                workers=args.workers,
+                report=print_summary,
+                report_every=args.report_every,
+                on_fetch_factory=functools.partial(alert_printer, rules) if rules else None
+            )
+            print_summary(summary)
+            return 0
+
+        poller = WatchlistPoller(fetch=session_fetch(), store=store, limiter=RateLimiter(rate), policy=policy,
+                                 on_fetch=alert_printer(rules) if rules else None)
+        for location in locations:
+            poller.add_site(location['lat'], location['lon'], name=location['location'])
+        print(f"Watching {len(poller.sites)} sites; Ctrl+C to stop", file=sys.stderr)
+        try:
+            poller.run(workers=args.workers, report=lambda p: print_summary(p.summary()),
+                       report_every=args.report_every)
+        except KeyboardInterrupt:
+            print_summary(poller.summary())
+        return 0
+    finally:
+        session.close()
+        for cache in (geocode_cache, store):
+            if cache is not None:
+                cache.close()
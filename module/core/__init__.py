@@ -16,8 +16,15 @@ from .air_quality_api import (
     read_pollution_data_from_api,
     convert_json_to_object
 )
-from .aqi_calculators import calculate_all_aqi_values
-from .geocoding import get_coordinates_from_location
+from .aqi_calculators import calculate_all_aqi_values, calculate_all_aqi_batch
+from .aqi_analysis import AQIAnalysis, analyze_air_quality
+from .geocoding import (
+    get_coordinates_from_location,
+    geocode_location,
+    GeocodingCache
+)
+from .throttle import RateLimiter
+from .timeseries import build_aqi_timeseries
 from .visualization import (
     calculate_max_aqi_over_time,
     plot_max_aqi_over_time
@@ -32,7 +39,14 @@ __all__ = [
     'read_pollution_data_from_api',
     'convert_json_to_object',
     'calculate_all_aqi_values',
+    'calculate_all_aqi_batch',
+    'AQIAnalysis',
+    'analyze_air_quality',
     'get_coordinates_from_location',
+    'geocode_location',
+    'GeocodingCache',
+    'RateLimiter',
+    'build_aqi_timeseries',
     'calculate_max_aqi_over_time',
     'plot_max_aqi_over_time'
 ]
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+Vectorized calendar aggregation of columnar readings.
+
+Daily and monthly summaries ("days above Moderate this month",
+"95th-percentile PM2.5") over millions of rows. Timestamps are bucketed
+by hour, day, week (Monday start) or month in each location's own time
+zone, so a day is a local calendar day of 23 to 25 hours. Rows are
+sorted once by (location, bucket) and every statistic is a segmented
+NumPy reduction over that order:
+
+- max and mean (the mean of a day bucket is its 24-hour mean)
+- percentiles, by a second sort on value within each segment
+- exceedance counts: rows above each threshold
+- dominant-pollutant frequency
+
+There are no per-bucket Python loops. reaggregate rolls a summary up to
+coarser buckets: daily aqi_max by month with a threshold of 100 counts
+the days above Moderate.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aqi_calculators import POLLUTANT_FIELDS, calculate_all_aqi_batch
+from .timeseries import local_timezone
+
+BUCKETS = ('hour', 'day', 'week', 'month')
+DEFAULT_PERCENTILES = (95,)
+# Upper bounds of Good, Moderate, USG, Unhealthy and Very Unhealthy
+DEFAULT_THRESHOLDS = {'aqi': (50, 100, 150, 200, 300)}
+
+
+def local_buckets(dt, freq='day', tz=None, groups=None):
+    """Calendar bucket number of each timestamp in its location's timezone.
+
+    Args:
+        dt: Unix seconds (N,)
+        freq: One of BUCKETS
+        tz: Timezone (name or tzinfo) of every row, or a dict mapping each
+            value of `groups` to its timezone; default the local timezone
+        groups: Location key of each row (N,), needed when tz is a dict
+
+    Returns:
+        numpy.ndarray: int64 bucket numbers; bucket_starts turns them back
+            into local start times
+    """
+    if freq not in BUCKETS:
+        raise ValueError(f"Unknown bucket {freq!r}; expected one of {BUCKETS}")
+    dt = np.asarray(dt, dtype=np.int64)
+    local = np.empty(len(dt), dtype=np.int64)
+    if isinstance(tz, dict):
+        keys, codes = np.unique(np.asarray(groups), return_inverse=True)
+        zone_of_key = [tz[key] for key in keys.tolist()]
+        zones = list(dict.fromkeys(zone_of_key))
+        zone_codes = np.array([zones.index(zone) for zone in zone_of_key], dtype=np.intp)[codes]
+        for i, zone in enumerate(zones):
+            rows = np.flatnonzero(zone_codes == i)
+            local[rows] = _local_seconds(dt[rows], zone)
+    else:
+        local[:] = _local_seconds(dt, tz or local_timezone())
+
+    if freq == 'hour':
+        return local // 3600
+    days = local // 86400
+    if freq == 'day':
+        return days
+    if freq == 'week':
+        return (days + 3) // 7  # 1970-01-01 was a Thursday
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _local_seconds(dt, tz):
+    """Wall-clock time in tz of Unix seconds, as seconds since the local epoch."""
+    local = pd.to_datetime(dt, unit='s', utc=True).tz_convert(tz).tz_localize(None)
+    return local.to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+def bucket_starts(buckets, freq='day'):
+    """Local (naive) start times of bucket numbers from local_buckets."""
+    buckets = np.asarray(buckets, dtype=np.int64)
+    if freq == 'hour':
+        return (buckets * 3600).astype('datetime64[s]')
+    if freq == 'day':
+        return buckets.astype('datetime64[D]')
+    if freq == 'week':
+        return (buckets * 7 - 3).astype('datetime64[D]')
+    return buckets.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def aggregate(dt, columns, freq='day', tz=None, groups=None, percentiles=DEFAULT_PERCENTILES,
+              thresholds=None, dominant=None):
+    """Summarize columns per location and calendar bucket.
+
+    Args:
+        dt: Unix seconds (N,)
+        columns: dict of name -> float array (N,) to summarize
+        freq: One of BUCKETS
+        tz: Timezone, or dict of group -> timezone (see local_buckets)
+        groups: Optional location key per row (N,), e.g. store cells;
+            without it all rows form one location
+        percentiles: Percentiles (0-100) of every column, linearly
+            interpolated like numpy.percentile
+        thresholds: dict of column name -> thresholds; counts rows with
+            values above each
+        dominant: Optional dominant pollutant per row (N,), as an index
+            into POLLUTANT_FIELDS; adds per-pollutant counts and the most
+            frequent one
+
+    Returns:
+        pandas.DataFrame: One row per (group, bucket) in that order, with
+            group (if given), start (local bucket start), count and for
+            each column <name>_max, <name>_mean, <name>_p<q> and
+            <name>_over_<threshold>; then dominant_<field> counts and
+            dominant (most frequent field)
+    """
+    dt = np.asarray(dt, dtype=np.int64)
+    buckets = local_buckets(dt, freq, tz, groups)
+    if groups is not None:
+        group_values, codes = np.unique(np.asarray(groups), return_inverse=True)
+    else:
+        group_values, codes = None, np.zeros(len(dt), dtype=np.int64)
+
+    # One key per (group, bucket); sorting it lays every segment out contiguously
+    first = buckets.min() if len(buckets) else 0
+    span = (buckets.max() - first + 1) if len(buckets) else 1
+    keys = codes.astype(np.int64) * span + (buckets - first)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    boundary = np.empty(len(keys), dtype=bool)
+    boundary[:1] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=boundary[1:])
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, len(keys)))
+    segment_keys = sorted_keys[starts]
+
+    result = {}
+    if group_values is not None:
+        result['group'] = group_values[segment_keys // span]
+    result['start'] = bucket_starts(segment_keys % span + first, freq)
+    result['count'] = counts
+    segment = np.repeat(np.arange(len(starts)), counts)
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=np.float64)
+        ordered = values[order]
+        result[f'{name}_max'] = np.maximum.reduceat(ordered, starts)
+        result[f'{name}_mean'] = np.add.reduceat(ordered, starts) / counts
+        if len(percentiles):
+            ranked = _sort_segments(ordered, segment, boundary)
+            for q in percentiles:
+                result[f'{name}_p{q:g}'] = _segment_percentile(ranked, starts, counts, q)
+        for threshold in (thresholds or {}).get(name, ()):
+            above = (ordered > threshold).astype(np.int64)
+            result[f'{name}_over_{threshold:g}'] = np.add.reduceat(above, starts)
+    if dominant is not None:
+        per_field = np.bincount(segment * len(POLLUTANT_FIELDS) + np.asarray(dominant)[order],
+                                minlength=len(starts) * len(POLLUTANT_FIELDS)).reshape(-1, len(POLLUTANT_FIELDS))
+        for i, field in enumerate(POLLUTANT_FIELDS):
+            result[f'dominant_{field}'] = per_field[:, i]
+        result['dominant'] = np.asarray(POLLUTANT_FIELDS, dtype=object)[per_field.argmax(axis=1)]
+    return pd.DataFrame(result)
+
+
+def reaggregate(summary, freq='month', columns=(), percentiles=(), thresholds=None):
+    """Aggregate an aggregate() result further into coarser buckets.
+
+    Bucket start dates are local already, so they are bucketed as they
+    are. E.g. days above Moderate per month:
+    ``reaggregate(daily, 'month', ['aqi_max'], thresholds={'aqi_max': [100]})``
+    gives aqi_max_over_100.
+
+    Args:
+        summary: DataFrame from aggregate() with start (and group) columns
+        freq: One of BUCKETS, coarser than the summary's
+        columns: Summary columns to aggregate
+        percentiles: Percentiles of those columns across buckets
+        thresholds: dict of column -> thresholds; counts buckets above each
+
+    Returns:
+        pandas.DataFrame: Same layout as aggregate(); count is the number
+            of summary buckets
+    """
+    starts = summary['start'].to_numpy().astype('datetime64[s]').astype(np.int64)
+    groups = summary['group'].to_numpy() if 'group' in summary else None
+    return aggregate(starts, {column: summary[column].to_numpy() for column in columns}, freq=freq, tz='UTC',
+                     groups=groups, percentiles=percentiles, thresholds=thresholds)
+
+
+def _sort_segments(ordered, segment, boundary):
+    """Sort values within each contiguous segment.
+
+    One float sort of segment + scaled value is ~8x faster than
+    np.lexsort; if scaling merged distinct values out of order (or there
+    are NaNs) the result is not ascending and lexsort is used instead.
+    """
+    if len(ordered):
+        low, spread = ordered.min(), np.ptp(ordered)
+        if np.isfinite(spread):
+            # Offsets stay in [0, 0.5] so the integer part is the segment
+            ranked = ordered[np.argsort(segment + (ordered - low) / (2 * spread or 1))]
+            if not np.any((ranked[1:] < ranked[:-1]) & ~boundary[1:]):
+                return ranked
+    return ordered[np.lexsort((ordered, segment))]
+
+
+def _segment_percentile(ranked, starts, counts, q):
+    """Linearly interpolated q-th percentile of each value-sorted segment."""
+    position = (counts - 1) * (q / 100.0)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, counts - 1)
+    fraction = position - low
+    below, above = ranked[starts + low], ranked[starts + high]
+    return below + (above - below) * fraction
+
+
+def aggregate_readings(readings, freq='day', tz=None, percentiles=DEFAULT_PERCENTILES,
+                       thresholds=DEFAULT_THRESHOLDS):
+    """Summarize store readings per location: overall AQI and every pollutant.
+
+    Args:
+        readings: dict with cell, dt and POLLUTANT_FIELDS arrays, e.g.
+            TimeSeriesStore.time_range(start, end)
+        freq: One of BUCKETS
+        tz: Timezone, or dict of cell -> timezone
+        percentiles: Percentiles of every column
+        thresholds: Exceedance thresholds per column; by default hours
+            above each AQI category bound
+
+    Returns:
+        pandas.DataFrame: aggregate() of 'aqi' and the concentrations, by
+            cell ('group') and bucket, with dominant-pollutant counts
+    """
+    concentrations = np.column_stack([readings[field] for field in POLLUTANT_FIELDS])
+    sub_indices = calculate_all_aqi_batch(concentrations)
+    dominant = np.argmax(sub_indices, axis=1)
+    columns = {'aqi': sub_indices.max(axis=1, initial=0.0)}
+    columns.update((field, concentrations[:, i]) for i, field in enumerate(POLLUTANT_FIELDS))
+    return aggregate(readings['dt'], columns, freq=freq, tz=tz, groups=readings['cell'],
+                     percentiles=percentiles, thresholds=thresholds, dominant=dominant)
@@ -2,25 +2,40 @@
 OpenWeather Air Pollution API client.
 
 Fetches air quality data and converts JSON responses to typed objects.
+Raw responses can be kept in a persistent ForecastCache so batch jobs that
+are rerun within the forecast's lifetime do not fetch again.
 """
 
+import json
+import sqlite3
+import threading
+import time
+
 import requests
 from .air_quality_models import AirQualityResponse, Coordinates, PollutantComponents, AirQualityData, AQIInfo
 from keys import appid
 
+# OpenWeather free tier: 60 calls per minute
+OPENWEATHER_RATE_PER_SECOND = 1.0
+
+# Round coordinates so nearby sites share a forecast (~11 m at 4 decimals)
+FORECAST_COORDINATE_DECIMALS = 4
 
-def read_pollution_data_from_api(lat, lon):
+
+def read_pollution_data_from_api(lat, lon, session=None):
     """Fetch air pollution forecast from OpenWeather API.
     
     Args:
         lat: Latitude in decimal degrees
         lon: Longitude in decimal degrees
+        session: Optional requests.Session for connection reuse
     
     Returns:
         dict: Raw JSON response from API
     """
     url = f"http://api.openweathermap.org/data/2.5/air_pollution/forecast?lat={lat}&lon={lon}&appid={appid}"
-    response = requests.get(url)
+    http = session if session is not None else requests
+    response = http.get(url)
     return response.json()
 
 
@@ -45,4 +60,69 @@ def convert_json_to_object(air_pollution_json_data):
         for item in air_pollution_json_data["list"]
     ]
     
-    return AirQualityResponse(coord=coord, list=air_quality_list)
\ No newline at end of file
+    return AirQualityResponse(coord=coord, list=air_quality_list)
+
+
+class ForecastCache:
+    """Persistent SQLite cache of raw forecast JSON per rounded coordinate.
+    
+    Entries carry their fetch time; readers pass max_age so stale forecasts
+    are refetched. Safe to share between threads.
+    
+    Args:
+        path: SQLite database file, or ":memory:" for a throwaway cache
+        decimals: Coordinate rounding used for the key
+    """
+
+    def __init__(self, path=":memory:", decimals=FORECAST_COORDINATE_DECIMALS):
+        self.path = path
+        self.decimals = decimals
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS forecasts ("
+            " lat REAL, lon REAL, data TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (lat, lon))"
+        )
+        self._conn.commit()
+
+    def key(self, lat, lon):
+        """Rounded (lat, lon) under which a forecast is stored."""
+        return round(lat, self.decimals), round(lon, self.decimals)
+
+    def get(self, lat, lon, max_age=None):
+        """Look up a cached forecast.
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
+            max_age: Ignore entries older than this many seconds
+        
+        Returns:
+            dict or None: Raw API JSON, or None if missing or too old
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at FROM forecasts WHERE lat = ? AND lon = ?", self.key(lat, lon)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return json.loads(row[0])
+
+    def put(self, lat, lon, data):
+        """Store raw API JSON for a coordinate."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO forecasts VALUES (?, ?, ?, ?)",
+                (*self.key(lat, lon), json.dumps(data), time.time())
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,313 @@
+"""
+Streaming threshold-crossing alerts over forecast and observation updates.
+
+Rules such as "overall AQI will reach 151 at site X within 24 hours" are
+evaluated as each fetch arrives instead of rescanning every forecast for
+every rule. Per update the engine scores the forecast once in a batch,
+takes a running maximum of each metric over time, and then only touches:
+
+- rules whose threshold is at or below the update's peak (bisected out
+  of a threshold-sorted array), which might fire
+- rules already firing at that site, which might clear
+
+Rules are grouped by scope (one site, or every site); within a group the
+metric and horizon checks are vectorized.
+
+An alert fires once per episode: while a rule is firing, later forecast
+revisions that still predict the crossing emit nothing, even if the
+predicted time moves. It clears when the peak within its horizon drops
+below threshold - hysteresis, and only then can it fire again.
+Observation updates (what was measured) can fire alerts but not clear
+them, since one observed hour says nothing about the hours ahead.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from .air_quality_models import AirQualityData, AirQualityResponse
+from .aqi_calculators import POLLUTANT_FIELDS, calculate_all_aqi_batch, components_to_array
+from .batch_report import forecast_arrays
+from .store import cell_id
+
+# Column order of the per-update metric matrix
+ALERT_METRICS = ['overall'] + POLLUTANT_FIELDS
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Notify when `metric` is forecast to reach `threshold` within `horizon` hours.
+
+    `metric` is 'overall' (worst pollutant) or a POLLUTANT_FIELDS name;
+    thresholds are AQI values. A rule with lat/lon of None watches every
+    site.
+    """
+    rule_id: str
+    threshold: float
+    metric: str = 'overall'
+    horizon: float = 24.0
+    hysteresis: float = 10.0
+    lat: float = None
+    lon: float = None
+
+
+@dataclass(frozen=True)
+class Alert:
+    """A rule starting ('fired') or ending ('cleared') an episode at a site."""
+    rule_id: str
+    kind: str
+    lat: float
+    lon: float
+    metric: str
+    threshold: float
+    peak: float        # Highest value within the rule's horizon
+    crossing: int      # First Unix time at or above threshold (None when cleared)
+    issued_at: float   # Time of the update that raised it
+
+
+def update_series(data):
+    """Timestamps and (N, 6) concentrations of an update.
+
+    Args:
+        data: Raw forecast JSON, AirQualityResponse, AirQualityData or a
+            list of AirQualityData
+
+    Returns:
+        tuple: (int64 dt (N,), float64 concentrations (N, 6))
+    """
+    if isinstance(data, dict):
+        return forecast_arrays(data)
+    if isinstance(data, AirQualityResponse):
+        data = data.list
+    elif isinstance(data, AirQualityData):
+        data = [data]
+    dt = np.fromiter((item.dt for item in data), dtype=np.int64, count=len(data))
+    return dt, components_to_array([item.components for item in data])
+
+
+def read_rules(path):
+    """Read AlertRules from a CSV or Parquet table.
+
+    Columns rule_id and threshold are required; metric, horizon (hours),
+    hysteresis, lat and lon are optional (blank lat/lon: every site).
+
+    Returns:
+        list: AlertRules in file order
+    """
+    frame = pd.read_parquet(path) if os.path.splitext(path)[1].lower() == '.parquet' else pd.read_csv(path)
+    missing = {'rule_id', 'threshold'} - set(frame.columns)
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+    columns = [f.name for f in fields(AlertRule) if f.name in frame.columns]
+    rules = []
+    for row in frame[columns].itertuples(index=False):
+        values = {column: value for column, value in zip(columns, row) if not pd.isna(value)}
+        values = {column: value if column in ('rule_id', 'metric') else float(value)
+                  for column, value in values.items()}
+        values['rule_id'] = str(values['rule_id'])
+        rules.append(AlertRule(**values))
+    return rules
+
+
+class _RuleGroup:
+    """Rules of one scope, sorted by threshold.
+
+    Adding or removing rules only marks the sorted arrays stale; refresh()
+    rebuilds them once before the next evaluation, so loading N rules one
+    at a time costs one sort rather than N.
+    """
+
+    def __init__(self):
+        self.by_id = {}    # rule_id -> AlertRule
+        self.active = {}   # cell -> set of rule ids firing at that cell
+        self._removed = set()  # Ids removed since the last refresh, to drop from `active`
+        self._stale = True
+
+    def add(self, rules):
+        self.by_id.update((rule.rule_id, rule) for rule in rules)
+        self._stale = True
+
+    def remove(self, rule_id):
+        del self.by_id[rule_id]
+        self._removed.add(rule_id)
+        self._stale = True
+
+    def refresh(self):
+        """Rebuild the threshold-sorted arrays if rules changed."""
+        if not self._stale:
+            return
+        self.rules = sorted(self.by_id.values(), key=lambda rule: rule.threshold)
+        self.ids = [rule.rule_id for rule in self.rules]
+        self.position = {rule_id: i for i, rule_id in enumerate(self.ids)}
+        self.thresholds = np.array([rule.threshold for rule in self.rules], dtype=np.float64)
+        self.metrics = np.array([ALERT_METRICS.index(rule.metric) for rule in self.rules], dtype=np.intp)
+        self.horizons = np.array([rule.horizon * 3600 for rule in self.rules], dtype=np.float64)
+        self.clear_below = self.thresholds - np.array([rule.hysteresis for rule in self.rules], dtype=np.float64)
+        self.max_horizon = float(self.horizons.max()) if len(self.rules) else 0.0
+        # A removed (or replaced) rule ends its episodes
+        if self._removed:
+            for cell, active in list(self.active.items()):
+                active -= self._removed
+                if not active:
+                    del self.active[cell]
+            self._removed = set()
+        self._stale = False
+
+    def firing_indices(self, cell):
+        """Sorted positions of the rules firing at a cell (call after refresh)."""
+        return np.array(sorted(self.position[rule_id] for rule_id in self.active.get(cell, ())), dtype=np.intp)
+
+
+class AlertEngine:
+    """Incremental evaluator of AlertRules over a stream of site updates.
+
+    Safe to share between threads.
+
+    Args:
+        rules: Initial AlertRules
+        clock: Wall-clock time source for updates without `now`
+    """
+
+    def __init__(self, rules=(), clock=time.time):
+        self.clock = clock
+        self._groups = {}  # cell, or None for rules on every site -> _RuleGroup
+        self._scopes = {}  # rule_id -> group key
+        self._issued = {}  # cell -> time of the newest forecast update seen
+        self._lock = threading.Lock()
+        self.add_rules(rules)
+
+    def add_rules(self, rules):
+        """Add rules; a rule_id already present is replaced.
+
+        Rule changes are applied in bulk: each scope is re-sorted once,
+        at its next evaluation, however many rules were added or removed
+        since.
+        """
+        by_group = {}
+        for rule in rules:
+            if rule.metric not in ALERT_METRICS:
+                raise ValueError(f"Unknown metric {rule.metric!r}; expected one of {ALERT_METRICS}")
+            if (rule.lat is None) != (rule.lon is None):
+                raise ValueError(f"Rule {rule.rule_id}: give both lat and lon, or neither")
+            scope = None if rule.lat is None else cell_id(rule.lat, rule.lon)
+            by_group.setdefault(scope, []).append(rule)
+        with self._lock:
+            for rules_in_group in by_group.values():
+                for rule in rules_in_group:
+                    self._remove(rule.rule_id)
+            for key, rules_in_group in by_group.items():
+                self._groups.setdefault(key, _RuleGroup()).add(rules_in_group)
+                self._scopes.update((rule.rule_id, key) for rule in rules_in_group)
+
+    def add_rule(self, rule):
+        self.add_rules([rule])
+
+    def _remove(self, rule_id):
+        # Called with the lock held
+        if rule_id in self._scopes:
+            key = self._scopes.pop(rule_id)
+            group = self._groups[key]
+            group.remove(rule_id)
+            if not group.by_id:
+                del self._groups[key]
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            self._remove(rule_id)
+
+    def __len__(self):
+        return len(self._scopes)
+
+    def update(self, lat, lon, data, now=None, observation=False):
+        """Evaluate the rules of one site against a new forecast or observation.
+
+        Args:
+            lat: Latitude of the site
+            lon: Longitude of the site
+            data: Raw forecast JSON, AirQualityResponse, AirQualityData or
+                a list of AirQualityData
+            now: Time of the update (default the clock); forecast hours
+                before the current hour are ignored
+            observation: The data is measured rather than forecast; it
+                can fire alerts but never clear them
+
+        Returns:
+            list: Alerts raised by this update
+        """
+        now = self.clock() if now is None else now
+        cell = cell_id(lat, lon)
+        with self._lock:
+            if not observation:
+                if now < self._issued.get(cell, -np.inf):
+                    return []  # An older revision arriving late
+                self._issued[cell] = now
+            groups = [self._groups[key] for key in (cell, None) if key in self._groups]
+            if not groups:
+                return []
+
+            dt, concentrations = update_series(data)
+            keep = dt <= now if observation else dt >= now - 3600  # Forecasts: from the current hour on
+            dt = dt[keep]
+            if not len(dt):
+                return []
+            sub_indices = calculate_all_aqi_batch(concentrations[keep])
+            values = np.column_stack([sub_indices.max(axis=1), sub_indices])
+            # Running maximum: peaks[i] is the highest value up to dt[i]
+            peaks = np.vstack([np.full(len(ALERT_METRICS), -np.inf), np.maximum.accumulate(values, axis=0)])
+
+            def ends(group, indices):
+                # Row of peaks covering each rule's horizon (0: no hour within it)
+                if observation:
+                    return np.full(len(indices), len(dt))
+                return np.searchsorted(dt, now + group.horizons[indices], side='right')
+
+            alerts = []
+            for group in groups:
+                group.refresh()
+                was_firing = group.firing_indices(cell)
+                # Only rules with threshold <= the highest peak over the longest horizon can fire
+                last = len(dt) if observation else np.searchsorted(dt, now + group.max_horizon, side='right')
+                window_peak = peaks[last].max()
+                candidates = np.arange(np.searchsorted(group.thresholds, window_peak, side='right'))
+                candidate_peak = peaks[ends(group, candidates), group.metrics[candidates]]
+                firing = candidate_peak >= group.thresholds[candidates]
+                firing[was_firing[was_firing < len(candidates)]] = False
+                if firing.any():
+                    fired = candidates[firing]
+                    group.active.setdefault(cell, set()).update(group.ids[i] for i in fired)
+                    for i, peak in zip(fired, candidate_peak[firing]):
+                        rule = group.rules[i]
+                        crossing = dt[np.argmax(values[:, group.metrics[i]] >= rule.threshold)]
+                        alerts.append(Alert(rule.rule_id, 'fired', lat, lon, rule.metric, rule.threshold,
+                                            float(peak), int(crossing), now))
+                # Rules that just fired are at or above threshold, so only earlier episodes can clear
+                if len(was_firing) and not observation:
+                    alerts += self._clear(group, cell, was_firing,
+                                          peaks[ends(group, was_firing), group.metrics[was_firing]], lat, lon, now)
+            return alerts
+
+    @staticmethod
+    def _clear(group, cell, indices, peak, lat, lon, now):
+        """End the episodes of firing rules whose peak fell below threshold - hysteresis."""
+        below = peak < group.clear_below[indices]
+        if not below.any():
+            return []
+        active = group.active[cell]
+        active.difference_update(group.ids[i] for i in indices[below])
+        if not active:
+            del group.active[cell]
+        return [Alert(group.rules[i].rule_id, 'cleared', lat, lon, group.rules[i].metric,
+                      group.rules[i].threshold, float(p), None, now)
+                for i, p in zip(indices[below], peak[below])]
+
+    def firing(self, lat, lon):
+        """Rule ids currently firing at a site."""
+        cell = cell_id(lat, lon)
+        with self._lock:
+            for group in self._groups.values():
+                group.refresh()
+            return sorted(rule_id for group in self._groups.values() for rule_id in group.active.get(cell, ()))
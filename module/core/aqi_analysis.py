@@ -0,0 +1,331 @@
+"""
+Compute-once AQI analysis of a forecast.
+
+analyze_air_quality scores every timestamp of an AirQualityResponse in a
+single batch and returns an immutable AQIAnalysis holding per-timestamp
+sub-indices, overall (max) AQI, dominant pollutant, EPA category and
+colour as arrays. The dashboard computes it once per rerun and hands the
+same object to every panel.
+
+An hourly forecast refresh repeats most of the previous forecast.
+update_analysis matches the new forecast to the previous analysis by
+timestamp and concentrations, re-scores only new or changed timestamps,
+copies every other row, and reports the difference as an AnalysisDiff.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .aqi_calculators import (
+    POLLUTANT_NAMES,
+    calculate_all_aqi_batch,
+    components_to_array
+)
+from .timeseries import timestamps_to_datetimes
+
+# EPA category upper bounds (inclusive); values above the last are Hazardous
+AQI_CATEGORY_EDGES = np.array([50, 100, 150, 200, 300], dtype=np.float64)
+AQI_CATEGORY_LABELS = np.array([
+    'Good',
+    'Moderate',
+    'Unhealthy for Sensitive Groups',
+    'Unhealthy',
+    'Very Unhealthy',
+    'Hazardous'
+], dtype=object)
+AQI_CATEGORY_COLORS = np.array([
+    '#00e400', '#ffff00', '#ff7e00', '#ff0000', '#8f3f97', '#7e0023'
+], dtype=object)
+
+
+def categorize_aqi(values):
+    """Map AQI values to EPA category indices with one searchsorted.
+
+    Args:
+        values: Array-like of AQI values
+
+    Returns:
+        numpy.ndarray: Indices into AQI_CATEGORY_LABELS / AQI_CATEGORY_COLORS
+    """
+    return np.searchsorted(AQI_CATEGORY_EDGES, np.asarray(values, dtype=np.float64), side='left')
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True, eq=False)
+class AQIAnalysis:
+    """Per-timestamp AQI results for one forecast, all as parallel arrays.
+
+    Row i of every array describes timestamp i; sub_indices columns follow
+    POLLUTANT_NAMES. Arrays are read-only.
+    """
+    timestamps: np.ndarray      # Unix seconds, int64 (N,)
+    dates: pd.DatetimeIndex     # tz-aware local datetimes for display (N,)
+    concentrations: np.ndarray  # Raw µg/m³, float64 (N, 6)
+    sub_indices: np.ndarray     # AQI per pollutant, float64 (N, 6)
+    max_aqi: np.ndarray         # Overall AQI (worst pollutant), float64 (N,)
+    dominant: np.ndarray        # Column index of the worst pollutant (N,)
+    category: np.ndarray        # Index into AQI_CATEGORY_LABELS (N,)
+    labels: np.ndarray          # Category names, object (N,)
+    colors: np.ndarray          # Category hex colours, object (N,)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def dominant_pollutants(self):
+        """Names of the worst pollutant per timestamp."""
+        return np.asarray(POLLUTANT_NAMES, dtype=object)[self.dominant]
+
+
+def _derive(sub_indices):
+    """Max AQI, dominant pollutant and category of sub-index rows."""
+    if len(sub_indices):
+        dominant = np.argmax(sub_indices, axis=1)
+        max_aqi = sub_indices[np.arange(len(sub_indices)), dominant]
+    else:
+        dominant = np.zeros(0, dtype=np.int64)
+        max_aqi = np.zeros(0, dtype=np.float64)
+    return max_aqi, dominant, categorize_aqi(max_aqi)
+
+
+def _assemble(timestamps, dates, concentrations, sub_indices, max_aqi, dominant, category):
+    return AQIAnalysis(
+        timestamps=_read_only(timestamps),
+        dates=dates,
+        concentrations=_read_only(concentrations),
+        sub_indices=_read_only(sub_indices),
+        max_aqi=_read_only(max_aqi),
+        dominant=_read_only(dominant),
+        category=_read_only(category),
+        labels=_read_only(AQI_CATEGORY_LABELS[category]),
+        colors=_read_only(AQI_CATEGORY_COLORS[category])
+    )
+
+
+def _build_analysis(timestamps, concentrations, sub_indices, dates):
+    """Derive max AQI, dominant pollutant and category from batch results."""
+    return _assemble(timestamps, dates, concentrations, sub_indices, *_derive(sub_indices))
+
+
+def analyze_air_quality(air_quality_list):
+    """Score every timestamp of a forecast in one batch.
+
+    Args:
+        air_quality_list: List of AirQualityData objects
+
+    Returns:
+        AQIAnalysis: Immutable per-timestamp results
+    """
+    timestamps = np.array([item.dt for item in air_quality_list], dtype=np.int64)
+    concentrations = components_to_array([item.components for item in air_quality_list])
+    sub_indices = calculate_all_aqi_batch(concentrations)
+    return _build_analysis(timestamps, concentrations, sub_indices, timestamps_to_datetimes(timestamps))
+
+
+def analyze_air_quality_many(air_quality_lists):
+    """Score several forecasts (e.g. one per city) in a single batch.
+
+    All series are stacked into one concentration matrix, scored with one
+    batch-engine call and one timestamp conversion, then split back into
+    one AQIAnalysis per input. Each result's arrays are views of the shared
+    batch.
+
+    Args:
+        air_quality_lists: Sequence of AirQualityData lists
+
+    Returns:
+        list: AQIAnalysis per input list, in input order
+    """
+    lengths = [len(items) for items in air_quality_lists]
+    flat = [item for items in air_quality_lists for item in items]
+    timestamps = np.array([item.dt for item in flat], dtype=np.int64)
+    concentrations = components_to_array([item.components for item in flat])
+    sub_indices = calculate_all_aqi_batch(concentrations)
+    dates = timestamps_to_datetimes(timestamps)
+
+    analyses = []
+    bounds = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        part = slice(start, end)
+        analyses.append(_build_analysis(
+            timestamps[part], concentrations[part], sub_indices[part], dates[part]
+        ))
+    return analyses
+
+
+@dataclass(frozen=True, eq=False)
+class AnalysisDiff:
+    """Timestamps that differ between two analyses of one location's forecast."""
+    added: np.ndarray          # Unix seconds new in the refreshed forecast
+    changed: np.ndarray        # Kept timestamps whose concentrations were revised
+    removed: np.ndarray        # Previous timestamps no longer in the forecast
+    unchanged: int             # Rows copied without rescoring
+    recategorized: np.ndarray  # Changed timestamps whose EPA category moved
+    max_aqi_delta: float       # Largest |overall AQI change| over changed timestamps
+
+    @property
+    def rescored(self):
+        """Number of timestamps that went through the AQI engine."""
+        return len(self.added) + len(self.changed)
+
+    def __bool__(self):
+        return bool(len(self.added) or len(self.changed) or len(self.removed))
+
+    def summary(self):
+        """Compact JSON-serializable summary for downstream consumers.
+
+        Returns:
+            dict: Counts, the added and removed time ranges, the changed and
+                recategorized timestamps and max_aqi_delta
+        """
+        def span(values):
+            return [int(values.min()), int(values.max())] if len(values) else None
+
+        return {
+            'added': len(self.added),
+            'changed': len(self.changed),
+            'removed': len(self.removed),
+            'unchanged': self.unchanged,
+            'added_range': span(self.added),
+            'removed_range': span(self.removed),
+            'changed_dt': self.changed.tolist(),
+            'recategorized_dt': self.recategorized.tolist(),
+            'max_aqi_delta': self.max_aqi_delta,
+        }
+
+
+def _dates_like(dates, timestamps):
+    """Unix seconds as a DatetimeIndex with the timezone and resolution of `dates`.
+
+    Cheaper than timestamps_to_datetimes, which parses through pd.to_datetime.
+    """
+    values = np.asarray(timestamps, dtype='datetime64[s]').astype(f'datetime64[{dates.dtype.unit}]')
+    return pd.DatetimeIndex(values, tz='UTC').tz_convert(dates.tz)
+
+
+def update_analysis(previous, air_quality_list):
+    """Analyze a refreshed forecast, re-scoring only what differs from `previous`.
+
+    A timestamp is reused when the previous analysis has the same dt with
+    identical concentrations; its sub-indices, derived values and date
+    are copied. Everything else is scored in one batch call.
+
+    Args:
+        previous: AQIAnalysis of the same location's earlier forecast, or
+            None to analyze from scratch
+        air_quality_list: List of AirQualityData objects
+
+    Returns:
+        tuple: (AQIAnalysis equal to analyze_air_quality(air_quality_list),
+            AnalysisDiff against `previous`)
+    """
+    timestamps = np.fromiter((item.dt for item in air_quality_list), dtype=np.int64,
+                             count=len(air_quality_list))
+    concentrations = components_to_array([item.components for item in air_quality_list])
+    n = len(timestamps)
+    if previous is None or not len(previous):
+        sub_indices = calculate_all_aqi_batch(concentrations)
+        analysis = _build_analysis(timestamps, concentrations, sub_indices, timestamps_to_datetimes(timestamps))
+        removed = np.zeros(0, dtype=np.int64) if previous is None else previous.timestamps.copy()
+        return analysis, AnalysisDiff(timestamps.copy(), np.zeros(0, dtype=np.int64), removed, 0,
+                                      np.zeros(0, dtype=np.int64), 0.0)
+
+    # Row of the previous analysis holding each new timestamp, if any
+    order = np.argsort(previous.timestamps, kind='stable')
+    sorted_previous = previous.timestamps[order]
+    position = np.minimum(np.searchsorted(sorted_previous, timestamps), len(order) - 1)
+    source = order[position]
+    matched = sorted_previous[position] == timestamps
+    reused = matched & (previous.concentrations[source] == concentrations).all(axis=1)
+    rescore = np.flatnonzero(~reused)
+
+    sub_indices = previous.sub_indices[source]
+    max_aqi = previous.max_aqi[source]
+    dominant = previous.dominant[source]
+    category = previous.category[source]
+    if len(rescore):
+        fresh = calculate_all_aqi_batch(concentrations[rescore])
+        sub_indices[rescore] = fresh
+        max_aqi[rescore], dominant[rescore], category[rescore] = _derive(fresh)
+
+    # Dates: reuse the previous ones when every timestamp was seen before
+    if matched.all():
+        dates = previous.dates.take(source)
+    else:
+        dates = _dates_like(previous.dates, timestamps)
+
+    kept = np.zeros(len(previous), dtype=bool)
+    kept[source[matched]] = True
+    changed = np.flatnonzero(matched & ~reused)
+    delta = np.abs(max_aqi[changed] - previous.max_aqi[source[changed]])
+    moved = category[changed] != previous.category[source[changed]]
+    diff = AnalysisDiff(
+        added=timestamps[~matched],
+        changed=timestamps[changed],
+        removed=previous.timestamps[~kept],
+        unchanged=int(reused.sum()),
+        recategorized=timestamps[changed[moved]],
+        max_aqi_delta=float(delta.max()) if len(delta) else 0.0
+    )
+    analysis = _assemble(timestamps, dates, concentrations, sub_indices, max_aqi, dominant, category)
+    return analysis, diff
+
+
+class IncrementalAnalyzer:
+    """Latest AQIAnalysis per location, updated in place of a full rescore.
+
+    Thread-safe LRU keyed by any hashable location key (e.g. rounded
+    coordinates).
+
+    Args:
+        max_entries: Locations kept; the least recently analyzed is dropped
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (AQIAnalysis, AnalysisDiff)
+        self._lock = threading.Lock()
+        self.rescored = 0
+        self.reused = 0
+
+    def analyze(self, key, air_quality_list):
+        """Analyze a location's forecast against its previous analysis.
+
+        Returns:
+            tuple: (AQIAnalysis, AnalysisDiff against the previous forecast
+                of `key`; everything counts as added the first time)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        analysis, diff = update_analysis(entry[0] if entry else None, air_quality_list)
+        with self._lock:
+            self._entries[key] = (analysis, diff)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.rescored += diff.rescored
+            self.reused += diff.unchanged
+        return analysis, diff
+
+    def last_diff(self, key):
+        """AnalysisDiff of the latest analysis of `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.rescored = 0
+            self.reused = 0
@@ -3,8 +3,21 @@ EPA Air Quality Index (AQI) Calculators.
 
 Converts pollutant concentrations (µg/m³) to the EPA's 0-500 AQI scale.
 Each pollutant has different breakpoints based on EPA standards.
+
+The scalar functions (PM25, PM10, ...) score one value at a time. The
+batch engine (calculate_all_aqi_batch) applies the same breakpoint
+segments to whole NumPy arrays and is what analysis and charts use.
 """
 
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+# Order of pollutants in every AQI list/array produced by this module
+POLLUTANT_NAMES = ['PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3']
+POLLUTANT_FIELDS = ['pm2_5', 'pm10', 'no2', 'so2', 'co', 'o3']
+
 
 def calculate_all_aqi_values(components):
     """Calculate EPA AQI for all pollutants.
@@ -147,4 +160,109 @@ def O3(val):
     elif val <= 1288:
         return round(400 + (val-748) * (100/540), 2)
     else:
-        return 500
\ No newline at end of file
+        return 500
+
+
+# Breakpoint segments mirroring the scalar functions above, as
+# (segment upper bounds, segment start concentrations, start AQI, slope).
+# Slopes are copied rather than derived because some segments (e.g. the
+# last NO2 one) do not end exactly on the next AQI breakpoint.
+AQI_SEGMENTS = {
+    'pm2_5': ([30, 60, 90, 120, 250, 380],
+              [0, 30, 60, 90, 120, 250],
+              [0, 50, 100, 200, 300, 400],
+              [50/30, 50/30, 100/30, 100/30, 100/130, 10/13]),
+    'pm10': ([100, 250, 350, 430, 510],
+             [0, 100, 250, 350, 430],
+             [0, 100, 200, 300, 400],
+             [1, 100/150, 1, 100/80, 100/80]),
+    'no2': ([40, 80, 180, 280, 400, 510],
+            [0, 40, 80, 180, 280, 400],
+            [0, 50, 100, 200, 300, 400],
+            [50/40, 50/40, 1, 1, 100/120, 100/120]),
+    'so2': ([40, 80, 380, 800, 1600, 2400],
+            [0, 40, 80, 380, 800, 1600],
+            [0, 50, 100, 200, 300, 400],
+            [50/40, 50/40, 100/300, 100/420, 100/800, 100/800]),
+    'co': ([1, 2, 10, 17, 34, 51],  # mg/m³
+           [0, 1, 2, 10, 17, 34],
+           [0, 50, 100, 200, 300, 400],
+           [50, 50, 50/4, 100/7, 100/17, 100/17]),
+    'o3': ([100, 168, 208, 748, 1288],
+           [0, 100, 168, 208, 748],
+           [0, 100, 200, 300, 400],
+           [1, 100/68, 100/40, 100/540, 100/540]),
+}
+
+
+def calculate_aqi_array(field, values):
+    """Vectorized AQI for one pollutant.
+    
+    Args:
+        field: PollutantComponents field name (e.g. 'pm2_5', 'co')
+        values: Array-like of concentrations in µg/m³
+    
+    Returns:
+        numpy.ndarray: AQI values (float64), rounded to 2 decimals and
+            capped at 500 like the scalar functions
+    """
+    upper, start_conc, start_aqi, slope = (np.asarray(a, dtype=np.float64) for a in AQI_SEGMENTS[field])
+    values = np.asarray(values, dtype=np.float64)
+    if field == 'co':
+        values = values / 1000.0  # Convert µg/m³ to mg/m³
+    
+    # Index of the first segment whose upper bound is >= value (<= in scalar code)
+    segment = np.searchsorted(upper, values, side='left')
+    in_range = segment < len(upper)
+    segment = np.minimum(segment, len(upper) - 1)
+    
+    aqi = start_aqi[segment] + (values - start_conc[segment]) * slope[segment]
+    return np.where(in_range, _round2(aqi), 500.0)
+
+
+def _round2(values):
+    """round(value, 2) of every element, with Python's rounding."""
+    rounded = np.round(values, 2)
+    # np.round scales by 100 before rounding, so a value within float error
+    # of a half-hundredth (e.g. 483.27499999...) can round the other way;
+    # those few go through round() itself
+    scaled = values * 100
+    near_half = np.atleast_1d(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if near_half.any():
+        rounded = np.atleast_1d(rounded)
+        rounded[near_half] = [round(value, 2) for value in np.atleast_1d(values)[near_half].tolist()]
+        rounded = rounded.reshape(np.shape(values))
+    return rounded
+
+
+def components_to_array(components_list):
+    """Stack PollutantComponents into an (N, 6) concentration matrix.
+    
+    Args:
+        components_list: Sequence of PollutantComponents objects
+    
+    Returns:
+        numpy.ndarray: Columns in POLLUTANT_FIELDS order
+    """
+    # One flat pass with C-level attribute lookup; no intermediate lists
+    n_fields = len(POLLUTANT_FIELDS)
+    values = chain.from_iterable(map(attrgetter(*POLLUTANT_FIELDS), components_list))
+    return np.fromiter(
+        values, dtype=np.float64, count=len(components_list) * n_fields
+    ).reshape(-1, n_fields)
+
+
+def calculate_all_aqi_batch(concentrations):
+    """Vectorized calculate_all_aqi_values for many timestamps at once.
+    
+    Args:
+        concentrations: (N, 6) array with columns in POLLUTANT_FIELDS order
+    
+    Returns:
+        numpy.ndarray: (N, 6) AQI sub-indices for [PM2.5, PM10, NO2, SO2, CO, O3]
+    """
+    concentrations = np.asarray(concentrations, dtype=np.float64).reshape(-1, len(POLLUTANT_FIELDS))
+    return np.column_stack([
+        calculate_aqi_array(field, concentrations[:, i])
+        for i, field in enumerate(POLLUTANT_FIELDS)
+    ]).reshape(-1, len(POLLUTANT_FIELDS))
@@ -0,0 +1,27 @@
+"""
+Shared background worker pool.
+
+Lets callers start blocking network calls (forecast fetches, geocoding)
+early and collect the result later, so the wait overlaps other work such
+as rendering. The pool lives at module level so Streamlit reruns reuse
+the same threads instead of spawning new ones.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Jobs are network-bound; enough threads to fetch a 20-city comparison at once
+MAX_WORKERS = 32
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="clearskies")
+
+
+def run_in_background(fn, *args, **kwargs):
+    """Schedule fn(*args, **kwargs) on the shared pool.
+    
+    Args:
+        fn: Callable to run; must not call Streamlit APIs
+    
+    Returns:
+        concurrent.futures.Future: Resolves to fn's return value
+    """
+    return _executor.submit(fn, *args, **kwargs)
@@ -0,0 +1,234 @@
+"""
+Batch geocoding of location inventories.
+
+Reads a file of location names, deduplicates them, resolves each unique
+name through the GeocodingCache and the throttled Nominatim path with a
+small worker pool, and writes lat/lon/display_name to CSV or Parquet.
+Finished rows are appended to a checkpoint file as they complete, so a
+killed job can be rerun with the same arguments and picks up where it
+stopped.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+
+from .geocoding import geocode_location, normalize_location_name
+
+RESULT_COLUMNS = ['location', 'lat', 'lon', 'display_name']
+
+
+def read_location_names(path, column=None):
+    """Read location names from a text, CSV or Parquet file.
+
+    Args:
+        path: Input file. ``.txt`` files hold one name per line; ``.csv``
+            and ``.parquet`` files are read as tables.
+        column: Table column holding the names (default: "location" if
+            present, otherwise the first column)
+
+    Returns:
+        list: Non-empty location names in file order
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.csv', '.parquet'):
+        frame = pd.read_parquet(path) if ext == '.parquet' else pd.read_csv(path, dtype=str)
+        if column is None:
+            column = 'location' if 'location' in frame.columns else frame.columns[0]
+        names = frame[column].dropna().astype(str).tolist()
+    else:
+        with open(path, encoding='utf-8') as fh:
+            names = fh.read().splitlines()
+    return [name.strip() for name in names if name.strip()]
+
+
+def deduplicate_locations(names):
+    """Drop names that normalize to the same cache key, keeping first spelling.
+
+    Returns:
+        list: Unique names in first-seen order
+    """
+    seen = set()
+    unique = []
+    for name in names:
+        key = normalize_location_name(name)
+        if key not in seen:
+            seen.add(key)
+            unique.append(name)
+    return unique
+
+
+class GeocodeCheckpoint:
+    """Append-only JSON-lines record of finished rows.
+
+    Each finished row is written and flushed immediately, so at most the
+    row being written when the process dies is lost. A truncated trailing
+    line is ignored on load.
+
+    Args:
+        path: Checkpoint file (created on first append)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def load(self):
+        """Read previously finished rows.
+
+        Returns:
+            dict: Normalized location name -> result row
+        """
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted write
+                done[normalize_location_name(row['location'])] = row
+        return done
+
+    def append(self, row):
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, 'a', encoding='utf-8')
+            self._fh.write(json.dumps(row) + "\n")
+            self._fh.flush()
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _geocode_with_retries(name, cache, limiter, session, retries, backoff):
+    """Geocode one name, retrying transient network errors.
+
+    Returns:
+        tuple: (row or None, from_cache, error message or None). A None row
+            means the name should be retried on the next run.
+    """
+    for attempt in range(retries + 1):
+        try:
+            ((lat, lon), display_name), from_cache = geocode_location(
+                name, cache=cache, limiter=limiter, session=session
+            )
+            row = {'location': name, 'lat': lat, 'lon': lon, 'display_name': display_name}
+            return row, from_cache, None
+        except requests.exceptions.RequestException as e:
+            error = f"Error fetching coordinates: {e}"
+            if attempt < retries:
+                time.sleep(backoff * (2 ** attempt))
+        except (KeyError, ValueError, IndexError) as e:
+            return None, False, f"Error parsing response: {e}"
+    return None, False, error
+
+
+def geocode_batch(names, cache=None, limiter=None, workers=4, checkpoint=None,
+                  progress=None, session=None, retries=2, backoff=1.0):
+    """Geocode many location names concurrently.
+
+    Names are deduplicated first. Rows already present in the checkpoint are
+    reused without touching the cache or network. Cache hits skip the
+    limiter, so only real Nominatim calls are throttled.
+
+    Args:
+        names: Iterable of location names (duplicates allowed)
+        cache: Optional GeocodingCache
+        limiter: Optional RateLimiter shared by all workers
+        workers: Number of worker threads
+        checkpoint: Optional GeocodeCheckpoint for kill-and-resume
+        progress: Optional callback ``progress(stats)`` called after each row
+        session: Optional requests.Session shared by the workers
+        retries: Retries per name on network errors
+        backoff: Initial retry delay in seconds (doubles per attempt)
+
+    Returns:
+        tuple: (rows, stats) where rows is a list of result dicts in input
+            order and stats counts total/done/cached/resumed/failed rows,
+            with stats['errors'] listing (name, error message) per failed
+            name. Names that failed are omitted from rows and left out of
+            the checkpoint so a rerun retries them.
+    """
+    unique = deduplicate_locations(names)
+    done = checkpoint.load() if checkpoint is not None else {}
+
+    results = {}
+    stats = {'total': len(unique), 'done': 0, 'cached': 0, 'resumed': 0, 'failed': 0, 'errors': []}
+    pending = []
+    for name in unique:
+        key = normalize_location_name(name)
+        if key in done:
+            results[key] = dict(done[key], location=name)
+            stats['done'] += 1
+            stats['resumed'] += 1
+        else:
+            pending.append(name)
+    if progress is not None and stats['resumed']:
+        progress(dict(stats))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = {
+        executor.submit(_geocode_with_retries, name, cache, limiter, session, retries, backoff): name
+        for name in pending
+    }
+    try:
+        for future in as_completed(futures):
+            name = futures[future]
+            row, from_cache, error = future.result()
+            if row is None:
+                stats['failed'] += 1
+                stats['errors'].append((name, error))
+            else:
+                results[normalize_location_name(name)] = row
+                stats['done'] += 1
+                stats['cached'] += int(from_cache)
+                if checkpoint is not None:
+                    checkpoint.append(row)
+            if progress is not None:
+                progress(dict(stats))
+    finally:
+        # On interrupt, drop queued names; finished rows are already checkpointed
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+    rows = [results[normalize_location_name(n)] for n in unique if normalize_location_name(n) in results]
+    return rows, stats
+
+
+def write_geocode_results(rows, path):
+    """Write result rows to CSV or Parquet, chosen by file extension.
+
+    The file is written to a temporary name and renamed into place, so an
+    interrupted write never leaves a truncated output behind.
+
+    Args:
+        rows: Result dicts with location/lat/lon/display_name keys
+        path: Output path ending in ``.csv`` or ``.parquet``
+    """
+    frame = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    ext = os.path.splitext(path)[1].lower()
+    tmp_path = path + '.tmp'
+    if ext == '.parquet':
+        frame.to_parquet(tmp_path, index=False)
+    elif ext == '.csv':
+        frame.to_csv(tmp_path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format: {path} (use .csv or .parquet)")
+    os.replace(tmp_path, path)
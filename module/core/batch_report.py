@@ -0,0 +1,363 @@
+"""
+Batch AQI reports over location inventories.
+
+Fetches the forecast of every geocoded location with a bounded window of
+worker threads (one fetch per rounded coordinate, through an optional
+ForecastCache and shared RateLimiter), scores chunks of locations with the
+vectorized AQI engine on a process pool, and streams per-timestamp rows to
+CSV or Parquet as chunks finish. At most a few chunks are held in memory,
+however long the inventory is.
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+import requests
+
+from .air_quality_api import FORECAST_COORDINATE_DECIMALS, read_pollution_data_from_api
+from .aqi_analysis import AQI_CATEGORY_LABELS, categorize_aqi
+from .aqi_calculators import POLLUTANT_FIELDS, POLLUTANT_NAMES, calculate_all_aqi_batch
+
+REPORT_COLUMNS = (
+    ['location', 'display_name', 'lat', 'lon', 'time', 'aqi', 'category', 'dominant_pollutant']
+    + [f'aqi_{field}' for field in POLLUTANT_FIELDS]
+)
+REPORT_FORMATS = ('.csv', '.parquet')
+DEFAULT_CHUNK_LOCATIONS = 200
+FORECAST_MAX_AGE_SECONDS = 60 * 60  # OpenWeather updates forecasts hourly
+# What a malformed forecast (missing or non-numeric field) raises while scored
+SCORING_ERRORS = (KeyError, TypeError, ValueError)
+
+logger = logging.getLogger(__name__)
+
+
+def forecast_arrays(forecast_json):
+    """Timestamps and concentrations straight from raw API JSON.
+
+    Skips building AirQualityData objects, which would dominate the cost
+    of scoring.
+
+    Returns:
+        tuple: (int64 timestamps (N,), float64 concentrations (N, 6) in
+            POLLUTANT_FIELDS order)
+    """
+    items = forecast_json['list']
+    timestamps = np.fromiter((item['dt'] for item in items), dtype=np.int64, count=len(items))
+    concentrations = np.fromiter(
+        (item['components'][field] for item in items for field in POLLUTANT_FIELDS),
+        dtype=np.float64,
+        count=len(items) * len(POLLUTANT_FIELDS)
+    ).reshape(-1, len(POLLUTANT_FIELDS))
+    return timestamps, concentrations
+
+
+def score_forecasts(chunk):
+    """Per-timestamp AQI rows for a chunk of locations in one batch call.
+
+    Args:
+        chunk: Non-empty list of (location dict with location/display_name/
+            lat/lon, raw forecast JSON) pairs
+
+    Returns:
+        pandas.DataFrame: REPORT_COLUMNS, locations in chunk order and
+            timestamps in forecast order
+    """
+    arrays = [forecast_arrays(forecast) for _, forecast in chunk]
+    lengths = np.array([len(timestamps) for timestamps, _ in arrays])
+    timestamps = np.concatenate([timestamps for timestamps, _ in arrays])
+    sub_indices = calculate_all_aqi_batch(np.concatenate([conc for _, conc in arrays]))
+    dominant = np.argmax(sub_indices, axis=1)
+    max_aqi = sub_indices[np.arange(len(sub_indices)), dominant]
+
+    def repeat(key):
+        return np.repeat(np.array([location[key] for location, _ in chunk], dtype=object), lengths)
+
+    frame = pd.DataFrame({
+        'location': repeat('location'),
+        'display_name': repeat('display_name'),
+        'lat': repeat('lat').astype(np.float64),
+        'lon': repeat('lon').astype(np.float64),
+        'time': pd.to_datetime(timestamps, unit='s', utc=True),
+        'aqi': max_aqi.round(1),
+        'category': AQI_CATEGORY_LABELS[categorize_aqi(max_aqi)],
+        'dominant_pollutant': np.asarray(POLLUTANT_NAMES, dtype=object)[dominant],
+    })
+    for column, field in enumerate(POLLUTANT_FIELDS):
+        frame[f'aqi_{field}'] = sub_indices[:, column].round(1)
+    return frame
+
+
+def render_chunk(chunk, output_format):
+    """Score a chunk and, for CSV, format it too, so workers do that work.
+
+    Args:
+        chunk: See score_forecasts
+        output_format: '.csv' or '.parquet'
+
+    Returns:
+        str or pandas.DataFrame: Header-less CSV text, or the frame for Parquet
+    """
+    frame = score_forecasts(chunk)
+    if output_format == '.csv':
+        # numpy formats UTC timestamps several times faster than to_csv does
+        utc = frame['time'].dt.tz_localize(None).to_numpy().astype('datetime64[s]')
+        frame['time'] = np.datetime_as_string(utc, unit='s', timezone='UTC')
+        return frame.to_csv(index=False, header=False)
+    return frame
+
+
+def _render_chunk_checked(chunk, output_format):
+    """render_chunk that leaves out locations whose forecast is malformed.
+
+    The chunk is scored in one batch as usual; only if that fails is it
+    rendered location by location to leave the bad ones out.
+
+    Returns:
+        tuple: (render_chunk output for the good locations, list of
+            (location name, error) of the ones left out)
+    """
+    try:
+        return render_chunk(chunk, output_format), []
+    except SCORING_ERRORS:
+        pass
+    outputs, failed = [], []
+    for location, forecast in chunk:
+        try:
+            outputs.append(render_chunk([(location, forecast)], output_format))
+        except SCORING_ERRORS as e:
+            failed.append((location.get('location'), f"Malformed forecast: {type(e).__name__}: {e}"))
+    if output_format == '.csv':
+        return ''.join(outputs), failed
+    return (pd.concat(outputs, ignore_index=True) if outputs else pd.DataFrame(columns=REPORT_COLUMNS)), failed
+
+
+class ReportWriter:
+    """Append report chunks to a CSV or Parquet file as they arrive.
+
+    Rows go to ``<path>.tmp``, renamed into place on a clean close, so an
+    interrupted run never leaves a truncated report behind.
+
+    Args:
+        path: Output path ending in ``.csv`` or ``.parquet``
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower()
+        if self.format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported output format: {path} (use .csv or .parquet)")
+        self.tmp_path = path + '.tmp'
+        self.rows = 0
+        self._parquet = None
+        if self.format == '.csv':
+            self._fh = open(self.tmp_path, 'w', encoding='utf-8', newline='')
+            self._fh.write(','.join(REPORT_COLUMNS) + '\n')
+        else:
+            self._fh = None
+
+    def write(self, chunk):
+        """Append the output of render_chunk."""
+        if isinstance(chunk, str):
+            self._fh.write(chunk)
+            self.rows += chunk.count('\n')
+            return
+        if chunk.empty:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.tmp_path, table.schema)
+        self._parquet.write_table(table)
+        self.rows += len(chunk)
+
+    def close(self):
+        """Finish the file and move it into place."""
+        if self._fh is not None:
+            self._fh.close()
+        elif self._parquet is not None:
+            self._parquet.close()
+        else:
+            pd.DataFrame(columns=REPORT_COLUMNS).to_parquet(self.tmp_path, index=False)
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discard the partial file."""
+        if self._fh is not None:
+            self._fh.close()
+        elif self._parquet is not None:
+            self._parquet.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def fetch_forecast(lat, lon, cache=None, limiter=None, session=None, retries=2, backoff=1.0,
+                   max_age=FORECAST_MAX_AGE_SECONDS):
+    """Fetch one forecast through the cache, retrying transient network errors.
+
+    Returns:
+        tuple: (raw forecast JSON, from_cache)
+
+    Raises:
+        requests.exceptions.RequestException: After the last retry
+        ValueError: If the API answered with an error instead of a forecast
+    """
+    if cache is not None:
+        cached = cache.get(lat, lon, max_age=max_age)
+        if cached is not None:
+            return cached, True
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            data = read_pollution_data_from_api(lat, lon, session=session)
+            break
+        except requests.exceptions.RequestException:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+    if 'list' not in data:
+        raise ValueError(f"API error: {data.get('message', data)}")
+    if cache is not None:
+        cache.put(lat, lon, data)
+    return data, False
+
+
+def run_batch_report(locations, writer, cache=None, limiter=None, workers=8, processes=None,
+                     chunk_size=DEFAULT_CHUNK_LOCATIONS, progress=None, session=None,
+                     retries=2, backoff=1.0, max_age=FORECAST_MAX_AGE_SECONDS):
+    """Fetch, score and write the forecast of every location.
+
+    Locations sharing a rounded coordinate are fetched once. Chunks are
+    written in the order they finish scoring, so rows of different
+    locations may be interleaved by chunk but each location's rows stay
+    together and in time order.
+
+    Args:
+        locations: Dicts with location, display_name, lat and lon keys
+        writer: ReportWriter (or anything with ``format`` and ``write``)
+        cache: Optional ForecastCache
+        limiter: Optional RateLimiter shared by the fetch threads
+        workers: Concurrent fetches
+        processes: Scoring processes (None for one per CPU beyond the
+            first, 0 to score in this process)
+        chunk_size: Locations per scoring chunk
+        progress: Optional callback ``progress(stats)`` called as work completes
+        session: Optional requests.Session shared by the fetch threads
+        retries: Retries per fetch on network errors
+        backoff: Initial retry delay in seconds (doubles per attempt)
+        max_age: Maximum age in seconds of cached forecasts
+
+    Returns:
+        dict: total/fetched/cached/failed location counts and rows written.
+            failed counts locations whose fetch failed or whose forecast
+            was malformed; both are logged and left out of the report
+    """
+    by_coordinate = {}
+    for location in locations:
+        key = (round(location['lat'], FORECAST_COORDINATE_DECIMALS),
+               round(location['lon'], FORECAST_COORDINATE_DECIMALS))
+        by_coordinate.setdefault(key, []).append(location)
+    stats = {'total': len(locations), 'fetched': 0, 'cached': 0, 'failed': 0, 'written': 0, 'rows': 0}
+
+    def report():
+        stats['rows'] = writer.rows
+        if progress is not None:
+            progress(dict(stats))
+
+    if processes is None:
+        # The main process fetches and writes; a single-CPU host scores inline
+        processes = (os.cpu_count() or 1) - 1
+    compute_pool = None
+    if processes > 0:
+        # Workers start lazily, after the fetch threads; forking a process
+        # with running threads can copy a held lock, so they are spawned
+        compute_pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+    max_pending_chunks = 2 * max(1, processes)
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    coordinates = iter(by_coordinate)
+    fetching = {}
+    scoring = {}
+    buffer = []
+
+    def submit_fetch():
+        key = next(coordinates, None)
+        if key is not None:
+            future = fetch_pool.submit(fetch_forecast, *key, cache=cache, limiter=limiter, session=session,
+                                       retries=retries, backoff=backoff, max_age=max_age)
+            fetching[future] = key
+
+    def write(rendered, size):
+        output, failed = rendered
+        writer.write(output)
+        stats['written'] += size - len(failed)
+        stats['failed'] += len(failed)
+        for location, error in failed:
+            logger.warning("%s: %s", location, error)
+
+    def submit_chunk(chunk):
+        if compute_pool is None:
+            write(_render_chunk_checked(chunk, writer.format), len(chunk))
+        else:
+            scoring[compute_pool.submit(_render_chunk_checked, chunk, writer.format)] = len(chunk)
+
+    def collect(block):
+        if not scoring:
+            return
+        done, _ = wait(scoring, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            write(future.result(), scoring.pop(future))
+
+    try:
+        # Keep a bounded window of fetches in flight so fetched forecasts
+        # never pile up faster than they are scored and written
+        for _ in range(4 * max(1, workers)):
+            submit_fetch()
+        while fetching:
+            done, _ = wait(fetching, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = fetching.pop(future)
+                submit_fetch()
+                group = by_coordinate[key]
+                try:
+                    forecast, from_cache = future.result()
+                except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                    stats['failed'] += len(group)
+                    logger.warning("%s: Error fetching air quality: %s", group[0]['location'], e)
+                    continue
+                stats['fetched'] += len(group)
+                stats['cached'] += len(group) * int(from_cache)
+                buffer.extend((location, forecast) for location in group)
+                if len(buffer) >= chunk_size:
+                    submit_chunk(buffer)
+                    buffer = []
+            collect(block=len(scoring) >= max_pending_chunks)
+            report()
+        if buffer:
+            submit_chunk(buffer)
+        while scoring:
+            collect(block=True)
+            report()
+        report()
+    finally:
+        for future in list(fetching) + list(scoring):
+            future.cancel()
+        fetch_pool.shutdown(wait=True)
+        if compute_pool is not None:
+            compute_pool.shutdown(wait=True)
+    return stats
@@ -0,0 +1,149 @@
+"""
+Downsampling of long AQI time series for charts.
+
+A chart cannot show more distinct points than it has horizontal pixels, so
+series longer than the plot width are reduced with Largest-Triangle-Three-
+Buckets (LTTB), which keeps the visual shape of the line. LTTB alone can
+step over a short excursion into a worse (or better) EPA category, so for
+every bucket whose extreme lies in a different category than the point LTTB
+picked, that extreme is kept as well. The result is at most three points per
+bucket, i.e. bounded by the pixel width regardless of the series length.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aqi_analysis import categorize_aqi
+
+DEFAULT_PLOT_WIDTH_PX = 1200
+
+
+def target_points(width_px=DEFAULT_PLOT_WIDTH_PX):
+    """Number of LTTB buckets for a plot of the given width (one per pixel).
+
+    Args:
+        width_px: Plot width in pixels, or None to disable downsampling
+
+    Returns:
+        int or None: Bucket count, None when downsampling is disabled
+    """
+    if width_px is None:
+        return None
+    return max(3, int(width_px))
+
+
+def _as_numeric(dates):
+    """Datetimes (list, DatetimeIndex or datetime64 array) as int64 nanoseconds."""
+    return pd.DatetimeIndex(dates).asi8
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the rest of the series is
+    split into n_out - 2 equal buckets and from each the point forming the
+    largest triangle with the previously chosen point and the mean of the
+    next bucket is selected.
+
+    Args:
+        x: Monotonic numeric x positions (N,)
+        y: Values (N,)
+        n_out: Number of points to keep (>= 3)
+
+    Returns:
+        numpy.ndarray: Sorted int64 indices into the series
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n < 3:
+        return np.arange(n, dtype=np.int64)
+
+    # Bucket i covers [edges[i], edges[i + 1]) of the interior points
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i < n_out - 3:
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(dates, values, n_out):
+    """Pick at most ~3 * n_out points that preserve shape, peaks and categories.
+
+    Args:
+        dates: Datetimes of the series (N,)
+        values: AQI values (N,)
+        n_out: LTTB bucket count, typically target_points(width_px)
+
+    Returns:
+        numpy.ndarray: Sorted int64 indices into the series
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n_out is None or n <= n_out:
+        return np.arange(n, dtype=np.int64)
+
+    picked = lttb_indices(_as_numeric(dates), values, n_out)
+
+    # Assign every point to the bucket of the nearest picked index at or
+    # before it, then keep each bucket's min and max when their category
+    # differs from the picked point's.
+    bucket_of = np.searchsorted(picked, np.arange(n), side='right') - 1
+    categories = categorize_aqi(values)
+    picked_category = categories[picked][bucket_of]
+
+    order = np.lexsort((values, bucket_of))  # Ascending value within each bucket
+    first = np.searchsorted(bucket_of[order], np.arange(len(picked)), side='left')
+    last = np.append(first[1:], n) - 1
+    bucket_min = order[first]
+    bucket_max = order[last]
+
+    extra_max = bucket_max[categories[bucket_max] != picked_category[bucket_max]]
+    extra_min = bucket_min[categories[bucket_min] != picked_category[bucket_min]]
+
+    # The global peak is always shown, whatever its category
+    peak = np.array([int(np.argmax(values))], dtype=np.int64)
+    return np.unique(np.concatenate([picked, extra_max, extra_min, peak]))
+
+
+def _as_timestamp(value, tz):
+    """Timestamp comparable with an index in timezone tz (naive values are local to tz)."""
+    ts = pd.Timestamp(value)
+    if tz is not None and ts.tz is None:
+        return ts.tz_localize(tz)
+    return ts
+
+
+def window_slice(dates, start, end):
+    """Slice of a sorted series falling within [start, end].
+
+    Args:
+        dates: Sorted datetimes of the series
+        start: Window start (datetime)
+        end: Window end (datetime, inclusive)
+
+    Returns:
+        slice: Positions of the points inside the window
+    """
+    index = pd.DatetimeIndex(dates)
+    lo = index.searchsorted(_as_timestamp(start, index.tz), side='left')
+    hi = index.searchsorted(_as_timestamp(end, index.tz), side='right')
+    return slice(int(lo), int(hi))
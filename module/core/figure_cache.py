@@ -0,0 +1,125 @@
+"""
+Content-addressed cache of serialized Plotly figures.
+
+A figure is fully determined by the arrays it plots and a few display
+parameters, so its key is a BLAKE2 digest of exactly those. Entries are
+the figure's JSON, the form Streamlit ships to the browser, so a hit skips
+both building the figure and serializing it. The cache is bounded by the
+total size of the stored JSON and evicts least-recently-used entries.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def fingerprint(*arrays, **params):
+    """Hex digest of array contents and display parameters.
+
+    Arrays are hashed from their raw buffers together with dtype and shape,
+    so equal data produces equal keys no matter which object holds it.
+
+    Args:
+        *arrays: Array-likes (None entries are allowed and hashed as such)
+        **params: JSON-serializable display parameters
+
+    Returns:
+        str: 32-character hex key
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        if array is None:
+            digest.update(b'none')
+            continue
+        array = np.ascontiguousarray(array)
+        digest.update(f'{array.dtype.str}{array.shape}'.encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def figure_from_json(spec):
+    """Rehydrate cached figure JSON without re-running Plotly validation.
+
+    Args:
+        spec: JSON produced by Figure.to_json()
+
+    Returns:
+        plotly.graph_objects.Figure
+    """
+    return go.Figure(json.loads(spec), _validate=False)
+
+
+class FigureCache:
+    """Thread-safe LRU of figure JSON bounded by total size.
+
+    Args:
+        max_bytes: Memory budget for stored JSON; entries larger than the
+            whole budget are not cached
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return cached JSON and mark it recently used, or None on a miss."""
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return spec
+
+    def put(self, key, spec):
+        """Store figure JSON, evicting least-recently-used entries to fit."""
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._entries[key] = spec
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def get_or_build(self, key, build):
+        """Cached JSON for key, building and storing the figure on a miss.
+
+        Args:
+            key: Key from fingerprint()
+            build: Zero-argument callable returning a Plotly figure
+
+        Returns:
+            str: Figure JSON
+        """
+        spec = self.get(key)
+        if spec is None:
+            spec = build().to_json()
+            self.put(key, spec)
+        return spec
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
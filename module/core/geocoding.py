@@ -2,46 +2,74 @@
 Geocoding service using OpenStreetMap's Nominatim API.
 
 Converts location names to coordinates for air quality lookups.
+Results can be kept in a persistent GeocodingCache so repeated lookups
+(and resumed batch jobs) never hit the network twice for the same name.
 """
 
+import sqlite3
+import threading
+import time
+
 import requests
 
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 
-def get_coordinates_from_location(location_name):
-    """Convert location name to latitude/longitude coordinates.
+# User-Agent required by Nominatim policy
+NOMINATIM_HEADERS = {'User-Agent': 'AirQualityApp/1.0'}
+
+# Nominatim policy: absolute maximum of one request per second
+NOMINATIM_RATE_PER_SECOND = 1.0
+
+
+def search_nominatim(location_name, session=None):
+    """Query Nominatim for the best match without swallowing errors.
     
     Args:
-        location_name: City, address, or place name (e.g., "Ames, IA")
+        location_name: City, address, or place name
+        session: Optional requests.Session for connection reuse
     
     Returns:
         tuple: ((lat, lon), display_name) or ((None, None), None) if not found
-    """
-    base_url = "https://nominatim.openstreetmap.org/search"
     
+    Raises:
+        requests.exceptions.RequestException: On network or HTTP errors
+        KeyError, ValueError, IndexError: On malformed responses
+    """
     params = {
         'q': location_name,
         'format': 'json',
         'limit': 1,  # Only need best match
         'addressdetails': 1
     }
+    http = session if session is not None else requests
+    response = http.get(NOMINATIM_URL, params=params, headers=NOMINATIM_HEADERS)
+    response.raise_for_status()
+    data = response.json()
     
-    # User-Agent required by Nominatim policy
-    headers = {'User-Agent': 'AirQualityApp/1.0'}
+    if data and len(data) > 0:
+        result = data[0]
+        display_name = result.get('display_name', 'Unknown')
+        lat = float(result['lat'])
+        lon = float(result['lon'])
+        return (lat, lon), display_name
+    return (None, None), None
+
 
+def get_coordinates_from_location(location_name, session=None):
+    """Convert location name to latitude/longitude coordinates.
+    
+    Args:
+        location_name: City, address, or place name (e.g., "Ames, IA")
+        session: Optional requests.Session for connection reuse
+    
+    Returns:
+        tuple: ((lat, lon), display_name) or ((None, None), None) if not found
+    """
     try:
-        response = requests.get(base_url, params=params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data and len(data) > 0:
-            result = data[0]
-            display_name = result.get('display_name', 'Unknown')
-            lat = float(result['lat'])
-            lon = float(result['lon'])
-            return (lat, lon), display_name
-        else:
+        (lat, lon), display_name = search_nominatim(location_name, session)
+        if lat is None:
             print(f"No results found for location: {location_name}")
-            return (None, None), None
+        return (lat, lon), display_name
             
     except requests.exceptions.RequestException as e:
         print(f"Error fetching coordinates: {e}")
@@ -51,6 +79,103 @@ def get_coordinates_from_location(location_name):
         return (None, None), None
 
 
+def normalize_location_name(location_name):
+    """Canonical cache key for a location name.
+    
+    "  ames,   IA " and "Ames, IA" geocode identically, so they share a key.
+    """
+    return " ".join(str(location_name).split()).casefold()
+
+
+class GeocodingCache:
+    """Persistent SQLite cache of geocoding results.
+    
+    Negative results ("not found") are cached too, so unknown names are not
+    re-queried. Safe to share between threads.
+    
+    Args:
+        path: SQLite database file, or ":memory:" for a throwaway cache
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocodes ("
+            " query TEXT PRIMARY KEY,"
+            " lat REAL, lon REAL, display_name TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, location_name):
+        """Look up a cached result.
+        
+        Returns:
+            tuple or None: ((lat, lon), display_name), which is
+                ((None, None), None) for a cached miss, or None if the
+                name has never been geocoded
+        """
+        key = normalize_location_name(location_name)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lon, display_name FROM geocodes WHERE query = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        lat, lon, display_name = row
+        return (lat, lon), display_name
+
+    def put(self, location_name, result):
+        """Store a ((lat, lon), display_name) result."""
+        (lat, lon), display_name = result
+        key = normalize_location_name(location_name)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?)",
+                (key, lat, lon, display_name, time.time())
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocodes").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def geocode_location(location_name, cache=None, limiter=None, session=None):
+    """Resolve a location through the cache, then the throttled network path.
+    
+    Unlike get_coordinates_from_location, network errors propagate so the
+    caller can retry; only definitive answers are cached.
+    
+    Args:
+        location_name: City, address, or place name
+        cache: Optional GeocodingCache
+        limiter: Optional RateLimiter applied to network calls only
+        session: Optional requests.Session for connection reuse
+    
+    Returns:
+        tuple: (((lat, lon), display_name), from_cache)
+    """
+    if cache is not None:
+        cached = cache.get(location_name)
+        if cached is not None:
+            return cached, True
+    
+    if limiter is not None:
+        limiter.acquire()
+    result = search_nominatim(location_name, session)
+    
+    if cache is not None:
+        cache.put(location_name, result)
+    return result, False
+
+
 # Simple test when run directly
 if __name__ == "__main__":
     location = "Ames, IA"
@@ -60,4 +185,4 @@ if __name__ == "__main__":
         print(f"Found location: {display_name}")
         print(f"Coordinates: {lat}, {lon}")
     else:
-        print(f"Could not geocode location: {location}")
\ No newline at end of file
+        print(f"Could not geocode location: {location}")
@@ -0,0 +1,426 @@
+"""
+Spatial interpolation of AQI between sampled points.
+
+Estimates AQI at arbitrary locations from nearby (lat, lon, AQI) samples,
+e.g. the points fetched by region_sampling, so heatmaps and users between
+sites need no extra API call. Each target uses its k nearest samples found
+with GridIndex, a bucket grid over locally projected coordinates backed by
+a k-d tree where samples cluster, and the weights for all targets are
+computed in one broadcast.
+"""
+
+import math
+
+import numpy as np
+
+from .region_sampling import KM_PER_DEGREE_LAT
+
+INTERPOLATION_METHODS = ('idw', 'gaussian')
+DEFAULT_NEIGHBOURS = 8
+# GridIndex hands a block of buckets to its k-d tree once it holds more
+# than this many times its expected share of points
+CROWDED_BLOCK = 4
+
+
+def project_km(lat, lon, lat0):
+    """Equirectangular projection to km around latitude lat0.
+
+    Accurate to well under 1% over a metro-sized region, which is plenty
+    for weighting neighbours.
+
+    Returns:
+        numpy.ndarray: (N, 2) array of (x, y) in km
+    """
+    lat = np.asarray(lat, dtype=np.float64).ravel()
+    lon = np.asarray(lon, dtype=np.float64).ravel()
+    return np.column_stack((lon * KM_PER_DEGREE_LAT * math.cos(math.radians(lat0)), lat * KM_PER_DEGREE_LAT))
+
+
+class KDTreeIndex:
+    """k-nearest-neighbour index over 2-D points: a balanced k-d tree.
+
+    Every split halves a node's points at the median of its wider side, so
+    leaves hold leaf_size to 2 * leaf_size points however unevenly the
+    points are spread (samples clustered in cities cost the same as
+    uniform ones). Queries run for all query points at once: each first
+    takes the k nearest points of the subtree it falls in as a distance
+    bound, then walks the tree level by level keeping only the nodes whose
+    bounding box lies within that bound, and finally compares the points of
+    the leaves it reached. Results are exact.
+    """
+
+    def __init__(self, xy, leaf_size=DEFAULT_NEIGHBOURS):
+        """
+        Args:
+            xy: (N, 2) point coordinates
+            leaf_size: Fewest points per leaf
+        """
+        self.xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        n = len(self.xy)
+        if n == 0:
+            raise ValueError("KDTreeIndex needs at least one point")
+        self.depth = int(math.log2(n / leaf_size)) if n >= 2 * leaf_size else 0
+
+        # Split level by level: sorting by (node, coordinate on the node's
+        # wider axis) puts each node's halves either side of its middle
+        perm = np.arange(n)
+        bounds = np.array([0, n])
+        self.split_dim, self.split_value = [], []
+        for _ in range(self.depth):
+            points = self.xy[perm]
+            node_span = np.maximum.reduceat(points, bounds[:-1]) - np.minimum.reduceat(points, bounds[:-1])
+            dims = (node_span[:, 1] > node_span[:, 0]).astype(np.intp)
+            node = np.repeat(np.arange(len(dims)), np.diff(bounds))
+            perm = perm[np.lexsort((points[np.arange(n), dims[node]], node))]
+            middles = (bounds[:-1] + bounds[1:]) // 2
+            self.split_dim.append(dims)
+            self.split_value.append(self.xy[perm[middles], dims])
+            bounds = np.insert(bounds, np.arange(1, len(bounds)), middles)
+        sizes = np.diff(bounds)
+
+        # Leaf point table and the points' coordinates in the same layout,
+        # with a last all-padding row; padding sits at infinity
+        self.leaves = np.full((len(sizes) + 1, int(sizes.max())), n, dtype=np.intp)
+        within = np.arange(n) - np.repeat(bounds[:-1], sizes)
+        self.leaves[np.repeat(np.arange(len(sizes)), sizes), within] = perm
+        padded = np.vstack([self.xy, [np.inf, np.inf]])
+        self._leaf_x, self._leaf_y = padded[self.leaves, 0], padded[self.leaves, 1]
+
+        # Bounding box (x0, y0, x1, y1) of every node, level by level,
+        # merged up from the leaves
+        points = self.xy[perm]
+        lo, hi = np.minimum.reduceat(points, bounds[:-1]), np.maximum.reduceat(points, bounds[:-1])
+        self.boxes = [(lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1])]
+        for _ in range(self.depth):
+            x0, y0, x1, y1 = self.boxes[0]
+            self.boxes.insert(0, (np.minimum(x0[0::2], x0[1::2]), np.minimum(y0[0::2], y0[1::2]),
+                                  np.maximum(x1[0::2], x1[1::2]), np.maximum(y1[0::2], y1[1::2])))
+
+    def _leaf_distances(self, q, leaves):
+        """Squared distances from each query to the points of its row of leaves."""
+        dx = q[:, 0, None, None] - self._leaf_x[leaves]
+        dy = q[:, 1, None, None] - self._leaf_y[leaves]
+        return (dx * dx + dy * dy).reshape(len(q), -1)
+
+    def _query_chunk(self, q, k, start_level):
+        m = len(q)
+        rows = np.arange(m)
+        qx, qy = q[:, 0].copy(), q[:, 1].copy()
+
+        # Distance bound: the k-th nearest point of the subtree each query
+        # falls in, at the deepest level whose nodes hold k points
+        node = np.zeros(m, dtype=np.intp)
+        for level in range(start_level):
+            dims, values = self.split_dim[level][node], self.split_value[level][node]
+            node = 2 * node + (np.where(dims, qy, qx) >= values)
+        below = self.depth - start_level
+        d2 = self._leaf_distances(q, (node[:, None] << below) + np.arange(1 << below))
+        bound = np.partition(d2, k - 1, axis=1)[:, k - 1]
+
+        # Children of the nodes kept so far whose box is within the bound.
+        # Down to start_level every node holds k points, all no farther
+        # than its farthest corner, which may tighten the bound further
+        pair_q, pair_node = rows, np.zeros(m, dtype=np.intp)
+        for level in range(1, self.depth + 1):
+            x0, y0, x1, y1 = self.boxes[level]
+            px, py = qx[pair_q], qy[pair_q]
+            kept_q, kept_node, kept_near = [], [], []
+            for child in (2 * pair_node, 2 * pair_node + 1):
+                gx = np.maximum(x0[child] - px, 0) + np.maximum(px - x1[child], 0)
+                gy = np.maximum(y0[child] - py, 0) + np.maximum(py - y1[child], 0)
+                near = gx * gx + gy * gy
+                keep = near <= bound[pair_q]
+                kept_q.append(pair_q[keep])
+                kept_node.append(child[keep])
+                kept_near.append(near[keep])
+            pair_q, pair_node = np.concatenate(kept_q), np.concatenate(kept_node)
+            if level <= start_level:
+                px, py = qx[pair_q], qy[pair_q]
+                fx = np.maximum(np.abs(px - x0[pair_node]), np.abs(px - x1[pair_node]))
+                fy = np.maximum(np.abs(py - y0[pair_node]), np.abs(py - y1[pair_node]))
+                np.minimum.at(bound, pair_q, fx * fx + fy * fy)
+                keep = np.concatenate(kept_near) <= bound[pair_q]
+                pair_q, pair_node = pair_q[keep], pair_node[keep]
+
+        # Compare each query with every point of the leaves it reached.
+        # Queries go in batches of about 4096 with similar leaf counts, each
+        # padded only to its own longest row of leaves
+        order = np.argsort(pair_q, kind='stable')
+        pair_q, pair_node = pair_q[order], pair_node[order]
+        per_query = np.bincount(pair_q, minlength=m)
+        starts = np.cumsum(per_query) - per_query
+        leaves = np.full((m, int(per_query.max())), len(self.leaves) - 1)
+        leaves[pair_q, np.arange(len(pair_q)) - starts[pair_q]] = pair_node
+        width = self.leaves.shape[1]
+        dist = np.empty((m, k))
+        idx = np.empty((m, k), dtype=np.intp)
+        by_count = np.argsort(per_query, kind='stable')
+        for batch in np.array_split(by_count, max(1, m // 4096)):
+            row_leaves = leaves[batch, :per_query[batch[-1]]]
+            d2 = self._leaf_distances(q[batch], row_leaves)
+            picked = np.arange(len(batch))[:, None]
+            if d2.shape[1] > k:
+                nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                nearest = np.broadcast_to(np.arange(k), d2.shape)
+            nearest = nearest[picked, np.argsort(d2[picked, nearest], axis=1)]
+            dist[batch] = np.sqrt(d2[picked, nearest])
+            idx[batch] = self.leaves[row_leaves[picked, nearest // width], nearest % width]
+        return dist, idx
+
+    def query(self, xy, k=DEFAULT_NEIGHBOURS, chunk_size=2 ** 18):
+        """Find the k nearest points to each query point.
+
+        Args:
+            xy: (M, 2) query coordinates
+            k: Number of neighbours (capped at the number of points)
+            chunk_size: Query-candidate pairs processed per broadcast
+
+        Returns:
+            tuple: (distances, indices), both (M, k), sorted nearest first
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        n = len(self.xy)
+        k = min(k, n)
+        # Deepest level whose nodes all hold at least k points
+        start_level = min(self.depth, int(math.log2(n / k)))
+        dist = np.empty((len(xy), k))
+        idx = np.empty((len(xy), k), dtype=np.intp)
+        step = max(1, chunk_size // self.leaves.shape[1])
+        for start in range(0, len(xy), step):
+            dist[start:start + step], idx[start:start + step] = self._query_chunk(xy[start:start + step], k,
+                                                                                 start_level)
+        return dist, idx
+
+
+class GridIndex:
+    """k-nearest-neighbour index over 2-D points using a uniform bucket grid.
+
+    Points are sorted by bucket so every row of a square block of buckets
+    is one contiguous slice of the sorted order. Queries are compared with
+    the block around their bucket in one broadcast. Buckets are sized from
+    the mean spacing, so where points cluster a block can hold thousands of
+    them; those queries, and any the block cannot settle, use a KDTreeIndex
+    over the same points instead. Results are exact.
+    """
+
+    def __init__(self, xy, per_cell=4):
+        """
+        Args:
+            xy: (N, 2) point coordinates
+            per_cell: Average number of points per bucket
+        """
+        self.xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        n = len(self.xy)
+        if n == 0:
+            raise ValueError("GridIndex needs at least one point")
+        self.lo = self.xy.min(axis=0)
+        span = self.xy.max(axis=0) - self.lo
+        area = float(span[0] * span[1])
+        # Mean distance between neighbouring points
+        self.spacing = math.sqrt(area / n) if area > 0 else float(span.max()) / n or 1.0
+        self.per_cell = per_cell
+        self.cell_size = self.spacing * math.sqrt(per_cell)
+        self.nx, self.ny = (span // self.cell_size).astype(int) + 1
+
+        cells = self._cells(self.xy)
+        self.order = np.argsort(cells, kind='stable')
+        self.starts = np.searchsorted(cells[self.order], np.arange(self.nx * self.ny + 1))
+        self._tree = None
+
+    def _cells(self, xy):
+        cx = np.clip(((xy[:, 0] - self.lo[0]) // self.cell_size).astype(int), 0, self.nx - 1)
+        cy = np.clip(((xy[:, 1] - self.lo[1]) // self.cell_size).astype(int), 0, self.ny - 1)
+        return cy * self.nx + cx
+
+    def _bounds(self, cells, r):
+        cx, cy = cells % self.nx, cells // self.nx
+        return (np.maximum(cx - r, 0), np.minimum(cx + r, self.nx - 1),
+                np.maximum(cy - r, 0), np.minimum(cy + r, self.ny - 1))
+
+    def _reach(self, q, bounds):
+        """Distance from each query to the nearest block edge that has points beyond it."""
+        x0, x1, y0, y1 = bounds
+        edges = (
+            (x0 > 0, q[:, 0] - (self.lo[0] + x0 * self.cell_size)),
+            (x1 < self.nx - 1, self.lo[0] + (x1 + 1) * self.cell_size - q[:, 0]),
+            (y0 > 0, q[:, 1] - (self.lo[1] + y0 * self.cell_size)),
+            (y1 < self.ny - 1, self.lo[1] + (y1 + 1) * self.cell_size - q[:, 1]),
+        )
+        reach = np.full(len(q), np.inf)
+        for inside, distance in edges:
+            reach = np.where(inside, np.minimum(reach, distance), reach)
+        return reach
+
+    def _block_runs(self, cells, r):
+        """(first, length) slices of the sorted order, one per row of the block around each bucket."""
+        x0, x1, y0, y1 = self._bounds(cells, r)
+        cy = cells // self.nx
+        runs = []
+        for dy in range(-r, r + 1):
+            row = cy + dy
+            valid = (row >= y0) & (row <= y1)
+            first = self.starts[np.where(valid, row * self.nx + x0, 0)]
+            last = self.starts[np.where(valid, row * self.nx + x1 + 1, 0)]
+            runs.append((first, last - first))
+        return runs
+
+    def _block_table(self, cells, r, min_width):
+        """Point indices in the (2r + 1)^2 block around each bucket, padded with len(xy).
+
+        Returns:
+            numpy.ndarray: (len(cells), max(longest block, min_width)) index table
+        """
+        runs = self._block_runs(cells, r)
+        lengths = sum(length for _, length in runs)
+        table = np.full((len(cells), max(int(lengths.max()), min_width)), len(self.xy), dtype=np.intp)
+        filled = np.zeros(len(cells), dtype=np.intp)
+        for first, length in runs:
+            rows = np.repeat(np.arange(len(cells)), length)
+            within = np.arange(len(rows)) - np.repeat(np.cumsum(length) - length, length)
+            table[rows, np.repeat(filled, length) + within] = self.order[np.repeat(first, length) + within]
+            filled += length
+        return table
+
+    @staticmethod
+    def _nearest(q, cand_x, cand_y, k):
+        """Sorted squared distances and candidate columns of the k nearest."""
+        dx = q[:, 0:1] - cand_x
+        dy = q[:, 1:2] - cand_y
+        d2 = dx * dx + dy * dy
+        rows = np.arange(len(q))[:, None]
+        if d2.shape[1] > k:
+            nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            d2 = d2[rows, nearest]
+        else:
+            nearest = np.broadcast_to(np.arange(k), d2.shape)
+        ranked = np.argsort(d2, axis=1)
+        return d2[rows, ranked], nearest[rows, ranked]
+
+    def query(self, xy, k=DEFAULT_NEIGHBOURS, chunk_size=2 ** 18):
+        """Find the k nearest points to each query point.
+
+        Args:
+            xy: (M, 2) query coordinates
+            k: Number of neighbours (capped at the number of points)
+            chunk_size: Query-candidate pairs processed per broadcast
+
+        Returns:
+            tuple: (distances, indices), both (M, k), sorted nearest first
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        k = min(k, len(self.xy))
+        dist = np.empty((len(xy), k))
+        idx = np.empty((len(xy), k), dtype=np.intp)
+        cells = self._cells(xy)
+        x_padded = np.append(self.xy[:, 0], np.inf)
+        y_padded = np.append(self.xy[:, 1], np.inf)
+
+        # Padding sits at infinity, so it is only picked when a block holds
+        # fewer than k points. A query is settled by the 3x3 block around its
+        # bucket when its k-th neighbour is nearer than every block edge with
+        # points beyond it. The rest (blocks crowded by a dense cluster,
+        # queries near a block edge or away from the indexed area) go to the
+        # k-d tree, which adapts to uneven density.
+        near = np.all((xy > self.lo - self.cell_size)
+                      & (xy < self.lo + (np.array([self.nx, self.ny]) + 1) * self.cell_size), axis=1)
+        pending = np.flatnonzero(near)
+        pending = pending[np.argsort(cells[pending], kind='stable')]  # Neighbouring queries share table rows
+        block_cells, which = np.unique(cells[pending], return_inverse=True)
+        crowded = sum(length for _, length in self._block_runs(block_cells, 1)) > CROWDED_BLOCK * 9 * self.per_cell
+        retry = [np.flatnonzero(~near), pending[crowded[which]]]
+        pending = pending[~crowded[which]]
+        if len(pending):
+            block_cells, which = np.unique(cells[pending], return_inverse=True)
+            table = self._block_table(block_cells, 1, k)
+            table_x, table_y = x_padded[table], y_padded[table]
+            step = max(1, chunk_size // table.shape[1])
+            for start in range(0, len(pending), step):
+                rows, blocks = pending[start:start + step], which[start:start + step]
+                q = xy[rows]
+                d2, nearest = self._nearest(q, table_x[blocks], table_y[blocks], k)
+                reach = self._reach(q, self._bounds(block_cells[blocks], 1))
+                done = np.isfinite(d2[:, -1]) & (d2[:, -1] <= np.maximum(reach, 0) ** 2)
+                dist[rows[done]] = np.sqrt(d2[done])
+                idx[rows[done]] = table[blocks[done][:, None], nearest[done]]
+                retry.append(rows[~done])
+        retry = np.concatenate(retry)
+        if len(retry):
+            dist[retry], idx[retry] = self.tree().query(xy[retry], k, chunk_size)
+        return dist, idx
+
+    def tree(self):
+        """The k-d tree over the same points, built on first use."""
+        if self._tree is None:
+            self._tree = KDTreeIndex(self.xy)
+        return self._tree
+
+
+def interpolate_aqi(points, lat, lon, method='idw', k=DEFAULT_NEIGHBOURS, power=2.0,
+                    bandwidth_km=None, max_distance_km=None):
+    """Estimate AQI at target locations from sampled points.
+
+    Args:
+        points: (N, 3) array of (lat, lon, aqi) samples; NaN AQI rows are ignored
+        lat: Target latitudes (any shape broadcastable with lon)
+        lon: Target longitudes
+        method: 'idw' (inverse distance ** power) or 'gaussian'
+            (exp(-d^2 / 2 bandwidth^2))
+        k: Number of nearest samples used per target
+        power: IDW distance exponent
+        bandwidth_km: Gaussian kernel width; defaults to the mean sample spacing
+        max_distance_km: Targets whose nearest sample is further away get NaN
+
+    Returns:
+        numpy.ndarray: Estimated AQI with the broadcast shape of lat and lon;
+            a target exactly on a sample gets that sample's value
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Unknown interpolation method {method!r}; expected one of {INTERPOLATION_METHODS}")
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    points = points[~np.isnan(points[:, 2])]
+    lat, lon = np.broadcast_arrays(np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64))
+    if len(points) == 0:
+        return np.full(lat.shape, np.nan)
+
+    lat0 = float(points[:, 0].mean())
+    index = GridIndex(project_km(points[:, 0], points[:, 1], lat0))
+    dist, idx = index.query(project_km(lat, lon, lat0), k)
+    values = points[idx, 2]
+
+    if method == 'idw':
+        exact = dist[:, 0] == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = dist ** -power
+            result = (weights * values).sum(axis=1) / weights.sum(axis=1)
+        result[exact] = values[exact, 0]
+    else:
+        bandwidth = bandwidth_km or index.spacing
+        # Relative to the nearest sample so distant targets do not underflow to 0 / 0
+        weights = np.exp(-(dist ** 2 - dist[:, :1] ** 2) / (2 * bandwidth ** 2))
+        result = (weights * values).sum(axis=1) / weights.sum(axis=1)
+
+    if max_distance_km is not None:
+        result[dist[:, 0] > max_distance_km] = np.nan
+    return result.reshape(lat.shape)
+
+
+def interpolate_grid(points, bbox, shape=(100, 100), **kwargs):
+    """Interpolate AQI on a regular grid of cell centres over a bounding box.
+
+    Args:
+        points: (N, 3) array of (lat, lon, aqi) samples
+        bbox: (south, west, north, east) in degrees
+        shape: (rows, columns) of the grid
+        **kwargs: Passed to interpolate_aqi
+
+    Returns:
+        tuple: (lats, lons, values) with 1-D cell-centre latitudes (rows),
+            longitudes (columns) and a (rows, columns) AQI array
+    """
+    south, west, north, east = bbox
+    rows, columns = shape
+    lats = south + (np.arange(rows) + 0.5) * (north - south) / rows
+    lons = west + (np.arange(columns) + 0.5) * (east - west) / columns
+    values = interpolate_aqi(points, lats[:, None], lons[None, :], **kwargs)
+    return lats, lons, values
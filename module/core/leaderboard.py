@@ -0,0 +1,240 @@
+"""
+Top-K leaderboard of the sites with the worst air.
+
+Ranks every site of a watchlist two ways: by current AQI (the forecast
+hour containing now) and by forecast peak AQI within a horizon. A site
+refresh scores that site's forecast once and pushes its new scores onto
+two max-heaps, O(log n); the previous entries are left in place and
+skipped when they surface (each push carries the site's version, like
+WatchlistPoller's schedule). top(k) pops the k best live entries and
+pushes them back, O(k log n), so nothing is re-scored or fully sorted
+when a few sites change per poll. Stale entries are dropped by a rebuild
+once they outnumber live ones.
+
+refresh_from_store keeps a leaderboard in step with a TimeSeriesStore
+another process (``clearskies watch``) writes: only sites fetched since
+the last refresh are read back and re-scored, plus every site once the
+clock enters a new hour, since the current hour of each forecast moves
+even without a new fetch.
+"""
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .alerts import update_series
+from .aqi_calculators import POLLUTANT_NAMES, calculate_all_aqi_batch
+from .store import cell_coordinates, cell_id, concentrations
+
+RANKINGS = ('current', 'peak')
+DEFAULT_K = 20
+DEFAULT_HORIZON_HOURS = 24
+
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    """Scores of one site at its last refresh."""
+    lat: float
+    lon: float
+    name: str
+    current: float           # AQI of the forecast hour containing the refresh time
+    peak: float              # Highest AQI from that hour to the horizon
+    peak_time: int           # Unix time of the peak hour
+    dominant_pollutant: str  # Of the current hour
+    updated_at: float
+
+
+def site_scores(cells, dt, sub_indices, now, horizon_hours=DEFAULT_HORIZON_HOURS):
+    """Current and peak AQI of every site in a batch of forecast rows.
+
+    Args:
+        cells: Site key of each row (N,)
+        dt: Unix time of each row (N,)
+        sub_indices: (N, 6) AQI sub-indices from calculate_all_aqi_batch
+        now: Time the current hour is taken at
+        horizon_hours: Hours after now the peak looks ahead
+
+    Returns:
+        dict: cell, current, peak, peak_time and dominant (index into
+            POLLUTANT_NAMES) -> arrays, one entry per site with a row in
+            the window, ordered by cell
+    """
+    cells, dt = np.asarray(cells, dtype=np.int64), np.asarray(dt, dtype=np.int64)
+    window = (dt > now - 3600) & (dt <= now + horizon_hours * 3600)
+    order = np.flatnonzero(window)
+    if not len(order):
+        empty = np.empty(0, dtype=np.int64)
+        return {'cell': empty, 'current': np.empty(0), 'peak': np.empty(0), 'peak_time': empty, 'dominant': empty}
+    order = order[np.lexsort((dt[order], cells[order]))]
+    cells, dt, sub_indices = cells[order], dt[order], sub_indices[order]
+    aqi = sub_indices.max(axis=1)
+    starts = np.flatnonzero(np.append(True, cells[1:] != cells[:-1]))
+    # Current hour: the last row at or before now, else the first one
+    current = starts + np.maximum(np.add.reduceat((dt <= now).astype(np.intp), starts) - 1, 0)
+    peak = np.maximum.reduceat(aqi, starts)
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(aqi))))
+    peak_row = np.minimum.reduceat(np.where(aqi == peak[segment], np.arange(len(aqi)), len(aqi)), starts)
+    return {
+        'cell': cells[starts],
+        'current': aqi[current],
+        'peak': peak,
+        'peak_time': dt[peak_row],
+        'dominant': np.argmax(sub_indices[current], axis=1),
+    }
+
+
+class Leaderboard:
+    """Sites ranked by current and by forecast peak AQI, updated one site at a time.
+
+    Safe to share between threads.
+
+    Args:
+        horizon_hours: Hours ahead the forecast peak covers
+        clock: Wall-clock time source for updates without `now`
+    """
+
+    def __init__(self, horizon_hours=DEFAULT_HORIZON_HOURS, clock=time.time):
+        self.horizon_hours = horizon_hours
+        self.clock = clock
+        self._entries = {}   # cell -> LeaderboardEntry
+        self._versions = {}  # cell -> version of its live heap entries
+        self._heaps = {ranking: [] for ranking in RANKINGS}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._store_seen = None  # (newest fetched_at, hour) of the last refresh_from_store
+
+    def update(self, lat, lon, forecast, now=None, name=None):
+        """Re-score one site from a new forecast.
+
+        Args:
+            lat: Latitude of the site
+            lon: Longitude of the site
+            forecast: Raw forecast JSON, AirQualityResponse, AirQualityData
+                or a list of AirQualityData
+            now: Time of the refresh (default the clock)
+            name: Display name (default the previous one, or lat,lon)
+
+        Returns:
+            LeaderboardEntry or None: None when no forecast hour falls in
+                the window (the site keeps its previous entry)
+        """
+        now = self.clock() if now is None else now
+        dt, values = update_series(forecast)
+        cell = cell_id(lat, lon)
+        scores = site_scores(np.full(len(dt), cell), dt, calculate_all_aqi_batch(values), now, self.horizon_hours)
+        if not len(scores['cell']):
+            return None
+        with self._lock:
+            return self._set(cell, scores, 0, lat, lon, name, now)
+
+    def _set(self, cell, scores, i, lat, lon, name, now):
+        # Called with the lock held
+        previous = self._entries.get(cell)
+        if name is None:
+            name = previous.name if previous is not None else f"{lat:.4f},{lon:.4f}"
+        entry = LeaderboardEntry(float(lat), float(lon), name, float(scores['current'][i]),
+                                 float(scores['peak'][i]), int(scores['peak_time'][i]),
+                                 POLLUTANT_NAMES[scores['dominant'][i]], now)
+        self._entries[cell] = entry
+        version = self._versions[cell] = self._versions.get(cell, 0) + 1
+        for ranking, heap in self._heaps.items():
+            self._sequence += 1
+            heapq.heappush(heap, (-getattr(entry, ranking), self._sequence, cell, version))
+            if len(heap) > 2 * len(self._entries) + 64:
+                self._rebuild(ranking)
+        return entry
+
+    def _rebuild(self, ranking):
+        # Called with the lock held: keep only live entries
+        heap = [item for item in self._heaps[ranking] if self._versions.get(item[2]) == item[3]]
+        heapq.heapify(heap)
+        self._heaps[ranking] = heap
+
+    def remove(self, lat, lon):
+        """Stop ranking a site."""
+        cell = cell_id(lat, lon)
+        with self._lock:
+            self._entries.pop(cell, None)
+            self._versions.pop(cell, None)
+
+    def top(self, k=DEFAULT_K, by='current'):
+        """The k sites with the highest current (or peak) AQI.
+
+        Args:
+            k: Number of sites
+            by: 'current' or 'peak'
+
+        Returns:
+            list: LeaderboardEntry, worst first; ties in update order
+        """
+        if by not in RANKINGS:
+            raise ValueError(f"Unknown ranking {by!r}; expected one of {RANKINGS}")
+        with self._lock:
+            heap, taken = self._heaps[by], []
+            while heap and len(taken) < k:
+                item = heapq.heappop(heap)
+                if self._versions.get(item[2]) == item[3]:
+                    taken.append(item)
+            for item in taken:
+                heapq.heappush(heap, item)
+            return [self._entries[item[2]] for item in taken]
+
+    def refresh_from_store(self, store, now=None):
+        """Re-score the sites a TimeSeriesStore has new forecasts for.
+
+        The first call, and the first in each new hour, scores every site
+        with a forecast in the window and drops the sites without one
+        (no longer polled or unwatched); other calls only re-score those
+        with a fetch newer than the last one seen. A fetch another
+        process writes late, with an older fetched_at, shows at the next
+        hour.
+
+        Args:
+            store: TimeSeriesStore
+            now: Current time (default the clock)
+
+        Returns:
+            int: Number of sites re-scored
+        """
+        now = self.clock() if now is None else now
+        start, end = int(now) - 3600 + 1, int(now + self.horizon_hours * 3600)
+        hour = int(now) // 3600
+        with self._lock:
+            seen = self._store_seen
+        full = seen is None or seen[1] != hour
+        if full:
+            readings = store.time_range(start, end)
+        else:
+            cells = store.updated_cells(seen[0], start, end)
+            if not len(cells):
+                return 0
+            readings = store.time_range(start, end, cells=cells)
+        scores = site_scores(readings['cell'], readings['dt'], calculate_all_aqi_batch(concentrations(readings)),
+                             now, self.horizon_hours)
+        lats, lons = cell_coordinates(scores['cell'])
+        with self._lock:
+            if full:
+                self._retain(scores['cell'].tolist())
+            for i, cell in enumerate(scores['cell'].tolist()):
+                self._set(cell, scores, i, lats[i], lons[i], None, now)
+            fetched = int(readings['fetched_at'].max()) if len(readings['dt']) else 0
+            self._store_seen = (max(fetched, seen[0] if seen else 0), hour)
+        return len(scores['cell'])
+
+    def _retain(self, cells):
+        # Called with the lock held: drop every site not in `cells` (no
+        # longer forecast in the window, e.g. unwatched) and its heap entries
+        keep = set(cells)
+        dropped = [cell for cell in self._entries if cell not in keep]
+        for cell in dropped:
+            del self._entries[cell]
+            del self._versions[cell]
+        if dropped:
+            for ranking in RANKINGS:
+                self._rebuild(ranking)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,403 @@
+"""
+Watchlist polling with a priority scheduler and adaptive refresh intervals.
+
+Keeps a set of monitored sites fresh within the API quota. Every site has
+a next-due time in a heap; the earliest is polled first, so when the
+quota cannot keep up the most overdue sites win. After each fetch the
+site's interval is recomputed from:
+
+- user demand (record_demand), which decays over time
+- volatility: how fast the fetched forecast says AQI is about to move,
+  and how far the new fetch revised the previous forecast
+- the AQI level itself (unhealthy air is refreshed sooner)
+- a calm streak: each fetch that changed nothing stretches the interval
+
+so the call budget goes where a refresh is likely to change the answer.
+"""
+
+import heapq
+import logging
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import requests
+
+from .air_quality_api import read_pollution_data_from_api
+from .aqi_calculators import calculate_all_aqi_batch
+from .batch_report import forecast_arrays
+from .store import cell_id
+
+logger = logging.getLogger(__name__)
+
+# Forecast hours whose movement counts as near-term volatility
+VOLATILITY_HORIZON_HOURS = 6
+
+
+@dataclass
+class RefreshPolicy:
+    """Tuning of the adaptive refresh interval (all times in seconds).
+
+    interval = base_interval / urgency * calm_backoff ** calm_streak,
+    clamped to [min_interval, max_interval], where
+    urgency = demand * (1 + volatility / volatility_scale) * (1 + aqi / aqi_scale).
+    """
+    base_interval: float = 3600.0
+    min_interval: float = 600.0  # OpenWeather updates forecasts hourly
+    max_interval: float = 6 * 3600.0
+    volatility_scale: float = 10.0  # AQI points per hour that doubles urgency
+    aqi_scale: float = 100.0
+    calm_delta: float = 5.0  # A fetch moving AQI less than this counts as calm
+    calm_backoff: float = 1.5
+    max_calm_streak: int = 4
+    demand_half_life: float = 6 * 3600.0
+    volatility_smoothing: float = 0.5  # Weight of the newest volatility sample
+    failure_backoff: float = 2.0
+
+    def interval(self, site, now):
+        """Seconds until the next poll of a site that was just fetched."""
+        if site.failures:
+            return min(self.max_interval, self.min_interval * self.failure_backoff ** (site.failures - 1))
+        urgency = (site.current_demand(now, self.demand_half_life)
+                   * (1 + site.volatility / self.volatility_scale)
+                   * (1 + max(site.aqi, 0.0) / self.aqi_scale))
+        interval = self.base_interval / urgency * self.calm_backoff ** min(site.calm_streak, self.max_calm_streak)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+
+@dataclass
+class WatchedSite:
+    """A monitored location and its polling state."""
+    name: str
+    lat: float
+    lon: float
+    demand: float = 1.0
+    demand_at: float = 0.0
+    aqi: float = 0.0
+    volatility: float = 0.0
+    calm_streak: int = 0
+    interval: float = 0.0
+    next_due: float = 0.0
+    last_success: float = None
+    fetches: int = 0
+    failures: int = 0
+    forecast_dt: np.ndarray = field(default=None, repr=False)
+    forecast_aqi: np.ndarray = field(default=None, repr=False)
+    polling: bool = False  # Off the heap while its fetch is in flight
+    version: int = 0  # Bumped on every reschedule; older heap entries are stale
+
+    @property
+    def key(self):
+        return cell_id(self.lat, self.lon)
+
+    def current_demand(self, now, half_life):
+        """Demand decayed towards the baseline of 1."""
+        extra = max(self.demand - 1.0, 0.0) * 0.5 ** ((now - self.demand_at) / half_life)
+        return 1.0 + extra
+
+
+def forecast_aqi(forecast):
+    """Timestamps and overall AQI of every forecast hour."""
+    timestamps, concentrations = forecast_arrays(forecast)
+    return timestamps, calculate_all_aqi_batch(concentrations).max(axis=1)
+
+
+class WatchlistPoller:
+    """Heap-scheduled poller for a watchlist of sites.
+
+    Args:
+        fetch: ``fetch(lat, lon)`` returning raw forecast JSON
+            (default read_pollution_data_from_api)
+        store: Optional TimeSeriesStore that receives every fetch
+        limiter: RateLimiter enforcing the API quota; every fetch takes a
+            token first
+        policy: RefreshPolicy
+        clock: Wall-clock time source (injectable for tests)
+        store_batch: Fetches written to the store per transaction; the
+            rest wait in memory until the batch fills or the poller idles
+        on_fetch: Optional callback ``on_fetch(site, forecast, fetched_at)``
+            run after every successful fetch, e.g. AlertEngine updates
+    """
+
+    def __init__(self, fetch=read_pollution_data_from_api, store=None, limiter=None, policy=None,
+                 clock=time.time, store_batch=1, on_fetch=None):
+        self.fetch = fetch
+        self.store = store
+        self.on_fetch = on_fetch
+        self.store_batch = max(1, store_batch)
+        self.limiter = limiter
+        self.policy = policy or RefreshPolicy()
+        self.clock = clock
+        self.sites = {}
+        self.calls = 0
+        self.started = clock()
+        self._heap = []
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._pending = []
+        self._pending_lock = threading.Lock()
+
+    def _schedule(self, site, due):
+        # Called with the lock held
+        site.polling = False
+        site.version += 1
+        site.next_due = due
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, site.key, site.version))
+
+    def add_site(self, lat, lon, name=None, demand=1.0):
+        """Watch a location; new sites are due immediately.
+
+        Returns:
+            WatchedSite: The site (an existing one if the cell is already watched)
+        """
+        site = WatchedSite(name or f"{lat:.4f},{lon:.4f}", lat, lon, demand=demand, demand_at=self.clock())
+        with self._lock:
+            if site.key in self.sites:
+                return self.sites[site.key]
+            self.sites[site.key] = site
+            self._schedule(site, self.clock())
+        return site
+
+    def remove_site(self, lat, lon):
+        with self._lock:
+            self.sites.pop(cell_id(lat, lon), None)
+
+    def record_demand(self, lat, lon, weight=1.0):
+        """Note that users asked for a site, pulling its next poll forward."""
+        now = self.clock()
+        with self._lock:
+            site = self.sites.get(cell_id(lat, lon))
+            if site is None:
+                return
+            site.demand = site.current_demand(now, self.policy.demand_half_life) + weight
+            site.demand_at = now
+            if site.last_success is not None and not site.polling:
+                due = site.last_success + self.policy.interval(site, now)
+                if due < site.next_due:
+                    self._schedule(site, due)
+
+    def _peek(self):
+        # Called with the lock held: drop stale entries, return the live head
+        while self._heap:
+            due, _, key, version = self._heap[0]
+            site = self.sites.get(key)
+            if site is not None and site.version == version:
+                return due, site
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now):
+        """Take the earliest-due site off the heap if it is due by now."""
+        with self._lock:
+            head = self._peek()
+            if head is None or head[0] > now:
+                return None
+            heapq.heappop(self._heap)
+            site = head[1]
+            site.polling = True
+            return site
+
+    def seconds_until_due(self):
+        """Time until the next site is due (0 if overdue, None if nothing is scheduled)."""
+        now = self.clock()
+        with self._lock:
+            head = self._peek()
+        return None if head is None else max(0.0, head[0] - now)
+
+    def _poll(self, site):
+        """Fetch one site and reschedule it.
+
+        The site always goes back on the heap: a failed fetch backs off,
+        and an error in the store write or on_fetch is logged without
+        losing the fetch.
+        """
+        fetched = None
+        try:
+            try:
+                forecast = self.fetch(site.lat, site.lon)
+                if not forecast.get('list'):
+                    raise ValueError(f"API error: {forecast.get('message', forecast)}")
+                dt, aqi = forecast_aqi(forecast)
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                logger.warning("%s: Error fetching air quality: %s", site.name, e)
+                return site
+            now = self.clock()
+            fetched = dt, aqi, now
+            if self.store is not None:
+                with self._pending_lock:
+                    self._pending.append((site.lat, site.lon, forecast, now))
+                    full = len(self._pending) >= self.store_batch
+                if full:
+                    self.flush()
+            if self.on_fetch is not None:
+                self.on_fetch(site, forecast, now)
+        except Exception:
+            logger.exception("%s: Error polling site", site.name)
+        finally:
+            self._reschedule(site, fetched)
+        return site
+
+    def _reschedule(self, site, fetched):
+        """Put a polled site back on the heap; `fetched` is None after a failure."""
+        now = self.clock() if fetched is None else fetched[2]
+        with self._lock:
+            if fetched is None:
+                site.failures += 1
+                site.interval = self.policy.interval(site, now)
+            else:
+                self._update(site, *fetched)
+            if site.key in self.sites:
+                self._schedule(site, now + site.interval)
+
+    def _update(self, site, dt, aqi, now):
+        current = float(np.interp(now, dt, aqi))
+        horizon = aqi[(dt >= now - 3600) & (dt <= now + VOLATILITY_HORIZON_HOURS * 3600)]
+        trend = float(np.abs(np.diff(horizon)).mean()) if len(horizon) > 1 else 0.0
+        revision = 0.0
+        if site.forecast_dt is not None:
+            # How far the new fetch moved the hours the previous one predicted
+            overlap = ((dt >= site.forecast_dt[0]) & (dt <= site.forecast_dt[-1])
+                       & (dt <= now + VOLATILITY_HORIZON_HOURS * 3600))
+            if overlap.any():
+                previous = np.interp(dt[overlap], site.forecast_dt, site.forecast_aqi)
+                revision = float(np.abs(aqi[overlap] - previous).mean())
+        sample = max(trend, revision)
+        alpha = self.policy.volatility_smoothing
+        site.volatility = sample if site.fetches == 0 else alpha * sample + (1 - alpha) * site.volatility
+        calm = site.fetches > 0 and max(abs(current - site.aqi), revision) < self.policy.calm_delta
+        site.calm_streak = site.calm_streak + 1 if calm else 0
+        site.aqi = current
+        site.forecast_dt, site.forecast_aqi = dt, aqi
+        site.failures = 0
+        site.fetches += 1
+        site.last_success = now
+        site.interval = self.policy.interval(site, now)
+
+    def flush(self):
+        """Write buffered fetches to the store in one transaction."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            self.store.ingest_many(pending)
+        except sqlite3.Error:
+            logger.exception("Error storing readings of %d fetches", len(pending))
+
+    def poll_once(self):
+        """Poll the earliest-due site if one is due now.
+
+        Blocks on the rate limiter, so a call never exceeds the quota.
+
+        Returns:
+            WatchedSite or None: The polled site, or None if nothing is due
+        """
+        site = self._pop_due(self.clock())
+        if site is None:
+            return None
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self.calls += 1
+        return self._poll(site)
+
+    def run(self, stop=None, workers=4, report=None, report_every=60.0, idle_sleep=1.0):
+        """Poll until `stop` is set, overlapping up to `workers` fetches.
+
+        Args:
+            stop: threading.Event that ends the loop (None runs until
+                KeyboardInterrupt)
+            workers: Fetches in flight at once; the rate limiter still
+                spaces their starts
+            report: Optional callback ``report(poller)`` run every
+                `report_every` seconds
+            idle_sleep: Longest sleep while waiting for the next due site
+        """
+        stop = stop or threading.Event()
+        slots = threading.BoundedSemaphore(max(1, workers))
+        last_report = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                def finished(_):
+                    slots.release()
+
+                while not stop.is_set():
+                    if report is not None and time.monotonic() - last_report >= report_every:
+                        last_report = time.monotonic()
+                        report(self)
+                    wait = self.seconds_until_due()
+                    if wait is None or wait > 0:
+                        self.flush()
+                        stop.wait(idle_sleep if wait is None else min(wait, idle_sleep))
+                        continue
+                    if not slots.acquire(timeout=idle_sleep):
+                        continue
+                    site = self._pop_due(self.clock())
+                    if site is None:
+                        slots.release()
+                        continue
+                    if self.limiter is not None:
+                        self.limiter.acquire()
+                    self.calls += 1
+                    pool.submit(self._poll, site).add_done_callback(finished)
+        finally:
+            # Write what is buffered, also when interrupted
+            self.flush()
+
+    def metrics(self):
+        """Per-site freshness.
+
+        Returns:
+            list: One dict per site with name, lat, lon, age (seconds since
+                the last successful fetch, None if never), interval,
+                overdue (seconds past due, 0 if not), aqi, volatility,
+                demand, fetches and failures
+        """
+        now = self.clock()
+        with self._lock:
+            return [{
+                'name': site.name,
+                'lat': site.lat,
+                'lon': site.lon,
+                'age': None if site.last_success is None else now - site.last_success,
+                'interval': site.interval,
+                'overdue': max(0.0, now - site.next_due),
+                'aqi': round(site.aqi, 1),
+                'volatility': round(site.volatility, 2),
+                'demand': round(site.current_demand(now, self.policy.demand_half_life), 2),
+                'fetches': site.fetches,
+                'failures': site.failures,
+            } for site in self.sites.values()]
+
+    def summary(self):
+        """Watchlist-wide freshness: site counts, age percentiles and call rate."""
+        return summarize(self.metrics(), self.calls, self.clock() - self.started)
+
+
+def summarize(metrics, calls, elapsed):
+    """Freshness summary of per-site metrics from one or more pollers.
+
+    Args:
+        metrics: WatchlistPoller.metrics() dicts
+        calls: API calls made
+        elapsed: Seconds the pollers have been running
+
+    Returns:
+        dict: sites, never_fetched, overdue, median_age, p95_age (seconds,
+            NaN if nothing was fetched yet), calls and calls_per_hour
+    """
+    ages = np.array([m['age'] for m in metrics if m['age'] is not None])
+    elapsed_hours = max(elapsed, 1.0) / 3600
+    return {
+        'sites': len(metrics),
+        'never_fetched': sum(m['age'] is None for m in metrics),
+        'overdue': sum(m['overdue'] > 0 for m in metrics),
+        'median_age': float(np.median(ages)) if len(ages) else math.nan,
+        'p95_age': float(np.percentile(ages, 95)) if len(ages) else math.nan,
+        'calls': calls,
+        'calls_per_hour': calls / elapsed_hours,
+    }
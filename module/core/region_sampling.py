@@ -0,0 +1,164 @@
+"""
+Adaptive sampling of AQI over a bounding box.
+
+A uniform fine grid over a metro area costs (n + 1)^2 API calls, most of
+them spent where air quality is flat. sample_region starts from a coarse
+grid and refines (quadtree) only the cells whose corner AQI values differ
+by more than a threshold, so calls concentrate where AQI actually changes.
+Points are addressed on the finest possible grid, so corners shared by
+neighbouring cells, or by a cell and its children, are fetched once.
+Each refinement level's new points are fetched concurrently.
+"""
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+
+from .air_quality_api import read_pollution_data_from_api, convert_json_to_object
+from .aqi_calculators import calculate_all_aqi_values
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE_LAT = 111.32
+
+
+def bounding_box(lat, lon, radius_km):
+    """Square box of +/- radius_km around a point.
+
+    Returns:
+        tuple: (south, west, north, east) in degrees
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def current_max_aqi(lat, lon, session=None):
+    """Overall AQI (worst pollutant) of the first forecast entry at a point.
+
+    Returns:
+        float: AQI, or NaN if the fetch or parse fails
+    """
+    try:
+        response = convert_json_to_object(read_pollution_data_from_api(lat, lon, session=session))
+        return float(max(calculate_all_aqi_values(response.list[0].components)))
+    except Exception as e:
+        logger.warning("Error fetching air quality at (%.4f, %.4f): %s", lat, lon, e)
+        return math.nan
+
+
+@dataclass
+class RegionSample:
+    """Result of sample_region.
+
+    points holds one (lat, lon, aqi) row per fetched location. cells lists
+    the final leaf cells as (depth, south, west, north, east).
+    """
+    bbox: Tuple[float, float, float, float]
+    points: np.ndarray
+    cells: List[tuple] = field(default_factory=list)
+    api_calls: int = 0
+    uniform_calls: int = 0
+
+    @property
+    def savings(self):
+        """Fraction of calls saved versus a uniform grid at the finest resolution."""
+        return 1 - self.api_calls / self.uniform_calls if self.uniform_calls else 0.0
+
+
+def sample_region(bbox, fetch_aqi=current_max_aqi, coarse=4, max_depth=3, threshold=25.0,
+                  workers=8, limiter=None, max_calls=None):
+    """Sample AQI over a bounding box with quadtree refinement.
+
+    Features smaller than a coarse cell whose corners all agree are not
+    seen; choose coarse so that cells are no larger than the smallest
+    plume of interest.
+
+    Args:
+        bbox: (south, west, north, east) in degrees
+        fetch_aqi: Function ``fetch_aqi(lat, lon)`` returning AQI (NaN on failure)
+        coarse: Cells per side of the initial grid
+        max_depth: Maximum number of times a cell may be split
+        threshold: Split a cell when max - min of its corner AQI exceeds this
+        workers: Concurrent fetches per refinement level
+        limiter: Optional RateLimiter shared by all fetches
+        max_calls: Optional API call budget for refinement (the coarse grid
+            is always fetched); when refining would exceed it, the cells
+            with the largest corner spread are split first and the rest
+            are left as they are
+
+    Returns:
+        RegionSample
+    """
+    south, west, north, east = bbox
+    scale = 2 ** max_depth
+    n_fine = coarse * scale  # Finest grid has n_fine cells per side
+
+    def position(key):
+        i, j = key
+        return south + (north - south) * i / n_fine, west + (east - west) * j / n_fine
+
+    values = {}
+
+    def fetch(key):
+        if limiter is not None:
+            limiter.acquire()
+        return fetch_aqi(*position(key))
+
+    def fetch_missing(keys):
+        missing = [key for key in dict.fromkeys(keys) if key not in values]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for key, aqi in zip(missing, executor.map(fetch, missing)):
+                values[key] = aqi
+
+    # A cell is (depth, i, j, size) with (i, j) its south-west corner on the fine grid
+    level = [(0, i * scale, j * scale, scale) for i in range(coarse) for j in range(coarse)]
+    leaves = []
+    while level:
+        fetch_missing(
+            (i + di, j + dj) for _, i, j, size in level for di in (0, size) for dj in (0, size)
+        )
+        next_level = []
+        candidates = []
+        for cell in level:
+            depth, i, j, size = cell
+            corners = [values[(i + di, j + dj)] for di in (0, size) for dj in (0, size)]
+            spread = np.nanmax(corners) - np.nanmin(corners) if not np.all(np.isnan(corners)) else 0.0
+            if depth < max_depth and spread > threshold:
+                candidates.append((spread, cell))
+            else:
+                leaves.append(cell)
+        # Split the most uneven cells first; each split needs at most 5 new points
+        candidates.sort(key=lambda item: -item[0])
+        budget = math.inf if max_calls is None else max_calls - len(values)
+        for _, (depth, i, j, size) in candidates:
+            if budget < 5:
+                leaves.append((depth, i, j, size))
+                continue
+            budget -= 5
+            half = size // 2
+            next_level.extend(
+                (depth + 1, i + di, j + dj, half) for di in (0, half) for dj in (0, half)
+            )
+        level = next_level
+
+    keys = sorted(values)
+    points = np.array([position(key) + (values[key],) for key in keys], dtype=np.float64).reshape(-1, 3)
+    cells = []
+    for depth, i, j, size in leaves:
+        s, w = position((i, j))
+        n, e = position((i + size, j + size))
+        cells.append((depth, s, w, n, e))
+    return RegionSample(
+        bbox=tuple(bbox),
+        points=points,
+        cells=cells,
+        api_calls=len(values),
+        uniform_calls=(n_fine + 1) ** 2
+    )
@@ -0,0 +1,371 @@
+"""
+Delta-compressed history of forecast revisions.
+
+TimeSeriesStore keeps one float64 row per forecast hour per fetch; for a
+96-hour forecast fetched hourly that is 96 full copies of every hour.
+RevisionStore keeps each fetch of a location (a revision) as a delta
+against the previous revision of that location instead:
+
+- values are quantized to `decimals` places (the API reports two), so
+  unchanged values become exact zeros after subtraction
+- hours also in the base revision store the change since then; hours
+  new in this revision store their quantized values
+- the hours themselves are stored as steps from the first one
+
+The residuals are zigzag-encoded, narrowed to the fewest bytes that hold
+them, split into byte planes and compressed with zlib, so runs of zeros
+(unchanged hours and components) and small revisions cost next to
+nothing.
+
+Every `keyframe_every` revisions of a location, and for fetches ingested
+out of order, a revision is stored against nothing (a keyframe), so
+reading any revision back decodes at most that many deltas. Each delta
+names its base, so a late or concurrent ingest never invalidates the
+chain of another revision.
+"""
+
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from .store import READING_COLUMNS, VALUE_COLUMNS, cell_id, response_values
+
+DEFAULT_DECIMALS = 2
+DEFAULT_KEYFRAME_EVERY = 24
+# Decoded latest revisions kept in memory, so ingest needs no read-back
+DEFAULT_TIP_ENTRIES = 4096
+
+_HEADER = struct.Struct('<qIBB')  # First dt, hours, decimals, packed width
+_EMPTY = (np.zeros(0, dtype=np.int64), np.zeros((0, len(VALUE_COLUMNS)), dtype=np.int64))
+
+
+def quantize(values, decimals=DEFAULT_DECIMALS):
+    """Values as integer multiples of 10**-decimals."""
+    return np.rint(np.asarray(values, dtype=np.float64) * 10 ** decimals).astype(np.int64)
+
+
+def encode_revision(dt, quantized, base=_EMPTY, decimals=DEFAULT_DECIMALS):
+    """Compress a revision as a delta against `base`.
+
+    Args:
+        dt: Sorted int64 hours of the revision (N,)
+        quantized: int64 quantized VALUE_COLUMNS (N, len(VALUE_COLUMNS))
+        base: (dt, quantized) of the base revision; default nothing,
+            which gives a keyframe
+
+    Returns:
+        bytes: Blob for decode_revision
+    """
+    residual = quantized.copy()
+    position, matched = _align(base[0], dt)
+    residual[matched] -= base[1][position[matched]]
+    # Column-major: each column's residuals, mostly zeros, are adjacent
+    payload, width = _pack(np.concatenate([np.diff(dt), residual.T.ravel()]))
+    return _HEADER.pack(int(dt[0]) if len(dt) else 0, len(dt), decimals, width) + payload
+
+
+def decode_revision(blob, base=_EMPTY):
+    """Inverse of encode_revision, given the same base.
+
+    Returns:
+        tuple: (int64 dt (N,), int64 quantized values (N, len(VALUE_COLUMNS)), decimals)
+    """
+    first, n, decimals, width = _HEADER.unpack_from(blob)
+    payload = _unpack(blob[_HEADER.size:], width)
+    steps = max(n - 1, 0)
+    dt = np.empty(n, dtype=np.int64)
+    if n:
+        dt[0] = first
+        np.cumsum(payload[:steps], out=dt[1:])
+        dt[1:] += first
+    quantized = payload[steps:].reshape(len(VALUE_COLUMNS), n).T.copy()
+    position, matched = _align(base[0], dt)
+    quantized[matched] += base[1][position[matched]]
+    return dt, quantized, decimals
+
+
+def _pack(values):
+    """Compress int64s: zigzag to unsigned, narrowest width, byte planes, zlib.
+
+    Small residuals of either sign become small unsigned integers whose
+    high byte planes are all zero, which zlib stores almost for free.
+
+    Returns:
+        tuple: (bytes, width in bytes)
+    """
+    zigzag = ((values << 1) ^ (values >> 63)).view(np.uint64)
+    top = int(zigzag.max()) if len(zigzag) else 0
+    width = next(w for w in (1, 2, 4, 8) if top < 1 << (8 * w))
+    planes = zigzag.astype(f'<u{width}').view(np.uint8).reshape(-1, width).T
+    return zlib.compress(np.ascontiguousarray(planes).tobytes()), width
+
+
+def _unpack(payload, width):
+    """Inverse of _pack."""
+    planes = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(width, -1)
+    zigzag = np.ascontiguousarray(planes.T).view(f'<u{width}').ravel().astype(np.uint64)
+    return (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+
+
+def _align(base_dt, dt):
+    """Row of sorted `base_dt` holding each of `dt`, and whether it is there."""
+    if not len(base_dt):
+        return np.zeros(len(dt), dtype=np.intp), np.zeros(len(dt), dtype=bool)
+    position = np.minimum(np.searchsorted(base_dt, dt), len(base_dt) - 1)
+    return position, base_dt[position] == dt
+
+
+def _columns(dt, quantized, decimals, fetched_at):
+    values = quantized / 10 ** decimals
+    result = {'dt': dt, 'fetched_at': np.full(len(dt), fetched_at, dtype=np.int64)}
+    result.update((column, values[:, i]) for i, column in enumerate(VALUE_COLUMNS))
+    return result
+
+
+class RevisionStore:
+    """SQLite store of every fetched forecast revision per location cell.
+
+    Safe to share between threads; separate processes may open the same
+    file (WAL mode plus a busy timeout serialize their writes).
+
+    Args:
+        path: SQLite database file, or ":memory:" for a throwaway store
+        decimals: Decimal places kept of every value; the API reports two,
+            so the default is lossless
+        keyframe_every: Longest delta chain; reading a revision decodes
+            at most this many blobs
+        timeout: Seconds to wait for another process's write lock
+    """
+
+    def __init__(self, path=":memory:", decimals=DEFAULT_DECIMALS, keyframe_every=DEFAULT_KEYFRAME_EVERY,
+                 timeout=30.0):
+        self.path = path
+        self.decimals = decimals
+        self.keyframe_every = keyframe_every
+        self._lock = threading.Lock()
+        self._tips = OrderedDict()  # cell -> (fetched_at, dt, quantized, keyframe, depth)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # base is NULL for keyframes; keyframe is the fetched_at the chain starts from.
+        # A rowid table: WITHOUT ROWID stores blobs of this size poorly
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revisions ("
+            " cell INTEGER NOT NULL, fetched_at INTEGER NOT NULL,"
+            " base INTEGER, keyframe INTEGER NOT NULL, depth INTEGER NOT NULL,"
+            " first_dt INTEGER NOT NULL, last_dt INTEGER NOT NULL, hours INTEGER NOT NULL,"
+            " delta BLOB NOT NULL,"
+            " PRIMARY KEY (cell, fetched_at))"
+        )
+        self._conn.commit()
+
+    def ingest(self, lat, lon, response, fetched_at=None):
+        """Store one fetch as a new revision; a revision already present is skipped.
+
+        Args:
+            lat: Latitude the response was fetched for
+            lon: Longitude the response was fetched for
+            response: AirQualityResponse or raw forecast JSON
+            fetched_at: Unix time of the fetch (default now), whole seconds
+
+        Returns:
+            int: 1 if stored, else 0
+        """
+        return self.ingest_many([(lat, lon, response, fetched_at)])
+
+    def ingest_many(self, fetches):
+        """Store several fetches in one transaction.
+
+        Same interface as TimeSeriesStore.ingest_many, so a WatchlistPoller
+        can write to either.
+
+        Args:
+            fetches: (lat, lon, response, fetched_at) tuples
+
+        Returns:
+            int: Number of new revisions
+        """
+        with self._lock:
+            added = 0
+            for lat, lon, response, fetched_at in fetches:
+                fetched_at = int(time.time() if fetched_at is None else fetched_at)
+                dt, values = response_values(response)
+                order = np.argsort(dt, kind='stable')
+                added += self._insert(cell_id(lat, lon), fetched_at, dt[order],
+                                      quantize(values[order], self.decimals))
+            self._conn.commit()
+            return added
+
+    def _insert(self, cell, fetched_at, dt, quantized):
+        # Called with the lock held
+        tip = self._tips.get(cell)
+        if tip is None:
+            tip = self._load_tip(cell)
+        if tip is not None and fetched_at > tip[0] and tip[4] + 1 < self.keyframe_every:
+            base, keyframe, depth = tip[0], tip[3], tip[4] + 1
+            delta = encode_revision(dt, quantized, (tip[1], tip[2]), self.decimals)
+        else:
+            # First revision, chain full, or a fetch older than the tip
+            base, keyframe, depth = None, fetched_at, 0
+            delta = encode_revision(dt, quantized, decimals=self.decimals)
+        before = self._conn.total_changes
+        self._conn.execute(
+            "INSERT OR IGNORE INTO revisions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (cell, fetched_at, base, keyframe, depth,
+             int(dt[0]) if len(dt) else 0, int(dt[-1]) if len(dt) else 0, len(dt), delta)
+        )
+        if self._conn.total_changes == before:
+            return 0
+        if tip is None or fetched_at > tip[0]:
+            self._tips[cell] = (fetched_at, dt, quantized, keyframe, depth)
+            self._tips.move_to_end(cell)
+            while len(self._tips) > DEFAULT_TIP_ENTRIES:
+                self._tips.popitem(last=False)
+        return 1
+
+    def _load_tip(self, cell):
+        """Decode the newest stored revision of a cell, or None."""
+        row = self._conn.execute(
+            "SELECT fetched_at, keyframe, depth FROM revisions WHERE cell = ? ORDER BY fetched_at DESC LIMIT 1",
+            (cell,)
+        ).fetchone()
+        if row is None:
+            return None
+        fetched_at, keyframe, depth = row
+        dt, quantized, _ = self._decode(cell, [fetched_at])[fetched_at]
+        return fetched_at, dt, quantized, keyframe, depth
+
+    def _decode(self, cell, targets):
+        """Decode revisions `targets` (fetched_at values) of one cell.
+
+        Reads every revision from the earliest keyframe involved to the
+        last target in one query and decodes each chain link once.
+
+        Returns:
+            dict: fetched_at -> (dt, quantized, decimals)
+        """
+        targets = sorted(set(targets))
+        placeholders = ",".join("?" * len(targets))
+        start = self._conn.execute(
+            f"SELECT min(keyframe) FROM revisions WHERE cell = ? AND fetched_at IN ({placeholders})",
+            [cell] + targets
+        ).fetchone()[0]
+        rows = self._conn.execute(
+            "SELECT fetched_at, base, delta FROM revisions WHERE cell = ? AND fetched_at BETWEEN ? AND ?"
+            " ORDER BY fetched_at",
+            (cell, start, targets[-1])
+        ).fetchall()
+        blobs = {fetched_at: (base, delta) for fetched_at, base, delta in rows}
+
+        decoded = {}
+
+        def decode(fetched_at):
+            if fetched_at not in decoded:
+                chain = [fetched_at]
+                while blobs[chain[-1]][0] is not None and blobs[chain[-1]][0] not in decoded:
+                    chain.append(blobs[chain[-1]][0])
+                for link in reversed(chain):
+                    base = blobs[link][0]
+                    decoded[link] = decode_revision(blobs[link][1], decoded[base][:2] if base is not None else _EMPTY)
+            return decoded[fetched_at]
+
+        return {fetched_at: decode(fetched_at) for fetched_at in targets}
+
+    def revision_times(self, lat, lon):
+        """Fetch times of every stored revision of a location, ascending."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fetched_at FROM revisions WHERE cell = ? ORDER BY fetched_at", (cell_id(lat, lon),)
+            ).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def revision(self, lat, lon, fetched_at=None):
+        """The forecast of a location as fetched at or before `fetched_at`.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            fetched_at: Unix time; default the newest revision
+
+        Returns:
+            dict: READING_COLUMNS -> 1-D arrays in dt order, or None if
+                nothing was fetched by then
+        """
+        cell = cell_id(lat, lon)
+        sql, params = "SELECT max(fetched_at) FROM revisions WHERE cell = ?", [cell]
+        if fetched_at is not None:
+            sql += " AND fetched_at <= ?"
+            params.append(int(fetched_at))
+        with self._lock:
+            found = self._conn.execute(sql, params).fetchone()[0]
+            if found is None:
+                return None
+            dt, quantized, decimals = self._decode(cell, [found])[found]
+        return _columns(dt, quantized, decimals, found)
+
+    def hour_history(self, lat, lon, dt):
+        """How the forecast for one hour evolved over successive fetches.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            dt: Unix time of the forecast hour
+
+        Returns:
+            dict: READING_COLUMNS -> 1-D arrays with one row per revision
+                that covered `dt`, ordered by fetched_at
+        """
+        cell = cell_id(lat, lon)
+        with self._lock:
+            covering = [row[0] for row in self._conn.execute(
+                "SELECT fetched_at FROM revisions WHERE cell = ? AND first_dt <= ? AND last_dt >= ?"
+                " ORDER BY fetched_at",
+                (cell, int(dt), int(dt))
+            )]
+            decoded = self._decode(cell, covering) if covering else {}
+        rows, fetched = [], []
+        for fetched_at in covering:
+            hours, quantized, decimals = decoded[fetched_at]
+            i = np.searchsorted(hours, dt)
+            if i < len(hours) and hours[i] == dt:
+                rows.append(quantized[i] / 10 ** decimals)
+                fetched.append(fetched_at)
+        values = np.array(rows, dtype=np.float64).reshape(-1, len(VALUE_COLUMNS))
+        result = {'dt': np.full(len(fetched), int(dt), dtype=np.int64),
+                  'fetched_at': np.array(fetched, dtype=np.int64)}
+        result.update((column, values[:, i]) for i, column in enumerate(VALUE_COLUMNS))
+        return result
+
+    def stats(self):
+        """Storage use against keeping every revision's full rows.
+
+        Returns:
+            dict: revisions, keyframes, hours (rows a full copy would hold),
+                stored_bytes (delta blobs) and full_bytes (float64
+                READING_COLUMNS per row, as TimeSeriesStore packs them)
+        """
+        with self._lock:
+            revisions, keyframes, hours, stored = self._conn.execute(
+                "SELECT COUNT(*), COUNT(*) - COUNT(base), COALESCE(SUM(hours), 0),"
+                " COALESCE(SUM(length(delta)), 0) FROM revisions"
+            ).fetchone()
+        return {
+            'revisions': revisions,
+            'keyframes': keyframes,
+            'hours': hours,
+            'stored_bytes': stored,
+            'full_bytes': hours * len(READING_COLUMNS) * 8,
+        }
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM revisions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,114 @@
+"""
+Daily and monthly rollups of hourly readings.
+
+A rollup row holds additive statistics of one location and local calendar
+day or month, so a month is the combination of its days and a year of
+charts reads 365 (or 12) small rows per location instead of 8,760 hourly
+ones:
+
+- hours and days covered
+- sum and max of the overall AQI and every pollutant concentration
+  (mean = sum / hours)
+- hours and days (by daily max AQI) above each AQI category bound
+- hours each pollutant was dominant
+
+Percentiles do not combine, so they are not kept; aggregate_readings
+computes them from hourly rows where those still exist. TimeSeriesStore
+maintains rollups of its latest readings on ingest.
+"""
+
+import numpy as np
+
+from .aggregation import DEFAULT_THRESHOLDS, aggregate_readings, bucket_starts
+from .aqi_calculators import POLLUTANT_FIELDS
+
+ROLLUP_VARIABLES = ['aqi'] + list(POLLUTANT_FIELDS)
+ROLLUP_THRESHOLDS = DEFAULT_THRESHOLDS['aqi']
+ROLLUP_COLUMNS = (
+    ['hours', 'days']
+    + [f'{variable}_{stat}' for variable in ROLLUP_VARIABLES for stat in ('sum', 'max')]
+    + [f'hours_over_{threshold:g}' for threshold in ROLLUP_THRESHOLDS]
+    + [f'days_over_{threshold:g}' for threshold in ROLLUP_THRESHOLDS]
+    + [f'dominant_{field}' for field in POLLUTANT_FIELDS]
+)
+# Combined with max across buckets; every other column is a sum
+_MAX_COLUMNS = np.array([column.endswith('_max') for column in ROLLUP_COLUMNS])
+
+
+def daily_rollups(readings, tz='UTC'):
+    """Rollup rows of hourly readings, one per cell and local day.
+
+    Args:
+        readings: dict with cell, dt and POLLUTANT_FIELDS arrays, one row
+            per cell and hour (e.g. TimeSeriesStore.time_range)
+        tz: Timezone of the calendar days
+
+    Returns:
+        tuple: (cells (M,), day numbers (M,) as days since 1970-01-01,
+            values (M, len(ROLLUP_COLUMNS))), ordered by cell then day
+    """
+    summary = aggregate_readings(readings, freq='day', tz=tz, percentiles=())
+    values = np.empty((len(summary), len(ROLLUP_COLUMNS)))
+    hours = summary['count'].to_numpy()
+    for i, column in enumerate(ROLLUP_COLUMNS):
+        if column == 'hours':
+            values[:, i] = hours
+        elif column == 'days':
+            values[:, i] = 1
+        elif column.endswith('_sum'):
+            values[:, i] = summary[column[:-4] + '_mean'].to_numpy() * hours
+        elif column.startswith('hours_over_'):
+            values[:, i] = summary['aqi_over_' + column[len('hours_over_'):]]
+        elif column.startswith('days_over_'):
+            values[:, i] = summary['aqi_max'].to_numpy() > float(column[len('days_over_'):])
+        else:
+            values[:, i] = summary[column]
+    days = summary['start'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    return summary['group'].to_numpy().astype(np.int64), days, values
+
+
+def combine_rollups(cells, buckets, values):
+    """Combine rollup rows that share a (cell, bucket), e.g. days into months.
+
+    Args:
+        cells: Cell of each row (M,)
+        buckets: Coarser bucket number of each row (M,)
+        values: Rollup rows (M, len(ROLLUP_COLUMNS))
+
+    Returns:
+        tuple: (cells, buckets, values) with one row per (cell, bucket),
+            ordered by cell then bucket
+    """
+    cells, buckets = np.asarray(cells, dtype=np.int64), np.asarray(buckets, dtype=np.int64)
+    order = np.lexsort((buckets, cells))
+    cells, buckets, values = cells[order], buckets[order], values[order]
+    starts = np.flatnonzero(np.append(True, (cells[1:] != cells[:-1]) | (buckets[1:] != buckets[:-1])))
+    if not len(starts):
+        return cells, buckets, values
+    combined = np.add.reduceat(values, starts)
+    combined[:, _MAX_COLUMNS] = np.maximum.reduceat(values[:, _MAX_COLUMNS], starts)
+    return cells[starts], buckets[starts], combined
+
+
+def day_to_month(days):
+    """Month numbers (months since 1970-01) of day numbers."""
+    return np.asarray(days, dtype=np.int64).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def rollup_columns(cells, buckets, values, freq='day'):
+    """Columnar form of rollup rows, with means per variable.
+
+    Returns:
+        dict: cell, start (local date of the bucket), ROLLUP_COLUMNS (counts
+            as int64) and <variable>_mean -> 1-D arrays
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1, len(ROLLUP_COLUMNS))
+    result = {'cell': np.asarray(cells, dtype=np.int64)}
+    result['start'] = bucket_starts(buckets, freq)
+    for i, column in enumerate(ROLLUP_COLUMNS):
+        is_count = not column.endswith(('_sum', '_max'))
+        result[column] = values[:, i].astype(np.int64) if is_count else values[:, i]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result.update((f'{variable}_mean', result[f'{variable}_sum'] / result['hours'])
+                      for variable in ROLLUP_VARIABLES)
+    return result
@@ -0,0 +1,177 @@
+"""
+Multi-process sharded watchlist polling.
+
+One WatchlistPoller process tops out on JSON parsing and AQI computation
+at tens of thousands of sites. run_sharded splits the watchlist across
+worker processes, each running its own poller on its own shard:
+
+- sites are assigned by consistent hashing of their location cell, so a
+  site always lands on the same shard and changing the number of
+  workers moves only about 1/N of the sites
+- every worker draws from one SharedRateLimiter, so together they stay
+  within the API quota
+- every worker opens the same TimeSeriesStore file (WAL mode serializes
+  their writes, which are batched to keep the lock free most of the time)
+
+The parent process only merges the workers' freshness reports.
+"""
+
+import bisect
+import hashlib
+import multiprocessing
+import queue
+import signal
+import time
+
+from .air_quality_api import read_pollution_data_from_api
+from .poller import WatchlistPoller, summarize
+from .store import TimeSeriesStore, cell_id
+
+# Ring points per shard; more points even out the shard sizes
+DEFAULT_REPLICAS = 128
+# Fetches per store transaction in each worker; one commit per fetch
+# would make the workers queue for the SQLite write lock
+DEFAULT_STORE_BATCH = 32
+
+
+def _hash(key):
+    """Stable 64-bit hash (Python's str hash differs between processes)."""
+    return int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to shards 0..shards-1.
+
+    Args:
+        shards: Number of shards
+        replicas: Points per shard on the ring
+    """
+
+    def __init__(self, shards, replicas=DEFAULT_REPLICAS):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.shards = shards
+        points = sorted((_hash(f"{shard}:{i}"), shard) for shard in range(shards) for i in range(replicas))
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard(self, key):
+        """Shard owning `key`: the first ring point at or after its hash."""
+        i = bisect.bisect_left(self._points, _hash(key))
+        return self._owners[i % len(self._points)]
+
+
+def shard_sites(sites, shards, replicas=DEFAULT_REPLICAS):
+    """Split (lat, lon, name) sites by consistent hashing of their cell.
+
+    Returns:
+        list: One list of sites per shard
+    """
+    ring = HashRing(shards, replicas)
+    result = [[] for _ in range(shards)]
+    for site in sites:
+        result[ring.shard(cell_id(site[0], site[1]))].append(site)
+    return result
+
+
+def _shard_worker(shard, sites, store_path, store_batch, fetch_factory, on_fetch_factory, limiter, policy,
+                  workers, stop, reports, report_every):
+    """Poll one shard until `stop` is set, sending metrics to `reports`."""
+    # Ctrl+C reaches the whole process group; the parent stops workers through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    store = TimeSeriesStore(store_path) if store_path else None
+    fetch = fetch_factory() if fetch_factory is not None else read_pollution_data_from_api
+    on_fetch = on_fetch_factory() if on_fetch_factory is not None else None
+    poller = WatchlistPoller(fetch=fetch, store=store, limiter=limiter, policy=policy, store_batch=store_batch,
+                             on_fetch=on_fetch)
+    for lat, lon, name in sites:
+        poller.add_site(lat, lon, name=name)
+
+    def send(p, final=False):
+        reports.put((shard, p.metrics(), p.calls, final))
+
+    try:
+        poller.run(stop=stop, workers=workers, report=send, report_every=report_every)
+    finally:
+        send(poller, final=True)
+        if store is not None:
+            store.close()
+
+
+def run_sharded(sites, processes, store_path=None, fetch_factory=None, limiter=None, policy=None,
+                workers=4, stop=None, report=None, report_every=60.0, context=None,
+                store_batch=DEFAULT_STORE_BATCH, on_fetch_factory=None):
+    """Poll a watchlist with one WatchlistPoller process per shard.
+
+    Runs until `stop` is set or Ctrl+C.
+
+    Args:
+        sites: (lat, lon, name) tuples; sites in the same cell are watched once
+        processes: Number of worker processes
+        store_path: TimeSeriesStore file every worker writes to (None
+            keeps no readings); ":memory:" would give each worker its own
+        fetch_factory: Picklable zero-argument callable run in each worker
+            to build its ``fetch(lat, lon)`` (default
+            read_pollution_data_from_api), e.g. to open one HTTP session
+            per process
+        limiter: SharedRateLimiter created from the same `context`
+        policy: RefreshPolicy
+        workers: Fetch threads per process
+        stop: Event from `context` that ends the run
+        report: Optional callback ``report(summary)`` with the merged
+            summarize() dict, run as worker reports arrive
+        report_every: Seconds between each worker's reports
+        context: multiprocessing context (default the platform default)
+        store_batch: Fetches per store transaction in each worker
+        on_fetch_factory: Picklable zero-argument callable run in each
+            worker to build its WatchlistPoller ``on_fetch`` callback
+
+    Returns:
+        dict: Final merged summary
+    """
+    context = context or multiprocessing.get_context()
+    stop = stop or context.Event()
+    reports = context.Queue()
+    shards = [shard for shard in shard_sites(sites, processes) if shard]
+    started = time.time()
+    procs = [
+        context.Process(
+            target=_shard_worker,
+            args=(i, shard, store_path, store_batch, fetch_factory, on_fetch_factory, limiter, policy, workers,
+                  stop, reports, report_every),
+            daemon=True
+        )
+        for i, shard in enumerate(shards)
+    ]
+    for proc in procs:
+        proc.start()
+
+    latest = {}
+    finished = set()
+
+    def merged():
+        metrics = [m for shard_metrics, _ in latest.values() for m in shard_metrics]
+        return summarize(metrics, sum(calls for _, calls in latest.values()), time.time() - started)
+
+    try:
+        while len(finished) < len(procs):
+            try:
+                shard, metrics, calls, final = reports.get(timeout=1.0)
+                latest[shard] = (metrics, calls)
+                if final:
+                    finished.add(shard)
+                elif report is not None and len(latest) == len(procs):
+                    report(merged())
+            except KeyboardInterrupt:
+                stop.set()  # Keep collecting the workers' final reports
+            except queue.Empty:
+                if not any(proc.is_alive() for proc in procs):
+                    break  # A worker died without its final report
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(timeout=10.0)
+            if proc.is_alive():
+                # Blocked on a report nobody reads any more; SQLite survives this
+                proc.terminate()
+    return merged()
@@ -0,0 +1,184 @@
+"""
+Forecast skill: error of past forecasts against what was later observed.
+
+Forecast rows (location cell, hour dt, fetch time, concentrations) are
+joined to observation rows on (cell, dt) with one sort and one
+searchsorted over integer keys, then bucketed by lead time, the whole
+hours between the fetch and dt. Per lead hour and variable:
+
+- bias (mean forecast - observed), MAE and RMSE of each pollutant's
+  concentration, each pollutant's AQI sub-index and the overall AQI
+- the share of forecasts that predicted the right EPA category
+
+Every statistic is built from per-bucket sums (np.bincount), so long
+periods are evaluated in chunks of hours and the sums added up.
+
+The API has no separate observation feed; evaluate_store takes the
+nowcast, the lead-0 reading of each hour (the first entry of a fetch
+made during that hour), as what was observed.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aqi_analysis import categorize_aqi
+from .aqi_calculators import POLLUTANT_FIELDS, calculate_all_aqi_batch
+
+SKILL_VARIABLES = POLLUTANT_FIELDS + [f'aqi_{field}' for field in POLLUTANT_FIELDS] + ['aqi']
+SKILL_COLUMNS = ['lead_hours', 'variable', 'count', 'bias', 'mae', 'rmse', 'category_hit_rate']
+DEFAULT_MAX_LEAD = 96  # Hours; the length of an OpenWeather forecast
+DEFAULT_CHUNK_HOURS = 24
+
+
+def lead_hours(dt, fetched_at):
+    """Whole hours from the fetch to each forecast hour (0: the hour it was fetched in)."""
+    return -((np.asarray(fetched_at, dtype=np.int64) - np.asarray(dt, dtype=np.int64)) // 3600)
+
+
+def join_observations(forecasts, observations):
+    """Match forecast rows to observation rows on (cell, dt).
+
+    Cells are replaced by dense codes so that (cell, dt) packs into one
+    int64 key; observation keys are sorted once and every forecast key
+    found by binary search.
+
+    Args:
+        forecasts: dict with 'cell' and 'dt' arrays
+        observations: dict with 'cell' and 'dt' arrays, one row per (cell, dt)
+
+    Returns:
+        tuple: (forecast row indices, matching observation row indices)
+    """
+    n = len(forecasts['dt'])
+    if not n or not len(observations['dt']):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    _, codes = np.unique(np.concatenate([forecasts['cell'], observations['cell']]), return_inverse=True)
+    dt = np.concatenate([forecasts['dt'], observations['dt']])
+    first = dt.min()
+    keys = codes.astype(np.int64) * (dt.max() - first + 1) + (dt - first)
+    order = np.argsort(keys[n:], kind='stable')
+    observed = keys[n:][order]
+    position = np.minimum(np.searchsorted(observed, keys[:n]), len(observed) - 1)
+    found = observed[position] == keys[:n]
+    return np.flatnonzero(found), order[position[found]]
+
+
+def _variables(readings, rows):
+    """(len(rows), len(SKILL_VARIABLES)) matrix of concentrations, sub-indices and overall AQI."""
+    concentrations = np.column_stack([readings[field][rows] for field in POLLUTANT_FIELDS])
+    sub_indices = calculate_all_aqi_batch(concentrations)
+    return np.column_stack([concentrations, sub_indices, sub_indices.max(axis=1)])
+
+
+def skill_sums(forecasts, observations, max_lead=DEFAULT_MAX_LEAD):
+    """Per-lead error sums of forecasts against observations.
+
+    Args:
+        forecasts: dict with cell, dt, fetched_at and POLLUTANT_FIELDS
+            arrays, e.g. TimeSeriesStore.time_range(..., latest=False)
+        observations: dict with cell, dt and POLLUTANT_FIELDS arrays, one
+            row per (cell, dt)
+        max_lead: Longest lead in hours; leads 1..max_lead are evaluated
+
+    Returns:
+        dict: count and hits (max_lead,), error, absolute and squared
+            (max_lead, len(SKILL_VARIABLES)) sums; add dicts of several
+            chunks key by key
+    """
+    lead = lead_hours(forecasts['dt'], forecasts['fetched_at'])
+    rows = np.flatnonzero((lead >= 1) & (lead <= max_lead))
+    rows_f, rows_o = join_observations({'cell': forecasts['cell'][rows], 'dt': forecasts['dt'][rows]},
+                                       observations)
+    rows_f = rows[rows_f]
+    predicted = _variables(forecasts, rows_f)
+    observed = _variables(observations, rows_o)
+    error = predicted - observed
+    bucket = lead[rows_f] - 1
+    hits = categorize_aqi(predicted[:, -1]) == categorize_aqi(observed[:, -1])
+    # One bincount per statistic over (lead, variable) cells
+    cells = (bucket[:, None] * len(SKILL_VARIABLES) + np.arange(len(SKILL_VARIABLES))).ravel()
+
+    def per_cell(values):
+        return np.bincount(cells, weights=values.ravel(),
+                           minlength=max_lead * len(SKILL_VARIABLES)).reshape(max_lead, -1)
+
+    return {
+        'count': np.bincount(bucket, minlength=max_lead).astype(np.int64),
+        'hits': np.bincount(bucket, weights=hits, minlength=max_lead).astype(np.int64),
+        'error': per_cell(error),
+        'absolute': per_cell(np.abs(error)),
+        'squared': per_cell(error ** 2),
+    }
+
+
+def add_sums(total, sums):
+    """Combine two skill_sums results (total may be None)."""
+    return sums if total is None else {key: total[key] + sums[key] for key in total}
+
+
+def skill_table(sums):
+    """Bias, MAE, RMSE and category hit rate per lead hour and variable.
+
+    Returns:
+        pandas.DataFrame: SKILL_COLUMNS, one row per lead hour with data
+            and variable; category_hit_rate is set on the 'aqi' rows
+    """
+    count = sums['count']
+    leads = np.flatnonzero(count)
+    n = count[leads, None].astype(np.float64)
+    bias = sums['error'][leads] / n
+    mae = sums['absolute'][leads] / n
+    rmse = np.sqrt(sums['squared'][leads] / n)
+    hit_rate = np.full((len(leads), len(SKILL_VARIABLES)), np.nan)
+    hit_rate[:, -1] = sums['hits'][leads] / count[leads]
+    return pd.DataFrame({
+        'lead_hours': np.repeat(leads + 1, len(SKILL_VARIABLES)),
+        'variable': np.tile(SKILL_VARIABLES, len(leads)),
+        'count': np.repeat(count[leads], len(SKILL_VARIABLES)),
+        'bias': bias.ravel(),
+        'mae': mae.ravel(),
+        'rmse': rmse.ravel(),
+        'category_hit_rate': hit_rate.ravel(),
+    }, columns=SKILL_COLUMNS)
+
+
+def evaluate_skill(forecasts, observations, max_lead=DEFAULT_MAX_LEAD):
+    """skill_table of forecasts against observations (see skill_sums for the inputs)."""
+    return skill_table(skill_sums(forecasts, observations, max_lead))
+
+
+def nowcasts(readings):
+    """The latest lead-0 reading of every (cell, dt), as observations.
+
+    Args:
+        readings: dict of arrays ordered by dt, cell, then fetched_at, e.g.
+            TimeSeriesStore.time_range(..., latest=False)
+
+    Returns:
+        dict: Same keys, one row per (cell, dt) fetched during that hour
+    """
+    rows = np.flatnonzero(lead_hours(readings['dt'], readings['fetched_at']) == 0)
+    if len(rows):
+        cell, dt = readings['cell'][rows], readings['dt'][rows]
+        rows = rows[np.append((cell[1:] != cell[:-1]) | (dt[1:] != dt[:-1]), True)]
+    return {column: values[rows] for column, values in readings.items()}
+
+
+def evaluate_store(store, start, end, max_lead=DEFAULT_MAX_LEAD, chunk_hours=DEFAULT_CHUNK_HOURS):
+    """Forecast skill of every location in a TimeSeriesStore over start <= dt <= end.
+
+    Hours are read and evaluated `chunk_hours` at a time, so memory
+    stays bounded over long periods.
+
+    Returns:
+        pandas.DataFrame: skill_table of every stored forecast for those
+            hours against the nowcasts of the same hours
+    """
+    total = None
+    for chunk_start in range(int(start), int(end) + 1, chunk_hours * 3600):
+        readings = store.time_range(chunk_start, min(chunk_start + chunk_hours * 3600 - 1, int(end)), latest=False)
+        total = add_sums(total, skill_sums(readings, nowcasts(readings), max_lead))
+    if total is None:  # end < start
+        total = {'count': np.zeros(max_lead, dtype=np.int64), 'hits': np.zeros(max_lead, dtype=np.int64)}
+        total.update((key, np.zeros((max_lead, len(SKILL_VARIABLES)))) for key in ('error', 'absolute', 'squared'))
+    return skill_table(total)
@@ -0,0 +1,483 @@
+"""
+Local time-series store for fetched forecasts and observations.
+
+Every forecast hour of every fetched response is kept in one SQLite table
+(WAL mode, so readers never block the writer and several processes can
+share the file), keyed by (location cell, dt, fetched_at). Re-ingesting
+the same response is a no-op, and a later fetch of the same hour is kept
+alongside the earlier one, so both the best current value and the
+history of revisions can be read back.
+
+A location cell is the coordinate rounded like ForecastCache keys,
+packed into one integer. Two orders are indexed:
+
+- (cell, dt, fetched_at), the primary key: one location over a time range
+- (dt, cell, fetched_at): all locations at time t, or over a time range
+
+A second table keeps only the newest fetch of every (cell, dt), with the
+same two orders, for queries about the current best value.
+
+Daily and monthly rollups of those latest values (see rollups.py) are
+kept in two more tables and updated in the same transaction as each
+ingest: only the (cell, day) buckets the new rows fall in are recomputed
+from hourly rows, then their months from the daily rollups. expire()
+deletes hourly rows older than a retention period and keeps the
+rollups, so long-range charts never need the hourly rows.
+
+Queries return columnar NumPy arrays rather than objects.
+"""
+
+import dataclasses
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+
+from .aggregation import local_buckets
+from .air_quality_api import FORECAST_COORDINATE_DECIMALS
+from .air_quality_models import PollutantComponents
+from .aqi_calculators import POLLUTANT_FIELDS
+from .rollups import ROLLUP_COLUMNS, combine_rollups, daily_rollups, day_to_month, rollup_columns
+
+COMPONENT_FIELDS = [f.name for f in dataclasses.fields(PollutantComponents)]
+VALUE_COLUMNS = ['owm_aqi'] + COMPONENT_FIELDS
+READING_COLUMNS = ['dt', 'fetched_at'] + VALUE_COLUMNS
+
+_SCALE = 10 ** FORECAST_COORDINATE_DECIMALS
+_LAT_OFFSET = 90 * _SCALE
+_LON_OFFSET = 180 * _SCALE
+_LON_SPAN = 360 * _SCALE + 1
+# Room for day numbers when packing (cell, day) into one int64
+_DAY_SPAN = 100000
+# Bound parameters per statement; SQLite before 3.32 allows 999
+_MAX_PARAMS = 900
+
+
+def cell_id(lat, lon):
+    """Integer key of the rounded coordinate cell containing (lat, lon)."""
+    return (int(round(lat * _SCALE)) + _LAT_OFFSET) * _LON_SPAN + int(round(lon * _SCALE)) + _LON_OFFSET
+
+
+def cell_coordinates(cells):
+    """Rounded (lat, lon) of cell ids; works on scalars and arrays.
+
+    Returns:
+        tuple: (lat, lon)
+    """
+    lat_q, lon_q = np.divmod(np.asarray(cells, dtype=np.int64), _LON_SPAN)
+    return (lat_q - _LAT_OFFSET) / _SCALE, (lon_q - _LON_OFFSET) / _SCALE
+
+
+def response_values(response):
+    """Timestamps and VALUE_COLUMNS matrix of an AirQualityResponse or raw forecast JSON.
+
+    Returns:
+        tuple: (int64 dt (N,), float64 values (N, len(VALUE_COLUMNS)))
+    """
+    if isinstance(response, dict):
+        items = response['list']
+        dt = np.fromiter((item['dt'] for item in items), dtype=np.int64, count=len(items))
+        values = np.fromiter(
+            (value for item in items
+             for value in (item['main']['aqi'], *(item['components'].get(f, 0.0) for f in COMPONENT_FIELDS))),
+            dtype=np.float64, count=len(items) * len(VALUE_COLUMNS)
+        )
+    else:
+        dt = np.fromiter((item.dt for item in response.list), dtype=np.int64, count=len(response.list))
+        components = attrgetter(*COMPONENT_FIELDS)
+        values = np.fromiter(
+            (value for item in response.list for value in (item.main.aqi, *components(item.components))),
+            dtype=np.float64, count=len(response.list) * len(VALUE_COLUMNS)
+        )
+    return dt, values.reshape(-1, len(VALUE_COLUMNS))
+
+
+def concentrations(readings):
+    """(N, 6) matrix in POLLUTANT_FIELDS order, ready for calculate_all_aqi_batch."""
+    return np.column_stack([readings[field] for field in POLLUTANT_FIELDS])
+
+
+def _columnar(rows, keys):
+    """Split (*keys, values blob) rows into one array per column."""
+    n = len(rows)
+    result = {key: np.fromiter((row[i] for row in rows), dtype=np.int64, count=n) for i, key in enumerate(keys)}
+    values = np.frombuffer(b''.join(row[-1] for row in rows), dtype=np.float64).reshape(n, len(VALUE_COLUMNS))
+    result.update((column, values[:, i]) for i, column in enumerate(VALUE_COLUMNS))
+    return result
+
+
+def _rollup_rows(rows):
+    """Split (cell, bucket, vals blob) rollup rows into cells, buckets and a values matrix."""
+    n = len(rows)
+    cells = np.fromiter((row[0] for row in rows), dtype=np.int64, count=n)
+    buckets = np.fromiter((row[1] for row in rows), dtype=np.int64, count=n)
+    values = np.frombuffer(b''.join(row[2] for row in rows), dtype=np.float64).reshape(n, len(ROLLUP_COLUMNS))
+    return cells, buckets, values
+
+
+class TimeSeriesStore:
+    """SQLite store of forecast readings per location cell, hour and fetch time.
+
+    Each row's VALUE_COLUMNS are packed into one float64 blob: reading
+    them back costs one Python object per row instead of one per value,
+    which is most of the time a range query takes.
+
+    Safe to share between threads; separate processes may open the same
+    file (WAL mode plus a busy timeout serialize their writes).
+
+    Args:
+        path: SQLite database file, or ":memory:" for a throwaway store
+        timeout: Seconds to wait for another process's write lock
+        rollup_tz: Timezone of the daily and monthly rollup buckets; fixed
+            when the file is created
+        read_only: Open an existing store for reading only: the file is
+            neither created nor altered, and rollup_tz is taken from it
+
+    Raises:
+        ValueError: If the file's rollups use a different rollup_tz
+        sqlite3.DatabaseError: If a read-only path is missing or is not a
+            store
+    """
+
+    def __init__(self, path=":memory:", timeout=30.0, rollup_tz='UTC', read_only=False):
+        self.path = path
+        self.rollup_tz = rollup_tz
+        self._lock = threading.Lock()
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro", uri=True,
+                                         check_same_thread=False, timeout=timeout)
+            try:
+                self.rollup_tz = self._meta('rollup_tz')
+            except sqlite3.DatabaseError:
+                self._conn.close()
+                raise
+            return
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL stays consistent after a crash and can only lose
+        # the last few commits, which the next fetch restores
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS readings ("
+            " cell INTEGER NOT NULL, dt INTEGER NOT NULL, fetched_at INTEGER NOT NULL,"
+            " vals BLOB NOT NULL,"
+            " PRIMARY KEY (cell, dt, fetched_at)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS readings_by_time ON readings (dt, cell, fetched_at)")
+        # Newest fetch of every hour, maintained on ingest, so "current best
+        # value" queries read one row per hour however often it was refetched
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS latest ("
+            " cell INTEGER NOT NULL, dt INTEGER NOT NULL, fetched_at INTEGER NOT NULL,"
+            " vals BLOB NOT NULL,"
+            " PRIMARY KEY (cell, dt)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS latest_by_time ON latest (dt, cell)")
+        # ROLLUP_COLUMNS blobs per cell and local day / month number
+        for table in ("daily", "monthly"):
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " cell INTEGER NOT NULL, bucket INTEGER NOT NULL, vals BLOB NOT NULL,"
+                " PRIMARY KEY (cell, bucket)) WITHOUT ROWID"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_by_time ON {table} (bucket, cell)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('rollup_tz', ?)", (str(rollup_tz),))
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('expired_before', 0)")
+        self._conn.commit()
+        stored_tz = self._meta('rollup_tz')
+        if stored_tz != str(rollup_tz):
+            self._conn.close()
+            raise ValueError(f"{path} keeps rollups in {stored_tz}, not {rollup_tz}")
+
+    def _meta(self, key):
+        return self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def ingest(self, lat, lon, response, fetched_at=None):
+        """Store every hour of a response; rows already present are skipped.
+
+        Args:
+            lat: Latitude the response was fetched for
+            lon: Longitude the response was fetched for
+            response: AirQualityResponse or raw forecast JSON
+            fetched_at: Unix time of the fetch (default now), whole seconds
+
+        Returns:
+            int: Number of new rows
+        """
+        return self.ingest_many([(lat, lon, response, fetched_at)])
+
+    def ingest_many(self, fetches):
+        """Store several responses in one transaction.
+
+        Each commit is a write-lock round trip (and, for several processes
+        sharing the file, a wait for the others), so pollers batch theirs.
+
+        Args:
+            fetches: (lat, lon, response, fetched_at) tuples, as for ingest
+
+        Returns:
+            int: Number of new rows
+        """
+        rows = []
+        for lat, lon, response, fetched_at in fetches:
+            fetched_at = int(time.time() if fetched_at is None else fetched_at)
+            cell = cell_id(lat, lon)
+            dt, values = response_values(response)
+            rows.extend((cell, int(t), fetched_at, row.tobytes()) for t, row in zip(dt, values))
+        with self._lock:
+            # Hours before the retention cutoff live on in rollups only
+            expired_before = self._meta('expired_before')
+            if expired_before:
+                rows = [row for row in rows if row[1] >= expired_before]
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO readings VALUES (?, ?, ?, ?)", rows)
+            added = self._conn.total_changes - before
+            if added:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT INTO latest VALUES (?, ?, ?, ?) ON CONFLICT (cell, dt) DO UPDATE"
+                    " SET fetched_at = excluded.fetched_at, vals = excluded.vals"
+                    " WHERE excluded.fetched_at > latest.fetched_at",
+                    rows
+                )
+                if self._conn.total_changes > before:
+                    self._update_rollups(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+                                         np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)))
+            self._conn.commit()
+            return added
+
+    def _update_rollups(self, cells, dt):
+        """Recompute the daily and monthly rollups of the (cell, local day)s of rows.
+
+        Reads each cell's latest hours around its affected days, rolls
+        them up in one batch and replaces just the affected days, then
+        recombines the months those days are in. Runs inside the caller's
+        transaction, with the lock held.
+        """
+        days = local_buckets(dt, 'day', self.rollup_tz)
+        affected = np.unique(cells * _DAY_SPAN + days)
+        cells, days = np.divmod(affected, _DAY_SPAN)
+        bounds = np.flatnonzero(np.append(True, cells[1:] != cells[:-1]))
+        rows = []
+        for first, last in zip(bounds, np.append(bounds[1:], len(cells)) - 1):
+            # UTC offsets are within 14 hours either way
+            rows.extend(self._conn.execute(
+                "SELECT cell, dt, fetched_at, vals FROM latest WHERE cell = ? AND dt BETWEEN ? AND ?",
+                (int(cells[first]), int(days[first]) * 86400 - 14 * 3600, int(days[last] + 1) * 86400 + 14 * 3600)
+            ).fetchall())
+        hourly = _columnar(rows, ['cell', 'dt', 'fetched_at'])
+        day_cells, day_numbers, values = daily_rollups(hourly, self.rollup_tz)
+        keep = np.isin(day_cells * _DAY_SPAN + day_numbers, affected)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO daily VALUES (?, ?, ?)",
+            zip(day_cells[keep].tolist(), day_numbers[keep].tolist(), (row.tobytes() for row in values[keep]))
+        )
+
+        months = np.unique(cells * _DAY_SPAN + day_to_month(days))
+        rows = []
+        for cell, month in zip(*np.divmod(months, _DAY_SPAN)):
+            first_day = np.datetime64(int(month), 'M').astype('datetime64[D]').astype(np.int64)
+            last_day = np.datetime64(int(month) + 1, 'M').astype('datetime64[D]').astype(np.int64) - 1
+            rows.extend(self._conn.execute(
+                "SELECT cell, bucket, vals FROM daily WHERE cell = ? AND bucket BETWEEN ? AND ?",
+                (int(cell), int(first_day), int(last_day))
+            ).fetchall())
+        month_cells, month_numbers, values = _rollup_rows(rows)
+        month_cells, month_numbers, values = combine_rollups(month_cells, day_to_month(month_numbers), values)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO monthly VALUES (?, ?, ?)",
+            zip(month_cells.tolist(), month_numbers.tolist(), (row.tobytes() for row in values))
+        )
+
+    def location_range(self, lat, lon, start, end, latest=True, fetched_before=None):
+        """Readings of one location with start <= dt <= end, in time order.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            start: First Unix time
+            end: Last Unix time
+            latest: One row per dt from the most recent fetch; False returns
+                every fetch, ordered by dt then fetched_at
+            fetched_before: Only use fetches made at or before this time,
+                i.e. what was known then
+
+        Returns:
+            dict: READING_COLUMNS -> 1-D arrays (dt and fetched_at int64)
+        """
+        params = [cell_id(lat, lon), int(start), int(end)]
+        table = "latest" if latest and fetched_before is None else "readings"
+        sql = f"SELECT dt, fetched_at, vals FROM {table} WHERE cell = ? AND dt BETWEEN ? AND ?"
+        if fetched_before is not None:
+            sql += " AND fetched_at <= ?"
+            params.append(int(fetched_before))
+        with self._lock:
+            # Primary-key order: by dt, then fetched_at
+            rows = self._conn.execute(sql, params).fetchall()
+        result = _columnar(rows, ['dt', 'fetched_at'])
+        if latest and table == "readings" and len(rows):
+            # The last fetch of each dt; cheaper here than GROUP BY in SQL
+            last = np.append(result['dt'][1:] != result['dt'][:-1], True)
+            result = {column: values[last] for column, values in result.items()}
+        return result
+
+    def snapshot(self, dt, fetched_before=None):
+        """Latest reading of every location for hour dt.
+
+        Returns:
+            dict: lat, lon, cell and READING_COLUMNS -> 1-D arrays ordered by cell
+        """
+        if fetched_before is None:
+            sql, params = "SELECT cell, dt, fetched_at, vals FROM latest WHERE dt = ? ORDER BY cell", [int(dt)]
+        else:
+            # SQLite takes the bare columns from the row that supplied max()
+            sql = ("SELECT cell, dt, max(fetched_at), vals FROM readings WHERE dt = ? AND fetched_at <= ? "
+                   "GROUP BY cell ORDER BY cell")
+            params = [int(dt), int(fetched_before)]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        result = _columnar(rows, ['cell', 'dt', 'fetched_at'])
+        result['lat'], result['lon'] = cell_coordinates(result['cell'])
+        return result
+
+    def time_range(self, start, end, latest=True, cells=None):
+        """Readings of every location with start <= dt <= end.
+
+        Args:
+            start: First Unix time
+            end: Last Unix time
+            latest: One row per location and dt from the most recent
+                fetch; False returns every fetch
+            cells: Optional cell ids to limit the result to
+
+        Returns:
+            dict: lat, lon, cell and READING_COLUMNS -> 1-D arrays ordered
+                by dt, cell, then fetched_at
+        """
+        # Both orders are served by the by-time indexes without sorting
+        table, order = ("latest", "dt, cell") if latest else ("readings", "dt, cell, fetched_at")
+        sql = f"SELECT cell, dt, fetched_at, vals FROM {table} WHERE dt BETWEEN ? AND ?"
+        if cells is None:
+            batches = [[]]
+        else:
+            cells = sorted(int(cell) for cell in cells)
+            batches = [cells[i:i + _MAX_PARAMS] for i in range(0, len(cells), _MAX_PARAMS)]
+        rows = []
+        with self._lock:
+            for batch in batches:
+                where = f" AND cell IN ({', '.join('?' * len(batch))})" if cells is not None else ""
+                rows.extend(self._conn.execute(f"{sql}{where} ORDER BY {order}",
+                                               [int(start), int(end)] + batch).fetchall())
+        if len(batches) > 1:
+            rows.sort(key=lambda row: (row[1], row[0], row[2]))
+        result = _columnar(rows, ['cell', 'dt', 'fetched_at'])
+        result['lat'], result['lon'] = cell_coordinates(result['cell'])
+        return result
+
+    def updated_cells(self, fetched_after, start, end):
+        """Cells whose latest value of some hour in start <= dt <= end was fetched after a time.
+
+        Lets a consumer re-read only the locations a poll has refreshed
+        since it last looked.
+
+        Returns:
+            numpy.ndarray: int64 cell ids, ascending
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT cell FROM latest WHERE dt BETWEEN ? AND ? AND fetched_at > ? ORDER BY cell",
+                (int(start), int(end), int(fetched_after))
+            ).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def rollups(self, start, end, freq='day', lat=None, lon=None):
+        """Daily or monthly rollups of every location, or of one.
+
+        Args:
+            start: Unix time in the first bucket
+            end: Unix time in the last bucket
+            freq: 'day' or 'month'
+            lat: Latitude, to read one location (with lon)
+            lon: Longitude
+
+        Returns:
+            dict: lat, lon, cell, start (local date of the bucket, in
+                rollup_tz), ROLLUP_COLUMNS and <variable>_mean -> 1-D
+                arrays ordered by cell then start
+        """
+        if freq not in ('day', 'month'):
+            raise ValueError(f"Rollups are by 'day' or 'month', not {freq!r}")
+        first, last = local_buckets([start, end], freq, self.rollup_tz).tolist()
+        table = "daily" if freq == 'day' else "monthly"
+        sql, params = f"SELECT cell, bucket, vals FROM {table} WHERE bucket BETWEEN ? AND ?", [first, last]
+        if lat is not None:
+            sql += " AND cell = ?"
+            params.append(cell_id(lat, lon))
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY cell, bucket", params).fetchall()
+        result = rollup_columns(*_rollup_rows(rows), freq=freq)
+        result['lat'], result['lon'] = cell_coordinates(result['cell'])
+        return result
+
+    def rebuild_rollups(self):
+        """Recompute every rollup from the hourly rows still stored.
+
+        For files written before rollups existed; days whose hourly rows
+        have expired keep their rollups.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT cell, dt FROM latest").fetchall()
+            if rows:
+                keys = np.array(rows, dtype=np.int64)
+                self._update_rollups(keys[:, 0], keys[:, 1])
+            self._conn.commit()
+
+    def expire(self, retain_days, now=None, vacuum=True):
+        """Delete hourly rows older than retain_days, keeping their rollups.
+
+        The cutoff is rounded down to a local midnight in rollup_tz so no
+        day is left half expired, and later ingests of expired hours are
+        dropped rather than reviving partial days.
+
+        Args:
+            retain_days: Days of hourly rows to keep
+            now: Unix time the retention period ends at (default now)
+            vacuum: Also rewrite the file to give the freed pages back
+
+        Returns:
+            int: Number of readings deleted
+        """
+        now = time.time() if now is None else now
+        day = local_buckets([int(now - retain_days * 86400)], 'day', self.rollup_tz)[0]
+        cutoff = int(pd.Timestamp(np.datetime64(int(day), 'D')).tz_localize(
+            self.rollup_tz, ambiguous=True, nonexistent='shift_forward').timestamp())
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("DELETE FROM readings WHERE dt < ?", (cutoff,))
+            deleted = self._conn.total_changes - before
+            self._conn.execute("DELETE FROM latest WHERE dt < ?", (cutoff,))
+            self._conn.execute("UPDATE meta SET value = max(value, ?) WHERE key = 'expired_before'", (cutoff,))
+            self._conn.commit()
+            if vacuum and deleted:
+                self._conn.execute("VACUUM")
+            return deleted
+
+    def locations(self):
+        """Rounded (lat, lon) arrays of every stored location."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT cell FROM latest ORDER BY cell").fetchall()
+        return cell_coordinates([row[0] for row in rows])
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,135 @@
+"""
+Request throttling for rate-limited upstream services.
+
+Nominatim's usage policy allows at most one request per second, and
+OpenWeather meters calls per day, so every network path that can fan out
+(batch jobs, pollers) goes through a shared RateLimiter, or a
+SharedRateLimiter when the callers are separate processes.
+"""
+
+import multiprocessing
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per `per` seconds.
+
+    Args:
+        rate: Number of calls allowed per period
+        per: Period length in seconds
+        burst: Maximum number of tokens that can accumulate (default 1,
+            i.e. calls are evenly spaced)
+        clock: Monotonic time source (injectable for tests)
+        sleep: Sleep function (injectable for tests)
+    """
+
+    def __init__(self, rate, per=1.0, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self.interval = per / rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last = clock()
+
+    def _refill(self, now):
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.burst, self._tokens + elapsed / self.interval)
+
+    def try_acquire(self):
+        """Take a token if one is available without blocking.
+
+        Returns:
+            bool: True if the call may proceed
+        """
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        """Block until a token is available, then take it.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) * self.interval
+            self._sleep(delay)
+            waited += delay
+
+
+class SharedRateLimiter:
+    """Token bucket shared by the processes of one machine.
+
+    Same interface and semantics as RateLimiter, but the bucket lives in
+    shared memory behind a process lock, so worker processes started
+    with it as a Process argument draw from one quota. The bucket is
+    kept as the time its next token is due (GCRA), a single double that
+    is updated in place.
+
+    Args:
+        rate: Number of calls allowed per period
+        per: Period length in seconds
+        burst: Maximum number of tokens that can accumulate
+        clock: Monotonic time source; time.monotonic reads one system-wide
+            clock, so every process sees the same time
+        sleep: Sleep function (injectable for tests)
+        context: multiprocessing context the workers are started from
+    """
+
+    def __init__(self, rate, per=1.0, burst=1, clock=time.monotonic, sleep=time.sleep, context=None):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        context = context or multiprocessing.get_context()
+        self.interval = per / rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = context.Lock()
+        self._due = context.RawValue('d', float('-inf'))
+
+    def _take(self):
+        """Take a token, or return the seconds until one is available."""
+        with self._lock:
+            now = self._clock()
+            due = max(self._due.value, now)
+            wait = due - now - (self.burst - 1) * self.interval
+            if wait > 0:
+                return wait
+            self._due.value = due + self.interval
+            return 0.0
+
+    def try_acquire(self):
+        """Take a token if one is available without blocking.
+
+        Returns:
+            bool: True if the call may proceed
+        """
+        return self._take() == 0.0
+
+    def acquire(self):
+        """Block until a token is available, then take it.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if delay == 0.0:
+                return waited
+            self._sleep(delay)
+            waited += delay
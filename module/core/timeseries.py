@@ -0,0 +1,55 @@
+"""
+Vectorized AQI time-series construction.
+
+Every chart and report starts from the same step: turn a forecast's Unix
+timestamps into datetimes and score each timestamp's worst pollutant.
+build_aqi_timeseries does both in bulk. Timestamps are converted in one
+pandas operation to a tz-aware DatetimeIndex and max AQI comes from the
+batch engine, so the result is a DatetimeIndex and a float64 array that
+Plotly and pandas consume directly.
+"""
+
+import numpy as np
+import pandas as pd
+from dateutil import tz as dateutil_tz
+
+from .aqi_calculators import calculate_all_aqi_batch, components_to_array
+
+
+def local_timezone():
+    """The server's local timezone, DST-aware (what datetime.fromtimestamp used)."""
+    return dateutil_tz.tzlocal()
+
+
+def timestamps_to_datetimes(timestamps, tz=None):
+    """Convert Unix seconds to a tz-aware DatetimeIndex in one operation.
+
+    Args:
+        timestamps: Array-like of Unix timestamps in seconds
+        tz: Target timezone (name or tzinfo); defaults to the local timezone
+
+    Returns:
+        pandas.DatetimeIndex: datetime64 values in tz
+    """
+    seconds = np.asarray(timestamps, dtype=np.int64)
+    return pd.to_datetime(seconds, unit='s', utc=True).tz_convert(tz or local_timezone())
+
+
+def build_aqi_timeseries(air_quality_list, tz=None):
+    """Dates and overall (max) AQI for every timestamp of a forecast.
+
+    Args:
+        air_quality_list: List of AirQualityData objects
+        tz: Timezone for the dates; defaults to the local timezone
+
+    Returns:
+        tuple: (dates, max_aqi_values) where dates is a tz-aware
+            pandas.DatetimeIndex and max_aqi_values a float64 numpy array
+    """
+    timestamps = np.fromiter((item.dt for item in air_quality_list), dtype=np.int64,
+                             count=len(air_quality_list))
+    sub_indices = calculate_all_aqi_batch(
+        components_to_array([item.components for item in air_quality_list])
+    )
+    max_aqi = sub_indices.max(axis=1) if len(sub_indices) else np.zeros(0, dtype=np.float64)
+    return timestamps_to_datetimes(timestamps, tz), max_aqi
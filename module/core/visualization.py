@@ -2,22 +2,67 @@
 Functions for visualizing air quality data using Plotly.
 """
 
-from datetime import datetime
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
-from .aqi_calculators import calculate_all_aqi_values
+from .downsampling import DEFAULT_PLOT_WIDTH_PX, downsample_indices, target_points
+from .timeseries import build_aqi_timeseries
 
-def plot_max_aqi_over_time(dates, max_aqi_values, location):
+# Above this many points in a figure traces are drawn with WebGL instead of
+# SVG. Measured with benchmarks/bench_webgl_threshold.py (headless Chromium 88,
+# software WebGL; median ms per pan frame, SVG / WebGL): 1000 points 17.8 / 21.4,
+# 1500 27.5 / 19.2, 2000 38.6 / 23.2, 20000 244 / 45. SVG pans cost ~12 ms
+# per 1000 points while WebGL's stay near 20 ms, so they cross at ~1200
+# points, which is also what one full-width downsampled chart plots. WebGL's
+# first draw costs a fixed ~550 ms more. Full table in docs/DEVELOPER_GUIDE.md.
+WEBGL_POINT_THRESHOLD = 1200
+RENDER_MODES = ('auto', 'svg', 'webgl')
+
+
+def scatter_trace_type(n_points, render_mode='auto', threshold=WEBGL_POINT_THRESHOLD):
+    """
+    Choose the Plotly scatter trace class for a figure
+    
+    Args:
+        n_points: Total number of points drawn in the figure
+        render_mode: 'svg' (go.Scatter), 'webgl' (go.Scattergl) or 'auto'
+        threshold: Point count above which 'auto' switches to WebGL
+    
+    Returns:
+        type: go.Scatter or go.Scattergl
+    """
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"render_mode must be one of {RENDER_MODES}, got {render_mode!r}")
+    if render_mode == 'webgl' or (render_mode == 'auto' and n_points > threshold):
+        return go.Scattergl
+    return go.Scatter
+
+
+def plot_max_aqi_over_time(dates, max_aqi_values, location, width_px=DEFAULT_PLOT_WIDTH_PX,
+                           render_mode='auto'):
     """
     Plot the maximum AQI (0-500 scale) over time using Plotly
     
+    Series longer than the plot is wide are downsampled first, keeping
+    peaks and EPA category crossings.
+    
     Args:
         dates: List of datetime objects
         max_aqi_values: List of maximum AQI values (0-500 scale)
         location: Name of the location being analyzed
+        width_px: Plot width bounding the number of points; None plots all
+        render_mode: 'auto', 'svg' or 'webgl' (see scatter_trace_type)
     """
+    keep = downsample_indices(dates, max_aqi_values, target_points(width_px))
+    if len(keep) < len(max_aqi_values):
+        dates = pd.DatetimeIndex(dates)[keep]
+        max_aqi_values = np.asarray(max_aqi_values, dtype=np.float64)[keep]
+
+    trace_type = scatter_trace_type(len(max_aqi_values), render_mode)
+
     fig = go.Figure()
     fig.add_trace(
-        go.Scatter(
+        trace_type(
             x=dates,
             y=max_aqi_values,
             mode='lines+markers',
@@ -37,7 +82,7 @@ def plot_max_aqi_over_time(dates, max_aqi_values, location):
         hovermode='x unified',
         showlegend=True,
         height=600,
-        width=1200
+        width=width_px or DEFAULT_PLOT_WIDTH_PX
     )
 
     # Add gridlines
@@ -50,27 +95,15 @@ def calculate_max_aqi_over_time(air_quality_list):
     """
     Calculate maximum AQI (0-500 scale) for each timestamp in the air quality data
     
+    Thin wrapper around timeseries.build_aqi_timeseries (bulk timestamp
+    conversion and batch AQI engine).
+    
     Args:
         air_quality_list: List of AirQualityData objects
     
     Returns:
-        tuple: (dates_list, max_aqi_list) where:
-            - dates_list: List of datetime objects
-            - max_aqi_list: List of maximum AQI values (0-500 scale)
+        tuple: (dates, max_aqi_values) where:
+            - dates: tz-aware pandas.DatetimeIndex (local timezone)
+            - max_aqi_values: float64 numpy array of maximum AQI (0-500 scale)
     """
-    dates = []
-    max_aqi_values = []
-    
-    for d in air_quality_list:
-        # Convert timestamp to datetime
-        dt_human = datetime.fromtimestamp(d.dt)
-        dates.append(dt_human)
-        
-        # Calculate AQI for each pollutant
-        aqi_values = calculate_all_aqi_values(d.components)
-        
-        # Get maximum AQI (worst pollutant)
-        max_aqi = max(aqi_values)
-        max_aqi_values.append(max_aqi)
-    
-    return dates, max_aqi_values
\ No newline at end of file
+    return build_aqi_timeseries(air_quality_list)
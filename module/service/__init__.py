@@ -0,0 +1,9 @@
+"""
+HTTP Service.
+
+A JSON API (``clearskies serve``) for systems that want AQI data without
+the Streamlit UI. Depends on core module for business logic.
+"""
+
+from .app import AQIService, TTLCache
+from .server import Request, Response, start_server
@@ -0,0 +1,431 @@
+"""
+ClearSkies JSON API.
+
+Routes:
+    GET  /aqi?lat=..&lon=..       Current AQI (``?location=name`` geocodes first)
+    GET  /forecast?lat=..&lon=..  Hourly AQI forecast, column-oriented
+    POST /aqi/batch               Current AQI for up to BATCH_MAX_LOCATIONS places
+    POST /aqi/score               Score raw concentration arrays (no upstream calls)
+    GET  /leaderboard?by=..&k=..  Worst sites by current or forecast-peak AQI
+    GET  /health                  Liveness and cache counters
+
+Geocoding and forecast fetches are blocking calls and run on a thread
+pool; concurrent requests for the same place share one upstream call.
+Serialized GET responses are kept in a TTL cache with their ETag, so a
+repeated request is answered without touching the event loop's executor.
+"""
+
+import asyncio
+import dataclasses
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import requests
+
+from .server import Response, error_response, json_response
+from ..core.air_quality_api import FORECAST_COORDINATE_DECIMALS, read_pollution_data_from_api
+from ..core.air_quality_models import PollutantComponents
+from ..core.aqi_analysis import AQI_CATEGORY_LABELS, categorize_aqi
+from ..core.aqi_calculators import (
+    POLLUTANT_FIELDS,
+    POLLUTANT_NAMES,
+    calculate_all_aqi_batch,
+    calculate_all_aqi_values
+)
+from ..core.batch_report import FORECAST_MAX_AGE_SECONDS, forecast_arrays
+from ..core.geocoding import get_coordinates_from_location, normalize_location_name
+from ..core.leaderboard import DEFAULT_K, RANKINGS, Leaderboard
+
+RESPONSE_TTL_SECONDS = 10 * 60
+GEOCODE_TTL_SECONDS = 24 * 60 * 60
+RESPONSE_MAX_ENTRIES = 10000
+BATCH_MAX_LOCATIONS = 100
+SCORE_MAX_ROWS = 100000
+LEADERBOARD_MAX_K = 100
+
+
+class ApiError(Exception):
+    """A request the API answers with an error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TTLCache:
+    """Thread-safe LRU whose entries also expire after `ttl` seconds.
+
+    Args:
+        ttl: Entry lifetime in seconds
+        max_entries: Least-recently-used entries are evicted beyond this
+        clock: Time source (injectable for tests)
+    """
+
+    def __init__(self, ttl, max_entries=RESPONSE_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return a live entry and mark it recently used, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def parse_target(params):
+    """Normalize a place given as lat/lon or a location name.
+
+    Args:
+        params: Dict with either ``lat`` and ``lon`` or ``location``
+
+    Returns:
+        tuple: ('coords', lat, lon) rounded like ForecastCache keys, or
+            ('location', normalized name)
+
+    Raises:
+        ApiError: 400 if neither form is present or values are invalid
+    """
+    if params.get('lat') is not None or params.get('lon') is not None:
+        try:
+            lat, lon = float(params['lat']), float(params['lon'])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(400, "lat and lon must both be numbers")
+        if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ApiError(400, "lat must be within [-90, 90] and lon within [-180, 180]")
+        return ('coords', round(lat, FORECAST_COORDINATE_DECIMALS), round(lon, FORECAST_COORDINATE_DECIMALS))
+    name = normalize_location_name(params.get('location') or '')
+    if not name:
+        raise ApiError(400, "Pass lat and lon, or location")
+    return ('location', name)
+
+
+def current_aqi_payload(forecast):
+    """Current-hour AQI from the first forecast entry, scored with calculate_all_aqi_values."""
+    item = forecast['list'][0]
+    components = item['components']
+    values = calculate_all_aqi_values(PollutantComponents(**components))
+    dominant = int(np.argmax(values))
+    return {
+        'time': item['dt'],
+        'aqi': values[dominant],
+        'category': str(AQI_CATEGORY_LABELS[categorize_aqi(values[dominant])]),
+        'dominant_pollutant': POLLUTANT_NAMES[dominant],
+        'pollutants': dict(zip(POLLUTANT_NAMES, values)),
+        'components': components,
+    }
+
+
+def score_payload(concentrations):
+    """Column-oriented AQI for an (N, 6) concentration matrix."""
+    sub_indices = calculate_all_aqi_batch(concentrations)
+    dominant = np.argmax(sub_indices, axis=1)
+    max_aqi = sub_indices[np.arange(len(sub_indices)), dominant]
+    return {
+        'aqi': max_aqi.tolist(),
+        'category': AQI_CATEGORY_LABELS[categorize_aqi(max_aqi)].tolist(),
+        'dominant_pollutant': np.asarray(POLLUTANT_NAMES)[dominant].tolist(),
+        'pollutants': {name: sub_indices[:, i].tolist() for i, name in enumerate(POLLUTANT_NAMES)},
+    }
+
+
+def forecast_payload(forecast):
+    """Hourly AQI forecast as parallel arrays."""
+    timestamps, concentrations = forecast_arrays(forecast)
+    return {'times': timestamps.tolist(), **score_payload(concentrations)}
+
+
+def parse_leaderboard_query(query):
+    """(ranking, k) of a /leaderboard request.
+
+    Raises:
+        ApiError: 400 on an unknown ranking or k outside 1..LEADERBOARD_MAX_K
+    """
+    by = query.get('by', RANKINGS[0])
+    if by not in RANKINGS:
+        raise ApiError(400, f"by must be one of {', '.join(RANKINGS)}")
+    try:
+        k = int(query.get('k', DEFAULT_K))
+    except ValueError:
+        raise ApiError(400, "k must be an integer")
+    if not 1 <= k <= LEADERBOARD_MAX_K:
+        raise ApiError(400, f"k must be within [1, {LEADERBOARD_MAX_K}]")
+    return by, k
+
+
+def leaderboard_payload(leaderboard, by, k):
+    """Top-k sites of a Leaderboard, each with the category of its ranking score."""
+    sites = []
+    for entry in leaderboard.top(k, by):
+        site = dataclasses.asdict(entry)
+        site['category'] = str(AQI_CATEGORY_LABELS[categorize_aqi(getattr(entry, by))])
+        sites.append(site)
+    return {'by': by, 'tracked': len(leaderboard), 'sites': sites}
+
+
+def parse_json_body(request):
+    if not request.body:
+        raise ApiError(400, "Expected a JSON request body")
+    try:
+        return json.loads(request.body)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ApiError(400, f"Invalid JSON: {e}")
+
+
+def parse_concentrations(body):
+    """(N, 6) concentrations from ``{"components": {field: [...]}}`` or ``{"concentrations": [[...]]}``.
+
+    Raises:
+        ApiError: 400 on missing fields, ragged arrays or non-finite values
+    """
+    try:
+        if 'components' in body:
+            columns = body['components']
+            missing = [f for f in POLLUTANT_FIELDS if f not in columns]
+            if missing:
+                raise ApiError(400, f"components is missing {', '.join(missing)}")
+            concentrations = np.column_stack([np.asarray(columns[f], dtype=np.float64).ravel()
+                                              for f in POLLUTANT_FIELDS])
+        elif 'concentrations' in body:
+            concentrations = np.asarray(body['concentrations'], dtype=np.float64)
+            if concentrations.ndim != 2 or concentrations.shape[1] != len(POLLUTANT_FIELDS):
+                raise ApiError(400, f"concentrations must be rows of {len(POLLUTANT_FIELDS)} values "
+                                    f"in {POLLUTANT_FIELDS} order")
+        else:
+            raise ApiError(400, "Expected components or concentrations")
+    except (TypeError, ValueError) as e:
+        raise ApiError(400, f"Invalid concentrations: {e}")
+    if len(concentrations) > SCORE_MAX_ROWS:
+        raise ApiError(413, f"At most {SCORE_MAX_ROWS} rows per request")
+    if not np.isfinite(concentrations).all() or (concentrations < 0).any():
+        raise ApiError(400, "Concentrations must be finite and non-negative")
+    return concentrations
+
+
+class AQIService:
+    """Request handler for the JSON API.
+
+    Args:
+        geocode: ``geocode(name)`` returning ((lat, lon), display_name),
+            or ((None, None), None) if not found
+        fetch: ``fetch(lat, lon)`` returning raw forecast JSON; may raise
+            requests exceptions or ValueError
+        executor: concurrent.futures executor for the blocking calls
+            (None for the event loop's default)
+        response_ttl: Seconds a serialized GET response is reused
+        forecast_ttl: Seconds a fetched forecast is reused
+        leaderboard: Leaderboard behind /leaderboard (default a new one);
+            every forecast the service fetches updates it
+        store: Optional TimeSeriesStore (e.g. written by ``clearskies
+            watch``) whose new fetches /leaderboard also ranks
+    """
+
+    def __init__(self, geocode=get_coordinates_from_location, fetch=read_pollution_data_from_api,
+                 executor=None, response_ttl=RESPONSE_TTL_SECONDS, forecast_ttl=FORECAST_MAX_AGE_SECONDS,
+                 max_entries=RESPONSE_MAX_ENTRIES, leaderboard=None, store=None):
+        self.geocode = geocode
+        self.fetch = fetch
+        self.executor = executor
+        self.cache_control = f'public, max-age={int(response_ttl)}'
+        self.responses = TTLCache(response_ttl, max_entries)
+        self.forecasts = TTLCache(forecast_ttl, max_entries)
+        self.geocodes = TTLCache(GEOCODE_TTL_SECONDS, max_entries)
+        self.leaderboard = leaderboard if leaderboard is not None else Leaderboard()
+        self.store = store
+        self._inflight = {}
+        self.routes = {
+            '/aqi': {'GET': self.aqi},
+            '/forecast': {'GET': self.forecast},
+            '/aqi/batch': {'POST': self.aqi_batch},
+            '/aqi/score': {'POST': self.score},
+            '/leaderboard': {'GET': self.worst_sites},
+            '/health': {'GET': self.health},
+        }
+
+    def __call__(self, request):
+        """Dispatch a request; returns a Response, or a coroutine on a cache miss."""
+        methods = self.routes.get(request.path.rstrip('/') or '/')
+        if methods is None:
+            return error_response(404, f"No route for {request.path}")
+        handler = methods.get('GET' if request.method == 'HEAD' else request.method)
+        if handler is None:
+            response = error_response(405, f"{request.method} not allowed on {request.path}")
+            response.headers['Allow'] = ', '.join(methods)
+            return response
+        try:
+            result = handler(request)
+        except ApiError as e:
+            return error_response(e.status, str(e))
+        if isinstance(result, Response):
+            return result
+        return self._guard(result)
+
+    async def _guard(self, pending):
+        try:
+            return await pending
+        except ApiError as e:
+            return error_response(e.status, str(e))
+
+    async def _once(self, key, make):
+        """Await make() once per key, however many requests ask concurrently."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(make())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._settle(key, done))
+        return await asyncio.shield(future)
+
+    def _settle(self, key, future):
+        self._inflight.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # Retrieved here in case every waiter went away
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _resolve(self, target):
+        """(lat, lon, display_name) for a parsed target."""
+        if target[0] == 'coords':
+            return target[1], target[2], None
+        name = target[1]
+        result = self.geocodes.get(name)
+        if result is None:
+            try:
+                result = await self._once(('geocode', name), lambda: self._call(self.geocode, name))
+            except (requests.exceptions.RequestException, KeyError, ValueError, IndexError) as e:
+                raise ApiError(502, f"Geocoding failed: {e}")
+            (lat, lon), display_name = result
+            if lat is None:
+                raise ApiError(404, f"Location not found: {name}")
+            self.geocodes.put(name, result)
+        (lat, lon), display_name = result
+        return (round(lat, FORECAST_COORDINATE_DECIMALS), round(lon, FORECAST_COORDINATE_DECIMALS),
+                display_name)
+
+    async def _forecast(self, lat, lon):
+        forecast = self.forecasts.get((lat, lon))
+        if forecast is None:
+            try:
+                forecast = await self._once(('forecast', lat, lon), lambda: self._call(self.fetch, lat, lon))
+            except (requests.exceptions.RequestException, ValueError) as e:
+                raise ApiError(502, f"Forecast fetch failed: {e}")
+            if not forecast.get('list'):
+                raise ApiError(502, f"Forecast fetch failed: {forecast.get('message', 'empty forecast')}")
+            self.forecasts.put((lat, lon), forecast)
+            self.leaderboard.update(lat, lon, forecast)
+        return forecast
+
+    def _cached(self, route, target, build):
+        """Cached Response for (route, target), or a coroutine that builds and caches it."""
+        key = (route,) + target
+        response = self.responses.get(key)
+        if response is not None:
+            return response
+
+        async def make():
+            lat, lon, display_name = await self._resolve(target)
+            payload = {'lat': lat, 'lon': lon}
+            if display_name is not None:
+                payload['display_name'] = display_name
+            payload.update(build(await self._forecast(lat, lon)))
+            response = json_response(payload, etag=True, cache_control=self.cache_control)
+            self.responses.put(key, response)
+            return response
+
+        return self._once(key, make)
+
+    def aqi(self, request):
+        return self._cached('/aqi', parse_target(request.query), current_aqi_payload)
+
+    def forecast(self, request):
+        return self._cached('/forecast', parse_target(request.query), forecast_payload)
+
+    async def aqi_batch(self, request):
+        """Current AQI per location, in request order.
+
+        Body: ``{"locations": [{"lat": .., "lon": ..} | {"location": ..} | "name", ...]}``.
+        Each result is the /aqi payload or ``{"error": .., "status": ..}``;
+        results come from, and warm, the same cache as /aqi.
+        """
+        body = parse_json_body(request)
+        locations = body.get('locations') if isinstance(body, dict) else None
+        if not isinstance(locations, list):
+            raise ApiError(400, "Expected {\"locations\": [...]}")
+        if len(locations) > BATCH_MAX_LOCATIONS:
+            raise ApiError(413, f"At most {BATCH_MAX_LOCATIONS} locations per request")
+
+        async def one(location):
+            try:
+                params = {'location': location} if isinstance(location, str) else location
+                if not isinstance(params, dict):
+                    raise ApiError(400, "Each location must be a name or an object")
+                result = self._cached('/aqi', parse_target(params), current_aqi_payload)
+                return result if isinstance(result, Response) else await result
+            except ApiError as e:
+                return error_response(e.status, str(e))
+
+        responses = await asyncio.gather(*(one(location) for location in locations))
+        # Splice the cached bodies rather than decoding and re-encoding them
+        body = b'{"results":[' + b','.join(response.body for response in responses) + b']}'
+        return Response(body=body)
+
+    def score(self, request):
+        """Score raw concentration arrays in µg/m³ (see parse_concentrations for the body)."""
+        body = parse_json_body(request)
+        if not isinstance(body, dict):
+            raise ApiError(400, "Expected a JSON object")
+        return json_response(score_payload(parse_concentrations(body)))
+
+    def worst_sites(self, request):
+        """Top-k sites by current (``by=current``) or forecast-peak (``by=peak``) AQI.
+
+        Not cached: the leaderboard changes with every fetch and top(k)
+        is O(k log n). With a store, its new fetches are ranked first.
+        """
+        by, k = parse_leaderboard_query(request.query)
+        if self.store is None:
+            return json_response(leaderboard_payload(self.leaderboard, by, k))
+
+        async def refreshed():
+            await self._call(self.leaderboard.refresh_from_store, self.store)
+            return json_response(leaderboard_payload(self.leaderboard, by, k))
+
+        return refreshed()
+
+    def health(self, request):
+        return json_response({
+            'status': 'ok',
+            'responses': {'entries': len(self.responses), 'hits': self.responses.hits,
+                          'misses': self.responses.misses},
+            'forecasts': len(self.forecasts),
+            'geocodes': len(self.geocodes),
+        })
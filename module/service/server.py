@@ -0,0 +1,313 @@
+"""
+Minimal asyncio HTTP/1.1 server for the JSON API.
+
+Implements only what the API needs: GET and POST with Content-Length
+bodies, keep-alive connections with pipelining (responses leave in
+request order), ETag revalidation and gzip. A handler may return a
+Response directly instead of a coroutine, so cached answers are written
+from data_received without scheduling a task.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+GZIP_MIN_BYTES = 512  # Smaller bodies barely shrink and cost a compress call
+GZIP_LEVEL = 6
+KEEP_ALIVE_SECONDS = 15
+
+
+@dataclass
+class Request:
+    """A parsed HTTP request; header names are lower-cased."""
+    method: str
+    path: str
+    query: dict
+    headers: dict
+    body: bytes = b''
+    keep_alive: bool = True
+
+
+@dataclass
+class Response:
+    """An HTTP response before content negotiation.
+
+    The gzip variant is computed on first use and kept, so a cached
+    Response is compressed once however often it is served.
+    """
+    status: int = 200
+    body: bytes = b''
+    content_type: str = 'application/json'
+    etag: str = None
+    cache_control: str = None
+    headers: dict = field(default_factory=dict)
+    gzip_body: bytes = None
+
+    def compressed(self):
+        if self.gzip_body is None:
+            self.gzip_body = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        return self.gzip_body
+
+
+def make_etag(body):
+    """Strong validator derived from the body bytes."""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def json_response(payload, status=200, etag=False, cache_control=None):
+    """Serialize payload compactly, optionally with an ETag."""
+    body = json.dumps(payload, separators=(',', ':'), allow_nan=False).encode()
+    return Response(status=status, body=body, etag=make_etag(body) if etag else None,
+                    cache_control=cache_control)
+
+
+def error_response(status, message):
+    return json_response({'error': message, 'status': status}, status=status)
+
+
+def accepts_gzip(header):
+    """Whether an Accept-Encoding value allows gzip (i.e. does not give it q=0)."""
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            params = params.strip().lower()
+            if not params.startswith('q='):
+                return True
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def etag_matches(header, etag):
+    """Weak comparison of If-None-Match against an ETag, as RFC 9110 requires for GET."""
+    if header.strip() == '*':
+        return True
+    def opaque(tag):
+        tag = tag.strip()
+        return tag[2:] if tag.startswith('W/') else tag
+    return any(opaque(candidate) == opaque(etag) for candidate in header.split(','))
+
+
+_date = (0, '')
+
+
+def http_date():
+    """Current Date header value, formatted at most once per second."""
+    global _date
+    now = int(time.time())
+    if _date[0] != now:
+        _date = (now, formatdate(now, usegmt=True))
+    return _date[1]
+
+
+def encode_response(request, response):
+    """Serialize a response for a request: 304 on a matching ETag, gzip when accepted.
+
+    Returns:
+        bytes: Status line, headers and body
+    """
+    status, body = response.status, response.body
+    lines = []
+    if response.etag is not None:
+        lines.append(f'ETag: {response.etag}')
+        if request.method in ('GET', 'HEAD') and etag_matches(request.headers.get('if-none-match', ''), response.etag):
+            status, body = 304, b''
+    if body and len(body) >= GZIP_MIN_BYTES:
+        lines.append('Vary: Accept-Encoding')
+        if accepts_gzip(request.headers.get('accept-encoding', '')):
+            body = response.compressed()
+            lines.append('Content-Encoding: gzip')
+    if response.cache_control is not None:
+        lines.append(f'Cache-Control: {response.cache_control}')
+    lines.extend(f'{name}: {value}' for name, value in response.headers.items())
+    if not request.keep_alive:
+        lines.append('Connection: close')
+    head = (
+        f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'
+        f'Date: {http_date()}\r\n'
+        f'Content-Type: {response.content_type}\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        + ''.join(line + '\r\n' for line in lines)
+        + '\r\n'
+    )
+    if request.method == 'HEAD':
+        body = b''
+    return head.encode('latin-1') + body
+
+
+class _ProtocolError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """One client connection.
+
+    Complete requests are parsed into a queue and answered strictly in
+    order; at most one handler coroutine runs per connection. Reading
+    pauses while the transport's write buffer is full.
+
+    Args:
+        handler: Callable ``handler(request)`` returning a Response or a
+            coroutine resolving to one
+        idle_timeout: Seconds an idle keep-alive connection stays open
+    """
+
+    def __init__(self, handler, idle_timeout=KEEP_ALIVE_SECONDS):
+        self.handler = handler
+        self.idle_timeout = idle_timeout
+        self.transport = None
+        self._buffer = bytearray()
+        self._queue = deque()
+        self._task = None
+        self._timer = None
+        self._last_activity = 0.0
+        self._closing = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._loop = asyncio.get_running_loop()
+        self._last_activity = self._loop.time()
+        self._timer = self._loop.call_later(self.idle_timeout, self._check_idle)
+
+    def connection_lost(self, exc):
+        self._closing = True
+        self._queue.clear()
+        if self._task is not None:
+            self._task.cancel()
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        if not self._closing:
+            self.transport.resume_reading()
+
+    def _check_idle(self):
+        # Rescheduled rather than reset on every request, which keeps the
+        # per-request cost of the timeout at one attribute store
+        idle = self._loop.time() - self._last_activity
+        if self._task is None and not self._queue and idle >= self.idle_timeout:
+            self.transport.close()
+        else:
+            self._timer = self._loop.call_later(max(self.idle_timeout - idle, 1.0), self._check_idle)
+
+    def data_received(self, data):
+        if self._closing:
+            return
+        self._last_activity = self._loop.time()
+        self._buffer += data
+        try:
+            while True:
+                request = self._parse()
+                if request is None:
+                    break
+                self._queue.append(request)
+                if not request.keep_alive:
+                    self._closing = True
+                    break
+        except _ProtocolError as e:
+            self._closing = True
+            request = Request('GET', '', {}, {}, keep_alive=False)
+            self._queue.append((request, error_response(e.status, str(e))))
+        self._drain()
+
+    def _parse(self):
+        end = self._buffer.find(b'\r\n\r\n')
+        if end < 0:
+            if len(self._buffer) > MAX_HEADER_BYTES:
+                raise _ProtocolError(431, "Request headers too large")
+            return None
+        lines = self._buffer[:end].decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise _ProtocolError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if not sep:
+                raise _ProtocolError(400, "Malformed header")
+            headers[name.strip().lower()] = value.strip()
+        if 'transfer-encoding' in headers:
+            raise _ProtocolError(501, "Chunked request bodies are not supported")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise _ProtocolError(400, "Invalid Content-Length")
+        if length < 0 or length > MAX_BODY_BYTES:
+            raise _ProtocolError(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+        if len(self._buffer) < end + 4 + length:
+            return None
+        body = bytes(self._buffer[end + 4:end + 4 + length])
+        del self._buffer[:end + 4 + length]
+
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.1':
+            keep_alive = connection != 'close'
+        else:
+            keep_alive = connection == 'keep-alive'
+        url = urlsplit(target)
+        return Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body, keep_alive)
+
+    def _drain(self):
+        while self._queue and self._task is None and not self.transport.is_closing():
+            item = self._queue.popleft()
+            if isinstance(item, tuple):
+                self._send(*item)
+                continue
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                result = error_response(500, f"Internal error: {e}")
+            if isinstance(result, Response):
+                self._send(item, result)
+            else:
+                self._task = self._loop.create_task(self._finish(item, result))
+
+    async def _finish(self, request, pending):
+        try:
+            response = await pending
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            response = error_response(500, f"Internal error: {e}")
+        self._task = None
+        self._send(request, response)
+        self._drain()
+
+    def _send(self, request, response):
+        if self.transport.is_closing():
+            return
+        self.transport.write(encode_response(request, response))
+        if not request.keep_alive:
+            self._queue.clear()
+            self.transport.close()
+
+
+async def start_server(handler, host='127.0.0.1', port=8080, idle_timeout=KEEP_ALIVE_SECONDS):
+    """Listen for connections and serve them with handler.
+
+    Returns:
+        asyncio.Server: Call ``serve_forever()`` or ``close()`` on it; the
+            bound port is ``server.sockets[0].getsockname()[1]``
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(
+        lambda: HTTPProtocol(handler, idle_timeout),
+        host, port, reuse_address=True, backlog=1024
+    )
@@ -7,6 +7,7 @@ individual pollutant measurements.
 
 import streamlit as st
 from ..core.aqi_calculators import calculate_all_aqi_values
+from ..core.aqi_analysis import AQI_CATEGORY_COLORS, AQI_CATEGORY_LABELS, categorize_aqi
 
 
 def get_aqi_category(value):
@@ -32,13 +33,14 @@ def get_aqi_category(value):
         return "Hazardous", "#7e0023"
 
 
-def display_aqi_category(value):
+def display_aqi_category(value, category=None):
     """Show AQI category badge with color-coded background.
     
     Args:
         value: AQI value to categorize
+        category: Optional precomputed (category_name, hex_color)
     """
-    category, color = get_aqi_category(value)
+    category, color = category if category is not None else get_aqi_category(value)
     
     # Use dark text for light backgrounds
     text_color = "black" if color in ["#00e400", "#ffff00"] else "white"
@@ -50,42 +52,92 @@ def display_aqi_category(value):
     )
 
 
-def display_pollutant_details(components, calculate_all_aqi_values):
+POLLUTANT_DESCRIPTIONS = [
+    "Fine particulate matter (≤2.5 µm)",
+    "Coarse particulate matter (≤10 µm)",
+    "Nitrogen dioxide",
+    "Sulfur dioxide",
+    "Carbon monoxide",
+    "Ozone"
+]
+
+
+def pollutant_card_html(name, desc, value, raw_value, category, color):
+    """HTML for a single pollutant card.
+    
+    Returns:
+        str: Bordered card with name, description, AQI, raw value and category
+    """
+    return (
+        f'<div style="padding: 10px; border-radius: 5px; '
+        f'border: 2px solid {color};">'
+        f'<h4 style="margin: 0;">{name}</h4>'
+        f'<p style="margin: 5px 0; font-size: 0.8em;">{desc}</p>'
+        f'<p style="margin: 5px 0;">AQI: {value:.1f}</p>'
+        f'<p style="margin: 5px 0; font-size: 0.9em;">Raw: {raw_value:.2f}</p>'
+        f'<p style="margin: 5px 0; color: {color};">{category}</p>'
+        f'</div>'
+    )
+
+
+def render_pollutant_grid_html(cards, columns=3):
+    """Lay out many card HTML snippets in one CSS grid block.
+    
+    Args:
+        cards: Iterable of card HTML strings
+        columns: Number of grid columns
+    
+    Returns:
+        str: A single HTML block, sent to the browser as one element
+    """
+    return (
+        f'<div style="display: grid; grid-template-columns: repeat({columns}, minmax(0, 1fr)); '
+        f'gap: 1rem;">{"".join(cards)}</div>'
+    )
+
+
+def display_pollutant_details(components, calculate_all_aqi_values, analysis=None, batched=False):
     """Show individual pollutant cards with AQI values and categories.
     
     Args:
         components: PollutantComponents object with raw concentrations
         calculate_all_aqi_values: Function to compute AQI from concentrations
+        analysis: Optional AQIAnalysis; when given, its first row is shown
+            and nothing is recomputed
+        batched: Render all cards as one HTML grid (one Streamlit element)
+            instead of one markdown element per card inside st.columns
     """
     st.subheader("📊 Pollutant Details")
     
-    aqi_values = calculate_all_aqi_values(components)
     pollutant_names = ['PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3']
-    descriptions = [
-        "Fine particulate matter (≤2.5 µm)",
-        "Coarse particulate matter (≤10 µm)",
-        "Nitrogen dioxide",
-        "Sulfur dioxide",
-        "Carbon monoxide",
-        "Ozone"
+    if analysis is not None:
+        aqi_values = analysis.sub_indices[0]
+        raw_values = analysis.concentrations[0]
+        categories = categorize_aqi(aqi_values)
+        cards = [
+            (AQI_CATEGORY_LABELS[c], AQI_CATEGORY_COLORS[c], raw)
+            for c, raw in zip(categories, raw_values)
+        ]
+    else:
+        aqi_values = calculate_all_aqi_values(components)
+        cards = [
+            # Get raw concentration (handle PM2.5 -> pm2_5 naming)
+            get_aqi_category(value) + (getattr(components, name.lower().replace('.', '_')),)
+            for name, value in zip(pollutant_names, aqi_values)
+        ]
+    
+    card_html = [
+        pollutant_card_html(name, desc, value, raw_value, category, color)
+        for name, desc, value, (category, color, raw_value)
+        in zip(pollutant_names, POLLUTANT_DESCRIPTIONS, aqi_values, cards)
     ]
     
+    if batched:
+        st.markdown(render_pollutant_grid_html(card_html), unsafe_allow_html=True)
+        return
+    
     # 3-column grid layout
     cols = st.columns(3)
-    for idx, (name, value, desc) in enumerate(zip(pollutant_names, aqi_values, descriptions)):
+    for idx, html in enumerate(card_html):
         with cols[idx % 3]:
-            # Get raw concentration (handle PM2.5 -> pm2_5 naming)
-            raw_value = getattr(components, name.lower().replace('.', '_'))
-            category, color = get_aqi_category(value)
-            
-            st.markdown(
-                f'<div style="padding: 10px; border-radius: 5px; '
-                f'border: 2px solid {color};">'
-                f'<h4 style="margin: 0;">{name}</h4>'
-                f'<p style="margin: 5px 0; font-size: 0.8em;">{desc}</p>'
-                f'<p style="margin: 5px 0;">AQI: {value:.1f}</p>'
-                f'<p style="margin: 5px 0; font-size: 0.9em;">Raw: {raw_value:.2f}</p>'
-                f'<p style="margin: 5px 0; color: {color};">{category}</p>'
-                f'</div>',
-                unsafe_allow_html=True
-            )
\ No newline at end of file
+            st.markdown(html, unsafe_allow_html=True)
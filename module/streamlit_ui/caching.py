@@ -0,0 +1,317 @@
+"""
+Streamlit caching for network calls and AQI analysis.
+
+Every widget interaction reruns main.main top to bottom; these wrappers
+keep geocoding, forecast fetches and the forecast AQIAnalysis in
+st.cache_data so reruns for the same location skip the network and the
+AQI analysis. One HTTP session, one rate limiter per API and one FigureCache of
+serialized charts are shared across sessions via st.cache_resource, as is an
+IncrementalAnalyzer: when the hourly refresh changes a location's
+forecast, only its new or revised hours are re-scored. The worst-air
+Leaderboard of a watch store is kept the same way and refreshed on every
+rerun, which re-scores only the sites fetched since.
+
+Failures are raised inside the cached functions and handled outside them,
+so a transient network error is never cached.
+"""
+
+import logging
+import math
+import threading
+
+import requests
+import streamlit as st
+
+from ..core.air_quality_api import OPENWEATHER_RATE_PER_SECOND, read_pollution_data_from_api, convert_json_to_object
+from ..core.air_quality_models import AirQualityResponse
+from ..core.geocoding import NOMINATIM_RATE_PER_SECOND, search_nominatim, normalize_location_name
+from ..core.throttle import RateLimiter
+from ..core.aqi_analysis import IncrementalAnalyzer
+from ..core.aqi_calculators import calculate_all_aqi_values
+from ..core.region_sampling import sample_region
+from ..core.figure_cache import FigureCache
+from ..core.leaderboard import Leaderboard
+from ..core.store import TimeSeriesStore
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_TTL_SECONDS = 24 * 60 * 60  # Place coordinates rarely change
+FORECAST_TTL_SECONDS = 10 * 60      # OpenWeather refreshes forecasts hourly
+ANALYSIS_TTL_SECONDS = 10 * 60
+GEOCODE_MAX_ENTRIES = 1000
+FORECAST_MAX_ENTRIES = 256
+ANALYSIS_MAX_ENTRIES = 256
+REGION_TTL_SECONDS = FORECAST_TTL_SECONDS
+REGION_MAX_ENTRIES = 32
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Round coordinates so nearby clicks share a forecast (~11 m at 4 decimals)
+COORDINATE_DECIMALS = 4
+
+
+class _CacheStats:
+    """Call/miss counters per cached function, shown in the admin panel."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.misses = {}
+
+    def record_call(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def record_miss(self, name):
+        with self._lock:
+            self.misses[name] = self.misses.get(name, 0) + 1
+
+    def reset(self, name=None):
+        with self._lock:
+            for counter in (self.calls, self.misses):
+                if name is None:
+                    counter.clear()
+                else:
+                    counter.pop(name, None)
+
+
+cache_stats = _CacheStats()
+
+
+def response_fingerprint(air_pollution_data):
+    """Hash key for an AirQualityResponse.
+    
+    Built from coordinates, timestamps and component values, which is much
+    cheaper than Streamlit's default pickling of nested dataclasses.
+    """
+    return (
+        air_pollution_data.coord.lat,
+        air_pollution_data.coord.lon,
+        tuple(
+            (item.dt,) + tuple(vars(item.components).values())
+            for item in air_pollution_data.list
+        )
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Shared requests.Session so repeated calls reuse TCP/TLS connections."""
+    return requests.Session()
+
+
+@st.cache_resource(show_spinner=False)
+def get_nominatim_limiter():
+    """Process-wide limiter keeping concurrent geocoding within Nominatim's policy."""
+    return RateLimiter(NOMINATIM_RATE_PER_SECOND)
+
+
+@st.cache_resource(show_spinner=False)
+def get_openweather_limiter():
+    """Process-wide limiter keeping forecast fetches, including region samples, within OpenWeather's quota."""
+    return RateLimiter(OPENWEATHER_RATE_PER_SECOND)
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """Process-wide FigureCache, so every session reuses rendered charts."""
+    return FigureCache(max_bytes=FIGURE_CACHE_MAX_BYTES)
+
+
+@st.cache_resource(show_spinner=False)
+def get_incremental_analyzer():
+    """Process-wide IncrementalAnalyzer holding the latest analysis per location."""
+    return IncrementalAnalyzer(max_entries=ANALYSIS_MAX_ENTRIES)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def get_leaderboard(store_path):
+    """Process-wide Leaderboard of the configured store, opened read-only."""
+    return Leaderboard(), TimeSeriesStore(store_path, read_only=True)
+
+
+@st.cache_data(ttl=GEOCODE_TTL_SECONDS, max_entries=GEOCODE_MAX_ENTRIES, show_spinner=False)
+def _cached_search(location_key):
+    cache_stats.record_miss('geocode')
+    get_nominatim_limiter().acquire()  # Only real lookups are throttled
+    return search_nominatim(location_key, session=get_http_session())
+
+
+@st.cache_data(ttl=FORECAST_TTL_SECONDS, max_entries=FORECAST_MAX_ENTRIES, show_spinner=False)
+def _cached_forecast(lat, lon):
+    cache_stats.record_miss('forecast')
+    get_openweather_limiter().acquire()  # Only real fetches are throttled
+    json_data = read_pollution_data_from_api(lat, lon, session=get_http_session())
+    return convert_json_to_object(json_data)
+
+
+@st.cache_data(
+    ttl=ANALYSIS_TTL_SECONDS,
+    max_entries=ANALYSIS_MAX_ENTRIES,
+    show_spinner=False,
+    hash_funcs={AirQualityResponse: response_fingerprint}
+)
+def _cached_analysis(air_pollution_data):
+    cache_stats.record_miss('analysis')
+    coord = air_pollution_data.coord
+    key = (round(coord.lat, COORDINATE_DECIMALS), round(coord.lon, COORDINATE_DECIMALS))
+    return get_incremental_analyzer().analyze(key, air_pollution_data.list)[0]
+
+
+@st.cache_data(ttl=REGION_TTL_SECONDS, max_entries=REGION_MAX_ENTRIES, show_spinner=False)
+def _cached_region(bbox, coarse, max_depth, threshold, max_calls):
+    cache_stats.record_miss('region')
+    return sample_region(bbox, cached_point_aqi, coarse=coarse, max_depth=max_depth,
+                         threshold=threshold, max_calls=max_calls)
+
+
+def cached_coordinates(location_name):
+    """Cached drop-in for get_coordinates_from_location.
+    
+    Args:
+        location_name: City, address, or place name
+    
+    Returns:
+        tuple: ((lat, lon), display_name) or ((None, None), None) if not found
+    """
+    cache_stats.record_call('geocode')
+    try:
+        return _cached_search(normalize_location_name(location_name))
+    except requests.exceptions.RequestException as e:
+        logger.warning("Error fetching coordinates of %r: %s", location_name, e)
+    except (KeyError, ValueError, IndexError) as e:
+        logger.warning("Error parsing coordinates of %r: %s", location_name, e)
+    return (None, None), None
+
+
+def cached_air_quality(lat, lon):
+    """Cached forecast fetch and parse for a point.
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+    
+    Returns:
+        AirQualityResponse object or None if fetch fails
+    """
+    cache_stats.record_call('forecast')
+    try:
+        return _cached_forecast(round(lat, COORDINATE_DECIMALS), round(lon, COORDINATE_DECIMALS))
+    except requests.exceptions.RequestException as e:
+        logger.warning("Error fetching air quality at (%.4f, %.4f): %s", lat, lon, e)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning("Error parsing air quality at (%.4f, %.4f): %s", lat, lon, e)
+    return None
+
+
+def cached_aqi_analysis(air_pollution_data):
+    """Cached AQIAnalysis for an AirQualityResponse.
+    
+    Args:
+        air_pollution_data: AirQualityResponse object
+    
+    Returns:
+        AQIAnalysis: Per-timestamp AQI results shared by all panels
+    """
+    cache_stats.record_call('analysis')
+    return _cached_analysis(air_pollution_data)
+
+
+def cached_point_aqi(lat, lon):
+    """Current overall AQI at a point, via the forecast cache.
+    
+    Region samples that share points (or overlap a searched location) reuse
+    already-fetched forecasts.
+    
+    Returns:
+        float: AQI of the first forecast entry, or NaN if the fetch fails
+    """
+    data = cached_air_quality(lat, lon)
+    if not data or not data.list:
+        return math.nan
+    return float(max(calculate_all_aqi_values(data.list[0].components)))
+
+
+def cached_region_sample(bbox, coarse, max_depth, threshold, max_calls=None):
+    """Cached quadtree AQI sample of a bounding box (see core.region_sampling).
+    
+    Args:
+        bbox: (south, west, north, east) in degrees
+        coarse: Cells per side of the initial grid
+        max_depth: Maximum refinement depth
+        threshold: Corner AQI spread that triggers refinement
+        max_calls: Optional API call budget
+    
+    Returns:
+        RegionSample
+    """
+    cache_stats.record_call('region')
+    bbox = tuple(round(v, COORDINATE_DECIMALS) for v in bbox)
+    return _cached_region(bbox, coarse, max_depth, threshold, max_calls)
+
+
+CACHES = {
+    'geocode': (_cached_search, GEOCODE_TTL_SECONDS, GEOCODE_MAX_ENTRIES),
+    'forecast': (_cached_forecast, FORECAST_TTL_SECONDS, FORECAST_MAX_ENTRIES),
+    'analysis': (_cached_analysis, ANALYSIS_TTL_SECONDS, ANALYSIS_MAX_ENTRIES),
+    'region': (_cached_region, REGION_TTL_SECONDS, REGION_MAX_ENTRIES),
+}
+
+
+def cached_leaderboard(store_path):
+    """Leaderboard of a watch store, brought up to date with its newest fetches."""
+    board, store = get_leaderboard(store_path)
+    board.refresh_from_store(store)
+    return board
+
+
+def clear_caches(name=None):
+    """Clear one named cache, or all caches, figures and the shared session.
+    
+    Args:
+        name: Key from CACHES, or None for everything
+    """
+    names = [name] if name is not None else list(CACHES)
+    for cache_name in names:
+        CACHES[cache_name][0].clear()
+        cache_stats.reset(cache_name)
+    if name in (None, 'analysis'):
+        get_incremental_analyzer().clear()
+    if name is None:
+        get_figure_cache().clear()
+        get_http_session.clear()
+
+
+def cache_summary():
+    """Per-cache settings and hit statistics since the last clear.
+    
+    Returns:
+        list: One dict per cache with name, ttl, max_entries, calls, misses
+            and hit_rate keys
+    """
+    rows = []
+    for name, (_, ttl, max_entries) in CACHES.items():
+        calls = cache_stats.calls.get(name, 0)
+        misses = cache_stats.misses.get(name, 0)
+        rows.append({
+            'name': name,
+            'ttl': ttl,
+            'max_entries': max_entries,
+            'calls': calls,
+            'misses': misses,
+            'hit_rate': (calls - misses) / calls if calls else 0.0
+        })
+    return rows
+
+
+def display_cache_admin():
+    """Sidebar panel to inspect and clear the caches."""
+    with st.sidebar.expander("⚙️ Cache admin"):
+        st.dataframe(cache_summary(), hide_index=True, use_container_width=True)
+        figures = get_figure_cache()
+        st.caption(
+            f"Figures: {len(figures)} cached, {figures.nbytes / 2**20:.1f} of "
+            f"{figures.max_bytes / 2**20:.0f} MB, {figures.hits} hits / {figures.misses} misses"
+        )
+        if st.button("Clear all caches"):
+            clear_caches()
+            st.success("Caches cleared")
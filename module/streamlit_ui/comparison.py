@@ -0,0 +1,235 @@
+"""
+Multi-location comparison view.
+
+Geocodes and fetches every requested city concurrently (each city's
+forecast fetch starts as soon as its own coordinates are known), scores all
+forecasts in one batch with analyze_air_quality_many, and renders a summary
+table plus either an overlaid chart or one small chart per city.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from ..core.air_quality_models import AirQualityResponse
+from ..core.aqi_analysis import AQI_CATEGORY_COLORS, AQI_CATEGORY_LABELS, analyze_air_quality_many
+from ..core.aqi_calculators import POLLUTANT_NAMES
+from ..core.background import run_in_background
+from ..core.batch_geocoding import deduplicate_locations
+from ..core.downsampling import DEFAULT_PLOT_WIDTH_PX, downsample_indices, target_points
+from ..core.visualization import scatter_trace_type
+from .plots import aqi_zone_shapes
+
+MAX_COMPARISON_LOCATIONS = 20
+COMPARISON_LAYOUTS = ('Overlay', 'Small multiples')
+SMALL_MULTIPLE_COLUMNS = 3
+NO_DATA_LABEL = 'No data'
+
+
+@dataclass
+class LocationResult:
+    """Outcome of geocoding and fetching one requested location."""
+    query: str
+    display_name: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    data: Optional[AirQualityResponse] = None
+    error: Optional[str] = None
+
+
+def parse_location_list(text, limit=MAX_COMPARISON_LOCATIONS):
+    """Split user input into unique location names.
+
+    Args:
+        text: Names separated by newlines or semicolons
+        limit: Maximum number of names kept
+
+    Returns:
+        list: Unique non-empty names in input order, at most limit
+    """
+    names = [part.strip() for line in text.splitlines() for part in line.split(';')]
+    return deduplicate_locations([name for name in names if name])[:limit]
+
+
+def _geocode_and_fetch(query, geocode, fetch):
+    (lat, lon), display_name = geocode(query)
+    if not (lat and lon):
+        return LocationResult(query, error="location not found")
+    data = fetch(lat, lon)
+    if not data:
+        return LocationResult(query, display_name, lat, lon, error="air quality fetch failed")
+    return LocationResult(query, display_name, lat, lon, data)
+
+
+def fetch_locations(names, geocode, fetch):
+    """Geocode and fetch all locations concurrently.
+
+    Each location is one background job, so a city's fetch starts right
+    after its own geocode and wall time tracks the slowest city rather than
+    the sum over cities.
+
+    Args:
+        names: Location names
+        geocode: Function with the signature of get_coordinates_from_location
+        fetch: Function ``fetch(lat, lon)`` returning AirQualityResponse or None
+
+    Returns:
+        list: LocationResult per name, in input order
+    """
+    futures = [run_in_background(_geocode_and_fetch, name, geocode, fetch) for name in names]
+    return [future.result() for future in futures]
+
+
+def location_label(result):
+    """Short chart label: the part of the geocoded name before the first comma."""
+    return (result.display_name or result.query).split(',')[0]
+
+
+def comparison_summary(labels, analyses):
+    """One row per location: current and peak forecast AQI.
+
+    Args:
+        labels: Location labels
+        analyses: AQIAnalysis per location
+
+    Returns:
+        pandas.DataFrame: Sorted by current AQI, worst first; locations
+            whose forecast is empty come last with category "No data"
+    """
+    rows = []
+    for label, analysis in zip(labels, analyses):
+        if len(analysis.max_aqi) == 0:
+            rows.append({'Location': label, 'Current AQI': np.nan, 'Category': NO_DATA_LABEL,
+                         'Main pollutant': None, 'Peak AQI': np.nan, 'Peak time': None})
+            continue
+        peak = int(np.argmax(analysis.max_aqi))
+        rows.append({
+            'Location': label,
+            'Current AQI': round(float(analysis.max_aqi[0]), 1),
+            'Category': analysis.labels[0],
+            'Main pollutant': POLLUTANT_NAMES[analysis.dominant[0]],
+            'Peak AQI': round(float(analysis.max_aqi[peak]), 1),
+            'Peak time': analysis.dates[peak].strftime('%a %H:%M'),
+        })
+    return pd.DataFrame(rows).sort_values('Current AQI', ascending=False, ignore_index=True)
+
+
+def _downsampled(analysis, width_px):
+    keep = downsample_indices(analysis.dates, analysis.max_aqi, target_points(width_px))
+    return analysis.dates[keep], analysis.max_aqi[keep], analysis.category[keep]
+
+
+def create_comparison_plot(labels, analyses, layout='Overlay', width_px=DEFAULT_PLOT_WIDTH_PX):
+    """Max AQI forecast for several locations in one figure.
+
+    Args:
+        labels: Location labels
+        analyses: AQIAnalysis per location
+        layout: 'Overlay' (one axis, one line per city) or 'Small multiples'
+            (one subplot per city with category-coloured markers)
+        width_px: Plot width used to downsample each series
+
+    Returns:
+        plotly.graph_objects.Figure
+    """
+    series = [_downsampled(analysis, width_px) for analysis in analyses]
+    y_max = min(max(float(values.max()) for _, values, _ in series) * 1.1, 500)
+    trace_type = scatter_trace_type(sum(len(values) for _, values, _ in series))
+
+    if layout == 'Overlay':
+        fig = go.Figure()
+        for label, (dates, values, categories) in zip(labels, series):
+            fig.add_trace(trace_type(
+                x=dates,
+                y=values,
+                mode='lines',
+                name=label,
+                customdata=AQI_CATEGORY_LABELS[categories],
+                hovertemplate=f'<b>{label}</b><br>AQI: %{{y:.1f}}<br>Level: %{{customdata}}<extra></extra>'
+            ))
+        fig.update_layout(
+            title='Maximum AQI Forecast Comparison',
+            xaxis_title='DateTime',
+            yaxis_title='Maximum AQI',
+            hovermode='x unified',
+            height=500,
+            shapes=aqi_zone_shapes(y_max),
+            yaxis=dict(range=[0, y_max])
+        )
+        return fig
+
+    cols = min(SMALL_MULTIPLE_COLUMNS, len(series))
+    rows = math.ceil(len(series) / cols)
+    fig = make_subplots(rows=rows, cols=cols, shared_xaxes=True, shared_yaxes=True,
+                        subplot_titles=labels, vertical_spacing=0.3 / rows)
+    shapes = []
+    for i, (label, (dates, values, categories)) in enumerate(zip(labels, series)):
+        fig.add_trace(trace_type(
+            x=dates,
+            y=values,
+            mode='lines+markers',
+            name=label,
+            showlegend=False,
+            line=dict(width=1, color='black'),
+            marker=dict(size=4, color=list(AQI_CATEGORY_COLORS[categories])),
+            customdata=AQI_CATEGORY_LABELS[categories],
+            hovertemplate=f'<b>{label}</b><br>%{{x}}<br>AQI: %{{y:.1f}}<br>Level: %{{customdata}}<extra></extra>'
+        ), row=i // cols + 1, col=i % cols + 1)
+        axis = '' if i == 0 else str(i + 1)
+        shapes.extend(aqi_zone_shapes(y_max, xref=f'x{axis} domain', yref=f'y{axis}'))
+    fig.update_yaxes(range=[0, y_max])
+    fig.update_layout(
+        title='Maximum AQI Forecast Comparison',
+        height=max(300, 220 * rows),
+        shapes=shapes
+    )
+    return fig
+
+
+def display_comparison_mode(geocode, fetch):
+    """Comparison page: location list input, summary table and chart.
+
+    Args:
+        geocode: Geocoding function (e.g. caching.cached_coordinates)
+        fetch: Forecast fetch function (e.g. caching.cached_air_quality)
+    """
+    text = st.text_area(
+        f"Locations to compare (one per line, up to {MAX_COMPARISON_LOCATIONS})",
+        key="comparison_input",
+        placeholder="Ames, IA\nParis, France\nDelhi, India"
+    )
+    names = parse_location_list(text)
+    if not names:
+        return
+
+    with st.spinner(f"Fetching air quality for {len(names)} locations..."):
+        results = fetch_locations(names, geocode, fetch)
+
+    for result in results:
+        if result.error:
+            st.warning(f"{result.query}: {result.error}")
+    found = [result for result in results if result.data is not None]
+    if not found:
+        st.error("No air quality data for any of the locations.")
+        return
+
+    labels = [location_label(result) for result in found]
+    analyses = analyze_air_quality_many([result.data.list for result in found])
+
+    st.header("Location Comparison")
+    st.dataframe(comparison_summary(labels, analyses), hide_index=True, use_container_width=True)
+
+    # Locations with an empty forecast are listed in the summary but not plotted
+    plotted = [(label, analysis) for label, analysis in zip(labels, analyses) if len(analysis.max_aqi)]
+    if not plotted:
+        return
+    plotted_labels, plotted_analyses = zip(*plotted)
+    layout = st.radio("Chart layout", COMPARISON_LAYOUTS, horizontal=True, key="comparison_layout")
+    st.plotly_chart(create_comparison_plot(list(plotted_labels), list(plotted_analyses), layout),
+                    use_container_width=True)
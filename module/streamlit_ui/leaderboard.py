@@ -0,0 +1,85 @@
+"""
+Worst-air leaderboard.
+
+Ranks the sites of a time-series store written by ``clearskies watch``
+by current or forecast-peak AQI with core.leaderboard. The Leaderboard
+is shared across sessions (caching.cached_leaderboard) and each rerun
+only re-scores the sites fetched since the previous one.
+
+The store is server configuration (the CLEARSKIES_STORE environment
+variable), never a page input, and is opened read-only.
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+import streamlit as st
+
+from ..core.aqi_analysis import AQI_CATEGORY_LABELS, categorize_aqi
+
+# Same default as ``clearskies watch --store``
+DEFAULT_STORE_PATH = os.path.join("data", "readings.sqlite")
+STORE_PATH_ENV = "CLEARSKIES_STORE"
+RANKING_LABELS = {'current': "Current AQI", 'peak': "Forecast peak"}
+DEFAULT_SITES = 20
+MAX_SITES = 100
+
+
+def leaderboard_frame(entries, by='current'):
+    """Leaderboard entries as a table, worst first.
+
+    Args:
+        entries: LeaderboardEntry list from Leaderboard.top
+        by: Ranking the entries were taken by; its score sets the level
+
+    Returns:
+        pandas.DataFrame: Rank, Site, Current AQI, Peak AQI, Peak at
+            (UTC), Level, Dominant and Updated (UTC) columns
+    """
+    scores = [getattr(entry, by) for entry in entries]
+    return pd.DataFrame({
+        'Rank': range(1, len(entries) + 1),
+        'Site': [entry.name for entry in entries],
+        'Current AQI': [round(entry.current, 1) for entry in entries],
+        'Peak AQI': [round(entry.peak, 1) for entry in entries],
+        'Peak at': pd.to_datetime([entry.peak_time for entry in entries], unit='s'),
+        'Level': AQI_CATEGORY_LABELS[categorize_aqi(scores)] if entries else [],
+        'Dominant': [entry.dominant_pollutant for entry in entries],
+        'Updated': pd.to_datetime([entry.updated_at for entry in entries], unit='s').floor('min'),
+    })
+
+
+def configured_store_path():
+    """Store the leaderboard reads: $CLEARSKIES_STORE, else DEFAULT_STORE_PATH."""
+    return os.environ.get(STORE_PATH_ENV) or DEFAULT_STORE_PATH
+
+
+def display_leaderboard_mode(load, store_path=None):
+    """Leaderboard page: ranking and size controls, and the table.
+
+    Args:
+        load: Function ``load(store_path)`` returning a refreshed
+            Leaderboard (e.g. caching.cached_leaderboard)
+        store_path: Store to rank (default configured_store_path())
+    """
+    store_path = configured_store_path() if store_path is None else store_path
+    by = st.radio("Rank by", list(RANKING_LABELS), format_func=RANKING_LABELS.get, horizontal=True,
+                  key="leaderboard_by")
+    k = st.slider("Sites", 5, MAX_SITES, DEFAULT_SITES, step=5, key="leaderboard_k")
+    if not os.path.isfile(store_path):
+        st.error(f"No time-series store at {store_path}. Run 'clearskies watch --store {store_path}', "
+                 f"or point {STORE_PATH_ENV} at an existing store.")
+        return
+
+    try:
+        board = load(store_path)
+    except sqlite3.DatabaseError as e:
+        st.error(f"{store_path} is not a readable time-series store: {e}")
+        return
+    if not len(board):
+        st.info("The store has no forecasts for the coming hours.")
+        return
+    st.header(f"Worst air by {RANKING_LABELS[by].lower()}")
+    st.dataframe(leaderboard_frame(board.top(k, by), by), hide_index=True, use_container_width=True)
+    st.caption(f"{len(board)} sites ranked; times in UTC")
@@ -28,9 +28,16 @@ def display_location_info(lat, lon, display_name):
     st.map(map_data, zoom=11, size='size', use_container_width=True)
 
 
-def get_location_data():
+def get_location_data(on_coordinates=None, geocode=None):
     """Handle location input and validation.
     
+    Args:
+        on_coordinates: Optional callback ``on_coordinates(lat, lon)`` invoked
+            as soon as geocoding succeeds, before the map is rendered, so
+            callers can start fetching data for the top candidate early
+        geocode: Optional geocoding function with the signature of
+            get_coordinates_from_location (e.g. a cached wrapper)
+    
     Returns:
         tuple: (lat, lon, display_name) or (None, None, None) if invalid
     """
@@ -46,9 +53,11 @@ def get_location_data():
     if location:
         # Show spinner during API call
         with st.spinner("🔍 Searching for location..."):
-            (lat, lon), display_name = get_coordinates_from_location(location)
+            (lat, lon), display_name = (geocode or get_coordinates_from_location)(location)
         
         if lat and lon:
+            if on_coordinates is not None:
+                on_coordinates(lat, lon)
             display_location_info(lat, lon, display_name)
             return lat, lon, display_name
         else:
@@ -10,37 +10,46 @@ from .aqi_display import (
     display_aqi_category
 )
 from .plots import display_aqi_forecast
+from ..core.aqi_analysis import analyze_air_quality
 
 
-def display_air_quality_data(air_pollution_data, display_name, calculate_all_aqi_values):
+def display_air_quality_data(air_pollution_data, display_name, calculate_all_aqi_values, analysis=None,
+                             figure_cache=None):
     """Render complete air quality dashboard.
     
+    The forecast is analyzed once (or the given analysis is reused) and the
+    same AQIAnalysis is passed to every panel.
+    
     Args:
         air_pollution_data: AirQualityResponse object or None
         display_name: Location name for titles
         calculate_all_aqi_values: AQI calculation function
+        analysis: Optional precomputed AQIAnalysis, e.g. from the Streamlit cache
+        figure_cache: Optional FigureCache for the forecast chart
     """
     if not air_pollution_data:
         st.error("Failed to fetch air quality data. Please try again.")
         return
 
-    # Calculate current conditions (first data point)
+    if analysis is None:
+        analysis = analyze_air_quality(air_pollution_data.list)
+    
+    # Current conditions (first data point); worst pollutant determines overall AQI
     current_components = air_pollution_data.list[0].components
-    current_aqi_values = calculate_all_aqi_values(current_components)
-    max_aqi = max(current_aqi_values)  # Worst pollutant determines overall AQI
+    max_aqi = analysis.max_aqi[0]
     
     # Current status section
     st.header("Current Air Quality Status")
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        display_pollutant_details(current_components, calculate_all_aqi_values)
+        display_pollutant_details(current_components, calculate_all_aqi_values, analysis, batched=True)
     
     with col2:
         st.subheader("Overall AQI Status")
         st.markdown(f"### {max_aqi:.1f}")
-        display_aqi_category(max_aqi)
+        display_aqi_category(max_aqi, (analysis.labels[0], analysis.colors[0]))
     
     # Forecast section
     st.header("Air Quality Forecast")
-    display_aqi_forecast(air_pollution_data, display_name, calculate_all_aqi_values)
\ No newline at end of file
+    display_aqi_forecast(air_pollution_data, display_name, calculate_all_aqi_values, analysis, figure_cache)
\ No newline at end of file
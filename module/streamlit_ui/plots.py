@@ -5,34 +5,21 @@ Creates interactive time series plots showing maximum AQI over time
 with color-coded EPA category zones.
 """
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-from datetime import datetime
-
-
-def calculate_aqi_over_time(air_quality_list, calculate_all_aqi_values):
-    """Extract max AQI for each forecast timestamp.
-    
-    Args:
-        air_quality_list: List of AirQualityData objects
-        calculate_all_aqi_values: Function to compute AQI values
-    
-    Returns:
-        tuple: (dates, max_aqi_values) as lists
-    """
-    dates = []
-    max_aqi_values = []
-    
-    for data_point in air_quality_list:
-        dt_human = datetime.fromtimestamp(data_point.dt)
-        dates.append(dt_human)
-        
-        # Get AQI for all pollutants and take maximum
-        aqi_values = calculate_all_aqi_values(data_point.components)
-        max_aqi = max(aqi_values)
-        max_aqi_values.append(max_aqi)
-    
-    return dates, max_aqi_values
+from .aqi_display import render_pollutant_grid_html
+from ..core.aqi_analysis import AQI_CATEGORY_COLORS, AQI_CATEGORY_LABELS, categorize_aqi
+from ..core.downsampling import (
+    DEFAULT_PLOT_WIDTH_PX,
+    downsample_indices,
+    target_points,
+    window_slice
+)
+from ..core.figure_cache import figure_from_json, fingerprint
+from ..core.timeseries import build_aqi_timeseries
+from ..core.visualization import scatter_trace_type
 
 
 def get_aqi_ranges():
@@ -51,81 +38,131 @@ def get_aqi_ranges():
     ]
 
 
-def create_aqi_plot(dates, max_aqi_values, display_name):
+def _zone_fill(color, alpha=0.1):
+    """Convert '#rrggbb' to an 'rgba(r, g, b, alpha)' fill string."""
+    r, g, b = (int(color.lstrip("#")[i:i+2], 16) for i in (0, 2, 4))
+    return f'rgba({r}, {g}, {b}, {alpha})'
+
+
+def _discrete_colorscale(colors):
+    """Plotly colorscale with one flat band per colour.
+    
+    Used with cmin=-0.5 and cmax=len(colors) - 0.5, integer i maps to the
+    middle of band i, never onto a stop shared by two colours.
+    """
+    n = len(colors)
+    scale = []
+    for i, color in enumerate(colors):
+        scale.append([i / n, color])
+        scale.append([(i + 1) / n, color])
+    return scale
+
+
+def aqi_zone_shapes(y_max, xref='paper', yref='y'):
+    """Layout rectangles for the AQI category bands up to y_max.
+    
+    Args:
+        y_max: Top of the y-axis; bands above it are dropped, the last one clipped
+        xref: Plotly x reference spanning the plot width (e.g. 'x2 domain'
+            for a subplot)
+        yref: Plotly y axis the bands are drawn against
+    
+    Returns:
+        list: Shape dicts for fig.update_layout(shapes=...)
+    """
+    shapes = []
+    for start, end, _, color in get_aqi_ranges():
+        if start > y_max:
+            break
+        shapes.append(dict(
+            type='rect', xref=xref, x0=0, x1=1, yref=yref, y0=start, y1=min(end, y_max),
+            fillcolor=_zone_fill(color), line=dict(width=0), layer='below'
+        ))
+    return shapes
+
+
+def create_aqi_plot(dates, max_aqi_values, display_name, categories=None,
+                    width_px=DEFAULT_PLOT_WIDTH_PX, render_mode='auto'):
     """Build Plotly figure with AQI forecast and colored zones.
     
+    Category zones are layout rectangles (constant size regardless of the
+    number of points) and marker colours/hover labels come from a single
+    searchsorted over the category edges. Series longer than the plot is
+    wide are downsampled (LTTB, keeping peaks and category crossings), so
+    the payload is bounded by width_px rather than the series length.
+    Above WEBGL_POINT_THRESHOLD plotted points the line is drawn with
+    WebGL (Scattergl) so pan and zoom stay smooth.
+    
     Args:
-        dates: List of datetime objects
-        max_aqi_values: List of AQI values
+        dates: List or array of datetimes
+        max_aqi_values: List or array of AQI values
         display_name: Location name for title
+        categories: Optional precomputed category index per point (e.g.
+            AQIAnalysis.category); derived from the values when omitted
+        width_px: Plot width that bounds the number of points sent to the
+            browser; None plots every point
+        render_mode: 'auto', 'svg' or 'webgl' (see scatter_trace_type)
     
     Returns:
         plotly.graph_objects.Figure
     """
     aqi_ranges = get_aqi_ranges()
+    values = np.asarray(max_aqi_values, dtype=np.float64)
+    
+    keep = downsample_indices(dates, values, target_points(width_px))
+    if len(keep) < len(values):
+        dates = pd.DatetimeIndex(dates)[keep]
+        values = values[keep]
+        if categories is not None:
+            categories = np.asarray(categories)[keep]
     
     # Set y-axis range to fit data with 10% padding
-    max_observed_aqi = max(max_aqi_values)
+    max_observed_aqi = values.max()
     y_max = min(max_observed_aqi * 1.1, 500)
     
     fig = go.Figure()
     
-    # Add colored background zones for relevant AQI categories
-    relevant_ranges = [r for r in aqi_ranges if r[0] <= y_max]
-    if not any(r[1] >= y_max for r in relevant_ranges):
-        # Partial range at top if y_max cuts through a category
-        for start, end, label, color in aqi_ranges:
-            if start <= y_max <= end:
-                relevant_ranges.append((start, y_max, label, color))
-                break
-    
-    for start, end, label, color in relevant_ranges:
+    # Colored background zones for relevant AQI categories, clipped at y_max
+    shapes = aqi_zone_shapes(y_max)
+    for start, end, label, color in aqi_ranges[:len(shapes)]:
         actual_end = min(end, y_max)
-        display_end = int(actual_end)
-        
-        # Create filled area using polygon technique
+        # Legend entry for the zone (a single empty point, not a polygon)
         fig.add_trace(
             go.Scatter(
-                x=dates + dates[::-1],
-                y=[actual_end] * len(dates) + [start] * len(dates),
-                fill='tonexty',
-                fillcolor=f'rgba{tuple(list(int(color.lstrip("#")[i:i+2], 16) for i in (0, 2, 4)) + [0.1])}',
-                line=dict(width=0),
-                showlegend=True,
-                name=f'{label} ({start}-{display_end})',
+                x=[None],
+                y=[None],
+                mode='markers',
+                marker=dict(symbol='square', size=12, color=_zone_fill(color, 0.4)),
+                name=f'{label} ({start}-{int(actual_end)})',
                 hoverinfo='skip'
             )
         )
-
-    # Assign marker colors based on AQI category
-    color_list = []
-    for aqi in max_aqi_values:
-        matched = False
-        for start, end, _, color in aqi_ranges:
-            if start <= aqi <= end:
-                marker_color = color
-                matched = True
-                break
-        if not matched:  # GOTCHA: Handle edge cases above 500
-            marker_color = '#7e0023'  # Default to Hazardous
-        color_list.append(marker_color)
-
+    
+    # Category per point: one searchsorted over the bin edges. Values above
+    # 500 fall into the last bin, i.e. Hazardous.
+    if categories is None:
+        categories = categorize_aqi(values)
+    categories = np.asarray(categories)
+    
     # Add main AQI trend line with colored markers
+    trace_type = scatter_trace_type(len(values), render_mode)
     fig.add_trace(
-        go.Scatter(
+        trace_type(
             x=dates,
-            y=max_aqi_values,
+            y=values,
             mode='lines+markers',
             name='Max AQI',
             line=dict(width=3, color='black'),
             marker=dict(
                 size=8,
-                color=color_list,
+                color=categories,
+                colorscale=_discrete_colorscale(list(AQI_CATEGORY_COLORS)),
+                cmin=-0.5,
+                cmax=len(AQI_CATEGORY_COLORS) - 0.5,
                 line=dict(width=1, color='black')
             ),
             hovertemplate='<b>%{x}</b><br>Max AQI: %{y:.1f}<br>Level: %{customdata}<extra></extra>',
-            customdata=[next(label for start, end, label, _ in aqi_ranges if start <= aqi <= end)
-                       for aqi in max_aqi_values]
+            customdata=AQI_CATEGORY_LABELS[categories]
         )
     )
     
@@ -137,6 +174,7 @@ def create_aqi_plot(dates, max_aqi_values, display_name):
         hovermode='x unified',
         showlegend=True,
         height=500,
+        shapes=shapes,
         legend=dict(
             groupclick="toggleitem",
             yanchor="top",
@@ -158,25 +196,54 @@ def create_aqi_plot(dates, max_aqi_values, display_name):
     return fig
 
 
-def display_current_air_quality(air_pollution_data, calculate_all_aqi_values):
+def metric_tile_html(label, value, delta):
+    """HTML tile resembling st.metric, for batched rendering.
+    
+    Returns:
+        str: Label, large value and small delta line
+    """
+    return (
+        f'<div style="padding: 4px 0;">'
+        f'<p style="margin: 0; font-size: 0.875em;">{label}</p>'
+        f'<p style="margin: 0; font-size: 2em;">{value}</p>'
+        f'<p style="margin: 0; font-size: 0.875em; color: #09ab3b;">↑ {delta}</p>'
+        f'</div>'
+    )
+
+
+def display_current_air_quality(air_pollution_data, calculate_all_aqi_values, analysis=None, batched=False):
     """Show current AQI metrics in a 3-column grid.
     
     Args:
         air_pollution_data: AirQualityResponse object
         calculate_all_aqi_values: AQI calculation function
+        analysis: Optional precomputed AQIAnalysis for the same response
+        batched: Render the six metrics as one HTML grid element instead of
+            six st.metric elements
     """
     st.subheader("📊 Current Air Quality")
     
     # Use first data point (current conditions)
     components = air_pollution_data.list[0].components
-    aqi_values = calculate_all_aqi_values(components)
+    if analysis is not None:
+        aqi_values = analysis.sub_indices[0]
+    else:
+        aqi_values = calculate_all_aqi_values(components)
     pollutant_names = ['PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3']
+    # Get raw concentration (handle PM2.5 naming)
+    raw_values = [getattr(components, name.lower().replace('.', '_')) for name in pollutant_names]
+    
+    if batched:
+        tiles = [
+            metric_tile_html(name, f"AQI: {value:.1f}", f"Raw: {raw_value:.2f}")
+            for name, value, raw_value in zip(pollutant_names, aqi_values, raw_values)
+        ]
+        st.markdown(render_pollutant_grid_html(tiles), unsafe_allow_html=True)
+        return
     
     cols = st.columns(3)
-    for idx, (name, value) in enumerate(zip(pollutant_names, aqi_values)):
+    for idx, (name, value, raw_value) in enumerate(zip(pollutant_names, aqi_values, raw_values)):
         with cols[idx % 3]:
-            # Get raw concentration (handle PM2.5 naming)
-            raw_value = getattr(components, name.lower().replace('.', '_'))
             st.metric(
                 label=name,
                 value=f"AQI: {value:.1f}",
@@ -184,18 +251,93 @@ def display_current_air_quality(air_pollution_data, calculate_all_aqi_values):
             )
 
 
-def display_aqi_forecast(air_pollution_data, display_name, calculate_all_aqi_values):
+def select_zoom_window(dates, display_name, width_px=DEFAULT_PLOT_WIDTH_PX):
+    """Date-range control for series too long to plot at full resolution.
+    
+    Narrowing the range re-downsamples only the selected window from the
+    full-resolution data, so zooming in shows finer detail. A range holding
+    fewer than two points (e.g. narrower than the sampling interval) is
+    widened to the two points around it, so the chart is never empty.
+    
+    Args:
+        dates: Sorted datetimes of the full series
+        display_name: Location name (keeps the widget key per location)
+        width_px: Plot width used for downsampling
+    
+    Returns:
+        slice or None: Window to plot, or None when the series fits the plot
+    """
+    n_out = target_points(width_px)
+    if n_out is None or len(dates) <= n_out:
+        return None
+    
+    # Slider works in naive wall-clock time; window_slice reads it in the series' timezone
+    first, last = (pd.Timestamp(dates[i]).tz_localize(None).to_pydatetime() for i in (0, -1))
+    start, end = st.slider(
+        "Zoom",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="YYYY-MM-DD HH:mm",
+        key=f"aqi_zoom_{display_name}"
+    )
+    window = window_slice(dates, start, end)
+    if window.stop - window.start < 2:
+        lo = max(0, min(window.start - 1, len(dates) - 2))
+        window = slice(lo, lo + 2)
+    return window
+
+
+def forecast_figure_key(dates, max_aqi_values, categories, display_name):
+    """Content key of the forecast chart for the figure cache.
+    
+    Returns:
+        str: Digest of the plotted arrays and every display parameter
+    """
+    index = pd.DatetimeIndex(dates)
+    return fingerprint(
+        index.asi8,
+        np.asarray(max_aqi_values, dtype=np.float64),
+        categories,
+        chart='aqi_forecast',
+        display_name=display_name,
+        tz=index.tz,
+        width_px=DEFAULT_PLOT_WIDTH_PX
+    )
+
+
+def display_aqi_forecast(air_pollution_data, display_name, calculate_all_aqi_values, analysis=None,
+                         figure_cache=None):
     """Render AQI forecast chart.
     
     Args:
         air_pollution_data: AirQualityResponse object
         display_name: Location name
         calculate_all_aqi_values: AQI calculation function
+        analysis: Optional precomputed AQIAnalysis; when given, its max AQI
+            and categories are plotted without recomputation
+        figure_cache: Optional FigureCache; identical charts are served from
+            cached JSON instead of being rebuilt and reserialized
     """
     st.subheader("📈 Air Quality Forecast")
-    dates, max_aqi_values = calculate_aqi_over_time(
-        air_pollution_data.list,
-        calculate_all_aqi_values
-    )
-    fig = create_aqi_plot(dates, max_aqi_values, display_name)
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    if analysis is not None:
+        dates, max_aqi_values, categories = analysis.dates, analysis.max_aqi, analysis.category
+    else:
+        dates, max_aqi_values = build_aqi_timeseries(air_pollution_data.list)
+        categories = None
+    
+    window = select_zoom_window(dates, display_name)
+    if window is not None:
+        dates, max_aqi_values = dates[window], max_aqi_values[window]
+        if categories is not None:
+            categories = categories[window]
+    
+    def build():
+        return create_aqi_plot(dates, max_aqi_values, display_name, categories=categories)
+    
+    if figure_cache is None:
+        fig = build()
+    else:
+        key = forecast_figure_key(dates, max_aqi_values, categories, display_name)
+        fig = figure_from_json(figure_cache.get_or_build(key, build))
+    st.plotly_chart(fig, use_container_width=True)
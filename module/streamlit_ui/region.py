@@ -0,0 +1,186 @@
+"""
+Regional AQI heatmap.
+
+Samples current AQI over a box around a searched place with
+core.region_sampling (coarse grid plus quadtree refinement where AQI
+changes) and renders the samples either as a pydeck heatmap or as an
+inverse-distance-weighted surface (core.interpolation), with the sampled
+points overlaid so users can see where the refinement spent its calls.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+import streamlit as st
+
+from ..core.aqi_analysis import AQI_CATEGORY_COLORS, AQI_CATEGORY_LABELS, categorize_aqi
+from ..core.interpolation import interpolate_grid
+from ..core.region_sampling import KM_PER_DEGREE_LAT, bounding_box
+
+DEFAULT_RADIUS_KM = 25
+DEFAULT_CALL_BUDGET = 150
+SURFACES = ('Heatmap', 'Interpolated')
+INTERPOLATION_GRID_SIZE = 100  # Cells per side of the interpolated surface
+SURFACE_ALPHA = 140
+# Heatmap colour ramp spans 0-300 so each EPA colour covers about one 50-point band
+HEATMAP_AQI_DOMAIN = [0, 300]
+
+
+def _hex_to_rgb(color):
+    return [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+
+
+HEATMAP_COLOR_RANGE = [_hex_to_rgb(color) for color in AQI_CATEGORY_COLORS]
+
+
+def region_points_frame(sample):
+    """Sampled points as a DataFrame for pydeck, failed fetches dropped.
+
+    Args:
+        sample: RegionSample
+
+    Returns:
+        pandas.DataFrame: lat, lon, aqi, level and color columns
+    """
+    points = sample.points[~np.isnan(sample.points[:, 2])]
+    categories = categorize_aqi(points[:, 2])
+    return pd.DataFrame({
+        'lat': points[:, 0],
+        'lon': points[:, 1],
+        'aqi': points[:, 2].round(1),
+        'level': AQI_CATEGORY_LABELS[categories],
+        'color': [HEATMAP_COLOR_RANGE[c] for c in categories],
+    })
+
+
+def interpolated_cells_frame(sample, size=INTERPOLATION_GRID_SIZE):
+    """IDW-interpolated AQI on a size x size grid over the sampled box.
+
+    Args:
+        sample: RegionSample
+        size: Cells per side
+
+    Returns:
+        tuple: (DataFrame with south-west corner lat/lon, aqi, level and
+            color per cell, cell height in metres)
+    """
+    south, west, north, east = sample.bbox
+    lats, lons, values = interpolate_grid(sample.points, sample.bbox, (size, size))
+    lat_step, lon_step = (north - south) / size, (east - west) / size
+    aqi = values.ravel()
+    categories = categorize_aqi(aqi)
+    return pd.DataFrame({
+        'lat': np.repeat(lats - lat_step / 2, size),
+        'lon': np.tile(lons - lon_step / 2, size),
+        'aqi': aqi.round(1),
+        'level': AQI_CATEGORY_LABELS[categories],
+        'color': [HEATMAP_COLOR_RANGE[c] + [SURFACE_ALPHA] for c in categories],
+    }), lat_step * KM_PER_DEGREE_LAT * 1000
+
+
+def zoom_for_radius(radius_km):
+    """Web-mercator zoom level that fits about 2 * radius_km across the map."""
+    return max(1.0, min(15.0, math.log2(40075 / (2.5 * radius_km))))
+
+
+def create_region_deck(sample, lat, lon, radius_km, show_points=True, surface='Heatmap'):
+    """pydeck map of a region sample.
+
+    Args:
+        sample: RegionSample
+        lat: Map centre latitude
+        lon: Map centre longitude
+        radius_km: Half-width of the sampled box, used for the zoom level
+        show_points: Overlay the sampled locations
+        surface: 'Heatmap' (deck.gl heatmap of the samples) or
+            'Interpolated' (IDW grid coloured by EPA category)
+
+    Returns:
+        pydeck.Deck
+    """
+    frame = region_points_frame(sample)
+    if surface == 'Interpolated':
+        cells, cell_size = interpolated_cells_frame(sample)
+        layers = [pdk.Layer(
+            'GridCellLayer',
+            data=cells,
+            get_position='[lon, lat]',
+            get_fill_color='color',
+            cell_size=cell_size,
+            extruded=False,
+            pickable=True,
+        )]
+    else:
+        layers = [pdk.Layer(
+            'HeatmapLayer',
+            data=frame,
+            get_position='[lon, lat]',
+            get_weight='aqi',
+            aggregation='MEAN',
+            color_range=HEATMAP_COLOR_RANGE,
+            color_domain=HEATMAP_AQI_DOMAIN,
+            radius_pixels=60,
+            opacity=0.6,
+        )]
+    if show_points:
+        layers.append(pdk.Layer(
+            'ScatterplotLayer',
+            data=frame,
+            get_position='[lon, lat]',
+            get_fill_color='color',
+            get_line_color=[0, 0, 0],
+            stroked=True,
+            line_width_min_pixels=1,
+            radius_min_pixels=3,
+            pickable=True,
+        ))
+    return pdk.Deck(
+        layers=layers,
+        initial_view_state=pdk.ViewState(latitude=lat, longitude=lon, zoom=zoom_for_radius(radius_km)),
+        tooltip={'text': 'AQI {aqi} ({level})'},
+    )
+
+
+def display_region_mode(geocode, sample):
+    """Region page: place input, sampling controls, heatmap and call count.
+
+    Args:
+        geocode: Geocoding function (e.g. caching.cached_coordinates)
+        sample: Function ``sample(bbox, coarse, max_depth, threshold, max_calls)``
+            returning a RegionSample (e.g. caching.cached_region_sample)
+    """
+    location = st.text_input("Region centre", key="region_input", placeholder="e.g. Los Angeles, CA")
+    with st.expander("Sampling settings"):
+        radius_km = st.slider("Radius (km)", 5, 100, DEFAULT_RADIUS_KM, step=5, key="region_radius")
+        coarse = st.slider("Initial grid (cells per side)", 2, 8, 4, key="region_coarse")
+        max_depth = st.slider("Maximum refinement depth", 0, 4, 3, key="region_depth")
+        threshold = st.slider("Refine when corner AQI differs by more than", 5, 100, 25, step=5,
+                              key="region_threshold")
+        max_calls = st.number_input("API call budget (the initial grid is always fetched)",
+                                    min_value=10, max_value=2000, value=DEFAULT_CALL_BUDGET,
+                                    step=10, key="region_budget")
+    if not location:
+        return
+
+    (lat, lon), display_name = geocode(location)
+    if not (lat and lon):
+        st.error("Location not found. Try a different search term.")
+        return
+
+    with st.spinner("Sampling air quality across the region..."):
+        result = sample(bounding_box(lat, lon, radius_km), coarse, max_depth, threshold, int(max_calls))
+
+    st.header(f"Air Quality around {display_name.split(',')[0]}")
+    if np.isnan(result.points[:, 2]).all():
+        st.error("No air quality data for this region.")
+        return
+
+    cols = st.columns(3)
+    cols[0].metric("API calls", result.api_calls)
+    cols[1].metric("Uniform grid at same detail", result.uniform_calls)
+    cols[2].metric("Calls saved", f"{result.savings:.0%}")
+    surface = st.radio("Surface", SURFACES, horizontal=True, key="region_surface")
+    show_points = st.checkbox("Show sampled points", value=True, key="region_points")
+    st.pydeck_chart(create_region_deck(result, lat, lon, radius_km, show_points, surface))
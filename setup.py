@@ -33,9 +33,13 @@ setup(
         "streamlit>=1.28.0",
         "requests>=2.31.0",
         "pandas>=2.0.0",
+        "numpy>=1.22.0",
         "plotly>=5.17.0",
     ],
     extras_require={
+        "parquet": [
+            "pyarrow>=14.0.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
@@ -43,7 +47,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "clearskies=main:main",
+            "clearskies=module.cli.main:main",
         ],
     },
     include_package_data=True,
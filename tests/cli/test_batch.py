@@ -0,0 +1,89 @@
+"""
+Test suite for the ``clearskies batch`` command.
+"""
+
+from unittest.mock import patch
+import pandas as pd
+import requests
+from module.cli.main import build_parser, main
+from tests.forecasts import make_forecast
+
+
+def fake_search(location_name, session=None):
+    """Deterministic stand-in for Nominatim."""
+    if location_name == "Nowhere":
+        return (None, None), None
+    return (float(len(location_name)), 2.0), f"{location_name} (resolved)"
+
+
+def fake_forecast(lat, lon, session=None):
+    """Deterministic stand-in for the OpenWeather forecast endpoint."""
+    return make_forecast(hours=4, lat=lat, lon=lon, o3=30.0 + lat)
+
+
+def run_batch(tmp_path, source, output, *extra):
+    return main([
+        "batch", str(source), "-o", str(output),
+        "--geocode-cache", str(tmp_path / "geocode.sqlite"),
+        "--forecast-cache", str(tmp_path / "forecast.sqlite"),
+        "--geocode-rate", "1000", "--fetch-rate", "1000", "--processes", "0", *extra
+    ])
+
+
+class TestBatchCommand:
+    """Test suite for the batch CLI command."""
+
+    def test_parser_registers_batch(self):
+        """Test that the batch subcommand parses its options."""
+        args = build_parser().parse_args(["batch", "in.txt", "-o", "out.parquet", "--processes", "2"])
+        
+        assert args.command == "batch"
+        assert args.processes == 2
+        assert args.fetch_rate == 1.0 and args.geocode_rate == 1.0
+
+    @patch('module.core.batch_report.read_pollution_data_from_api', side_effect=fake_forecast)
+    @patch('module.core.geocoding.search_nominatim', side_effect=fake_search)
+    def test_names_are_geocoded_fetched_and_cached(self, mock_search, mock_fetch, tmp_path, capsys):
+        """Test a complete run from names, then a rerun served from the caches."""
+        source = tmp_path / "names.txt"
+        source.write_text("Ames\nParis\nNowhere\names\n")
+        output = tmp_path / "report.csv"
+        
+        assert run_batch(tmp_path, source, output) == 0
+        
+        frame = pd.read_csv(output)
+        assert sorted(set(frame['location'])) == ["Ames", "Paris"]
+        assert len(frame) == 8
+        captured = capsys.readouterr()
+        assert "Nowhere: location not found" in captured.err
+        assert "Nowhere" not in captured.out
+        
+        mock_search.reset_mock()
+        mock_fetch.reset_mock()
+        assert run_batch(tmp_path, source, output) == 0
+        mock_search.assert_not_called()
+        mock_fetch.assert_not_called()
+
+    @patch('module.core.batch_report.read_pollution_data_from_api', side_effect=fake_forecast)
+    @patch('module.core.geocoding.search_nominatim', side_effect=fake_search)
+    def test_geocoded_input_skips_geocoding(self, mock_search, mock_fetch, tmp_path):
+        """Test that lat/lon columns are used directly and Parquet output works."""
+        source = tmp_path / "sites.csv"
+        pd.DataFrame({'location': ['A', 'B'], 'lat': [1.0, 2.0], 'lon': [3.0, 4.0]}).to_csv(source, index=False)
+        output = tmp_path / "report.parquet"
+        
+        assert run_batch(tmp_path, source, output, "--no-cache") == 0
+        
+        mock_search.assert_not_called()
+        frame = pd.read_parquet(output)
+        assert frame.groupby('location')['lat'].first().to_dict() == {'A': 1.0, 'B': 2.0}
+
+    @patch('module.core.batch_report.read_pollution_data_from_api',
+           side_effect=requests.exceptions.ConnectionError("down"))
+    def test_fetch_failures_exit_nonzero(self, mock_fetch, tmp_path):
+        """Test that failed locations are reported through the exit code."""
+        source = tmp_path / "sites.csv"
+        pd.DataFrame({'location': ['A'], 'lat': [1.0], 'lon': [3.0]}).to_csv(source, index=False)
+        
+        assert run_batch(tmp_path, source, tmp_path / "r.csv", "--no-cache", "--retries", "0") == 1
+        assert pd.read_csv(tmp_path / "r.csv").empty
@@ -0,0 +1,67 @@
+"""
+Test suite for the ``clearskies geocode`` command.
+"""
+
+import pytest
+from unittest.mock import patch
+import pandas as pd
+import requests
+from module.cli.main import build_parser, main
+
+
+def fake_search(location_name, session=None):
+    """Deterministic stand-in for Nominatim."""
+    return (1.0, 2.0), f"{location_name} (resolved)"
+
+
+class TestGeocodeCommand:
+    """Test suite for the geocode CLI command."""
+
+    def test_parser_registers_geocode(self):
+        """Test that the geocode subcommand parses its options."""
+        args = build_parser().parse_args(["geocode", "in.txt", "-o", "out.csv", "--workers", "2"])
+        
+        assert args.command == "geocode"
+        assert args.workers == 2
+        assert args.rate == 1.0
+
+    def test_no_command_prints_help(self, capsys):
+        """Test that running without a command shows usage and fails."""
+        assert main([]) == 2
+        assert "geocode" in capsys.readouterr().out
+
+    @patch('module.core.geocoding.search_nominatim', side_effect=fake_search)
+    def test_end_to_end_writes_output_and_clears_checkpoint(self, mock_search, tmp_path):
+        """Test a complete run over a small file with duplicates."""
+        source = tmp_path / "names.txt"
+        source.write_text("Ames\nParis\names\n")
+        output = tmp_path / "out.csv"
+        
+        code = main([
+            "geocode", str(source), "-o", str(output),
+            "--cache", str(tmp_path / "cache.sqlite"), "--rate", "1000"
+        ])
+        
+        assert code == 0
+        frame = pd.read_csv(output)
+        assert frame['location'].tolist() == ["Ames", "Paris"]
+        assert not (tmp_path / "out.csv.checkpoint").exists()
+        
+        # A second run is served entirely from the cache
+        mock_search.reset_mock()
+        main(["geocode", str(source), "-o", str(output), "--cache", str(tmp_path / "cache.sqlite")])
+        mock_search.assert_not_called()
+
+    @patch('module.core.geocoding.search_nominatim', side_effect=requests.exceptions.ConnectionError("down"))
+    def test_failed_names_are_printed_by_the_command(self, mock_search, tmp_path, capsys):
+        """Test that the command, not the library, prints each failed name."""
+        source = tmp_path / "names.txt"
+        source.write_text("Paris\n")
+        
+        code = main(["geocode", str(source), "-o", str(tmp_path / "out.csv"), "--no-cache",
+                     "--retries", "0", "--rate", "1000"])
+        
+        assert code == 1
+        captured = capsys.readouterr()
+        assert "Paris: Error fetching coordinates: down" in captured.err
+        assert "Paris" not in captured.out
@@ -0,0 +1,30 @@
+"""
+Test suite for the ``clearskies serve`` command.
+"""
+
+from unittest.mock import patch
+from module.cli.main import build_parser, main
+
+
+class TestServeCommand:
+    """Test suite for the serve subcommand."""
+
+    def test_parser_defaults(self):
+        """Test that serve binds to localhost with rate-limited upstreams by default."""
+        args = build_parser().parse_args(["serve"])
+        assert args.host == "127.0.0.1"
+        assert args.port == 8080
+        assert args.geocode_rate == 1.0
+        assert args.fetch_rate == 1.0
+
+    def test_interrupt_closes_caches(self, tmp_path):
+        """Test that Ctrl+C stops the server cleanly and returns 0."""
+        with patch('module.cli.serve.serve', side_effect=KeyboardInterrupt) as serve:
+            code = main([
+                "serve", "--port", "0",
+                "--geocode-cache", str(tmp_path / "geocode.sqlite"),
+                "--forecast-cache", str(tmp_path / "forecast.sqlite")
+            ])
+        assert code == 0
+        assert serve.call_args[0][1:] == ("127.0.0.1", 0)
+        assert (tmp_path / "forecast.sqlite").exists()
@@ -0,0 +1,73 @@
+"""
+Test suite for the ``clearskies watch`` command.
+"""
+
+import io
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+from module.cli.main import build_parser, main
+from module.cli.watch import alert_printer, quota_rate
+from module.core.alerts import AlertRule
+from tests.forecasts import CLEAN, make_forecast
+
+
+class TestWatchCommand:
+    """Test suite for the watch subcommand."""
+
+    def test_parser_defaults(self):
+        """Test that watch refreshes hourly within 10 min to 6 h by default."""
+        args = build_parser().parse_args(["watch", "sites.csv"])
+        assert args.base_interval == 60
+        assert args.min_interval == 10
+        assert args.max_interval == 360
+        assert args.rate == 1.0
+        assert args.processes == 1
+
+    def test_quota_rate(self):
+        """Test that a daily budget lowers the rate but never raises it."""
+        assert quota_rate(1.0) == 1.0
+        assert quota_rate(1.0, calls_per_day=8640) == 0.1
+        assert quota_rate(0.05, calls_per_day=86400 * 10) == 0.05
+
+    def test_alert_printer_writes_json_lines(self):
+        """Test that alerts raised by fetches are printed once as JSON lines."""
+        stream = io.StringIO()
+        on_fetch = alert_printer([AlertRule("r", 80)], stream=stream)
+        site = SimpleNamespace(lat=1.0, lon=2.0)
+        forecast = make_forecast(hours=1, base=CLEAN, o3=90.0)
+        on_fetch(site, forecast, 1700000000)
+        on_fetch(site, forecast, 1700000060)
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["kind"] == "fired"
+
+    def test_watches_geocoded_input_until_interrupted(self, tmp_path, capsys):
+        """Test that coordinates in the input skip geocoding and Ctrl+C returns 0."""
+        sites = tmp_path / "sites.csv"
+        sites.write_text("location,lat,lon\nParis,48.85,2.35\nLyon,45.76,4.84\n")
+        with patch('module.core.poller.WatchlistPoller.run', side_effect=KeyboardInterrupt), \
+                patch('module.cli.watch.geocode_locations') as geocode:
+            code = main(["watch", str(sites), "--store", str(tmp_path / "readings.sqlite")])
+        assert code == 0
+        geocode.assert_not_called()
+        err = capsys.readouterr().err
+        assert "Watching 2 sites" in err
+        assert "2 never fetched" in err
+        assert (tmp_path / "readings.sqlite").exists()
+
+    def test_processes_shard_the_watchlist(self, tmp_path, capsys):
+        """Test that --processes hands the sites, store and shared quota to run_sharded."""
+        sites = tmp_path / "sites.csv"
+        sites.write_text("location,lat,lon\nParis,48.85,2.35\nLyon,45.76,4.84\n")
+        summary = {'sites': 2, 'overdue': 0, 'never_fetched': 0, 'median_age': 60.0, 'p95_age': 60.0,
+                   'calls': 2, 'calls_per_hour': 2.0}
+        with patch('module.cli.watch.run_sharded', return_value=summary) as run_sharded:
+            code = main(["watch", str(sites), "--processes", "3", "--calls-per-day", "8640",
+                         "--store", str(tmp_path / "readings.sqlite")])
+        assert code == 0
+        args, kwargs = run_sharded.call_args
+        assert args == ([(48.85, 2.35, "Paris"), (45.76, 4.84, "Lyon")], 3)
+        assert kwargs['store_path'] == str(tmp_path / "readings.sqlite")
+        assert kwargs['limiter'].interval == 10.0
+        assert "2 sites, 0 overdue" in capsys.readouterr().err
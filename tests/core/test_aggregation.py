@@ -0,0 +1,143 @@
+"""
+Test suite for module.core.aggregation module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from module.core.aggregation import aggregate, aggregate_readings, bucket_starts, local_buckets, reaggregate
+from module.core.aqi_calculators import POLLUTANT_FIELDS
+
+# 2023-11-05 00:00 in Chicago (CDT, UTC-5); clocks go back at 02:00 that day
+CHICAGO_MIDNIGHT = 1699160400
+
+
+class TestBuckets:
+    """Test suite for calendar bucketing in local time."""
+
+    def test_days_follow_local_midnight_and_dst(self):
+        """Test that a local day starts at local midnight and the DST day has 25 hours."""
+        dt = CHICAGO_MIDNIGHT + 3600 * np.arange(-1, 27)
+
+        days = local_buckets(dt, 'day', tz='America/Chicago')
+
+        starts = bucket_starts(days, 'day')
+        assert str(starts[0]) == '2023-11-04'
+        assert (starts == np.datetime64('2023-11-05')).sum() == 25
+
+    def test_week_and_month(self):
+        """Test Monday weeks and calendar months."""
+        dt = np.array([CHICAGO_MIDNIGHT, CHICAGO_MIDNIGHT + 2 * 86400])  # Sunday, Monday 23:00
+
+        weeks = bucket_starts(local_buckets(dt, 'week', tz='America/Chicago'), 'week')
+        months = bucket_starts(local_buckets(dt, 'month', tz='America/Chicago'), 'month')
+
+        assert [str(w) for w in weeks] == ['2023-10-30', '2023-11-06']
+        assert [str(m) for m in months] == ['2023-11-01', '2023-11-01']
+
+    def test_timezone_per_location(self):
+        """Test that each group is bucketed in its own timezone."""
+        dt = np.array([CHICAGO_MIDNIGHT, CHICAGO_MIDNIGHT])
+
+        days = local_buckets(dt, 'day', tz={1: 'America/Chicago', 2: 'Asia/Tokyo'}, groups=[1, 2])
+
+        assert [str(d) for d in bucket_starts(days)] == ['2023-11-05', '2023-11-05']
+        assert str(bucket_starts(local_buckets(dt[:1], 'day', tz='UTC'))[0]) == '2023-11-05'
+
+    def test_unknown_bucket(self):
+        """Test that an unsupported freq is rejected."""
+        with pytest.raises(ValueError):
+            local_buckets([0], 'fortnight')
+
+
+class TestAggregate:
+    """Test suite for grouped statistics."""
+
+    def test_matches_pandas_groupby(self):
+        """Test max, mean and percentiles against a pandas reference."""
+        rng = np.random.default_rng(0)
+        n = 5000
+        dt = 1700000000 + rng.integers(0, 40 * 86400, n)
+        groups = rng.integers(0, 7, n) * 10
+        values = rng.gamma(2.0, 20.0, n)
+        tz = {g: zone for g, zone in zip(range(0, 70, 10), ['UTC', 'Asia/Tokyo', 'America/Chicago'] * 3)}
+
+        summary = aggregate(dt, {'pm2_5': values}, freq='day', tz=tz, groups=groups, percentiles=(50, 95))
+
+        local = np.concatenate([
+            pd.to_datetime(dt[groups == g], unit='s', utc=True).tz_convert(tz[g]).tz_localize(None).floor('D')
+            .to_numpy() for g in sorted(tz)
+        ])
+        frame = pd.DataFrame({'group': np.concatenate([groups[groups == g] for g in sorted(tz)]), 'start': local,
+                              'v': np.concatenate([values[groups == g] for g in sorted(tz)])})
+        expected = frame.groupby(['group', 'start'])['v'].agg(
+            ['count', 'max', 'mean', lambda v: np.percentile(v, 50), lambda v: np.percentile(v, 95)]
+        ).reset_index()
+        assert summary['group'].tolist() == expected['group'].tolist()
+        assert (summary['start'].to_numpy() == expected['start'].to_numpy()).all()
+        np.testing.assert_array_equal(summary['count'], expected['count'])
+        np.testing.assert_allclose(summary['pm2_5_max'], expected['max'])
+        np.testing.assert_allclose(summary['pm2_5_mean'], expected['mean'])
+        np.testing.assert_allclose(summary['pm2_5_p50'], expected.iloc[:, 5])
+        np.testing.assert_allclose(summary['pm2_5_p95'], expected.iloc[:, 6])
+
+    def test_percentiles_of_values_too_close_to_scale(self):
+        """Test exact percentiles when one outlier dwarfs the spread of the rest."""
+        values = np.array([1e15, 1.0 + 2e-9, 1.0 + 1e-9, 1.0, 5.0])
+
+        summary = aggregate(np.zeros(5), {'v': values}, tz='UTC', percentiles=(25, 50))
+
+        assert summary['v_p25'].iloc[0] == np.percentile(values, 25)
+        assert summary['v_p50'].iloc[0] == np.percentile(values, 50)
+
+    def test_exceedances_and_dominant(self):
+        """Test threshold counts and dominant-pollutant frequency per bucket."""
+        dt = 86400 * np.array([0, 0, 0, 1])
+        aqi = np.array([40.0, 120.0, 160.0, 90.0])
+        dominant = np.array([5, 0, 0, 1])
+
+        summary = aggregate(dt, {'aqi': aqi}, tz='UTC', percentiles=(),
+                            thresholds={'aqi': [100, 150]}, dominant=dominant)
+
+        assert summary['aqi_over_100'].tolist() == [2, 0]
+        assert summary['aqi_over_150'].tolist() == [1, 0]
+        assert summary['dominant_pm2_5'].tolist() == [2, 0]
+        assert summary['dominant'].tolist() == ['pm2_5', 'pm10']
+        assert 'aqi_p95' not in summary
+
+    def test_days_above_moderate_per_month(self):
+        """Test rolling daily maxima up into monthly day counts."""
+        dt = 1698796800 + 86400 * np.arange(45)  # From 2023-11-01 UTC
+        aqi = np.where(np.arange(45) % 3 == 0, 120.0, 60.0)
+        daily = aggregate(dt, {'aqi': aqi}, tz='UTC', groups=np.ones(45, dtype=np.int64))
+
+        monthly = reaggregate(daily, 'month', ['aqi_max'], thresholds={'aqi_max': [100]})
+
+        assert [str(s)[:10] for s in monthly['start']] == ['2023-11-01', '2023-12-01']
+        assert monthly['count'].tolist() == [30, 15]
+        assert monthly['aqi_max_over_100'].tolist() == [10, 5]
+
+    def test_empty(self):
+        """Test that no rows give an empty summary."""
+        summary = aggregate([], {'aqi': []}, tz='UTC', groups=[], thresholds={'aqi': [100]})
+
+        assert len(summary) == 0
+        assert {'group', 'start', 'count', 'aqi_max', 'aqi_p95', 'aqi_over_100'} <= set(summary.columns)
+
+
+class TestAggregateReadings:
+    """Test suite for summaries of store readings."""
+
+    def test_overall_aqi_and_pollutants(self):
+        """Test that readings are scored and summarized per cell."""
+        readings = {'cell': np.array([1, 1, 2]), 'dt': np.array([0, 3600, 0])}
+        readings.update((field, np.full(3, 10.0)) for field in POLLUTANT_FIELDS)
+        readings['pm2_5'] = np.array([10.0, 70.0, 10.0])
+
+        summary = aggregate_readings(readings, tz='UTC')
+
+        assert summary['group'].tolist() == [1, 2]
+        assert summary['aqi_max'].iloc[0] == pytest.approx(133.33, abs=0.01)
+        assert summary['aqi_over_100'].tolist() == [1, 0]
+        assert summary['pm2_5_mean'].iloc[0] == 40.0
+        assert summary['dominant_pm2_5'].iloc[0] == 2
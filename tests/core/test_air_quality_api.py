@@ -5,7 +5,7 @@ Test suite for module.core.air_quality_api module.
 import pytest
 from unittest.mock import Mock, patch
 import requests
-from module.core.air_quality_api import read_pollution_data_from_api, convert_json_to_object
+from module.core.air_quality_api import ForecastCache, read_pollution_data_from_api, convert_json_to_object
 from module.core.air_quality_models import AirQualityResponse
 
 
@@ -122,3 +122,29 @@ class TestAirQuality:
         assert result.coord.lat == 42.03
         assert len(result.list) == 2
         assert result.list[0].components.pm2_5 == 15.0
+
+
+class TestForecastCache:
+    """Test suite for the persistent forecast cache."""
+
+    def test_round_trip_by_rounded_coordinate(self, valid_api_response, tmp_path):
+        """Test that nearby coordinates share an entry that survives reopening."""
+        path = str(tmp_path / "forecasts.sqlite")
+        cache = ForecastCache(path)
+        cache.put(42.030001, -93.62, valid_api_response)
+        cache.close()
+        
+        cache = ForecastCache(path)
+        assert cache.get(42.03, -93.620002) == valid_api_response
+        assert cache.get(42.04, -93.62) is None
+        assert len(cache) == 1
+
+    def test_max_age_expires_entries(self, valid_api_response):
+        """Test that entries older than max_age are ignored."""
+        cache = ForecastCache()
+        with patch('module.core.air_quality_api.time.time', return_value=1000.0):
+            cache.put(1.0, 2.0, valid_api_response)
+        
+        with patch('module.core.air_quality_api.time.time', return_value=1500.0):
+            assert cache.get(1.0, 2.0, max_age=600) == valid_api_response
+            assert cache.get(1.0, 2.0, max_age=100) is None
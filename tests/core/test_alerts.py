@@ -0,0 +1,130 @@
+"""
+Test suite for module.core.alerts module.
+"""
+
+import pytest
+from module.core.air_quality_api import convert_json_to_object
+from module.core.alerts import AlertEngine, AlertRule, read_rules
+from tests.forecasts import CLEAN, T0, make_forecast
+
+
+def kinds(alerts):
+    return [(alert.rule_id, alert.kind) for alert in alerts]
+
+
+class TestAlertEngine:
+    """Test suite for AlertEngine."""
+
+    def test_fires_when_crossing_is_within_horizon(self):
+        """Test that a forecast crossing inside the horizon fires with its time and peak."""
+        engine = AlertEngine([AlertRule("near", 80, horizon=6, lat=1.0, lon=2.0),
+                              AlertRule("far", 80, horizon=2, lat=1.0, lon=2.0)])
+        alerts = engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[20, 30, 40, 90, 95, 50]), now=T0)
+        assert kinds(alerts) == [("near", "fired")]
+        assert alerts[0].crossing == T0 + 3 * 3600
+        assert alerts[0].peak == 95.0
+        assert engine.firing(1.0, 2.0) == ["near"]
+
+    def test_revisions_do_not_repeat_an_alert(self):
+        """Test that later forecasts still predicting the crossing emit nothing, even if it moves."""
+        engine = AlertEngine([AlertRule("r", 80, lat=1.0, lon=2.0)])
+        assert kinds(engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[20] * 5 + [90]), now=T0)) == [("r", "fired")]
+        assert engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[20] * 5 + [90]), now=T0 + 60) == []
+        assert engine.update(1.0, 2.0, make_forecast(start=T0 + 3600, base=CLEAN, o3=[20, 95, 20]), now=T0 + 3600) == []
+
+    def test_hysteresis_before_clearing_and_refiring(self):
+        """Test that an alert clears only below threshold - hysteresis, then can fire again."""
+        engine = AlertEngine([AlertRule("r", 80, hysteresis=10, lat=1.0, lon=2.0)])
+        engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[85] * 3), now=T0)
+        assert engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[75] * 3), now=T0 + 1) == []
+        cleared = engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[60] * 3), now=T0 + 2)
+        assert kinds(cleared) == [("r", "cleared")]
+        assert cleared[0].peak == 60.0
+        assert kinds(engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[81] * 3), now=T0 + 3)) == [("r", "fired")]
+
+    def test_pollutant_rule_watches_its_sub_index(self):
+        """Test that a pollutant rule ignores the overall AQI driven by another pollutant."""
+        engine = AlertEngine([AlertRule("o3", 80, metric="o3"), AlertRule("all", 80)])
+        # PM2.5 of 55 µg/m³ gives an overall AQI above 90 while O3 stays at 20
+        alerts = engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[20] * 3, pm2_5=55.0), now=T0)
+        assert kinds(alerts) == [("all", "fired")]
+
+    def test_site_and_global_scopes(self):
+        """Test that site rules only see their cell and global rules see every site."""
+        engine = AlertEngine([AlertRule("site", 50, lat=1.0, lon=2.0), AlertRule("everywhere", 50)])
+        assert kinds(engine.update(3.0, 4.0, make_forecast(base=CLEAN, o3=[60]), now=T0)) == [("everywhere", "fired")]
+        assert sorted(kinds(engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[60]), now=T0))) == [
+            ("everywhere", "fired"), ("site", "fired")]
+        assert engine.firing(3.0, 4.0) == ["everywhere"]
+
+    def test_past_hours_and_stale_revisions_are_ignored(self):
+        """Test that hours before the current one and late older forecasts change nothing."""
+        engine = AlertEngine([AlertRule("r", 80)])
+        late = make_forecast(start=T0 - 5 * 3600, base=CLEAN, o3=[90, 90, 20, 20, 20, 20, 20])
+        assert engine.update(1.0, 2.0, late, now=T0) == []
+        assert engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[90]), now=T0 - 60) == []
+
+    def test_observations_fire_but_do_not_clear(self):
+        """Test that measured values can start an episode but not end one."""
+        engine = AlertEngine([AlertRule("r", 80)])
+        observed = engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[90]), now=T0, observation=True)
+        assert kinds(observed) == [("r", "fired")]
+        assert engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[10]), now=T0 + 60, observation=True) == []
+        assert kinds(engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[10] * 3), now=T0 + 60)) == [("r", "cleared")]
+
+    def test_objects_and_json_agree(self):
+        """Test that AirQualityResponse, AirQualityData and raw JSON evaluate the same."""
+        forecast = make_forecast(base=CLEAN, o3=[20, 90])
+        response = convert_json_to_object(forecast)
+        for data in (forecast, response, response.list, response.list[1]):
+            engine = AlertEngine([AlertRule("r", 80)])
+            assert kinds(engine.update(1.0, 2.0, data, now=T0)) == [("r", "fired")]
+
+    def test_rule_changes_keep_firing_state(self):
+        """Test that adding and removing rules keeps other episodes firing; replacing one restarts it."""
+        engine = AlertEngine([AlertRule("a", 80), AlertRule("b", 50)])
+        engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[90]), now=T0)
+        engine.add_rule(AlertRule("c", 10))
+        engine.remove_rule("a")
+        assert len(engine) == 2
+        assert engine.firing(1.0, 2.0) == ["b"]
+        assert kinds(engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[90]), now=T0 + 1)) == [("c", "fired")]
+
+        engine.add_rule(AlertRule("b", 60))
+        assert engine.firing(1.0, 2.0) == ["c"]
+        assert kinds(engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[90]), now=T0 + 2)) == [("b", "fired")]
+
+    def test_rules_added_one_at_a_time_sort_once(self):
+        """Test that single-rule adds defer sorting and firing state is kept per firing rule only."""
+        engine = AlertEngine()
+        for i in range(1000):
+            engine.add_rule(AlertRule(f"r{i}", float(1000 - i)))
+        group = engine._groups[None]
+        assert group._stale
+
+        fired = engine.update(1.0, 2.0, make_forecast(base=CLEAN, o3=[90]), now=T0)
+
+        assert sorted(alert.threshold for alert in fired) == [float(t) for t in range(1, 91)]
+        assert group.thresholds.tolist() == sorted(group.thresholds.tolist())
+        assert list(group.active.values()) == [{f"r{1000 - t}" for t in range(1, 91)}]
+        engine.remove_rule("r999")
+        assert "r999" not in engine.firing(1.0, 2.0) and len(engine.firing(1.0, 2.0)) == 89
+
+    def test_invalid_rules_rejected(self):
+        """Test that unknown metrics and half-given coordinates raise ValueError."""
+        with pytest.raises(ValueError):
+            AlertEngine([AlertRule("r", 80, metric="pm25")])
+        with pytest.raises(ValueError):
+            AlertEngine([AlertRule("r", 80, lat=1.0)])
+
+    def test_read_rules(self, tmp_path):
+        """Test that rules load from CSV with optional columns left blank."""
+        path = tmp_path / "rules.csv"
+        path.write_text("rule_id,threshold,metric,horizon,lat,lon\n"
+                        "1,151,overall,24,42.03,-93.62\n"
+                        "smoke,100,pm2_5,,,\n")
+        rules = read_rules(str(path))
+        assert rules == [
+            AlertRule("1", 151.0, "overall", 24.0, lat=42.03, lon=-93.62),
+            AlertRule("smoke", 100.0, "pm2_5"),
+        ]
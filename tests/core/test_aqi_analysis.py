@@ -0,0 +1,228 @@
+"""
+Test suite for module.core.aqi_analysis module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime
+import numpy as np
+from module.core.aqi_analysis import (
+    AQI_CATEGORY_LABELS,
+    IncrementalAnalyzer,
+    analyze_air_quality,
+    analyze_air_quality_many,
+    categorize_aqi,
+    update_analysis
+)
+from module.core.aqi_calculators import calculate_all_aqi_batch, calculate_all_aqi_values
+
+
+def make_item(dt, pm2_5=5.0, pm10=15.0, no2=20.0, so2=10.0, co=300.0, o3=40.0):
+    """Mock AirQualityData entry."""
+    item = Mock()
+    item.dt = dt
+    item.components = Mock(pm2_5=pm2_5, pm10=pm10, no2=no2, so2=so2, co=co, o3=o3)
+    return item
+
+
+@pytest.fixture
+def forecast():
+    """Three timestamps: good, moderate (PM10-driven) and unhealthy (O3-driven)."""
+    return [
+        make_item(1700000000),
+        make_item(1700003600, pm10=75.0),
+        make_item(1700007200, o3=150.0)
+    ]
+
+
+class TestCategorizeAQI:
+    """Test suite for vectorized category lookup."""
+
+    def test_boundaries_match_get_aqi_category(self):
+        """Test that category upper bounds are inclusive like get_aqi_category."""
+        values = [0, 50, 50.01, 100, 150, 200, 300, 300.5, 600]
+        
+        labels = AQI_CATEGORY_LABELS[categorize_aqi(values)].tolist()
+        
+        assert labels == [
+            'Good', 'Good', 'Moderate', 'Moderate', 'Unhealthy for Sensitive Groups',
+            'Unhealthy', 'Very Unhealthy', 'Hazardous', 'Hazardous'
+        ]
+
+
+class TestAnalyzeAirQuality:
+    """Test suite for analyze_air_quality."""
+
+    def test_shapes(self, forecast):
+        """Test that every array has one row per timestamp."""
+        analysis = analyze_air_quality(forecast)
+        
+        assert len(analysis) == 3
+        assert analysis.sub_indices.shape == (3, 6)
+        assert analysis.concentrations.shape == (3, 6)
+        for name in ('timestamps', 'max_aqi', 'dominant', 'category', 'labels', 'colors'):
+            assert getattr(analysis, name).shape == (3,)
+
+    def test_sub_indices_match_scalar_calculator(self, forecast):
+        """Test that each row equals calculate_all_aqi_values for that timestamp."""
+        analysis = analyze_air_quality(forecast)
+        
+        for row, item in zip(analysis.sub_indices, forecast):
+            assert row.tolist() == calculate_all_aqi_values(item.components)
+
+    def test_max_dominant_and_category(self, forecast):
+        """Test overall AQI, dominant pollutant and category per timestamp."""
+        analysis = analyze_air_quality(forecast)
+        
+        assert analysis.max_aqi.tolist() == [row.max() for row in analysis.sub_indices]
+        assert analysis.dominant_pollutants.tolist()[1:] == ['PM10', 'O3']
+        assert analysis.labels.tolist() == ['Good', 'Moderate', 'Unhealthy']
+        assert analysis.colors[2] == '#ff0000'
+
+    def test_dates_are_local_datetimes(self, forecast):
+        """Test that dates are tz-aware and show the previous fromtimestamp wall time."""
+        analysis = analyze_air_quality(forecast)
+        
+        assert analysis.dates.tz is not None
+        assert analysis.dates[0].tz_localize(None) == datetime.fromtimestamp(1700000000)
+        assert analysis.timestamps.dtype == np.int64
+
+    def test_result_is_immutable(self, forecast):
+        """Test that neither fields nor arrays can be modified."""
+        analysis = analyze_air_quality(forecast)
+        
+        with pytest.raises(AttributeError):
+            analysis.max_aqi = None
+        with pytest.raises(ValueError):
+            analysis.max_aqi[0] = 0
+
+    def test_empty_forecast(self):
+        """Test that an empty list gives an empty analysis."""
+        analysis = analyze_air_quality([])
+        
+        assert len(analysis) == 0
+        assert analysis.sub_indices.shape == (0, 6)
+
+
+class TestAnalyzeAirQualityMany:
+    """Test suite for batch analysis of several forecasts."""
+
+    def test_matches_individual_analysis(self, forecast):
+        """Test that each result equals analyzing that forecast alone."""
+        other = [make_item(1700000000, pm2_5=80.0), make_item(1700003600, so2=300.0)]
+        
+        many = analyze_air_quality_many([forecast, other, []])
+        
+        assert [len(a) for a in many] == [3, 2, 0]
+        for result, items in zip(many, [forecast, other]):
+            single = analyze_air_quality(items)
+            assert np.array_equal(result.sub_indices, single.sub_indices)
+            assert np.array_equal(result.category, single.category)
+            assert result.dates.equals(single.dates)
+
+    def test_single_batch_call(self, forecast):
+        """Test that all series are scored by one batch-engine call."""
+        with patch('module.core.aqi_analysis.calculate_all_aqi_batch',
+                   wraps=calculate_all_aqi_batch) as mock_batch:
+            analyze_air_quality_many([forecast, forecast, forecast])
+        
+        mock_batch.assert_called_once()
+        assert mock_batch.call_args.args[0].shape == (9, 6)
+
+    def test_results_are_read_only(self, forecast):
+        """Test that per-series views cannot be modified."""
+        result = analyze_air_quality_many([forecast, forecast])[1]
+        
+        with pytest.raises(ValueError):
+            result.max_aqi[0] = 0
+
+
+def refresh():
+    """Next hour's forecast: first hour dropped, O3 revised at the second, one hour added."""
+    return [
+        make_item(1700003600, pm10=75.0),
+        make_item(1700007200, o3=210.0),
+        make_item(1700010800, pm2_5=70.0)
+    ]
+
+
+class TestUpdateAnalysis:
+    """Test suite for incremental re-analysis of a refreshed forecast."""
+
+    def test_equals_full_analysis(self, forecast):
+        """Test that every field matches analyzing the refreshed forecast from scratch."""
+        new = refresh()
+        
+        analysis, _ = update_analysis(analyze_air_quality(forecast), new)
+        
+        full = analyze_air_quality(new)
+        for name in ('timestamps', 'concentrations', 'sub_indices', 'max_aqi', 'dominant', 'category'):
+            assert np.array_equal(getattr(analysis, name), getattr(full, name)), name
+        assert analysis.dates.equals(full.dates)
+        assert analysis.dates.dtype == full.dates.dtype
+        with pytest.raises(ValueError):
+            analysis.max_aqi[0] = 0
+
+    def test_diff(self, forecast):
+        """Test added, changed, removed and recategorized timestamps and the summary."""
+        _, diff = update_analysis(analyze_air_quality(forecast), refresh())
+        
+        assert diff.added.tolist() == [1700010800]
+        assert diff.changed.tolist() == [1700007200]
+        assert diff.removed.tolist() == [1700000000]
+        assert diff.unchanged == 1
+        assert diff.rescored == 2
+        assert diff.recategorized.tolist() == [1700007200]  # Unhealthy -> Very Unhealthy
+        summary = diff.summary()
+        assert summary['added_range'] == [1700010800, 1700010800]
+        assert summary['changed_dt'] == [1700007200]
+        assert summary['max_aqi_delta'] == pytest.approx(diff.max_aqi_delta)
+        assert diff.max_aqi_delta > 0
+
+    def test_only_new_or_revised_rows_are_scored(self, forecast):
+        """Test that unchanged timestamps skip the batch engine."""
+        previous = analyze_air_quality(forecast)
+        with patch('module.core.aqi_analysis.calculate_all_aqi_batch',
+                   wraps=calculate_all_aqi_batch) as mock_batch:
+            update_analysis(previous, refresh())
+            _, diff = update_analysis(previous, list(forecast))
+        
+        mock_batch.assert_called_once()
+        assert mock_batch.call_args.args[0].shape == (2, 6)
+        assert not diff
+        assert diff.unchanged == 3
+
+    def test_without_previous(self, forecast):
+        """Test that no previous analysis scores everything as added."""
+        analysis, diff = update_analysis(None, forecast)
+        
+        assert np.array_equal(analysis.max_aqi, analyze_air_quality(forecast).max_aqi)
+        assert diff.added.tolist() == [item.dt for item in forecast]
+        assert len(diff.removed) == 0
+
+
+class TestIncrementalAnalyzer:
+    """Test suite for the per-location incremental analysis cache."""
+
+    def test_updates_from_previous_analysis(self, forecast):
+        """Test that a second forecast for a key is diffed against the first."""
+        analyzer = IncrementalAnalyzer()
+        analyzer.analyze('a', forecast)
+        
+        _, diff = analyzer.analyze('a', refresh())
+        
+        assert analyzer.last_diff('a') is diff
+        assert diff.unchanged == 1
+        assert (analyzer.rescored, analyzer.reused) == (5, 1)
+
+    def test_evicts_least_recently_analyzed(self, forecast):
+        """Test the max_entries bound and clear."""
+        analyzer = IncrementalAnalyzer(max_entries=2)
+        for key in ('a', 'b', 'a', 'c'):
+            analyzer.analyze(key, forecast)
+        
+        assert len(analyzer) == 2
+        assert analyzer.last_diff('b') is None
+        assert analyzer.last_diff('a').unchanged == 3
+        analyzer.clear()
+        assert len(analyzer) == 0
@@ -4,7 +4,17 @@ Test suite for module.core.aqi_calculators module.
 
 import pytest
 from unittest.mock import Mock
-from module.core.aqi_calculators import calculate_all_aqi_values
+import numpy as np
+from module.core.aqi_calculators import (
+    AQI_SEGMENTS,
+    POLLUTANT_FIELDS,
+    POLLUTANT_NAMES,
+    calculate_all_aqi_values,
+    calculate_all_aqi_batch,
+    calculate_aqi_array,
+    components_to_array,
+    PM25, PM10, NO2, SO2, CO, O3
+)
 
 
 @pytest.fixture
@@ -234,3 +244,49 @@ class TestAQICalculators:
         # Should have mix of good and unhealthy values
         assert min(result) < 50      # At least one good
         assert max(result) > 100     # At least one unhealthy
+
+
+class TestBatchEngine:
+    """Test suite for the vectorized AQI engine."""
+
+    @pytest.mark.parametrize("field,scalar", [
+        ('pm2_5', PM25), ('pm10', PM10), ('no2', NO2),
+        ('so2', SO2), ('co', CO), ('o3', O3)
+    ])
+    def test_matches_scalar_functions(self, field, scalar):
+        """Test that every segment, boundary, cap and rounding matches the scalar code."""
+        upper = np.array(AQI_SEGMENTS[field][0], dtype=float)
+        if field == 'co':
+            upper = upper * 1000.0
+        values = np.concatenate([
+            np.linspace(0, upper[-1] * 1.2, 997),
+            upper,
+            upper + 0.01
+        ])
+        
+        expected = [scalar(v) for v in values]
+        
+        assert calculate_aqi_array(field, values).tolist() == pytest.approx(expected, abs=1e-9)
+        
+        # Realistic 2-decimal readings round exactly as round() does
+        readings = (np.random.default_rng(0).random(50000) * upper[-1] * 1.1).round(2)
+        assert calculate_aqi_array(field, readings).tolist() == [scalar(v) for v in readings.tolist()]
+        assert calculate_aqi_array('pm10', 496.62) == PM10(496.62) == 483.27
+
+    def test_batch_matches_calculate_all_aqi_values(self, mock_components_moderate):
+        """Test that one batch row equals the scalar list for the same components."""
+        concentrations = components_to_array([mock_components_moderate])
+        
+        result = calculate_all_aqi_batch(concentrations)
+        
+        assert result.shape == (1, 6)
+        assert result[0].tolist() == calculate_all_aqi_values(mock_components_moderate)
+
+    def test_batch_of_empty_input(self):
+        """Test that an empty batch yields an empty (0, 6) array."""
+        assert calculate_all_aqi_batch(np.zeros((0, 6))).shape == (0, 6)
+
+    def test_column_order_matches_pollutant_names(self):
+        """Test that column order follows POLLUTANT_NAMES."""
+        assert POLLUTANT_NAMES == ['PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3']
+        assert POLLUTANT_FIELDS == ['pm2_5', 'pm10', 'no2', 'so2', 'co', 'o3']
@@ -0,0 +1,31 @@
+"""
+Test suite for module.core.background module.
+"""
+
+import threading
+from module.core.background import run_in_background
+
+
+class TestRunInBackground:
+    """Test suite for the shared background pool."""
+
+    def test_returns_result_via_future(self):
+        """Test that the future resolves to the function's return value."""
+        future = run_in_background(lambda a, b=0: a + b, 2, b=3)
+        
+        assert future.result(timeout=5) == 5
+
+    def test_runs_off_the_calling_thread(self):
+        """Test that work executes on a pool thread, not the caller."""
+        future = run_in_background(threading.current_thread)
+        
+        assert future.result(timeout=5) is not threading.current_thread()
+
+    def test_overlaps_with_caller_work(self):
+        """Test that the caller can proceed while the task is blocked."""
+        release = threading.Event()
+        future = run_in_background(release.wait, 5)
+        
+        assert not future.done()
+        release.set()
+        assert future.result(timeout=5) is True
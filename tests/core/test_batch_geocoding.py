@@ -0,0 +1,158 @@
+"""
+Test suite for module.core.batch_geocoding module.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+import pandas as pd
+import requests
+from module.core.batch_geocoding import (
+    GeocodeCheckpoint,
+    deduplicate_locations,
+    geocode_batch,
+    read_location_names,
+    write_geocode_results
+)
+from module.core.geocoding import GeocodingCache
+
+
+def fake_search(location_name, session=None):
+    """Deterministic stand-in for Nominatim."""
+    if location_name.lower().startswith("nowhere"):
+        return (None, None), None
+    return (float(len(location_name)), 1.0), f"{location_name} (resolved)"
+
+
+class TestReadAndDeduplicate:
+    """Test suite for input parsing and deduplication."""
+
+    def test_read_text_file_skips_blank_lines(self, tmp_path):
+        """Test that text input yields one stripped name per non-empty line."""
+        path = tmp_path / "names.txt"
+        path.write_text("Ames, IA\n\n  Paris  \n")
+        
+        assert read_location_names(str(path)) == ["Ames, IA", "Paris"]
+
+    def test_read_csv_prefers_location_column(self, tmp_path):
+        """Test that CSV input uses the 'location' column when present."""
+        path = tmp_path / "sites.csv"
+        pd.DataFrame({'id': [1, 2], 'location': ['Ames', 'Paris']}).to_csv(path, index=False)
+        
+        assert read_location_names(str(path)) == ['Ames', 'Paris']
+
+    def test_read_csv_with_explicit_column(self, tmp_path):
+        """Test that an explicit column name is honored."""
+        path = tmp_path / "sites.csv"
+        pd.DataFrame({'site': ['Ames', None], 'city': ['Tokyo', 'Oslo']}).to_csv(path, index=False)
+        
+        assert read_location_names(str(path), column='city') == ['Tokyo', 'Oslo']
+
+    def test_deduplicate_keeps_first_spelling(self):
+        """Test that names differing only in case/whitespace collapse."""
+        names = ["Ames, IA", "ames,  ia", "Paris", "PARIS", "Oslo"]
+        
+        assert deduplicate_locations(names) == ["Ames, IA", "Paris", "Oslo"]
+
+
+class TestGeocodeBatch:
+    """Test suite for concurrent batch geocoding."""
+
+    @patch('module.core.geocoding.search_nominatim', side_effect=fake_search)
+    def test_results_follow_unique_input_order(self, mock_search):
+        """Test that output rows are deduplicated and in input order."""
+        rows, stats = geocode_batch(["B", "Aa", "b", "Ccc"], workers=3, backoff=0)
+        
+        assert [r['location'] for r in rows] == ["B", "Aa", "Ccc"]
+        assert rows[1]['lat'] == 2.0
+        assert stats['total'] == 3
+        assert stats['done'] == 3
+        assert mock_search.call_count == 3
+
+    @patch('module.core.geocoding.search_nominatim', side_effect=fake_search)
+    def test_cache_hits_skip_network(self, mock_search):
+        """Test that cached names are counted and not re-queried."""
+        cache = GeocodingCache()
+        cache.put("Paris", ((48.0, 2.0), "Paris, France"))
+        
+        rows, stats = geocode_batch(["Paris", "Oslo"], cache=cache, backoff=0)
+        
+        assert stats['cached'] == 1
+        assert mock_search.call_count == 1
+        assert rows[0]['display_name'] == "Paris, France"
+
+    @patch('module.core.geocoding.search_nominatim', side_effect=fake_search)
+    def test_not_found_rows_are_kept(self, mock_search):
+        """Test that definitive misses produce rows with empty coordinates."""
+        rows, stats = geocode_batch(["Nowhere"], backoff=0)
+        
+        assert rows == [{'location': 'Nowhere', 'lat': None, 'lon': None, 'display_name': None}]
+        assert stats['failed'] == 0
+
+    def test_network_failures_are_retried_then_skipped(self, tmp_path, capsys):
+        """Test that names failing every retry are left for the next run and reported, not printed."""
+        checkpoint = GeocodeCheckpoint(str(tmp_path / "out.checkpoint"))
+        with patch('module.core.geocoding.search_nominatim') as mock_search:
+            mock_search.side_effect = requests.exceptions.ConnectionError("down")
+            
+            rows, stats = geocode_batch(["Paris"], checkpoint=checkpoint, retries=2, backoff=0)
+        checkpoint.close()
+        
+        assert rows == []
+        assert stats['failed'] == 1
+        assert stats['errors'] == [("Paris", "Error fetching coordinates: down")]
+        assert capsys.readouterr().out == ""
+        assert mock_search.call_count == 3
+        assert checkpoint.load() == {}
+
+    def test_resume_skips_checkpointed_rows(self, tmp_path):
+        """Test that a rerun reuses checkpointed rows without any lookup."""
+        path = tmp_path / "out.checkpoint"
+        row = {'location': 'Paris', 'lat': 48.0, 'lon': 2.0, 'display_name': 'Paris, France'}
+        path.write_text(json.dumps(row) + "\n" + '{"location": "Osl')  # Truncated by a kill
+        
+        with patch('module.core.geocoding.search_nominatim', side_effect=fake_search) as mock_search:
+            rows, stats = geocode_batch(
+                ["Paris", "Oslo"], checkpoint=GeocodeCheckpoint(str(path)), backoff=0
+            )
+        
+        assert stats['resumed'] == 1
+        assert mock_search.call_count == 1
+        assert mock_search.call_args[0][0] == "Oslo"
+        assert [r['location'] for r in rows] == ["Paris", "Oslo"]
+
+    @patch('module.core.geocoding.search_nominatim', side_effect=fake_search)
+    def test_progress_reports_each_row(self, mock_search):
+        """Test that the progress callback sees the final totals."""
+        reports = []
+        
+        geocode_batch(["A", "B"], progress=reports.append, backoff=0)
+        
+        assert len(reports) == 2
+        assert reports[-1]['done'] == 2
+
+
+class TestWriteResults:
+    """Test suite for result output."""
+
+    def test_write_csv(self, tmp_path):
+        """Test CSV output columns and values."""
+        path = str(tmp_path / "out.csv")
+        write_geocode_results([{'location': 'A', 'lat': 1.0, 'lon': 2.0, 'display_name': 'A!'}], path)
+        
+        frame = pd.read_csv(path)
+        assert list(frame.columns) == ['location', 'lat', 'lon', 'display_name']
+        assert frame.loc[0, 'lat'] == 1.0
+
+    def test_write_parquet(self, tmp_path):
+        """Test Parquet output round-trips."""
+        pytest.importorskip("pyarrow")
+        path = str(tmp_path / "out.parquet")
+        write_geocode_results([{'location': 'A', 'lat': 1.0, 'lon': 2.0, 'display_name': 'A!'}], path)
+        
+        assert pd.read_parquet(path).loc[0, 'display_name'] == 'A!'
+
+    def test_unsupported_extension_rejected(self, tmp_path):
+        """Test that unknown output formats raise ValueError."""
+        with pytest.raises(ValueError):
+            write_geocode_results([], str(tmp_path / "out.xlsx"))
@@ -0,0 +1,191 @@
+"""
+Test suite for module.core.batch_report module.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from unittest.mock import patch
+import pandas as pd
+import requests
+from module.core.air_quality_api import ForecastCache, convert_json_to_object
+from module.core.aqi_calculators import calculate_all_aqi_values
+from module.core.batch_report import (
+    REPORT_COLUMNS,
+    ReportWriter,
+    fetch_forecast,
+    render_chunk,
+    run_batch_report,
+    score_forecasts
+)
+from tests.forecasts import site_forecast
+
+
+def make_location(name, lat, lon=0.0):
+    return {'location': name, 'display_name': f"{name} (resolved)", 'lat': lat, 'lon': lon}
+
+
+class FakeAPI:
+    """Thread-safe stand-in for read_pollution_data_from_api."""
+
+    def __init__(self, failing=(), malformed=()):
+        self.failing = set(failing)
+        self.malformed = set(malformed)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, lat, lon, session=None):
+        with self._lock:
+            self.calls.append((lat, lon))
+        if lat in self.failing:
+            raise requests.exceptions.ConnectionError("down")
+        forecast = site_forecast(lat)
+        if lat in self.malformed:
+            del forecast['list'][1]['components']['pm10']
+        return forecast
+
+
+class TestScoring:
+    """Test suite for chunk scoring."""
+
+    def test_rows_match_per_item_calculation(self):
+        """Test that batch scoring agrees with calculate_all_aqi_values."""
+        chunk = [(make_location('A', 10.0), site_forecast(10.0)), (make_location('B', 90.0), site_forecast(90.0, 2))]
+        
+        frame = score_forecasts(chunk)
+        
+        assert list(frame.columns) == REPORT_COLUMNS
+        assert frame['location'].tolist() == ['A', 'A', 'A', 'B', 'B']
+        expected = [
+            round(max(calculate_all_aqi_values(item.components)), 1)
+            for _, forecast in chunk for item in convert_json_to_object(forecast).list
+        ]
+        assert frame['aqi'].tolist() == pytest.approx(expected)
+        assert str(frame['time'].dt.tz) == 'UTC'
+        assert frame['dominant_pollutant'].iloc[-1] == 'O3'
+
+    def test_csv_rendering_has_no_header(self):
+        """Test that CSV chunks are header-less text with one line per row."""
+        text = render_chunk([(make_location('A', 10.0), site_forecast(10.0))], '.csv')
+        
+        assert text.count('\n') == 3
+        assert not text.startswith('location')
+
+
+class TestReportWriter:
+    """Test suite for streaming output."""
+
+    @pytest.mark.parametrize("ext", ['.csv', '.parquet'])
+    def test_chunks_are_appended_and_moved_into_place(self, tmp_path, ext):
+        """Test that several chunks end up in one file with one header."""
+        path = str(tmp_path / f"report{ext}")
+        chunks = [[(make_location(n, lat), site_forecast(lat))] for n, lat in (('A', 1.0), ('B', 2.0))]
+        
+        with ReportWriter(path) as writer:
+            for chunk in chunks:
+                writer.write(render_chunk(chunk, ext))
+            assert not (tmp_path / f"report{ext}").exists()
+        
+        frame = pd.read_csv(path) if ext == '.csv' else pd.read_parquet(path)
+        assert writer.rows == len(frame) == 6
+        assert list(frame.columns) == REPORT_COLUMNS
+        assert frame['location'].tolist() == ['A'] * 3 + ['B'] * 3
+
+    def test_error_discards_partial_file(self, tmp_path):
+        """Test that an exception leaves neither output nor temp file."""
+        path = tmp_path / "report.csv"
+        with pytest.raises(RuntimeError):
+            with ReportWriter(str(path)) as writer:
+                writer.write(render_chunk([(make_location('A', 1.0), site_forecast(1.0))], '.csv'))
+                raise RuntimeError("boom")
+        
+        assert list(tmp_path.iterdir()) == []
+
+    def test_rejects_unknown_format(self, tmp_path):
+        """Test that unsupported extensions fail early."""
+        with pytest.raises(ValueError):
+            ReportWriter(str(tmp_path / "report.xlsx"))
+
+
+class TestFetchForecast:
+    """Test suite for cached, retried forecast fetches."""
+
+    def test_cache_hit_skips_network(self):
+        """Test that a cached forecast is returned without a request."""
+        cache = ForecastCache()
+        api = FakeAPI()
+        with patch('module.core.batch_report.read_pollution_data_from_api', side_effect=api):
+            assert fetch_forecast(5.0, 0.0, cache=cache) == (site_forecast(5.0), False)
+            assert fetch_forecast(5.0, 0.0, cache=cache) == (site_forecast(5.0), True)
+        assert len(api.calls) == 1
+
+    def test_retries_then_raises(self):
+        """Test that network errors are retried before giving up."""
+        api = FakeAPI(failing={5.0})
+        with patch('module.core.batch_report.read_pollution_data_from_api', side_effect=api):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                fetch_forecast(5.0, 0.0, retries=2, backoff=0)
+        assert len(api.calls) == 3
+
+    def test_api_error_is_not_cached(self):
+        """Test that an error payload raises and is not stored."""
+        cache = ForecastCache()
+        with patch('module.core.batch_report.read_pollution_data_from_api',
+                   return_value={"cod": 401, "message": "Invalid API key"}):
+            with pytest.raises(ValueError, match="Invalid API key"):
+                fetch_forecast(5.0, 0.0, cache=cache)
+        assert len(cache) == 0
+
+
+class TestRunBatchReport:
+    """Test suite for the fetch -> score -> write pipeline."""
+
+    @pytest.mark.parametrize("processes", [0, 2])
+    def test_pipeline_dedupes_coordinates_and_reports_failures(self, tmp_path, processes):
+        """Test a run with a shared coordinate and a failing location."""
+        locations = [make_location(f"L{i}", float(i)) for i in range(7)]
+        locations.append(make_location('Same as L1', 1.00001))
+        api = FakeAPI(failing={3.0})
+        updates = []
+        path = str(tmp_path / "report.csv")
+        
+        with patch('module.core.batch_report.read_pollution_data_from_api', side_effect=api):
+            with ReportWriter(path) as writer:
+                stats = run_batch_report(locations, writer, workers=3, processes=processes,
+                                         chunk_size=2, progress=updates.append, retries=0)
+        
+        assert len(api.calls) == 7
+        assert stats == {'total': 8, 'fetched': 7, 'cached': 0, 'failed': 1, 'written': 7, 'rows': 21}
+        assert updates[-1] == stats
+        frame = pd.read_csv(path)
+        assert sorted(set(frame['location'])) == ['L0', 'L1', 'L2', 'L4', 'L5', 'L6', 'Same as L1']
+        assert (frame.groupby('location')['time'].apply(lambda t: t.is_monotonic_increasing)).all()
+
+    def test_scoring_processes_are_spawned(self, tmp_path):
+        """Test that scoring workers are spawned, not forked from a process running fetch threads."""
+        locations = [make_location(f"L{i}", float(i)) for i in range(3)]
+        
+        with patch('module.core.batch_report.read_pollution_data_from_api', side_effect=FakeAPI()), \
+             patch('module.core.batch_report.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as mock_pool:
+            with ReportWriter(str(tmp_path / "report.csv")) as writer:
+                stats = run_batch_report(locations, writer, workers=2, processes=1, retries=0)
+        
+        assert mock_pool.call_args.kwargs['mp_context'].get_start_method() == 'spawn'
+        assert stats['written'] == 3
+
+    @pytest.mark.parametrize("processes", [0, 2])
+    @pytest.mark.parametrize("ext", ['.csv', '.parquet'])
+    def test_malformed_forecast_fails_only_its_location(self, tmp_path, processes, ext, caplog):
+        """Test that a reading missing a pollutant is recorded as failed and the run goes on."""
+        locations = [make_location(f"L{i}", float(i)) for i in range(5)]
+        api = FakeAPI(malformed={2.0})
+        path = str(tmp_path / f"report{ext}")
+        
+        with patch('module.core.batch_report.read_pollution_data_from_api', side_effect=api):
+            with ReportWriter(path) as writer:
+                stats = run_batch_report(locations, writer, workers=2, processes=processes, chunk_size=2, retries=0)
+        
+        assert stats == {'total': 5, 'fetched': 5, 'cached': 0, 'failed': 1, 'written': 4, 'rows': 12}
+        frame = pd.read_csv(path) if ext == '.csv' else pd.read_parquet(path)
+        assert sorted(set(frame['location'])) == ['L0', 'L1', 'L3', 'L4']
+        assert "L2: Malformed forecast: KeyError: 'pm10'" in caplog.text
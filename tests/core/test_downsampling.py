@@ -0,0 +1,123 @@
+"""
+Test suite for module.core.downsampling module.
+"""
+
+import pytest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from module.core.aqi_analysis import categorize_aqi
+from module.core.downsampling import (
+    downsample_indices,
+    lttb_indices,
+    target_points,
+    window_slice
+)
+
+
+def hourly(n, start='2024-01-01'):
+    """Hourly DatetimeIndex of length n."""
+    return pd.date_range(start, periods=n, freq='h')
+
+
+def random_walk(n, seed=0):
+    """AQI-like series wandering through several categories."""
+    rng = np.random.default_rng(seed)
+    return np.clip(80 + np.cumsum(rng.normal(0, 4, n)), 0, 450)
+
+
+class TestTargetPoints:
+    """Test suite for pixel-width based bucket counts."""
+
+    def test_one_bucket_per_pixel(self):
+        """Test that the bucket count follows the plot width."""
+        assert target_points(800) == 800
+
+    def test_none_disables_downsampling(self):
+        """Test that None means plot every point."""
+        assert target_points(None) is None
+
+
+class TestLTTB:
+    """Test suite for Largest-Triangle-Three-Buckets selection."""
+
+    def test_short_series_kept(self):
+        """Test that series no longer than n_out are returned whole."""
+        assert list(lttb_indices(np.arange(5), np.arange(5), 10)) == [0, 1, 2, 3, 4]
+
+    def test_keeps_endpoints_and_count(self):
+        """Test that exactly n_out sorted indices including both ends are chosen."""
+        idx = lttb_indices(np.arange(1000), random_walk(1000), 100)
+
+        assert len(idx) == 100
+        assert idx[0] == 0 and idx[-1] == 999
+        assert np.all(np.diff(idx) > 0)
+
+    def test_picks_spike(self):
+        """Test that an isolated spike wins its bucket."""
+        y = np.zeros(1000)
+        y[437] = 100.0
+
+        assert 437 in lttb_indices(np.arange(1000), y, 50)
+
+
+class TestDownsampleIndices:
+    """Test suite for peak- and category-preserving downsampling."""
+
+    def test_output_bounded_by_width(self):
+        """Test that the number of points does not grow with the series."""
+        for n in (10_000, 100_000):
+            idx = downsample_indices(hourly(n), random_walk(n), 500)
+            assert len(idx) <= 3 * 500
+
+    def test_keeps_global_peak(self):
+        """Test that the series maximum is always kept."""
+        values = random_walk(20_000)
+        values[12345] = 499.0
+
+        idx = downsample_indices(hourly(20_000), values, 200)
+
+        assert 12345 in idx
+
+    def test_preserves_every_category_reached(self):
+        """Test that each category present in the series appears in the output."""
+        values = random_walk(50_000, seed=3)
+        # Short excursions that LTTB alone could step over
+        values[1000] = 160.0
+        values[30000] = 10.0
+
+        idx = downsample_indices(hourly(50_000), values, 300)
+
+        assert set(categorize_aqi(values[idx])) == set(categorize_aqi(values))
+
+    def test_disabled_returns_all(self):
+        """Test that n_out=None keeps every point."""
+        assert len(downsample_indices(hourly(50), random_walk(50), None)) == 50
+
+    def test_accepts_datetime_list(self):
+        """Test that plain lists of datetimes are accepted."""
+        dates = list(hourly(1000).to_pydatetime())
+
+        idx = downsample_indices(dates, random_walk(1000), 100)
+
+        assert idx[0] == 0 and idx[-1] == 999
+
+
+class TestWindowSlice:
+    """Test suite for zoom window selection."""
+
+    def test_inclusive_bounds(self):
+        """Test that both window ends are included."""
+        dates = hourly(48)
+
+        window = window_slice(dates, datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 20))
+
+        assert (window.start, window.stop) == (10, 21)
+
+    def test_naive_bounds_on_tz_aware_index(self):
+        """Test that naive bounds are interpreted in the index timezone."""
+        dates = hourly(48).tz_localize('UTC')
+
+        window = window_slice(dates, datetime(2024, 1, 2), datetime(2024, 1, 2, 5))
+
+        assert (window.start, window.stop) == (24, 30)
@@ -0,0 +1,106 @@
+"""
+Test suite for module.core.figure_cache module.
+"""
+
+import json
+import pytest
+import numpy as np
+import plotly.graph_objects as go
+from module.core.figure_cache import FigureCache, figure_from_json, fingerprint
+
+
+class TestFingerprint:
+    """Test suite for content-addressed keys."""
+
+    def test_equal_content_equal_key(self):
+        """Test that keys depend on content, not object identity."""
+        a = np.arange(10, dtype=float)
+
+        assert fingerprint(a, name='x') == fingerprint(a.copy(), name='x')
+        assert fingerprint([0.0, 1.0], name='x') == fingerprint(np.array([0.0, 1.0]), name='x')
+
+    def test_data_and_params_change_key(self):
+        """Test that any change in values, dtype or parameters changes the key."""
+        a = np.arange(10, dtype=float)
+        b = a.copy()
+        b[3] = 99.0
+
+        keys = {
+            fingerprint(a, name='x'),
+            fingerprint(b, name='x'),
+            fingerprint(a.astype(np.float32), name='x'),
+            fingerprint(a, name='y'),
+            fingerprint(a, None, name='x'),
+        }
+        assert len(keys) == 5
+
+
+class TestFigureCache:
+    """Test suite for the LRU figure JSON cache."""
+
+    def test_get_or_build_builds_once(self):
+        """Test that the figure is built on the first call only."""
+        cache = FigureCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return go.Figure(go.Scatter(x=[1, 2], y=[3, 4]))
+
+        first = cache.get_or_build('k', build)
+        second = cache.get_or_build('k', build)
+
+        assert first == second
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used_within_budget(self):
+        """Test that the byte budget is enforced by evicting the oldest entry."""
+        cache = FigureCache(max_bytes=25)
+        cache.put('a', 'x' * 10)
+        cache.put('b', 'x' * 10)
+        cache.get('a')  # 'b' is now least recently used
+        cache.put('c', 'x' * 10)
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None and cache.get('c') is not None
+        assert cache.nbytes == 20
+
+    def test_oversized_entry_not_stored(self):
+        """Test that an entry larger than the budget is skipped."""
+        cache = FigureCache(max_bytes=5)
+        cache.put('a', 'x' * 10)
+
+        assert len(cache) == 0
+        assert cache.nbytes == 0
+
+    def test_replacing_key_updates_size(self):
+        """Test that re-putting a key does not double count its size."""
+        cache = FigureCache()
+        cache.put('a', 'x' * 10)
+        cache.put('a', 'x' * 4)
+
+        assert cache.nbytes == 4
+        assert len(cache) == 1
+
+    def test_clear(self):
+        """Test that clear empties the cache and resets counters."""
+        cache = FigureCache()
+        cache.put('a', '{}')
+        cache.get('a')
+        cache.clear()
+
+        assert len(cache) == 0
+        assert (cache.nbytes, cache.hits, cache.misses) == (0, 0, 0)
+
+
+class TestFigureFromJson:
+    """Test suite for rehydrating cached figures."""
+
+    def test_round_trip(self):
+        """Test that a rehydrated figure serializes to the same content."""
+        fig = go.Figure(go.Scattergl(x=[1, 2], y=[3, 4], marker=dict(color=[0, 1])))
+        fig.update_layout(title='T', shapes=[dict(type='rect', x0=0, x1=1, y0=0, y1=1)])
+        spec = fig.to_json()
+
+        assert json.loads(figure_from_json(spec).to_json()) == json.loads(spec)
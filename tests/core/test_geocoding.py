@@ -6,7 +6,11 @@ Focuses on testing get_coordinates_from_location function comprehensively.
 import pytest
 from unittest.mock import Mock, patch
 import requests
-from module.core.geocoding import get_coordinates_from_location
+from module.core.geocoding import (
+    get_coordinates_from_location,
+    geocode_location,
+    GeocodingCache
+)
 
 
 class TestGeocoding:
@@ -269,3 +273,99 @@ class TestGeocoding:
             assert lat == 48.8566
             assert lon == 2.3522
             assert display_name == 'Île-de-France, Paris'
+
+
+class TestGeocodingCache:
+    """Test suite for the persistent geocoding cache and cached lookups."""
+
+    def test_put_and_get_round_trip(self):
+        """Test that stored results are returned for the same name."""
+        cache = GeocodingCache()
+        cache.put("Ames, IA", ((42.03, -93.62), "Ames, Iowa"))
+        
+        assert cache.get("Ames, IA") == ((42.03, -93.62), "Ames, Iowa")
+        assert len(cache) == 1
+
+    def test_lookup_is_normalized(self):
+        """Test that case and whitespace differences share one entry."""
+        cache = GeocodingCache()
+        cache.put("Ames, IA", ((42.03, -93.62), "Ames, Iowa"))
+        
+        assert cache.get("  ames,   ia ") == ((42.03, -93.62), "Ames, Iowa")
+
+    def test_miss_returns_none(self):
+        """Test that unknown names return None, not a negative result."""
+        assert GeocodingCache().get("Nowhere") is None
+
+    def test_negative_results_are_cached(self):
+        """Test that not-found results are stored and distinguishable from misses."""
+        cache = GeocodingCache()
+        cache.put("Nowhere", ((None, None), None))
+        
+        assert cache.get("Nowhere") == ((None, None), None)
+
+    def test_cache_persists_to_file(self, tmp_path):
+        """Test that a file-backed cache survives reopening."""
+        path = str(tmp_path / "geo.sqlite")
+        cache = GeocodingCache(path)
+        cache.put("Paris", ((48.85, 2.35), "Paris, France"))
+        cache.close()
+        
+        assert GeocodingCache(path).get("paris") == ((48.85, 2.35), "Paris, France")
+
+    def test_geocode_location_uses_cache_before_network(self):
+        """Test that cached names skip both the limiter and the network."""
+        cache = GeocodingCache()
+        cache.put("Paris", ((48.85, 2.35), "Paris, France"))
+        limiter = Mock()
+        
+        with patch('module.core.geocoding.requests.get') as mock_get:
+            result, from_cache = geocode_location("Paris", cache=cache, limiter=limiter)
+        
+        assert result == ((48.85, 2.35), "Paris, France")
+        assert from_cache is True
+        mock_get.assert_not_called()
+        limiter.acquire.assert_not_called()
+
+    def test_geocode_location_throttles_and_stores_network_results(self):
+        """Test that network lookups acquire the limiter and fill the cache."""
+        cache = GeocodingCache()
+        limiter = Mock()
+        
+        with patch('module.core.geocoding.requests.get') as mock_get:
+            mock_response = Mock()
+            mock_response.json.return_value = [
+                {'lat': '48.8566', 'lon': '2.3522', 'display_name': 'Paris, France'}
+            ]
+            mock_get.return_value = mock_response
+            
+            result, from_cache = geocode_location("Paris", cache=cache, limiter=limiter)
+        
+        assert result == ((48.8566, 2.3522), 'Paris, France')
+        assert from_cache is False
+        limiter.acquire.assert_called_once()
+        assert cache.get("Paris") == result
+
+    def test_geocode_location_propagates_network_errors(self):
+        """Test that network errors are raised and nothing is cached."""
+        cache = GeocodingCache()
+        
+        with patch('module.core.geocoding.requests.get') as mock_get:
+            mock_get.side_effect = requests.exceptions.ConnectionError("down")
+            
+            with pytest.raises(requests.exceptions.ConnectionError):
+                geocode_location("Paris", cache=cache)
+        
+        assert cache.get("Paris") is None
+
+    def test_session_is_used_when_given(self):
+        """Test that a provided session performs the request."""
+        session = Mock()
+        session.get.return_value.json.return_value = [
+            {'lat': '1.0', 'lon': '2.0', 'display_name': 'Somewhere'}
+        ]
+        
+        (lat, lon), display_name = get_coordinates_from_location("Somewhere", session=session)
+        
+        session.get.assert_called_once()
+        assert (lat, lon) == (1.0, 2.0)
@@ -0,0 +1,161 @@
+"""
+Test suite for module.core.interpolation module.
+"""
+
+import math
+import numpy as np
+import pytest
+from module.core.interpolation import GridIndex, KDTreeIndex, interpolate_aqi, interpolate_grid, project_km
+
+
+def brute_force_knn(points, queries, k):
+    """Sorted distances to the k nearest points, by exhaustive search."""
+    d = np.sqrt(((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+    return np.sort(d, axis=1)[:, :k]
+
+
+def city_points(rng, cities=5, n=2000):
+    """Points in tight clusters a few hundred metres across, far apart."""
+    centres = rng.random((cities, 2)) * [40.0, 30.0]
+    return centres[rng.integers(cities, size=n)] + rng.normal(0, 0.3, (n, 2))
+
+
+class TestGridIndex:
+    """Test suite for the bucket-grid nearest neighbour index."""
+
+    @pytest.mark.parametrize("per_cell", [1, 4, 16])
+    def test_matches_brute_force(self, per_cell):
+        """Test exact kNN for queries inside, around and far outside the points."""
+        rng = np.random.default_rng(1)
+        points = rng.random((500, 2)) * [50.0, 20.0]
+        queries = np.vstack([rng.random((800, 2)) * [80.0, 50.0] - 15.0, points[:3], [[1e3, -1e3]]])
+        
+        dist, idx = GridIndex(points, per_cell=per_cell).query(queries, k=6)
+        
+        np.testing.assert_allclose(dist, brute_force_knn(points, queries, 6))
+        np.testing.assert_allclose(np.linalg.norm(points[idx] - queries[:, None, :], axis=2), dist)
+
+    def test_clustered_and_degenerate_points(self):
+        """Test uneven density, collinear points and k above the point count."""
+        rng = np.random.default_rng(2)
+        clustered = np.vstack([rng.normal(0, 0.01, (300, 2)), rng.random((20, 2)) * 100])
+        queries = rng.random((200, 2)) * 100
+        dist, _ = GridIndex(clustered).query(queries, k=4)
+        np.testing.assert_allclose(dist, brute_force_knn(clustered, queries, 4))
+        
+        line = np.column_stack([np.arange(10.0), np.zeros(10)])
+        dist, idx = GridIndex(line).query([[2.2, 1.0]], k=20)
+        assert dist.shape == (1, 10)
+        assert list(idx[0, :2]) == [2, 3]
+
+    def test_city_clusters_use_the_tree(self):
+        """Test exact kNN around dense clusters, which the k-d tree answers."""
+        rng = np.random.default_rng(4)
+        points = city_points(rng)
+        queries = np.vstack([rng.random((1000, 2)) * [40.0, 30.0], points[:50]])
+        index = GridIndex(points)
+        
+        dist, _ = index.query(queries, k=8)
+        
+        np.testing.assert_allclose(dist, brute_force_knn(points, queries, 8))
+        assert index._tree is not None
+
+
+class TestKDTreeIndex:
+    """Test suite for the k-d tree nearest neighbour index."""
+
+    @pytest.mark.parametrize("leaf_size", [1, 4, 16])
+    def test_matches_brute_force(self, leaf_size):
+        """Test exact kNN for uniform and clustered points, inside and far outside them."""
+        rng = np.random.default_rng(3)
+        queries = np.vstack([rng.random((600, 2)) * [60.0, 50.0] - 10.0, [[1e3, -1e3]]])
+        for points in (rng.random((500, 2)) * [50.0, 20.0], city_points(rng)):
+            dist, idx = KDTreeIndex(points, leaf_size=leaf_size).query(queries, k=6, chunk_size=2 ** 10)
+            
+            np.testing.assert_allclose(dist, brute_force_knn(points, queries, 6))
+            np.testing.assert_allclose(np.linalg.norm(points[idx] - queries[:, None, :], axis=2), dist)
+
+    def test_few_and_duplicate_points(self):
+        """Test k above the point count, a single point and repeated points."""
+        line = np.column_stack([np.arange(10.0), np.zeros(10)])
+        dist, idx = KDTreeIndex(line).query([[2.2, 1.0]], k=20)
+        assert dist.shape == (1, 10)
+        assert list(idx[0, :2]) == [2, 3]
+        
+        dist, idx = KDTreeIndex([[1.0, 1.0]]).query([[4.0, 5.0]], k=3)
+        assert dist.tolist() == [[5.0]] and idx.tolist() == [[0]]
+        
+        same = np.ones((40, 2))
+        dist, _ = KDTreeIndex(same, leaf_size=2).query([[1.0, 2.0]], k=5)
+        np.testing.assert_allclose(dist, 1.0)
+
+
+class TestInterpolateAQI:
+    """Test suite for IDW and Gaussian interpolation."""
+
+    SAMPLES = np.array([
+        [42.00, -93.60, 50.0],
+        [42.00, -93.50, 150.0],
+        [42.10, -93.60, 50.0],
+        [42.10, -93.50, 150.0],
+    ])
+
+    def test_exact_at_samples(self):
+        """Test that a target on a sample returns that sample's value."""
+        result = interpolate_aqi(self.SAMPLES, self.SAMPLES[:, 0], self.SAMPLES[:, 1])
+        
+        np.testing.assert_array_equal(result, self.SAMPLES[:, 2])
+
+    @pytest.mark.parametrize("method", ['idw', 'gaussian'])
+    def test_symmetric_midpoint_and_bounds(self, method):
+        """Test that the centre is the mean and estimates stay within the sample range."""
+        lat = np.linspace(41.9, 42.2, 7)[:, None]
+        lon = np.linspace(-93.7, -93.4, 9)[None, :]
+        
+        result = interpolate_aqi(self.SAMPLES, lat, lon, method=method)
+        
+        assert result.shape == (7, 9)
+        assert math.isclose(interpolate_aqi(self.SAMPLES, 42.05, -93.55, method=method), 100.0)
+        assert result.min() >= 50.0 and result.max() <= 150.0
+
+    def test_gaussian_bandwidth_controls_smoothing(self):
+        """Test that a narrow kernel follows the nearest sample and a wide one averages."""
+        narrow = interpolate_aqi(self.SAMPLES, 42.05, -93.59, method='gaussian', bandwidth_km=0.5)
+        wide = interpolate_aqi(self.SAMPLES, 42.05, -93.59, method='gaussian', bandwidth_km=500)
+        
+        assert narrow < 51.0
+        assert 99.0 < wide < 101.0
+
+    def test_ignores_nan_samples_and_limits_distance(self):
+        """Test that failed samples are skipped and far targets become NaN."""
+        samples = np.vstack([self.SAMPLES, [42.05, -93.55, np.nan]])
+        
+        result = interpolate_aqi(samples, [42.05, 45.0], [-93.55, -93.55], max_distance_km=20)
+        
+        assert math.isclose(result[0], 100.0)
+        assert np.isnan(result[1])
+
+    def test_no_samples_and_unknown_method(self):
+        """Test the NaN result for no data and the error for a bad method."""
+        assert np.isnan(interpolate_aqi(np.empty((0, 3)), [1.0, 2.0], [1.0, 2.0])).all()
+        with pytest.raises(ValueError):
+            interpolate_aqi(self.SAMPLES, 42.0, -93.6, method='kriging')
+
+
+class TestInterpolateGrid:
+    """Test suite for grid interpolation."""
+
+    def test_cell_centres_and_shape(self):
+        """Test that the grid covers the box at cell centres."""
+        lats, lons, values = interpolate_grid(TestInterpolateAQI.SAMPLES, (42.0, -93.6, 42.1, -93.5), (4, 5))
+        
+        np.testing.assert_allclose(lats, [42.0125, 42.0375, 42.0625, 42.0875])
+        np.testing.assert_allclose(lons, [-93.59, -93.57, -93.55, -93.53, -93.51])
+        assert values.shape == (4, 5)
+        assert (np.diff(values, axis=1) > 0).all()
+
+    def test_projection_scales_longitude(self):
+        """Test that a degree of longitude shrinks with latitude."""
+        xy = project_km([60.0, 60.0], [0.0, 1.0], 60.0)
+        
+        assert math.isclose(xy[1, 0] - xy[0, 0], 111.32 / 2, rel_tol=1e-9)
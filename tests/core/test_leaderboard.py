@@ -0,0 +1,130 @@
+"""
+Test suite for module.core.leaderboard module.
+"""
+
+import numpy as np
+import pytest
+from module.core.aqi_calculators import calculate_all_aqi_batch
+from module.core.leaderboard import Leaderboard, site_scores
+from module.core.store import TimeSeriesStore
+from tests.forecasts import CLEAN, make_forecast
+
+T0 = 1700000000 // 3600 * 3600
+
+
+class TestSiteScores:
+    """Test suite for scoring forecast rows per site."""
+
+    def test_current_hour_and_peak(self):
+        """Test that current is the hour containing now and the peak stays within the horizon."""
+        dt = T0 + 3600 * np.arange(6)
+        sub_indices = np.zeros((6, 6))
+        sub_indices[:, 0] = [90, 10, 20, 70, 30, 200]
+
+        scores = site_scores(np.ones(6), dt, sub_indices, now=T0 + 3600 + 1800, horizon_hours=3)
+
+        assert scores['current'].tolist() == [10.0]
+        assert scores['peak'].tolist() == [70.0]
+        assert scores['peak_time'].tolist() == [T0 + 3 * 3600]
+        assert scores['dominant'].tolist() == [0]
+
+    def test_sites_in_one_batch(self):
+        """Test that rows in any order are grouped by site."""
+        dt = np.array([T0, T0, T0 + 3600, T0 + 3600])
+        sub_indices = np.column_stack([[10, 50, 40, 20], np.zeros((4, 5))])
+
+        scores = site_scores([2, 1, 2, 1], dt, sub_indices, now=T0)
+
+        assert scores['cell'].tolist() == [1, 2]
+        assert scores['current'].tolist() == [50.0, 10.0]
+        assert scores['peak'].tolist() == [50.0, 40.0]
+        assert len(site_scores([1], [T0], sub_indices[:1], now=T0 + 86400)['cell']) == 0
+
+
+class TestLeaderboard:
+    """Test suite for Leaderboard."""
+
+    def test_rankings_follow_updates(self):
+        """Test that a refreshed site moves and its old scores are skipped."""
+        board = Leaderboard(clock=lambda: T0)
+        board.update(1.0, 1.0, make_forecast(start=T0, base=CLEAN, pm2_5=[10.0, 10.0]), name="a")
+        board.update(2.0, 2.0, make_forecast(start=T0, base=CLEAN, pm2_5=[40.0, 200.0]), name="b")
+        board.update(3.0, 3.0, make_forecast(start=T0, base=CLEAN, pm2_5=[80.0, 20.0]), name="c")
+
+        assert [e.name for e in board.top(3)] == ["c", "b", "a"]
+        assert [e.name for e in board.top(1, by='peak')] == ["b"]
+
+        board.update(1.0, 1.0, make_forecast(start=T0, base=CLEAN, pm2_5=[150.0]))
+        assert [e.name for e in board.top(2)] == ["a", "c"]
+        assert [e.name for e in board.top(5)] == ["a", "c", "b"]
+        board.remove(1.0, 1.0)
+        assert [e.name for e in board.top(5)] == ["c", "b"]
+        assert len(board) == 2
+        with pytest.raises(ValueError):
+            board.top(by='worst')
+
+    def test_matches_a_full_sort(self):
+        """Test that after many refreshes top(k) equals sorting every site's latest scores."""
+        rng = np.random.default_rng(0)
+        board = Leaderboard(clock=lambda: T0)
+        latest = {}
+        for _ in range(2000):
+            site = int(rng.integers(50))
+            values = rng.gamma(2.0, 20.0, 30).round(1)
+            entry = board.update(float(site), 0.0, make_forecast(start=T0, base=CLEAN, pm2_5=values))
+            latest[site] = entry
+
+        for by in ('current', 'peak'):
+            expected = sorted(latest.values(), key=lambda e: -getattr(e, by))[:10]
+            assert [getattr(e, by) for e in board.top(10, by=by)] == [getattr(e, by) for e in expected]
+        assert max(len(heap) for heap in board._heaps.values()) <= 2 * 50 + 64
+
+    def test_entry_fields(self):
+        """Test the scores and labels of an entry."""
+        board = Leaderboard(horizon_hours=2)
+
+        entry = board.update(1.0, 2.0, make_forecast(start=T0, base=CLEAN, pm2_5=[5.0, 80.0, 20.0, 300.0]), now=T0 + 60)
+
+        aqi = calculate_all_aqi_batch(np.array([[80.0, 1.0, 1.0, 1.0, 100.0, 1.0]]))[0].max()
+        assert (entry.lat, entry.lon, entry.name) == (1.0, 2.0, "1.0000,2.0000")
+        assert entry.peak == aqi and entry.peak_time == T0 + 3600
+        assert entry.dominant_pollutant == 'PM2.5'
+        assert board.update(1.0, 2.0, make_forecast(start=T0, base=CLEAN, pm2_5=[5.0]), now=T0 + 86400) is None
+
+
+class TestRefreshFromStore:
+    """Test suite for keeping a leaderboard in step with a store."""
+
+    def test_only_refetched_sites_are_rescored(self, tmp_path):
+        """Test that a refresh reads new fetches only, and everything once per hour."""
+        store = TimeSeriesStore(str(tmp_path / "readings.sqlite"))
+        for site in range(3):
+            store.ingest(float(site), 0.0, make_forecast(start=T0, base=CLEAN, pm2_5=[10.0 * (site + 1)] * 30),
+                         fetched_at=T0)
+        board = Leaderboard()
+
+        assert board.refresh_from_store(store, now=T0 + 600) == 3
+        assert board.refresh_from_store(store, now=T0 + 900) == 0
+        store.ingest(0.0, 0.0, make_forecast(start=T0, base=CLEAN, pm2_5=[300.0] * 30), fetched_at=T0 + 1000)
+        assert board.refresh_from_store(store, now=T0 + 1200) == 1
+        assert board.top(1)[0].lat == 0.0
+        assert board.refresh_from_store(store, now=T0 + 3600) == 3
+        store.close()
+
+    def test_sites_leaving_the_window_are_dropped(self, tmp_path):
+        """Test that the hourly full refresh drops sites with no forecast in the window."""
+        store = TimeSeriesStore(str(tmp_path / "readings.sqlite"))
+        store.ingest(0.0, 0.0, make_forecast(start=T0, base=CLEAN, pm2_5=[300.0] * 3), fetched_at=T0)
+        store.ingest(1.0, 0.0, make_forecast(start=T0, base=CLEAN, pm2_5=[10.0] * 30), fetched_at=T0)
+        board = Leaderboard()
+
+        assert board.refresh_from_store(store, now=T0 + 600) == 2
+        assert board.top(1)[0].lat == 0.0
+        # Site 0 is no longer polled; its 3-hour forecast runs out
+        assert board.refresh_from_store(store, now=T0 + 5 * 3600) == 1
+        assert [e.lat for e in board.top(5)] == [1.0]
+        assert [e.lat for e in board.top(5, by='peak')] == [1.0]
+        assert len(board) == 1 and all(len(heap) == 1 for heap in board._heaps.values())
+        assert board.refresh_from_store(store, now=T0 + 48 * 3600) == 0
+        assert len(board) == 0 and board.top(5) == []
+        store.close()
@@ -0,0 +1,253 @@
+"""
+Test suite for module.core.poller module.
+"""
+
+import sqlite3
+import threading
+from unittest.mock import Mock
+import numpy as np
+import pytest
+import requests
+from module.core.poller import RefreshPolicy, WatchlistPoller
+from module.core.store import TimeSeriesStore
+from tests.forecasts import CLEAN, T0, make_forecast
+
+
+class Clock:
+    def __init__(self, now=T0):
+        self.now = float(now)
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAPI:
+    """Forecast per latitude: calm (flat 20), volatile (swinging) or failing."""
+
+    def __init__(self, clock, failing=()):
+        self.clock = clock
+        self.failing = set(failing)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, lat, lon):
+        with self._lock:
+            self.calls.append(lat)
+        if lat in self.failing:
+            raise requests.exceptions.ConnectionError("down")
+        start = int(self.clock()) // 3600 * 3600
+        if lat >= 10:
+            return make_forecast(start=start, base=CLEAN, o3=[20 + 30 * (h % 2) for h in range(24)])
+        return make_forecast(start=start, base=CLEAN, o3=[20] * 24)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def api(clock):
+    return FakeAPI(clock, failing={5.0})
+
+
+def run_until(poller, clock, end, step=60):
+    """Advance the fake clock, polling whatever is due."""
+    while clock.now < end:
+        while poller.poll_once() is not None:
+            pass
+        clock.now += step
+
+
+class TestRefreshPolicy:
+    """Test suite for the refresh interval."""
+
+    def test_urgency_shortens_and_calm_lengthens(self):
+        """Test that volatility, AQI and demand shorten intervals and calm streaks lengthen them."""
+        policy = RefreshPolicy()
+        poller = WatchlistPoller(fetch=None, clock=lambda: T0)
+        calm = poller.add_site(1.0, 1.0)
+        assert policy.interval(calm, T0) == policy.base_interval
+        calm.volatility = 10.0
+        assert policy.interval(calm, T0) == policy.base_interval / 2
+        calm.volatility, calm.aqi = 0.0, 100.0
+        assert policy.interval(calm, T0) == policy.base_interval / 2
+        calm.aqi, calm.calm_streak = 0.0, 2
+        assert policy.interval(calm, T0) == policy.base_interval * 1.5 ** 2
+        calm.calm_streak = 100
+        assert policy.interval(calm, T0) == policy.base_interval * 1.5 ** policy.max_calm_streak
+        policy.base_interval = 10 * 3600.0
+        assert policy.interval(calm, T0) == policy.max_interval
+
+    def test_failures_back_off_exponentially(self):
+        """Test that consecutive failures double the retry delay."""
+        policy = RefreshPolicy()
+        site = WatchlistPoller(fetch=None, clock=lambda: T0).add_site(1.0, 1.0)
+        site.failures = 1
+        first = policy.interval(site, T0)
+        site.failures = 3
+        assert policy.interval(site, T0) == first * 4
+
+
+class TestWatchlistPoller:
+    """Test suite for WatchlistPoller."""
+
+    def test_new_sites_due_immediately_and_only_once(self, clock, api):
+        """Test that every new site is polled once, then nothing is due."""
+        poller = WatchlistPoller(fetch=api, clock=clock)
+        poller.add_site(1.0, 1.0)
+        poller.add_site(2.0, 2.0)
+        poller.add_site(1.00001, 1.0)  # Same cell as the first site
+        assert len(poller.sites) == 2
+        assert poller.poll_once().lat == 1.0
+        assert poller.poll_once().lat == 2.0
+        assert poller.poll_once() is None
+        assert poller.seconds_until_due() > 0
+
+    def test_volatile_sites_polled_more_often_than_calm_ones(self, clock, api):
+        """Test that a swinging forecast earns more fetches than a flat one."""
+        poller = WatchlistPoller(fetch=api, clock=clock)
+        poller.add_site(1.0, 1.0, name="calm")
+        poller.add_site(10.0, 1.0, name="volatile")
+        run_until(poller, clock, T0 + 24 * 3600)
+        counts = {lat: api.calls.count(lat) for lat in (1.0, 10.0)}
+        assert counts[10.0] > 3 * counts[1.0]
+        metrics = {m['name']: m for m in poller.metrics()}
+        assert metrics['volatile']['interval'] < metrics['calm']['interval']
+        assert metrics['calm']['interval'] > poller.policy.base_interval
+
+    def test_demand_pulls_next_poll_forward(self, clock, api):
+        """Test that recorded demand reschedules a site earlier."""
+        poller = WatchlistPoller(fetch=api, clock=clock)
+        site = poller.add_site(1.0, 1.0)
+        poller.poll_once()
+        due = site.next_due
+        clock.now += 60
+        poller.record_demand(1.0, 1.0, weight=3.0)
+        assert site.next_due < due
+        assert site.current_demand(clock.now, poller.policy.demand_half_life) == pytest.approx(4.0, abs=0.01)
+
+    def test_failures_are_rescheduled_with_backoff(self, clock, api, caplog):
+        """Test that a failing site is retried later instead of dropped."""
+        poller = WatchlistPoller(fetch=api, clock=clock)
+        site = poller.add_site(5.0, 1.0)
+        poller.poll_once()
+        assert site.failures == 1
+        assert site.next_due == clock.now + poller.policy.min_interval
+        assert "Error fetching air quality" in caplog.text
+        clock.now = site.next_due
+        poller.poll_once()
+        assert site.next_due == clock.now + 2 * poller.policy.min_interval
+
+    def test_every_fetch_takes_a_token_and_is_stored(self, clock, api):
+        """Test that the limiter gates each fetch and the store receives it."""
+        limiter = Mock()
+        store = TimeSeriesStore()
+        poller = WatchlistPoller(fetch=api, store=store, limiter=limiter, clock=clock)
+        poller.add_site(1.0, 1.0)
+        poller.add_site(2.0, 2.0)
+        while poller.poll_once() is not None:
+            pass
+        assert limiter.acquire.call_count == 2
+        assert len(store) == 48
+
+    def test_store_writes_are_batched(self, clock, api):
+        """Test that fetches wait for a full batch or a flush before reaching the store."""
+        store = TimeSeriesStore()
+        poller = WatchlistPoller(fetch=api, store=store, clock=clock, store_batch=3)
+        for lat in (1.0, 2.0, 3.0, 4.0):
+            poller.add_site(lat, 1.0)
+        poller.poll_once()
+        poller.poll_once()
+        assert len(store) == 0
+        poller.poll_once()
+        assert len(store) == 72
+        poller.poll_once()
+        poller.flush()
+        assert len(store) == 96
+
+    def test_store_errors_are_logged(self, clock, api, caplog):
+        """Test that a failed store write is logged, not printed or raised."""
+        store = Mock()
+        store.ingest_many.side_effect = sqlite3.OperationalError("database is locked")
+        poller = WatchlistPoller(fetch=api, store=store, clock=clock)
+        poller.add_site(1.0, 1.0)
+        poller.poll_once()
+        poller.flush()
+        assert "Error storing readings of 1 fetches" in caplog.text
+        assert "database is locked" in caplog.text
+
+    def test_on_fetch_sees_every_successful_fetch(self, clock, api):
+        """Test that the on_fetch callback receives each fetched forecast, not failures."""
+        seen = []
+        poller = WatchlistPoller(fetch=api, clock=clock,
+                                 on_fetch=lambda site, forecast, now: seen.append((site.lat, len(forecast['list']), now)))
+        poller.add_site(1.0, 1.0)
+        poller.add_site(5.0, 1.0)
+        poller.poll_once()
+        poller.poll_once()
+        assert seen == [(1.0, 24, clock.now)]
+
+    def test_on_fetch_error_keeps_site_scheduled(self, clock, api, caplog):
+        """Test that a raising on_fetch is logged and the site is still polled again."""
+        on_fetch = Mock(side_effect=RuntimeError("hook failed"))
+        poller = WatchlistPoller(fetch=api, clock=clock, on_fetch=on_fetch)
+        site = poller.add_site(1.0, 1.0)
+
+        assert poller.poll_once() is site
+        assert not site.polling and site.fetches == 1 and site.failures == 0
+        assert "hook failed" in caplog.text
+        clock.now = site.next_due
+        assert poller.poll_once() is site
+        assert on_fetch.call_count == 2
+
+    def test_most_overdue_site_first(self, clock, api):
+        """Test that the earliest-due site wins when several are overdue."""
+        poller = WatchlistPoller(fetch=api, clock=clock)
+        for lat in (1.0, 2.0, 3.0):
+            poller.add_site(lat, 1.0)
+            clock.now += 1
+        assert [poller.poll_once().lat for _ in range(3)] == [1.0, 2.0, 3.0]
+
+    def test_removed_site_is_not_polled(self, clock, api):
+        """Test that removing a site drops its pending heap entry."""
+        poller = WatchlistPoller(fetch=api, clock=clock)
+        poller.add_site(1.0, 1.0)
+        poller.remove_site(1.0, 1.0)
+        assert poller.poll_once() is None
+        assert poller.seconds_until_due() is None
+
+    def test_summary(self, clock, api):
+        """Test that the summary reports freshness and calls."""
+        poller = WatchlistPoller(fetch=api, clock=clock)
+        poller.add_site(1.0, 1.0)
+        poller.add_site(2.0, 2.0)
+        poller.poll_once()
+        clock.now += 600
+        summary = poller.summary()
+        assert summary['sites'] == 2
+        assert summary['never_fetched'] == 1
+        assert summary['overdue'] == 1
+        assert summary['median_age'] == 600
+        assert summary['calls'] == 1
+
+    def test_run_until_stopped(self, api):
+        """Test that the threaded loop polls every site and stops on request."""
+        poller = WatchlistPoller(fetch=api)
+        for lat in np.arange(1.0, 4.0):
+            poller.add_site(float(lat), 1.0)
+        stop = threading.Event()
+        reports = []
+
+        def report(p):
+            reports.append(p.summary())
+            if p.summary()['never_fetched'] == 0:
+                stop.set()
+
+        thread = threading.Thread(target=poller.run,
+                                  kwargs=dict(stop=stop, workers=2, report=report, report_every=0,
+                                              idle_sleep=0.01))
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert sorted(api.calls) == [1.0, 2.0, 3.0]
@@ -0,0 +1,99 @@
+"""
+Test suite for module.core.region_sampling module.
+"""
+
+import math
+import threading
+import numpy as np
+from unittest.mock import patch
+from module.core.region_sampling import bounding_box, current_max_aqi, sample_region
+
+BBOX = (0.0, 0.0, 1.0, 1.0)
+
+
+class CountingField:
+    """AQI field that records every point it is asked for."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, lat, lon):
+        with self._lock:
+            self.calls.append((lat, lon))
+        return self.fn(lat, lon)
+
+
+class TestBoundingBox:
+    """Test suite for bounding_box."""
+
+    def test_box_is_symmetric_and_widens_with_latitude(self):
+        """Test that the box is centred and longitude span grows away from the equator."""
+        s, w, n, e = bounding_box(0.0, 10.0, 111.32)
+        assert (s, n) == (-1.0, 1.0)
+        assert math.isclose(w, 9.0) and math.isclose(e, 11.0)
+        
+        s, w, n, e = bounding_box(60.0, 10.0, 111.32)
+        assert math.isclose(e - w, 4.0)
+
+
+class TestSampleRegion:
+    """Test suite for quadtree sampling."""
+
+    def test_flat_field_fetches_only_coarse_grid(self):
+        """Test that uniform AQI needs no refinement."""
+        field = CountingField(lambda lat, lon: 42.0)
+        
+        sample = sample_region(BBOX, field, coarse=4, max_depth=3)
+        
+        assert sample.api_calls == len(field.calls) == 25
+        assert sample.uniform_calls == 33 ** 2
+        assert len(sample.cells) == 16
+        assert all(depth == 0 for depth, *_ in sample.cells)
+
+    def test_refines_only_near_gradient(self):
+        """Test that split cells are those straddling a sharp edge."""
+        field = CountingField(lambda lat, lon: 200.0 if lon > 0.6 else 20.0)
+        
+        sample = sample_region(BBOX, field, coarse=4, max_depth=2, threshold=25)
+        
+        deep = [cell for cell in sample.cells if cell[0] == 2]
+        assert deep and all(0.5 <= w and e <= 0.75 for _, _, w, _, e in deep)
+        assert all(e <= 0.6 or w >= 0.6 for depth, _, w, _, e in sample.cells if depth == 0)
+        assert sample.api_calls < sample.uniform_calls
+
+    def test_points_are_fetched_once(self):
+        """Test that shared corners are deduplicated across cells and levels."""
+        field = CountingField(lambda lat, lon: 500.0 * lat * lon)
+        
+        sample = sample_region(BBOX, field, coarse=2, max_depth=3, threshold=1)
+        
+        assert len(field.calls) == len(set(field.calls)) == sample.api_calls
+        assert sample.points.shape == (sample.api_calls, 3)
+
+    def test_call_budget_is_respected(self):
+        """Test that refinement stops within max_calls."""
+        field = CountingField(lambda lat, lon: 500.0 * lat * lon)
+        
+        sample = sample_region(BBOX, field, coarse=4, max_depth=3, threshold=1, max_calls=60)
+        
+        assert sample.api_calls == len(field.calls) <= 60
+        assert sample.api_calls > 25
+
+    def test_failed_points_do_not_trigger_refinement(self):
+        """Test that NaN corners are ignored when measuring spread."""
+        field = CountingField(lambda lat, lon: math.nan if lat > 0.5 else 30.0)
+        
+        sample = sample_region(BBOX, field, coarse=2, max_depth=2)
+        
+        assert sample.api_calls == 9
+        assert np.isnan(sample.points[:, 2]).sum() == 3
+
+    def test_current_max_aqi_returns_nan_on_error(self, caplog, capsys):
+        """Test that a failed fetch becomes NaN and is logged instead of raising or printing."""
+        with patch('module.core.region_sampling.read_pollution_data_from_api',
+                   side_effect=ConnectionError("down")):
+            assert math.isnan(current_max_aqi(1.0, 2.0))
+        assert "Error fetching air quality at (1.0000, 2.0000): down" in caplog.text
+        assert capsys.readouterr().out == ""
@@ -0,0 +1,132 @@
+"""
+Test suite for module.core.revisions module.
+"""
+
+import numpy as np
+import pytest
+from module.core.air_quality_api import convert_json_to_object
+from module.core.revisions import RevisionStore, decode_revision, encode_revision, quantize
+from module.core.store import READING_COLUMNS, VALUE_COLUMNS, TimeSeriesStore
+from tests.forecasts import T0, make_forecast
+
+
+def revisions(count=10, hours=6):
+    """Hourly fetches: the window moves on an hour and one hour is revised each time."""
+    o3 = 20.0 + np.arange(count + hours)
+    fetches = []
+    for k in range(count):
+        o3[k + hours // 2] += 0.01 * (k + 1)
+        forecast = make_forecast(start=T0 + k * 3600, co=250.33, pm2_5=8.17, o3=o3[k:k + hours].round(2).tolist())
+        fetches.append((T0 + k * 3600, forecast))
+    return fetches
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RevisionStore(str(tmp_path / "revisions.sqlite"), keyframe_every=4)
+    yield store
+    store.close()
+
+
+class TestEncoding:
+    """Test suite for delta encoding of one revision."""
+
+    def test_round_trip_against_base(self):
+        """Test that decoding with the same base restores every value and hour."""
+        base_dt = T0 + 3600 * np.arange(5)
+        base = quantize(np.arange(5 * len(VALUE_COLUMNS)).reshape(5, -1) * 1.25)
+        dt = T0 + 3600 * np.arange(2, 8)
+        values = quantize(np.arange(6 * len(VALUE_COLUMNS)).reshape(6, -1) * 0.5)
+
+        blob = encode_revision(dt, values, (base_dt, base))
+        decoded_dt, decoded, decimals = decode_revision(blob, (base_dt, base))
+
+        np.testing.assert_array_equal(decoded_dt, dt)
+        np.testing.assert_array_equal(decoded, values)
+        assert decimals == 2
+
+    def test_unchanged_hours_compress_away(self):
+        """Test that a repeat of the base is much smaller than a keyframe."""
+        rng = np.random.default_rng(0)
+        dt = T0 + 3600 * np.arange(96)
+        values = quantize(rng.gamma(2.0, 20.0, size=(96, len(VALUE_COLUMNS))))
+
+        assert len(encode_revision(dt, values, (dt, values))) < len(encode_revision(dt, values)) / 20
+
+
+class TestRevisionStore:
+    """Test suite for RevisionStore."""
+
+    def test_every_revision_reconstructs_exactly(self, store):
+        """Test that each revision reads back as TimeSeriesStore holds that fetch."""
+        full = TimeSeriesStore()
+        for fetched_at, forecast in revisions():
+            store.ingest(1.0, 2.0, forecast, fetched_at=fetched_at)
+            full.ingest(1.0, 2.0, forecast, fetched_at=fetched_at)
+        every = full.location_range(1.0, 2.0, 0, 2 ** 40, latest=False)
+
+        for fetched_at in store.revision_times(1.0, 2.0):
+            revision = store.revision(1.0, 2.0, fetched_at)
+            mask = every['fetched_at'] == fetched_at
+            for column in READING_COLUMNS:
+                np.testing.assert_array_equal(revision[column], every[column][mask], err_msg=column)
+
+    def test_revision_as_of_time(self, store):
+        """Test that a time between fetches gives the earlier fetch, and None before any."""
+        for fetched_at, forecast in revisions(count=3):
+            store.ingest(1.0, 2.0, forecast, fetched_at=fetched_at)
+
+        assert store.revision(1.0, 2.0, T0 + 3599)['fetched_at'][0] == T0
+        assert store.revision(1.0, 2.0)['fetched_at'][0] == T0 + 7200
+        assert store.revision(1.0, 2.0, T0 - 1) is None
+        assert store.revision(3.0, 4.0) is None
+
+    def test_keyframes_bound_the_chain(self, store):
+        """Test that every keyframe_every-th revision is stored whole."""
+        for fetched_at, forecast in revisions(count=10):
+            store.ingest(1.0, 2.0, forecast, fetched_at=fetched_at)
+
+        stats = store.stats()
+        assert stats['revisions'] == 10
+        assert stats['keyframes'] == 3
+        assert stats['stored_bytes'] < stats['full_bytes']
+
+    def test_hour_history(self, store):
+        """Test that one hour's forecast is traced across the revisions covering it."""
+        for fetched_at, forecast in revisions(count=10, hours=6):
+            store.ingest(1.0, 2.0, forecast, fetched_at=fetched_at)
+
+        history = store.hour_history(1.0, 2.0, T0 + 5 * 3600)
+
+        np.testing.assert_array_equal(history['fetched_at'], T0 + 3600 * np.arange(6))
+        # Revised by the fetch at T0 + 2 h (+0.03), unchanged afterwards
+        np.testing.assert_allclose(history['o3'], [25.0, 25.0, 25.03, 25.03, 25.03, 25.03])
+
+    def test_late_and_repeated_fetches(self, store):
+        """Test that an out-of-order fetch is kept without breaking later revisions."""
+        fetches = revisions(count=4)
+        for fetched_at, forecast in fetches[::2] + fetches[1::2]:
+            store.ingest(1.0, 2.0, forecast, fetched_at=fetched_at)
+        assert store.ingest(1.0, 2.0, fetches[0][1], fetched_at=fetches[0][0]) == 0
+
+        assert len(store) == 4
+        for fetched_at, forecast in fetches:
+            expected = [item['components']['o3'] for item in forecast['list']]
+            np.testing.assert_array_equal(store.revision(1.0, 2.0, fetched_at)['o3'], expected)
+
+    def test_reopened_store_continues_chains(self, tmp_path):
+        """Test that a new instance deltas against revisions on disk."""
+        path = str(tmp_path / "revisions.sqlite")
+        fetches = revisions(count=2)
+        first = RevisionStore(path)
+        first.ingest(1.0, 2.0, fetches[0][1], fetched_at=fetches[0][0])
+        first.close()
+
+        second = RevisionStore(path)
+        second.ingest(1.0, 2.0, convert_json_to_object(fetches[1][1]), fetched_at=fetches[1][0])
+
+        assert second.stats()['keyframes'] == 1
+        assert second.revision(1.0, 2.0)['o3'].tolist() == [
+            item['components']['o3'] for item in fetches[1][1]['list']
+        ]
+        second.close()
@@ -0,0 +1,48 @@
+"""
+Test suite for module.core.rollups module.
+"""
+
+import numpy as np
+from module.core.aqi_calculators import POLLUTANT_FIELDS
+from module.core.rollups import ROLLUP_COLUMNS, combine_rollups, daily_rollups, day_to_month, rollup_columns
+
+D0 = 1698796800  # 2023-11-01 00:00 UTC
+
+
+def readings(hours, cell=7):
+    """Hourly readings of one cell from D0 with PM2.5 rising 1 per hour."""
+    result = {'cell': np.full(hours, cell), 'dt': D0 + 3600 * np.arange(hours)}
+    result.update((field, np.ones(hours)) for field in POLLUTANT_FIELDS)
+    result['pm2_5'] = np.arange(hours, dtype=float)
+    return result
+
+
+class TestRollups:
+    """Test suite for rollup rows."""
+
+    def test_daily_rollups(self):
+        """Test sums, maxima and counts of one day per row."""
+        cells, days, values = daily_rollups(readings(30))
+
+        daily = rollup_columns(cells, days, values)
+        assert [str(s) for s in daily['start']] == ['2023-11-01', '2023-11-02']
+        assert daily['hours'].tolist() == [24, 6]
+        assert daily['pm2_5_max'].tolist() == [23.0, 29.0]
+        assert daily['pm2_5_mean'].tolist() == [11.5, 26.5]
+        assert daily['days'].tolist() == [1, 1]
+        assert (sum(daily[f'dominant_{field}'] for field in POLLUTANT_FIELDS) == daily['hours']).all()
+
+    def test_days_combine_into_months(self):
+        """Test that combining sums counts and takes the max of maxima."""
+        cells, days, values = daily_rollups({key: np.concatenate([a, b]) for (key, a), b in
+                                             zip(readings(24 * 40).items(), readings(24 * 3, cell=9).values())})
+
+        cells, months, combined = combine_rollups(cells, day_to_month(days), values)
+
+        monthly = rollup_columns(cells, months, combined, freq='month')
+        assert monthly['cell'].tolist() == [7, 7, 9]
+        assert [str(s) for s in monthly['start']] == ['2023-11-01', '2023-12-01', '2023-11-01']
+        assert monthly['days'].tolist() == [30, 10, 3]
+        assert monthly['hours'].tolist() == [720, 240, 72]
+        assert monthly['pm2_5_max'].tolist() == [719.0, 959.0, 71.0]
+        assert combined.shape == (3, len(ROLLUP_COLUMNS))
@@ -0,0 +1,96 @@
+"""
+Test suite for module.core.sharding module.
+"""
+
+import multiprocessing
+import pytest
+from module.core.poller import RefreshPolicy
+from module.core.sharding import HashRing, run_sharded, shard_sites
+from module.core.store import TimeSeriesStore, cell_id
+from module.core.throttle import SharedRateLimiter
+from tests.forecasts import CLEAN, make_forecast
+
+
+def flat_forecast(lat, lon):
+    """Stand-in fetch: a calm 24-hour forecast starting at the current hour."""
+    import time
+    start = int(time.time()) // 3600 * 3600
+    return make_forecast(hours=24, start=start, base=CLEAN, o3=20.0)
+
+
+def flat_fetch_factory():
+    return flat_forecast
+
+
+SITES = [(40.0 + i * 0.01, -90.0, f"site {i}") for i in range(40)]
+
+
+class TestHashRing:
+    """Test suite for consistent hashing of sites to shards."""
+
+    def test_assignment_is_stable_and_balanced(self):
+        """Test that every key maps to one shard, the same each time, spread evenly."""
+        ring = HashRing(4)
+        keys = [cell_id(40 + i * 0.01, -90.0) for i in range(4000)]
+        shards = [ring.shard(key) for key in keys]
+        again = HashRing(4)
+        assert shards == [again.shard(key) for key in keys]
+        counts = [shards.count(shard) for shard in range(4)]
+        assert min(counts) > 0.6 * 1000
+        assert max(counts) < 1.4 * 1000
+
+    def test_adding_a_shard_moves_few_keys(self):
+        """Test that growing from 4 to 5 shards moves about a fifth of the keys, all to the new shard."""
+        keys = [cell_id(40 + i * 0.01, -90.0) for i in range(4000)]
+        before, after = HashRing(4), HashRing(5)
+        moved = [key for key in keys if before.shard(key) != after.shard(key)]
+        assert len(moved) < 0.3 * len(keys)
+        assert {after.shard(key) for key in moved} == {4}
+
+    def test_shard_sites(self):
+        """Test that every site lands in exactly one shard."""
+        shards = shard_sites(SITES, 3)
+        assert len(shards) == 3
+        assert sorted(site for shard in shards for site in shard) == sorted(SITES)
+
+    def test_invalid_shard_count(self):
+        """Test that zero shards raises ValueError."""
+        with pytest.raises(ValueError):
+            HashRing(0)
+
+
+class TestRunSharded:
+    """Test suite for run_sharded."""
+
+    def test_workers_poll_every_site_into_one_store(self, tmp_path):
+        """Test that two worker processes fetch every site once and share the store."""
+        path = str(tmp_path / "readings.sqlite")
+        TimeSeriesStore(path).close()
+        stop = multiprocessing.Event()
+        reports = []
+
+        def report(summary):
+            reports.append(summary)
+            if summary['never_fetched'] == 0:
+                stop.set()
+
+        summary = run_sharded(
+            SITES, 2,
+            store_path=path,
+            fetch_factory=flat_fetch_factory,
+            limiter=SharedRateLimiter(1000.0),
+            policy=RefreshPolicy(base_interval=3600, min_interval=3600),
+            workers=2,
+            stop=stop,
+            report=report,
+            report_every=0.05
+        )
+
+        assert reports
+        assert summary['sites'] == len(SITES)
+        assert summary['never_fetched'] == 0
+        assert summary['calls'] == len(SITES)
+        store = TimeSeriesStore(path)
+        assert len(store.locations()[0]) == len(SITES)
+        assert len(store) == 24 * len(SITES)
+        store.close()
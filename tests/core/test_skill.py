@@ -0,0 +1,138 @@
+"""
+Test suite for module.core.skill module.
+"""
+
+import numpy as np
+import pytest
+from module.core.aqi_calculators import POLLUTANT_FIELDS, calculate_all_aqi_values
+from module.core.air_quality_models import PollutantComponents
+from module.core.skill import (
+    SKILL_COLUMNS,
+    evaluate_skill,
+    evaluate_store,
+    join_observations,
+    lead_hours,
+    nowcasts
+)
+from module.core.store import TimeSeriesStore
+from tests.forecasts import make_forecast
+
+T0 = 1700000000 // 3600 * 3600
+
+
+def readings(cell, dt, fetched_at, o3):
+    """Columnar readings with constant components besides o3."""
+    n = len(dt)
+    result = {'cell': np.full(n, cell, dtype=np.int64), 'dt': np.asarray(dt, dtype=np.int64),
+              'fetched_at': np.asarray(fetched_at, dtype=np.int64)}
+    result.update((field, np.full(n, 10.0)) for field in POLLUTANT_FIELDS)
+    result['o3'] = np.asarray(o3, dtype=np.float64)
+    return result
+
+
+def overall_aqi(o3):
+    """Overall AQI of the readings() components with this o3."""
+    return max(calculate_all_aqi_values(PollutantComponents(
+        co=10.0, no=0.0, no2=10.0, o3=o3, so2=10.0, pm2_5=10.0, pm10=10.0, nh3=0.0
+    )))
+
+
+class TestJoin:
+    """Test suite for the (cell, dt) join and lead times."""
+
+    def test_lead_hours(self):
+        """Test that the hour a fetch was made in is lead 0 and the next is lead 1."""
+        fetched = T0 + 1200
+        assert lead_hours([T0 - 3600, T0, T0 + 3600, T0 + 7200], fetched).tolist() == [-1, 0, 1, 2]
+
+    def test_join_on_cell_and_hour(self):
+        """Test that rows match only when both cell and dt agree."""
+        forecasts = {'cell': np.array([5, 5, 7, 9]), 'dt': np.array([T0, T0 + 3600, T0, T0])}
+        observations = {'cell': np.array([7, 5, 5]), 'dt': np.array([T0, T0 + 3600, T0 + 7200])}
+
+        rows_f, rows_o = join_observations(forecasts, observations)
+
+        assert rows_f.tolist() == [1, 2]
+        assert rows_o.tolist() == [1, 0]
+
+    def test_nowcasts_keep_latest_lead_zero_row(self):
+        """Test that each hour is observed by the last fetch made during it."""
+        data = readings(1, [T0, T0, T0, T0 + 3600], [T0 - 3600, T0 + 60, T0 + 120, T0 + 120],
+                        [1.0, 2.0, 3.0, 4.0])
+
+        observed = nowcasts(data)
+
+        assert observed['dt'].tolist() == [T0]
+        assert observed['o3'].tolist() == [3.0]
+
+
+class TestEvaluateSkill:
+    """Test suite for error statistics by lead time."""
+
+    def test_bias_mae_rmse_by_lead(self):
+        """Test statistics against hand-computed errors."""
+        # Hour T0 + 2h observed at o3=50; forecast 1 h ahead as 52 and 54, 2 h ahead as 44
+        forecasts = readings(1, [T0 + 7200] * 3, [T0 + 3600, T0 + 3600, T0], [52.0, 54.0, 44.0])
+        observations = readings(1, [T0 + 7200], [T0 + 7200], [50.0])
+
+        table = evaluate_skill(forecasts, observations, max_lead=4).set_index(['lead_hours', 'variable'])
+
+        assert list(table.reset_index().columns) == SKILL_COLUMNS
+        assert sorted(set(table.index.get_level_values(0))) == [1, 2]
+        o3 = table.loc[(1, 'o3')]
+        assert o3['count'] == 2
+        assert o3['bias'] == pytest.approx(3.0)
+        assert o3['mae'] == pytest.approx(3.0)
+        assert o3['rmse'] == pytest.approx(np.sqrt((4 + 16) / 2))
+        assert table.loc[(2, 'o3'), 'bias'] == pytest.approx(-6.0)
+        assert table.loc[(1, 'pm2_5'), 'mae'] == 0
+        assert table.loc[(1, 'aqi'), 'bias'] == pytest.approx(
+            (overall_aqi(52.0) + overall_aqi(54.0)) / 2 - overall_aqi(50.0))
+        assert np.isnan(table.loc[(1, 'o3'), 'category_hit_rate'])
+
+    def test_category_hit_rate(self):
+        """Test the share of forecasts in the observed EPA category."""
+        forecasts = readings(1, [T0 + 3600] * 2, [T0, T0], [40.0, 150.0])
+        observations = readings(1, [T0 + 3600], [T0 + 3600], [45.0])
+
+        table = evaluate_skill(forecasts, observations, max_lead=2)
+
+        assert table.set_index('variable').loc['aqi', 'category_hit_rate'] == 0.5
+
+    def test_unobserved_and_out_of_range_leads_are_ignored(self):
+        """Test that forecasts without an observation or beyond max_lead add nothing."""
+        forecasts = readings(1, [T0 + 3600, T0 + 7200, T0 + 10 * 3600], [T0] * 3, [1.0, 2.0, 3.0])
+        observations = readings(1, [T0 + 3600, T0 + 10 * 3600], [T0 + 3600, T0 + 10 * 3600], [1.0, 3.0])
+
+        table = evaluate_skill(forecasts, observations, max_lead=5)
+
+        assert table['lead_hours'].unique().tolist() == [1]
+        assert table['count'].unique().tolist() == [1]
+
+
+class TestEvaluateStore:
+    """Test suite for skill straight from a TimeSeriesStore."""
+
+    def test_matches_known_errors(self):
+        """Test chunked evaluation of stored fetches against their nowcasts."""
+        store = TimeSeriesStore()
+        truth = 30.0 + np.arange(12)
+        for k in range(8):
+            # Fetched at minute 10 of hour k; lead h forecasts are h too high
+            store.ingest(1.0, 2.0, make_forecast(start=T0 + k * 3600, o3=(truth[k:k + 4] + np.arange(4)).tolist()),
+                         fetched_at=T0 + k * 3600 + 600)
+
+        table = evaluate_store(store, T0, T0 + 12 * 3600, max_lead=3, chunk_hours=5)
+        o3 = table[table['variable'] == 'o3'].set_index('lead_hours')
+
+        assert o3.index.tolist() == [1, 2, 3]
+        np.testing.assert_allclose(o3['bias'], [1.0, 2.0, 3.0])
+        np.testing.assert_allclose(o3['rmse'], [1.0, 2.0, 3.0])
+        assert o3['count'].tolist() == [7, 6, 5]
+
+    def test_empty_range(self):
+        """Test that a period without data gives an empty table."""
+        table = evaluate_store(TimeSeriesStore(), T0, T0 + 3600)
+
+        assert len(table) == 0
+        assert list(table.columns) == SKILL_COLUMNS
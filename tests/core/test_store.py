@@ -0,0 +1,254 @@
+"""
+Test suite for module.core.store module.
+"""
+
+import sqlite3
+import numpy as np
+import pytest
+from module.core.air_quality_api import convert_json_to_object
+from module.core.store import (
+    READING_COLUMNS,
+    TimeSeriesStore,
+    cell_coordinates,
+    cell_id,
+    concentrations
+)
+from tests.forecasts import CLEAN, T0, make_forecast
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(str(tmp_path / "readings.sqlite"))
+    yield store
+    store.close()
+
+
+class TestCells:
+    """Test suite for location cell keys."""
+
+    def test_round_trip(self):
+        """Test that cell ids decode to the rounded coordinate."""
+        for lat, lon in [(42.03001, -93.62), (-90.0, -180.0), (90.0, 180.0), (0.0, 0.0)]:
+            decoded = cell_coordinates(cell_id(lat, lon))
+            assert decoded == pytest.approx((round(lat, 4), round(lon, 4)))
+
+    def test_nearby_points_share_a_cell(self):
+        """Test that coordinates within the rounding share an id."""
+        assert cell_id(42.030001, -93.62) == cell_id(42.03, -93.620002)
+        assert cell_id(42.0301, -93.62) != cell_id(42.03, -93.62)
+
+
+class TestTimeSeriesStore:
+    """Test suite for TimeSeriesStore."""
+
+    def test_ingest_is_idempotent(self, store):
+        """Test that re-ingesting a fetch adds nothing."""
+        assert store.ingest(42.03, -93.62, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0) == 3
+        assert store.ingest(42.03, -93.62, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0) == 0
+        assert len(store) == 3
+
+    def test_objects_and_json_store_the_same_values(self, store):
+        """Test that AirQualityResponse and raw JSON ingest identically."""
+        forecast = make_forecast(aqi=2, o3=20.0 + np.arange(3))
+        store.ingest(1.0, 2.0, forecast, fetched_at=T0)
+        store.ingest(3.0, 4.0, convert_json_to_object(forecast), fetched_at=T0)
+        a = store.location_range(1.0, 2.0, T0, T0 + 7200)
+        b = store.location_range(3.0, 4.0, T0, T0 + 7200)
+        for column in READING_COLUMNS:
+            np.testing.assert_array_equal(a[column], b[column])
+        np.testing.assert_array_equal(a['o3'], [20.0, 21.0, 22.0])
+        np.testing.assert_array_equal(a['owm_aqi'], [2, 2, 2])
+
+    def test_range_returns_latest_fetch_per_hour(self, store):
+        """Test that a newer fetch of an hour supersedes the older one."""
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(4)), fetched_at=T0)
+        store.ingest(1.0, 2.0, make_forecast(start=T0 + 3600, o3=50.0 + np.arange(4)), fetched_at=T0 + 3600)
+        latest = store.location_range(1.0, 2.0, T0, T0 + 10 * 3600)
+        np.testing.assert_array_equal(latest['dt'], T0 + 3600 * np.arange(5))
+        np.testing.assert_array_equal(latest['o3'], [20.0, 50.0, 51.0, 52.0, 53.0])
+        np.testing.assert_array_equal(latest['fetched_at'], [T0] + [T0 + 3600] * 4)
+
+        every = store.location_range(1.0, 2.0, T0, T0 + 10 * 3600, latest=False)
+        assert len(every['dt']) == 8
+        assert np.all(np.diff(every['dt']) >= 0)
+
+    def test_ingest_many_matches_separate_ingests(self, store):
+        """Test that one batched transaction stores what separate ingests would."""
+        added = store.ingest_many([
+            (1.0, 2.0, make_forecast(o3=20.0 + np.arange(4)), T0),
+            (1.0, 2.0, make_forecast(start=T0 + 3600, o3=50.0 + np.arange(4)), T0 + 3600),
+            (3.0, 4.0, make_forecast(o3=20.0 + np.arange(3)), T0),
+        ])
+        assert added == 11
+        np.testing.assert_array_equal(store.location_range(1.0, 2.0, T0, T0 + 36000)['o3'],
+                                      [20.0, 50.0, 51.0, 52.0, 53.0])
+        assert store.ingest_many([]) == 0
+
+    def test_older_fetch_ingested_late_does_not_win(self, store):
+        """Test that backfilling an old fetch keeps the newer values current."""
+        store.ingest(1.0, 2.0, make_forecast(o3=50.0 + np.arange(3)), fetched_at=T0 + 60)
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0)
+        np.testing.assert_array_equal(store.location_range(1.0, 2.0, T0, T0 + 7200)['o3'], [50.0, 51.0, 52.0])
+        np.testing.assert_array_equal(store.snapshot(T0)['o3'], [50.0])
+        assert len(store.location_range(1.0, 2.0, T0, T0 + 7200, latest=False)['dt']) == 6
+
+    def test_fetched_before_reproduces_past_knowledge(self, store):
+        """Test that fetched_before hides fetches made after that time."""
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0)
+        store.ingest(1.0, 2.0, make_forecast(o3=50.0 + np.arange(3)), fetched_at=T0 + 60)
+        past = store.location_range(1.0, 2.0, T0, T0 + 7200, fetched_before=T0 + 59)
+        np.testing.assert_array_equal(past['o3'], [20.0, 21.0, 22.0])
+        np.testing.assert_array_equal(store.snapshot(T0, fetched_before=T0 + 59)['o3'], [20.0])
+
+    def test_range_bounds_and_other_locations(self, store):
+        """Test that a range query is limited to its cell and inclusive bounds."""
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(10)), fetched_at=T0)
+        store.ingest(1.0, 2.1, make_forecast(o3=90.0 + np.arange(10)), fetched_at=T0)
+        result = store.location_range(1.0, 2.0, T0 + 3600, T0 + 3 * 3600)
+        np.testing.assert_array_equal(result['o3'], [21.0, 22.0, 23.0])
+        assert len(store.location_range(5.0, 5.0, T0, T0 + 36000)['dt']) == 0
+
+    def test_snapshot_of_all_locations(self, store):
+        """Test that snapshot returns each location's latest value at time t."""
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0)
+        store.ingest(1.0, 2.0, make_forecast(o3=30.0 + np.arange(3)), fetched_at=T0 + 60)
+        store.ingest(-5.0, 7.5, make_forecast(o3=40.0 + np.arange(3)), fetched_at=T0)
+        snap = store.snapshot(T0 + 3600)
+        order = np.argsort(snap['lat'])
+        np.testing.assert_array_equal(snap['lat'][order], [-5.0, 1.0])
+        np.testing.assert_array_equal(snap['lon'][order], [7.5, 2.0])
+        np.testing.assert_array_equal(snap['o3'][order], [41.0, 31.0])
+        assert concentrations(snap).shape == (2, 6)
+
+    def test_time_range_of_all_locations(self, store):
+        """Test that time_range returns every location's rows in (dt, cell, fetched_at) order."""
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0)
+        store.ingest(1.0, 2.0, make_forecast(o3=30.0 + np.arange(3)), fetched_at=T0 + 60)
+        store.ingest(-5.0, 7.5, make_forecast(o3=40.0 + np.arange(3)), fetched_at=T0)
+        every = store.time_range(T0 + 3600, T0 + 7200, latest=False)
+        assert len(every['dt']) == 6
+        keys = list(zip(every['dt'], every['cell'], every['fetched_at']))
+        assert keys == sorted(keys)
+        latest = store.time_range(T0 + 3600, T0 + 7200)
+        np.testing.assert_array_equal(latest['dt'], [T0 + 3600] * 2 + [T0 + 7200] * 2)
+        np.testing.assert_array_equal(np.sort(latest['o3'][:2]), [31.0, 41.0])
+
+    def test_updated_cells_and_cell_filter(self, store):
+        """Test finding cells refetched since a time and reading just those."""
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0)
+        store.ingest(-5.0, 7.5, make_forecast(o3=40.0 + np.arange(3)), fetched_at=T0)
+        store.ingest(1.0, 2.0, make_forecast(start=T0 + 3600, o3=30.0 + np.arange(3)), fetched_at=T0 + 60)
+
+        cells = store.updated_cells(T0, T0, T0 + 7200)
+
+        assert cells.tolist() == [cell_id(1.0, 2.0)]
+        readings = store.time_range(T0, T0 + 7200, cells=cells)
+        np.testing.assert_array_equal(readings['o3'], [20.0, 30.0, 31.0])
+        assert len(store.updated_cells(T0 + 60, T0, T0 + 7200)) == 0
+
+    def test_persists_and_lists_locations(self, tmp_path):
+        """Test that readings survive reopening the file."""
+        path = str(tmp_path / "readings.sqlite")
+        store = TimeSeriesStore(path)
+        store.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0)
+        store.close()
+        store = TimeSeriesStore(path)
+        lats, lons = store.locations()
+        assert list(lats) == [1.0] and list(lons) == [2.0]
+        assert len(store) == 3
+        store.close()
+
+    def test_read_only_never_creates_or_alters_files(self, tmp_path):
+        """Test that a read-only store reads an existing file and rejects anything else."""
+        path = tmp_path / "readings.sqlite"
+        writer = TimeSeriesStore(str(path), rollup_tz='Europe/Paris')
+        writer.ingest(1.0, 2.0, make_forecast(o3=20.0 + np.arange(3)), fetched_at=T0)
+
+        reader = TimeSeriesStore(str(path), read_only=True)
+        assert len(reader) == 3 and reader.rollup_tz == 'Europe/Paris'
+        with pytest.raises(sqlite3.OperationalError):
+            reader.ingest(1.0, 2.0, make_forecast(start=T0 + 3600, o3=20.0 + np.arange(3)), fetched_at=T0 + 60)
+        reader.close()
+        writer.close()
+
+        with pytest.raises(sqlite3.DatabaseError):
+            TimeSeriesStore(str(tmp_path / "missing.sqlite"), read_only=True)
+        assert not (tmp_path / "missing.sqlite").exists()
+        (tmp_path / "notes.txt").write_text("not a database\n" * 100)
+        with pytest.raises(sqlite3.DatabaseError):
+            TimeSeriesStore(str(tmp_path / "notes.txt"), read_only=True)
+        assert (tmp_path / "notes.txt").read_text() == "not a database\n" * 100
+
+
+def make_day(start, hours=24, pm2_5=10.0):
+    """Raw API JSON of `hours` hours with constant PM2.5 (and clean other pollutants)."""
+    return make_forecast(hours=hours, start=start, base=CLEAN, pm2_5=pm2_5)
+
+
+D0 = 1698796800  # 2023-11-01 00:00 UTC
+
+
+class TestRollups:
+    """Test suite for rollups maintained on ingest."""
+
+    def test_incremental_rollups_match_a_rebuild(self, store):
+        """Test that overlapping and revised fetches leave the same rollups as a full recompute."""
+        store.ingest(1.0, 2.0, make_forecast(start=D0 + 20 * 3600, o3=100.0 + np.arange(30)), fetched_at=D0)
+        store.ingest(1.0, 2.0, make_forecast(start=D0 + 30 * 3600, o3=60.0 + np.arange(40)), fetched_at=D0 + 3600)
+        store.ingest(3.0, 4.0, make_forecast(start=D0, o3=20.0 + np.arange(5)), fetched_at=D0)
+        incremental = store.rollups(D0, D0 + 5 * 86400)
+
+        store.rebuild_rollups()
+        rebuilt = store.rollups(D0, D0 + 5 * 86400)
+
+        assert incremental['hours'].tolist() == [4, 24, 22, 5]
+        assert incremental['hours'].sum() == len(store.time_range(D0, D0 + 5 * 86400)['dt'])
+        for column, values in rebuilt.items():
+            np.testing.assert_allclose(incremental[column].astype(float), values.astype(float))
+        hours = store.location_range(1.0, 2.0, D0 + 86400, D0 + 2 * 86400 - 1)
+        assert incremental['o3_max'][1] == hours['o3'].max()
+        assert incremental['o3_mean'][1] == pytest.approx(hours['o3'].mean())
+
+    def test_months_combine_days(self, store):
+        """Test that monthly rollups count the days above Moderate across ingests."""
+        for day in range(45):
+            store.ingest(1.0, 2.0, make_day(D0 + day * 86400, pm2_5=80.0 if day % 3 == 0 else 5.0),
+                         fetched_at=D0 + day * 86400)
+
+        monthly = store.rollups(D0, D0 + 44 * 86400, freq='month', lat=1.0, lon=2.0)
+
+        assert [str(s) for s in monthly['start']] == ['2023-11-01', '2023-12-01']
+        assert monthly['days'].tolist() == [30, 15]
+        assert monthly['hours'].tolist() == [720, 360]
+        assert monthly['days_over_100'].tolist() == [10, 5]
+        assert monthly['hours_over_100'].tolist() == [240, 120]
+        assert monthly['dominant_pm2_5'].tolist() == [720, 360]
+
+    def test_local_days(self, tmp_path):
+        """Test that rollup days follow local midnight in rollup_tz."""
+        store = TimeSeriesStore(str(tmp_path / "chicago.sqlite"), rollup_tz='America/Chicago')
+        store.ingest(1.0, 2.0, make_day(D0, hours=48), fetched_at=D0)
+
+        daily = store.rollups(D0, D0 + 2 * 86400)
+
+        assert [str(s) for s in daily['start']] == ['2023-10-31', '2023-11-01', '2023-11-02']
+        assert daily['hours'].tolist() == [5, 24, 19]
+        store.close()
+        with pytest.raises(ValueError):
+            TimeSeriesStore(str(tmp_path / "chicago.sqlite"))
+
+    def test_expire_keeps_rollups(self, store):
+        """Test that expired hours are deleted, stay deleted and keep their rollups."""
+        for day in range(10):
+            store.ingest(1.0, 2.0, make_day(D0 + day * 86400), fetched_at=D0 + day * 86400)
+        before = store.rollups(D0, D0 + 9 * 86400)
+
+        deleted = store.expire(3, now=D0 + 9 * 86400 + 43200)
+
+        assert deleted == 6 * 24
+        assert store.location_range(1.0, 2.0, D0, D0 + 10 * 86400)['dt'].min() == D0 + 6 * 86400
+        assert store.ingest(1.0, 2.0, make_day(D0, pm2_5=200.0), fetched_at=D0 + 10 * 86400) == 0
+        after = store.rollups(D0, D0 + 9 * 86400)
+        for column, values in before.items():
+            np.testing.assert_array_equal(after[column], values)
+        assert store.rollups(D0, D0 + 9 * 86400, freq='month')['hours'].tolist() == [240]
@@ -0,0 +1,122 @@
+"""
+Test suite for module.core.throttle module.
+"""
+
+import multiprocessing
+import time
+import pytest
+from module.core.throttle import RateLimiter, SharedRateLimiter
+
+
+class FakeClock:
+    """Manually advanced clock; sleeping advances time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def take_tokens(limiter, count, stamps):
+    """Worker process: acquire `count` tokens and record when each was granted."""
+    for _ in range(count):
+        limiter.acquire()
+        stamps.put(time.monotonic())
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter."""
+
+    def test_first_call_does_not_wait(self):
+        """Test that a fresh limiter lets the first call through immediately."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, clock=clock, sleep=clock.sleep)
+        
+        assert limiter.acquire() == 0.0
+
+    def test_calls_are_spaced_by_interval(self):
+        """Test that consecutive calls wait one interval each."""
+        clock = FakeClock()
+        limiter = RateLimiter(2.0, clock=clock, sleep=clock.sleep)
+        
+        limiter.acquire()
+        waited = limiter.acquire()
+        
+        assert waited == pytest.approx(0.5)
+        assert clock.now == pytest.approx(0.5)
+
+    def test_try_acquire_does_not_block(self):
+        """Test that try_acquire fails instead of sleeping when no token is left."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, clock=clock, sleep=clock.sleep)
+        
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+        assert clock.slept == []
+        
+        clock.now += 1.0
+        assert limiter.try_acquire() is True
+
+    def test_burst_allows_back_to_back_calls(self):
+        """Test that burst tokens accumulate up to the burst size only."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, burst=3, clock=clock, sleep=clock.sleep)
+        
+        assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+        
+        clock.now += 100.0
+        assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_invalid_rate_rejected(self):
+        """Test that non-positive rates raise ValueError."""
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+
+
+class TestSharedRateLimiter:
+    """Test suite for SharedRateLimiter."""
+
+    def test_calls_are_spaced_by_interval(self):
+        """Test that it spaces calls like RateLimiter."""
+        clock = FakeClock()
+        limiter = SharedRateLimiter(2.0, clock=clock, sleep=clock.sleep)
+
+        assert limiter.acquire() == 0.0
+        assert limiter.acquire() == pytest.approx(0.5)
+        assert clock.now == pytest.approx(0.5)
+
+    def test_burst_allows_back_to_back_calls(self):
+        """Test that burst tokens accumulate up to the burst size only."""
+        clock = FakeClock()
+        limiter = SharedRateLimiter(1.0, burst=3, clock=clock, sleep=clock.sleep)
+
+        assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+        assert clock.slept == []
+
+        clock.now += 100.0
+        assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_processes_share_one_quota(self):
+        """Test that tokens taken in separate processes are spaced as one stream."""
+        limiter = SharedRateLimiter(50.0)
+        stamps = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=take_tokens, args=(limiter, 5, stamps)) for _ in range(2)]
+        for proc in procs:
+            proc.start()
+        granted = sorted(stamps.get(timeout=10) for _ in range(10))
+        for proc in procs:
+            proc.join()
+
+        # Ten tokens at 50/s span nine intervals, whichever process took them
+        assert granted[-1] - granted[0] >= 9 * 0.02 * 0.8
+
+    def test_invalid_rate_rejected(self):
+        """Test that non-positive rates raise ValueError."""
+        with pytest.raises(ValueError):
+            SharedRateLimiter(-1.0)
@@ -0,0 +1,76 @@
+"""
+Test suite for module.core.timeseries module.
+"""
+
+import pytest
+from unittest.mock import Mock
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from module.core.aqi_calculators import calculate_all_aqi_values
+from module.core.timeseries import build_aqi_timeseries, timestamps_to_datetimes
+
+
+def make_item(dt, pm2_5=5.0, pm10=15.0, no2=20.0, so2=10.0, co=300.0, o3=40.0):
+    """Mock AirQualityData entry."""
+    item = Mock()
+    item.dt = dt
+    item.components = Mock(pm2_5=pm2_5, pm10=pm10, no2=no2, so2=so2, co=co, o3=o3)
+    return item
+
+
+class TestTimestampsToDatetimes:
+    """Test suite for bulk timestamp conversion."""
+
+    def test_returns_tz_aware_index(self):
+        """Test that the result is a tz-aware DatetimeIndex."""
+        dates = timestamps_to_datetimes([1700000000, 1700003600])
+
+        assert isinstance(dates, pd.DatetimeIndex)
+        assert dates.tz is not None
+
+    def test_explicit_timezone(self):
+        """Test conversion into a named timezone keeps the instant."""
+        dates = timestamps_to_datetimes([1700000000], tz='America/Chicago')
+
+        assert str(dates.tz) == 'America/Chicago'
+        assert dates[0] == pd.Timestamp('2023-11-14 22:13:20', tz='UTC')
+        assert dates[0].hour == 16
+
+    def test_default_matches_fromtimestamp(self):
+        """Test that the default timezone reproduces datetime.fromtimestamp."""
+        seconds = [1700000000, 1720000000]  # Winter and summer (DST)
+
+        dates = timestamps_to_datetimes(seconds)
+
+        assert list(dates.tz_localize(None).to_pydatetime()) == [datetime.fromtimestamp(s) for s in seconds]
+
+
+class TestBuildAQITimeseries:
+    """Test suite for the unified time-series builder."""
+
+    def test_matches_scalar_engine(self):
+        """Test that max AQI equals the per-point scalar result."""
+        items = [make_item(1700000000 + i * 3600, pm10=10.0 * i, o3=30.0 + 20 * i) for i in range(8)]
+
+        dates, max_aqi = build_aqi_timeseries(items)
+
+        assert len(dates) == 8
+        assert max_aqi.dtype == np.float64
+        assert list(max_aqi) == [max(calculate_all_aqi_values(item.components)) for item in items]
+
+    def test_empty_forecast(self):
+        """Test that an empty list gives empty results."""
+        dates, max_aqi = build_aqi_timeseries([])
+
+        assert len(dates) == 0
+        assert len(max_aqi) == 0
+
+    def test_outputs_are_usable_without_copy(self):
+        """Test that pandas wraps the outputs without copying the values."""
+        dates, max_aqi = build_aqi_timeseries([make_item(1700000000), make_item(1700003600)])
+
+        series = pd.Series(max_aqi, index=dates, copy=False)
+
+        assert np.shares_memory(series.to_numpy(), max_aqi)
+        assert series.index is dates
@@ -4,9 +4,18 @@ Focuses on testing calculate_max_aqi_over_time and plot_max_aqi_over_time functi
 """
 
 import pytest
+import numpy as np
+import pandas as pd
 from unittest.mock import Mock, patch
 from datetime import datetime
-from module.core.visualization import calculate_max_aqi_over_time, plot_max_aqi_over_time
+from module.core.visualization import (
+    WEBGL_POINT_THRESHOLD,
+    calculate_max_aqi_over_time,
+    plot_max_aqi_over_time,
+    scatter_trace_type
+)
+import plotly.graph_objects as go
+from module.core.aqi_calculators import calculate_all_aqi_values
 
 
 @pytest.fixture
@@ -87,11 +96,11 @@ class TestVisualization:
     """Test suite for visualization functions."""
 
     def test_calculate_max_aqi_returns_tuple(self, mock_air_quality_single):
-        """Test that calculate_max_aqi_over_time returns a tuple of two lists."""
+        """Test that calculate_max_aqi_over_time returns a DatetimeIndex and a float array."""
         dates, max_aqi_values = calculate_max_aqi_over_time(mock_air_quality_single)
         
-        assert isinstance(dates, list)
-        assert isinstance(max_aqi_values, list)
+        assert isinstance(dates, pd.DatetimeIndex)
+        assert isinstance(max_aqi_values, np.ndarray)
 
     def test_calculate_max_aqi_equal_lengths(self, mock_air_quality_single):
         """Test that dates and AQI values lists have equal length."""
@@ -137,28 +146,23 @@ class TestVisualization:
         """Test that Unix timestamps are converted to datetime correctly."""
         dates, max_aqi_values = calculate_max_aqi_over_time(mock_air_quality_single)
         
-        # Verify the timestamp conversion
-        expected_datetime = datetime.fromtimestamp(1700000000)
-        assert dates[0] == expected_datetime
+        # Same instant, shown in local wall-clock time like fromtimestamp
+        assert dates[0] == pd.Timestamp(1700000000, unit='s', tz='UTC')
+        assert dates[0].tz_localize(None) == datetime.fromtimestamp(1700000000)
 
     def test_calculate_max_aqi_empty_list(self):
-        """Test that empty air quality list returns empty lists."""
+        """Test that empty air quality list returns empty arrays."""
         dates, max_aqi_values = calculate_max_aqi_over_time([])
         
-        assert dates == []
-        assert max_aqi_values == []
+        assert len(dates) == 0
+        assert len(max_aqi_values) == 0
 
-    def test_calculate_max_aqi_calls_calculate_all_aqi_values(self, mock_air_quality_single):
-        """Test that calculate_all_aqi_values is called for each entry."""
-        with patch('module.core.visualization.calculate_all_aqi_values') as mock_calc:
-            mock_calc.return_value = [10, 20, 30, 40, 50, 60]
-            
-            dates, max_aqi_values = calculate_max_aqi_over_time(mock_air_quality_single)
-            
-            # Should call calculate_all_aqi_values once for single entry
-            mock_calc.assert_called_once()
-            # Max of [10, 20, 30, 40, 50, 60] is 60
-            assert max_aqi_values[0] == 60
+    def test_calculate_max_aqi_matches_scalar_engine(self, mock_air_quality_multiple):
+        """Test that batch max AQI equals the max of calculate_all_aqi_values per entry."""
+        dates, max_aqi_values = calculate_max_aqi_over_time(mock_air_quality_multiple)
+        
+        expected = [max(calculate_all_aqi_values(d.components)) for d in mock_air_quality_multiple]
+        assert list(max_aqi_values) == expected
 
     def test_plot_max_aqi_creates_figure(self, mock_air_quality_single):
         """Test that plot_max_aqi_over_time creates a Plotly figure."""
@@ -263,3 +267,49 @@ class TestVisualization:
             assert mock_fig_instance.add_trace.called
             assert mock_fig_instance.update_layout.called
             assert mock_fig_instance.show.called
+
+    def test_plot_max_aqi_downsamples_long_series(self):
+        """Test that long series are reduced before plotting, keeping the peak."""
+        dates = pd.date_range('2024-01-01', periods=50_000, freq='h')
+        values = np.full(50_000, 40.0)
+        values[31337] = 250.0
+        
+        with patch('module.core.visualization.go') as mock_go:
+            plot_max_aqi_over_time(dates, values, "Test Location", width_px=600, render_mode='svg')
+            
+            y = mock_go.Scatter.call_args.kwargs['y']
+            assert len(y) <= 3 * 600
+            assert 250.0 in y
+
+    def test_plot_max_aqi_short_series_uses_svg(self, mock_air_quality_multiple):
+        """Test that small series keep the SVG scatter trace."""
+        dates, max_aqi_values = calculate_max_aqi_over_time(mock_air_quality_multiple)
+        
+        with patch('module.core.visualization.go') as mock_go:
+            plot_max_aqi_over_time(dates, max_aqi_values, "Test Location")
+            
+            mock_go.Scatter.assert_called_once()
+            mock_go.Scattergl.assert_not_called()
+
+
+class TestScatterTraceType:
+    """Test suite for SVG/WebGL trace selection."""
+
+    def test_auto_switches_above_threshold(self):
+        """Test that 'auto' uses WebGL only above the threshold."""
+        assert scatter_trace_type(WEBGL_POINT_THRESHOLD) is go.Scatter
+        assert scatter_trace_type(WEBGL_POINT_THRESHOLD + 1) is go.Scattergl
+
+    def test_custom_threshold(self):
+        """Test that the threshold is configurable."""
+        assert scatter_trace_type(200, threshold=100) is go.Scattergl
+
+    def test_forced_modes(self):
+        """Test that 'svg' and 'webgl' ignore the point count."""
+        assert scatter_trace_type(10 ** 6, 'svg') is go.Scatter
+        assert scatter_trace_type(1, 'webgl') is go.Scattergl
+
+    def test_rejects_unknown_mode(self):
+        """Test that an unknown render mode raises ValueError."""
+        with pytest.raises(ValueError):
+            scatter_trace_type(10, 'canvas')
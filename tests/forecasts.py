@@ -0,0 +1,56 @@
+"""
+Raw OpenWeather forecast JSON shared by the test suites.
+"""
+
+import numpy as np
+
+T0 = 1700000000
+
+# Typical background: every sub-index well inside the "Good" band
+TYPICAL = {"co": 250.0, "no": 0.5, "no2": 10.0, "o3": 20.0,
+           "so2": 5.0, "pm2_5": 8.0, "pm10": 20.0, "nh3": 1.0}
+
+# Near-zero background, so the overall AQI follows the component being varied
+CLEAN = {"co": 100.0, "no": 0.0, "no2": 1.0, "o3": 1.0,
+         "so2": 1.0, "pm2_5": 1.0, "pm10": 1.0, "nh3": 0.0}
+
+
+def make_forecast(hours=None, start=T0, lat=0.0, lon=0.0, aqi=1, base=TYPICAL, **components):
+    """Raw API JSON with one entry per hour from `start`.
+
+    Args:
+        hours: Number of hourly entries; defaults to the length of the
+            per-hour components
+        start: Unix time of the first entry
+        lat: Latitude of the response
+        lon: Longitude of the response
+        aqi: OpenWeather index of every entry
+        base: Values of the components not given
+        **components: Per-hour values (a sequence) or one value for every
+            hour, by component name
+
+    Returns:
+        dict: Forecast shaped like read_pollution_data_from_api's result
+    """
+    per_hour = {name: value for name, value in components.items() if np.ndim(value)}
+    if hours is None:
+        hours = min(len(value) for value in per_hour.values())
+
+    def component(name, h):
+        if name in per_hour:
+            return float(per_hour[name][h])
+        return float(components.get(name, base[name]))
+
+    return {
+        "coord": {"lat": lat, "lon": lon},
+        "list": [
+            {"dt": start + h * 3600, "main": {"aqi": aqi},
+             "components": {name: component(name, h) for name in base}}
+            for h in range(hours)
+        ]
+    }
+
+
+def site_forecast(lat, hours=3):
+    """Hourly forecast whose ozone level depends on latitude."""
+    return make_forecast(lat=lat, o3=20.0 + lat + np.arange(hours))
@@ -0,0 +1,3 @@
+"""
+Tests for module.service package.
+"""
@@ -0,0 +1,280 @@
+"""
+Test suite for module.service.app module.
+"""
+
+import asyncio
+import json
+import threading
+import pytest
+import requests
+from module.core.aqi_calculators import calculate_all_aqi_values
+from module.core.air_quality_models import PollutantComponents
+from module.core.aqi_analysis import AQI_CATEGORY_LABELS, categorize_aqi
+from module.core.leaderboard import Leaderboard
+from module.core.store import TimeSeriesStore
+from module.service.app import AQIService, TTLCache, parse_target, ApiError
+from module.service.server import Request, Response
+from tests.forecasts import site_forecast
+
+
+class Upstream:
+    """Thread-safe stand-ins for the geocoder and forecast API, counting calls."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.geocodes = []
+        self.fetches = []
+        self._lock = threading.Lock()
+
+    def geocode(self, name):
+        with self._lock:
+            self.geocodes.append(name)
+        if name == 'nowhere':
+            return (None, None), None
+        return (10.0, 20.0), name.title()
+
+    def fetch(self, lat, lon):
+        with self._lock:
+            self.fetches.append((lat, lon))
+        if lat in self.failing:
+            raise requests.exceptions.ConnectionError("down")
+        return site_forecast(lat)
+
+
+def call(service, method, path, query=None, body=None):
+    """Dispatch a request and resolve it to (status, decoded JSON, Response)."""
+    raw = json.dumps(body).encode() if body is not None else b''
+    result = service(Request(method, path, query or {}, {}, raw))
+    if not isinstance(result, Response):
+        result = asyncio.run(result)
+    return result.status, json.loads(result.body), result
+
+
+@pytest.fixture
+def upstream():
+    return Upstream(failing={45.0})
+
+
+@pytest.fixture
+def service(upstream):
+    return AQIService(geocode=upstream.geocode, fetch=upstream.fetch)
+
+
+class TestTTLCache:
+    """Test suite for TTLCache."""
+
+    def test_entries_expire(self):
+        """Test that entries disappear after the TTL."""
+        now = [0.0]
+        cache = TTLCache(10, clock=lambda: now[0])
+        cache.put('a', 1)
+        assert cache.get('a') == 1
+        now[0] = 10.0
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_evicted(self):
+        """Test that the cache keeps at most max_entries, dropping the coldest."""
+        cache = TTLCache(60, max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1 and cache.get('c') == 3
+
+
+class TestParseTarget:
+    """Test suite for query parsing."""
+
+    def test_coordinates_rounded(self):
+        """Test that nearby coordinates share a key."""
+        assert parse_target({'lat': '42.000001', 'lon': '-93.5'}) == ('coords', 42.0, -93.5)
+
+    def test_location_normalized(self):
+        """Test that location names are normalized like the geocoding cache."""
+        assert parse_target({'location': '  Ames,   IA '}) == ('location', 'ames, ia')
+
+    @pytest.mark.parametrize("params", [{}, {'lat': '1'}, {'lat': 'x', 'lon': '1'}, {'lat': '91', 'lon': '0'},
+                                        {'lat': 'nan', 'lon': '0'}, {'location': '   '}])
+    def test_invalid(self, params):
+        """Test that missing or out-of-range parameters are rejected with 400."""
+        with pytest.raises(ApiError) as error:
+            parse_target(params)
+        assert error.value.status == 400
+
+
+class TestAQIEndpoint:
+    """Test suite for GET /aqi."""
+
+    def test_matches_calculate_all_aqi_values(self, service):
+        """Test that /aqi reports the first forecast hour scored per pollutant."""
+        status, payload, _ = call(service, 'GET', '/aqi', {'lat': '10', 'lon': '20'})
+        components = site_forecast(10.0)['list'][0]['components']
+        values = calculate_all_aqi_values(PollutantComponents(**components))
+        assert status == 200
+        assert payload['aqi'] == max(values)
+        assert list(payload['pollutants'].values()) == values
+        assert payload['dominant_pollutant'] == 'O3'
+        assert payload['category'] == 'Good'
+        assert (payload['lat'], payload['lon']) == (10.0, 20.0)
+
+    def test_second_request_is_served_from_cache(self, service, upstream):
+        """Test that a repeated request returns the cached Response synchronously."""
+        _, _, first = call(service, 'GET', '/aqi', {'lat': '10', 'lon': '20'})
+        second = service(Request('GET', '/aqi', {'lat': '10.00001', 'lon': '20'}, {}))
+        assert second is first
+        assert first.etag is not None
+        assert len(upstream.fetches) == 1
+
+    def test_location_is_geocoded_once(self, service, upstream):
+        """Test that named lookups share the geocode and the forecast of the same place."""
+        _, payload, _ = call(service, 'GET', '/aqi', {'location': 'Ames'})
+        call(service, 'GET', '/forecast', {'location': 'ames'})
+        assert payload['display_name'] == 'Ames'
+        assert upstream.geocodes == ['ames']
+        assert upstream.fetches == [(10.0, 20.0)]
+
+    def test_unknown_location_is_404(self, service):
+        """Test that a location the geocoder cannot find answers 404."""
+        status, payload, _ = call(service, 'GET', '/aqi', {'location': 'Nowhere'})
+        assert status == 404
+        assert 'nowhere' in payload['error']
+
+    def test_upstream_failure_is_502_and_not_cached(self, service, upstream):
+        """Test that fetch errors answer 502 and are retried on the next request."""
+        assert call(service, 'GET', '/aqi', {'lat': '45', 'lon': '0'})[0] == 502
+        assert call(service, 'GET', '/aqi', {'lat': '45', 'lon': '0'})[0] == 502
+        assert len(upstream.fetches) == 2
+
+    def test_concurrent_misses_share_one_fetch(self, service, upstream):
+        """Test that simultaneous requests for one place make one upstream call."""
+        async def run():
+            request = Request('GET', '/aqi', {'lat': '10', 'lon': '20'}, {})
+            return await asyncio.gather(*(service(request) for _ in range(5)))
+
+        responses = asyncio.run(run())
+        assert len({response.body for response in responses}) == 1
+        assert len(upstream.fetches) == 1
+
+
+class TestForecastEndpoint:
+    """Test suite for GET /forecast."""
+
+    def test_hourly_arrays(self, service):
+        """Test that /forecast returns one value per forecast hour."""
+        status, payload, _ = call(service, 'GET', '/forecast', {'lat': '10', 'lon': '20'})
+        assert status == 200
+        assert payload['times'] == [1700000000, 1700003600, 1700007200]
+        assert payload['pollutants']['O3'] == [30.0, 31.0, 32.0]
+        assert payload['aqi'] == [30.0, 31.0, 32.0]
+
+
+class TestBatchEndpoint:
+    """Test suite for POST /aqi/batch."""
+
+    def test_results_in_request_order_with_errors_inline(self, service, upstream):
+        """Test that each location gets a result or an inline error."""
+        status, payload, _ = call(service, 'POST', '/aqi/batch', body={
+            'locations': [{'lat': 10, 'lon': 20}, 'Ames', 'Nowhere', {'lat': 45, 'lon': 0}, 5]
+        })
+        results = payload['results']
+        assert status == 200
+        assert results[0]['lat'] == 10.0
+        assert results[1]['display_name'] == 'Ames'
+        assert [r.get('status') for r in results[2:]] == [404, 502, 400]
+        assert len(upstream.fetches) == 2
+
+    def test_batch_warms_single_cache(self, service, upstream):
+        """Test that a batch result is reused by a later /aqi request."""
+        call(service, 'POST', '/aqi/batch', body={'locations': [{'lat': 10, 'lon': 20}]})
+        assert isinstance(service(Request('GET', '/aqi', {'lat': '10', 'lon': '20'}, {})), Response)
+
+    def test_invalid_body(self, service):
+        """Test that malformed batch bodies are rejected."""
+        assert call(service, 'POST', '/aqi/batch', body={'places': []})[0] == 400
+        assert call(service, 'POST', '/aqi/batch', body={'locations': ['a'] * 101})[0] == 413
+
+
+class TestScoreEndpoint:
+    """Test suite for POST /aqi/score."""
+
+    def test_components_and_rows_agree(self, service):
+        """Test that both body layouts score like calculate_all_aqi_values."""
+        columns = {'pm2_5': [8.0, 100.0], 'pm10': [20.0, 20.0], 'no2': [10.0, 10.0],
+                   'so2': [5.0, 5.0], 'co': [250.0, 250.0], 'o3': [30.0, 30.0]}
+        status, by_column, _ = call(service, 'POST', '/aqi/score', body={'components': columns})
+        rows = [[columns[f][i] for f in ('pm2_5', 'pm10', 'no2', 'so2', 'co', 'o3')] for i in range(2)]
+        _, by_row, _ = call(service, 'POST', '/aqi/score', body={'concentrations': rows})
+        expected = calculate_all_aqi_values(PollutantComponents(
+            co=250.0, no=0.0, no2=10.0, o3=30.0, so2=5.0, pm2_5=100.0, pm10=20.0, nh3=0.0))
+        assert status == 200
+        assert by_column == by_row
+        assert by_column['aqi'][1] == max(expected)
+        assert by_column['dominant_pollutant'] == ['O3', 'PM2.5']
+
+    @pytest.mark.parametrize("body", [{'components': {'pm2_5': [1]}}, {'concentrations': [[1, 2]]},
+                                      {'concentrations': [[1, 2, 3, 4, 5, -6]]}, {'values': []}])
+    def test_invalid_concentrations(self, service, body):
+        """Test that incomplete, misshapen or negative input is rejected."""
+        assert call(service, 'POST', '/aqi/score', body=body)[0] == 400
+
+
+class TestLeaderboardEndpoint:
+    """Test suite for /leaderboard."""
+
+    @pytest.fixture
+    def service(self, upstream):
+        return AQIService(geocode=upstream.geocode, fetch=upstream.fetch,
+                          leaderboard=Leaderboard(clock=lambda: 1700000000))
+
+    def test_fetched_sites_are_ranked(self, service):
+        """Test that every forecast the service fetches joins the leaderboard."""
+        for lat in ('10', '60', '30'):
+            call(service, 'GET', '/aqi', {'lat': lat, 'lon': '0'})
+
+        status, payload, _ = call(service, 'GET', '/leaderboard', {'k': '2', 'by': 'peak'})
+
+        assert status == 200
+        assert payload['tracked'] == 3
+        assert [site['lat'] for site in payload['sites']] == [60.0, 30.0]
+        assert payload['sites'][0]['peak'] >= payload['sites'][0]['current']
+        assert payload['sites'][0]['category'] == AQI_CATEGORY_LABELS[categorize_aqi(payload['sites'][0]['peak'])]
+
+    @pytest.mark.parametrize('query', [{'by': 'worst'}, {'k': '0'}, {'k': 'ten'}, {'k': '1000'}])
+    def test_invalid_query(self, service, query):
+        """Test that unknown rankings and out-of-range k are rejected."""
+        assert call(service, 'GET', '/leaderboard', query)[0] == 400
+
+    def test_store_sites(self, upstream, tmp_path):
+        """Test that a store's sites are ranked without the service fetching them."""
+        store = TimeSeriesStore(str(tmp_path / "readings.sqlite"))
+        store.ingest(45.0, 0.0, site_forecast(45.0), fetched_at=1700000000)
+        service = AQIService(geocode=upstream.geocode, fetch=upstream.fetch,
+                             leaderboard=Leaderboard(clock=lambda: 1700000000), store=store)
+
+        status, payload, _ = call(service, 'GET', '/leaderboard')
+
+        assert status == 200
+        assert [(site['lat'], site['lon']) for site in payload['sites']] == [(45.0, 0.0)]
+        assert upstream.fetches == []
+        store.close()
+
+
+class TestRouting:
+    """Test suite for dispatch."""
+
+    def test_unknown_path_and_method(self, service):
+        """Test that unknown routes answer 404 and wrong methods 405 with Allow."""
+        assert call(service, 'GET', '/nope')[0] == 404
+        status, _, response = call(service, 'GET', '/aqi/score')
+        assert status == 405
+        assert response.headers['Allow'] == 'POST'
+
+    def test_health(self, service):
+        """Test that /health reports cache counters."""
+        call(service, 'GET', '/aqi', {'lat': '10', 'lon': '20'})
+        status, payload, _ = call(service, 'GET', '/health')
+        assert status == 200
+        assert payload['responses']['entries'] == 1
+        assert payload['forecasts'] == 1
@@ -0,0 +1,155 @@
+"""
+Test suite for module.service.server module.
+"""
+
+import asyncio
+import gzip
+from module.service.server import (
+    Request,
+    Response,
+    accepts_gzip,
+    encode_response,
+    etag_matches,
+    json_response,
+    start_server
+)
+
+
+def make_request(method='GET', headers=None, keep_alive=True):
+    return Request(method, '/x', {}, headers or {}, b'', keep_alive)
+
+
+def split(raw):
+    head, _, body = raw.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    return lines[0], headers, body
+
+
+async def exchange(handler, raw, read_all=True):
+    """Send raw bytes to a fresh server and return everything it answers."""
+    server = await start_server(handler, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw)
+    data = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return data
+
+
+class TestContentNegotiation:
+    """Test suite for response encoding."""
+
+    def test_accepts_gzip(self):
+        """Test that gzip is accepted unless absent or given q=0."""
+        assert accepts_gzip('gzip, deflate, br')
+        assert accepts_gzip('br;q=1.0, gzip;q=0.5')
+        assert accepts_gzip('*')
+        assert not accepts_gzip('gzip;q=0')
+        assert not accepts_gzip('deflate')
+        assert not accepts_gzip('')
+
+    def test_etag_matches_lists_and_weak_tags(self):
+        """Test that If-None-Match uses weak comparison over a list."""
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('W/"b"', '"b"')
+        assert etag_matches('*', '"b"')
+        assert not etag_matches('"a"', '"b"')
+
+    def test_matching_etag_gives_304_without_body(self):
+        """Test that a matching If-None-Match turns a 200 into an empty 304."""
+        response = json_response({'a': 1}, etag=True)
+        status, headers, body = split(encode_response(
+            make_request(headers={'if-none-match': response.etag}), response))
+        assert status == 'HTTP/1.1 304 Not Modified'
+        assert headers['ETag'] == response.etag
+        assert headers['Content-Length'] == '0'
+        assert body == b''
+
+    def test_large_bodies_are_gzipped_once(self):
+        """Test that gzip applies above the size threshold and is reused."""
+        response = Response(body=b'{"v":"' + b'x' * 2000 + b'"}')
+        request = make_request(headers={'accept-encoding': 'gzip'})
+        _, headers, body = split(encode_response(request, response))
+        assert headers['Content-Encoding'] == 'gzip'
+        assert headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(body) == response.body
+        assert response.gzip_body is not None
+        _, plain_headers, plain = split(encode_response(make_request(), response))
+        assert 'Content-Encoding' not in plain_headers
+        assert plain == response.body
+
+    def test_small_bodies_are_not_gzipped(self):
+        """Test that tiny responses are sent uncompressed."""
+        _, headers, _ = split(encode_response(make_request(headers={'accept-encoding': 'gzip'}),
+                                              json_response({'a': 1})))
+        assert 'Content-Encoding' not in headers
+
+
+class TestHTTPProtocol:
+    """Test suite for the connection handling."""
+
+    def test_pipelined_requests_answered_in_order(self):
+        """Test that a slow handler does not let later responses overtake it."""
+        async def handler(request):
+            await asyncio.sleep(0.05 if request.path == '/slow' else 0)
+            return json_response({'path': request.path})
+
+        def dispatch(request):
+            if request.path == '/fast':
+                return json_response({'path': request.path})
+            return handler(request)
+
+        data = asyncio.run(exchange(dispatch, (
+            b'GET /slow HTTP/1.1\r\n\r\n'
+            b'GET /fast HTTP/1.1\r\n\r\n'
+            b'GET /last HTTP/1.1\r\nConnection: close\r\n\r\n'
+        )))
+        assert data.index(b'/slow') < data.index(b'/fast') < data.index(b'/last')
+        assert data.count(b'HTTP/1.1 200 OK') == 3
+
+    def test_post_body_is_read_by_content_length(self):
+        """Test that bodies split across packets are reassembled."""
+        async def run():
+            server = await start_server(lambda r: Response(body=r.body[::-1]), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'POST /x HTTP/1.1\r\nContent-Length: 6\r\nConnection: close\r\n\r\nabc')
+            await writer.drain()
+            await asyncio.sleep(0.01)
+            writer.write(b'def')
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            server.close()
+            return data
+
+        assert asyncio.run(run()).endswith(b'\r\n\r\nfedcba')
+
+    def test_handler_exception_becomes_500(self):
+        """Test that a failing handler answers 500 and keeps serving."""
+        def handler(request):
+            if request.path == '/boom':
+                raise RuntimeError("boom")
+            return json_response({})
+
+        data = asyncio.run(exchange(handler, (
+            b'GET /boom HTTP/1.1\r\n\r\nGET /ok HTTP/1.1\r\nConnection: close\r\n\r\n'
+        )))
+        assert data.startswith(b'HTTP/1.1 500 Internal Server Error')
+        assert b'HTTP/1.1 200 OK' in data
+
+    def test_malformed_and_oversized_requests_close_connection(self):
+        """Test that protocol errors are answered once and the connection closed."""
+        data = asyncio.run(exchange(lambda r: json_response({}), b'NONSENSE\r\n\r\n'))
+        assert data.startswith(b'HTTP/1.1 400 Bad Request')
+        assert b'Connection: close' in data
+
+        data = asyncio.run(exchange(lambda r: json_response({}),
+                                    b'POST /x HTTP/1.1\r\nContent-Length: 999999999\r\n\r\n'))
+        assert data.startswith(b'HTTP/1.1 413')
+
+        data = asyncio.run(exchange(lambda r: json_response({}),
+                                    b'POST /x HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'))
+        assert data.startswith(b'HTTP/1.1 501')
@@ -293,3 +293,60 @@ class TestAQIDisplay:
             assert mock_st.subheader.called
             assert mock_st.columns.called
             mock_calc.assert_called_with(components)
+
+    def test_display_pollutant_details_uses_analysis_row(self):
+        """Test that a precomputed analysis supplies values without recalculating."""
+        with patch('module.streamlit_ui.aqi_display.st') as mock_st:
+            mock_st.columns.return_value = [MagicMock(), MagicMock(), MagicMock()]
+            analysis = Mock()
+            analysis.sub_indices = [[10.0, 60.0, 120.0, 170.0, 250.0, 350.0]]
+            analysis.concentrations = [[1.0, 2.0, 3.0, 4.0, 5.0, 6.0]]
+            mock_calc = Mock()
+            
+            display_pollutant_details(Mock(), mock_calc, analysis)
+            
+            mock_calc.assert_not_called()
+            html = "".join(call[0][0] for call in mock_st.markdown.call_args_list)
+            assert "AQI: 350.0" in html
+            assert "Raw: 6.00" in html
+            assert "Hazardous" in html
+            assert "#ffff00" in html  # PM10 at 60 is Moderate
+
+    def test_display_aqi_category_accepts_precomputed_category(self):
+        """Test that a given (category, color) pair is rendered as-is."""
+        with patch('module.streamlit_ui.aqi_display.st') as mock_st:
+            
+            display_aqi_category(75, ('Moderate', '#ffff00'))
+            
+            html_content = mock_st.markdown.call_args[0][0]
+            assert "Moderate" in html_content
+            assert "black" in html_content
+
+    def test_display_pollutant_details_batched_single_element(self):
+        """Test that batched mode sends all six cards in one markdown call."""
+        with patch('module.streamlit_ui.aqi_display.st') as mock_st:
+            components = Mock(pm2_5=25.0, pm10=50.0, no2=40.0, so2=20.0, co=500.0, o3=80.0)
+            mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
+            
+            display_pollutant_details(components, mock_calc, batched=True)
+            
+            mock_st.columns.assert_not_called()
+            mock_st.markdown.assert_called_once()
+            html = mock_st.markdown.call_args[0][0]
+            assert "grid-template-columns: repeat(3" in html
+            for name in ['PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3']:
+                assert f"<h4 style=\"margin: 0;\">{name}</h4>" in html
+
+    def test_batched_and_column_cards_are_identical(self):
+        """Test that both modes render the same card markup."""
+        components = Mock(pm2_5=25.0, pm10=50.0, no2=40.0, so2=20.0, co=500.0, o3=80.0)
+        mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
+        with patch('module.streamlit_ui.aqi_display.st') as mock_st:
+            mock_st.columns.return_value = [MagicMock(), MagicMock(), MagicMock()]
+            display_pollutant_details(components, mock_calc)
+            per_card = "".join(call[0][0] for call in mock_st.markdown.call_args_list)
+        with patch('module.streamlit_ui.aqi_display.st') as mock_st:
+            display_pollutant_details(components, mock_calc, batched=True)
+            batched = mock_st.markdown.call_args[0][0]
+        
+        assert per_card in batched
@@ -0,0 +1,204 @@
+"""
+Test suite for module.streamlit_ui.caching module.
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+import requests
+from module.core.aqi_analysis import analyze_air_quality, update_analysis
+from module.core.air_quality_models import (
+    AirQualityResponse, AirQualityData, AQIInfo, Coordinates, PollutantComponents
+)
+from module.core.store import TimeSeriesStore
+from module.streamlit_ui.caching import (
+    cache_summary,
+    cached_air_quality,
+    cached_aqi_analysis,
+    cached_coordinates,
+    cached_leaderboard,
+    cached_region_sample,
+    clear_caches,
+    get_figure_cache,
+    get_incremental_analyzer,
+    response_fingerprint
+)
+
+
+def make_response(pm2_5=10.0):
+    """Small AirQualityResponse with two timestamps."""
+    components = dict(co=200.0, no=0.1, no2=5.0, o3=30.0, so2=1.0, pm2_5=pm2_5, pm10=12.0, nh3=0.5)
+    return AirQualityResponse(
+        coord=Coordinates(lat=42.03, lon=-93.62),
+        list=[
+            AirQualityData(dt=1700000000 + i * 3600, main=AQIInfo(aqi=1),
+                           components=PollutantComponents(**components))
+            for i in range(2)
+        ]
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    """Start every test with empty caches and no API throttling."""
+    clear_caches()
+    with patch('module.streamlit_ui.caching.get_nominatim_limiter'), \
+         patch('module.streamlit_ui.caching.get_openweather_limiter'):
+        yield
+    clear_caches()
+
+
+class TestCaching:
+    """Test suite for Streamlit cache wrappers."""
+
+    def test_geocoding_is_cached_across_spellings(self):
+        """Test that equivalent names hit Nominatim once."""
+        with patch('module.streamlit_ui.caching.search_nominatim') as mock_search:
+            mock_search.return_value = ((48.85, 2.35), 'Paris, France')
+            
+            first = cached_coordinates("Paris")
+            second = cached_coordinates("  PARIS ")
+        
+        assert first == second == ((48.85, 2.35), 'Paris, France')
+        mock_search.assert_called_once()
+
+    def test_geocoding_errors_are_not_cached(self, caplog):
+        """Test that a network error is logged, returns None values and is retried next time."""
+        with patch('module.streamlit_ui.caching.search_nominatim') as mock_search:
+            mock_search.side_effect = [
+                requests.exceptions.ConnectionError("down"),
+                ((48.85, 2.35), 'Paris, France')
+            ]
+            
+            assert cached_coordinates("Paris") == ((None, None), None)
+            assert cached_coordinates("Paris") == ((48.85, 2.35), 'Paris, France')
+        assert "Error fetching coordinates of 'Paris': down" in caplog.text
+
+    def test_forecast_is_cached_per_rounded_coordinate(self):
+        """Test that nearby coordinates share one forecast fetch."""
+        with patch('module.streamlit_ui.caching.read_pollution_data_from_api') as mock_read, \
+             patch('module.streamlit_ui.caching.convert_json_to_object') as mock_convert:
+            mock_convert.return_value = make_response()
+            
+            cached_air_quality(42.030001, -93.62)
+            cached_air_quality(42.030002, -93.62)
+        
+        mock_read.assert_called_once()
+        assert mock_read.call_args.kwargs['session'] is not None
+
+    def test_forecast_failure_returns_none(self, caplog):
+        """Test that fetch and parse errors are logged and surface as None."""
+        with patch('module.streamlit_ui.caching.read_pollution_data_from_api') as mock_read:
+            mock_read.side_effect = requests.exceptions.Timeout("slow")
+            assert cached_air_quality(1.0, 2.0) is None
+            
+            mock_read.side_effect = None
+            mock_read.return_value = {"cod": 401, "message": "Invalid API key"}
+            assert cached_air_quality(1.0, 2.0) is None
+        
+        assert "Error fetching air quality at (1.0000, 2.0000): slow" in caplog.text
+        assert "Error parsing air quality at (1.0000, 2.0000)" in caplog.text
+
+    def test_forecast_bugs_are_not_swallowed(self):
+        """Test that errors other than fetch and parse failures propagate."""
+        with patch('module.streamlit_ui.caching.read_pollution_data_from_api') as mock_read:
+            mock_read.side_effect = RuntimeError("bug")
+            
+            with pytest.raises(RuntimeError):
+                cached_air_quality(1.0, 2.0)
+
+    def test_analysis_cached_by_content(self):
+        """Test that equal responses reuse the analysis and different ones do not."""
+        with patch('module.core.aqi_analysis.update_analysis', wraps=update_analysis) as mock_update:
+            cached_aqi_analysis(make_response())
+            cached_aqi_analysis(make_response())
+            assert mock_update.call_count == 1
+            
+            cached_aqi_analysis(make_response(pm2_5=99.0))
+            assert mock_update.call_count == 2
+
+    def test_revised_forecast_updates_previous_analysis(self):
+        """Test that a refreshed forecast of the same location only re-scores what changed."""
+        response = make_response()
+        cached_aqi_analysis(response)
+        response.list[1].components.pm2_5 = 99.0
+        
+        analysis = cached_aqi_analysis(response)
+        
+        diff = get_incremental_analyzer().last_diff((42.03, -93.62))
+        assert diff.unchanged == 1
+        assert diff.changed.tolist() == [1700003600]
+        assert analysis.max_aqi.tolist() == analyze_air_quality(response.list).max_aqi.tolist()
+
+    def test_fingerprint_reflects_component_values(self):
+        """Test that the fingerprint changes with any component value."""
+        assert response_fingerprint(make_response()) == response_fingerprint(make_response())
+        assert response_fingerprint(make_response()) != response_fingerprint(make_response(pm2_5=11.0))
+
+    def test_summary_reports_hits_and_clear_resets(self):
+        """Test hit statistics and clearing of a single cache."""
+        with patch('module.streamlit_ui.caching.search_nominatim') as mock_search:
+            mock_search.return_value = ((1.0, 2.0), 'X')
+            for _ in range(4):
+                cached_coordinates("X")
+            
+            geocode = next(row for row in cache_summary() if row['name'] == 'geocode')
+            assert geocode['calls'] == 4
+            assert geocode['misses'] == 1
+            assert geocode['hit_rate'] == pytest.approx(0.75)
+            
+            clear_caches('geocode')
+            cached_coordinates("X")
+        
+        assert mock_search.call_count == 2
+
+    def test_figure_cache_is_shared_and_cleared(self):
+        """Test that one FigureCache serves all callers and clear_caches empties it."""
+        cache = get_figure_cache()
+        cache.put('k', '{}')
+        
+        assert get_figure_cache() is cache
+        clear_caches()
+        assert len(get_figure_cache()) == 0
+
+    def test_geocode_misses_are_throttled(self):
+        """Test that only real Nominatim lookups take a rate-limiter token."""
+        with patch('module.streamlit_ui.caching.search_nominatim') as mock_search, \
+             patch('module.streamlit_ui.caching.get_nominatim_limiter') as mock_limiter:
+            mock_search.return_value = ((1.0, 2.0), 'X')
+            cached_coordinates("X")
+            cached_coordinates("X")
+            cached_coordinates("Y")
+        
+        assert mock_limiter.return_value.acquire.call_count == 2
+
+    def test_region_sample_reuses_forecast_cache(self):
+        """Test that region points go through the forecast cache and the result is cached."""
+        with patch('module.streamlit_ui.caching.read_pollution_data_from_api') as mock_read, \
+             patch('module.streamlit_ui.caching.convert_json_to_object') as mock_convert, \
+             patch('module.streamlit_ui.caching.get_openweather_limiter') as mock_limiter:
+            mock_convert.return_value = make_response()
+            
+            first = cached_region_sample((42.0, -93.7, 42.1, -93.6), 2, 1, 25.0)
+            second = cached_region_sample((42.0, -93.7, 42.1, -93.6), 2, 1, 25.0)
+        
+        assert first.api_calls == second.api_calls == mock_read.call_count == 9
+        assert mock_limiter.return_value.acquire.call_count == 9
+        assert not any(row['name'] == 'region' and row['misses'] != 1 for row in cache_summary())
+
+    def test_leaderboard_is_shared_and_refreshed(self, tmp_path):
+        """Test that one Leaderboard per store picks up fetches made after the last rerun."""
+        path = str(tmp_path / "readings.sqlite")
+        hour = int(time.time()) // 3600 * 3600
+        store = TimeSeriesStore(path)
+        store.ingest(1.0, 2.0, {"list": [{"dt": hour, "main": {"aqi": 1},
+                                          "components": {"pm2_5": 30.0}}]}, fetched_at=hour)
+
+        board = cached_leaderboard(path)
+        assert len(board) == 1
+        store.ingest(3.0, 4.0, {"list": [{"dt": hour, "main": {"aqi": 1},
+                                          "components": {"pm2_5": 90.0}}]}, fetched_at=hour + 1)
+
+        assert cached_leaderboard(path) is board
+        assert [entry.lat for entry in board.top(2)] == [3.0, 1.0]
+        store.close()
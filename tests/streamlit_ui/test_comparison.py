@@ -0,0 +1,163 @@
+"""
+Test suite for module.streamlit_ui.comparison module.
+"""
+
+import time
+import pytest
+from unittest.mock import Mock, patch
+from module.core.air_quality_api import convert_json_to_object
+from module.core.aqi_analysis import analyze_air_quality_many
+from module.streamlit_ui.comparison import (
+    NO_DATA_LABEL,
+    LocationResult,
+    comparison_summary,
+    create_comparison_plot,
+    display_comparison_mode,
+    fetch_locations,
+    location_label,
+    parse_location_list
+)
+from tests.forecasts import CLEAN, make_forecast
+
+
+class TestParseLocationList:
+    """Test suite for location list parsing."""
+
+    def test_splits_lines_and_semicolons(self):
+        """Test that newlines and semicolons both separate names."""
+        assert parse_location_list("Ames, IA\nParis; Delhi\n\n") == ['Ames, IA', 'Paris', 'Delhi']
+
+    def test_deduplicates_and_limits(self):
+        """Test that repeated spellings collapse and the list is capped."""
+        assert parse_location_list("Ames\n ames \nParis\nDelhi", limit=2) == ['Ames', 'Paris']
+
+
+class TestFetchLocations:
+    """Test suite for concurrent geocode and fetch."""
+
+    def test_results_in_input_order_with_errors(self):
+        """Test that results keep input order and record failures."""
+        coords = {'A': ((1.0, 1.0), 'A, X'), 'B': ((None, None), None), 'C': ((3.0, 3.0), 'C, Z')}
+        data = Mock()
+        
+        results = fetch_locations(['A', 'B', 'C'], coords.get,
+                                  lambda lat, lon: data if lat == 1.0 else None)
+        
+        assert [r.query for r in results] == ['A', 'B', 'C']
+        assert results[0].data is data and results[0].error is None
+        assert results[1].error == "location not found"
+        assert results[2].error == "air quality fetch failed"
+
+    def test_locations_are_fetched_concurrently(self):
+        """Test that wall time stays near one round trip as locations are added."""
+        def slow_geocode(name):
+            time.sleep(0.1)
+            return (1.0, 2.0), name
+        
+        def slow_fetch(lat, lon):
+            time.sleep(0.1)
+            return Mock()
+        
+        start = time.perf_counter()
+        results = fetch_locations([f"city{i}" for i in range(10)], slow_geocode, slow_fetch)
+        elapsed = time.perf_counter() - start
+        
+        assert len(results) == 10
+        assert elapsed < 1.0  # Sequential would take 2 s
+
+
+class TestComparisonViews:
+    """Test suite for comparison table and charts."""
+
+    @pytest.fixture
+    def analyses(self):
+        return analyze_air_quality_many([
+            convert_json_to_object(make_forecast(base=CLEAN, o3=[40.0, 150.0, 60.0])).list,
+            convert_json_to_object(make_forecast(base=CLEAN, o3=[20.0, 30.0, 25.0])).list,
+        ])
+
+    def test_summary_sorted_worst_first(self, analyses):
+        """Test that the summary has one row per location, worst current AQI first."""
+        summary = comparison_summary(['Low', 'High'], analyses[::-1])
+        
+        assert list(summary['Location']) == ['High', 'Low']
+        assert summary.loc[0, 'Peak AQI'] == analyses[0].max_aqi.max().round(1)
+        assert summary.loc[0, 'Main pollutant'] in ('PM2.5', 'PM10', 'NO2', 'SO2', 'CO', 'O3')
+
+    def test_summary_lists_empty_forecasts_as_no_data(self, analyses):
+        """Test that a location with no forecast entries is listed last instead of raising."""
+        empty = analyze_air_quality_many([[]])[0]
+        
+        summary = comparison_summary(['Empty', 'High'], [empty, analyses[0]])
+        
+        assert list(summary['Location']) == ['High', 'Empty']
+        assert summary.loc[1, 'Category'] == NO_DATA_LABEL
+        assert summary.loc[1, ['Current AQI', 'Peak AQI']].isna().all()
+
+    def test_overlay_one_trace_per_location(self, analyses):
+        """Test that overlay mode draws one line per city over shared zones."""
+        fig = create_comparison_plot(['A', 'B'], analyses, 'Overlay')
+        
+        assert [trace.name for trace in fig.data] == ['A', 'B']
+        assert len(fig.layout.shapes) > 0
+
+    def test_small_multiples_one_subplot_per_location(self, analyses):
+        """Test that small multiples put each city on its own axes with its own zones."""
+        fig = create_comparison_plot(['A', 'B'], analyses, 'Small multiples')
+        
+        assert [trace.yaxis for trace in fig.data] == ['y', 'y2']
+        assert {shape.yref for shape in fig.layout.shapes} == {'y', 'y2'}
+        assert [a.text for a in fig.layout.annotations] == ['A', 'B']
+
+    def test_location_label_uses_place_name(self):
+        """Test that labels drop the region part of the geocoded name."""
+        assert location_label(LocationResult('ames', 'Ames, Story County, Iowa')) == 'Ames'
+        assert location_label(LocationResult('ames')) == 'ames'
+
+
+class TestDisplayComparisonMode:
+    """Test suite for the comparison page."""
+
+    def test_no_input_renders_nothing(self):
+        """Test that an empty list does not fetch anything."""
+        with patch('module.streamlit_ui.comparison.st') as mock_st:
+            mock_st.text_area.return_value = ""
+            geocode = Mock()
+            
+            display_comparison_mode(geocode, Mock())
+            
+            geocode.assert_not_called()
+            mock_st.plotly_chart.assert_not_called()
+
+    def test_renders_table_chart_and_warnings(self):
+        """Test the full page with one failed location."""
+        with patch('module.streamlit_ui.comparison.st') as mock_st:
+            mock_st.text_area.return_value = "Ames\nNowhere"
+            mock_st.radio.return_value = 'Overlay'
+            geocode = Mock(side_effect=lambda name: ((1.0, 2.0), 'Ames, IA') if name == 'Ames'
+                           else ((None, None), None))
+            
+            forecast = convert_json_to_object(make_forecast(base=CLEAN, o3=[40.0, 60.0]))
+            
+            display_comparison_mode(geocode, Mock(return_value=forecast))
+            
+            mock_st.warning.assert_called_once()
+            mock_st.dataframe.assert_called_once()
+            mock_st.plotly_chart.assert_called_once()
+
+    def test_empty_forecast_is_tabled_but_not_plotted(self):
+        """Test that a location whose forecast has no entries does not break the page."""
+        with patch('module.streamlit_ui.comparison.st') as mock_st, \
+             patch('module.streamlit_ui.comparison.create_comparison_plot') as mock_plot:
+            mock_st.text_area.return_value = "Ames\nParis"
+            mock_st.radio.return_value = 'Overlay'
+            geocode = Mock(side_effect=lambda name: ((1.0, 2.0), 'Ames, IA') if name == 'Ames'
+                           else ((48.9, 2.4), 'Paris, France'))
+            forecasts = {1.0: convert_json_to_object(make_forecast(base=CLEAN, o3=[40.0, 60.0])),
+                         48.9: convert_json_to_object(make_forecast(hours=0))}
+            
+            display_comparison_mode(geocode, lambda lat, lon: forecasts[lat])
+            
+            summary = mock_st.dataframe.call_args.args[0]
+            assert list(summary['Category'])[-1] == NO_DATA_LABEL
+            assert mock_plot.call_args.args[0] == ['Ames']
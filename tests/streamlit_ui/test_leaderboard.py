@@ -0,0 +1,99 @@
+"""
+Test suite for module.streamlit_ui.leaderboard module.
+"""
+
+from unittest.mock import Mock, patch
+from module.core.leaderboard import Leaderboard, LeaderboardEntry
+from module.core.store import TimeSeriesStore
+from module.streamlit_ui.leaderboard import (
+    DEFAULT_STORE_PATH,
+    STORE_PATH_ENV,
+    configured_store_path,
+    display_leaderboard_mode,
+    leaderboard_frame
+)
+
+
+def make_entry(name, current, peak):
+    return LeaderboardEntry(lat=1.0, lon=2.0, name=name, current=current, peak=peak, peak_time=1700003600,
+                            dominant_pollutant='PM2.5', updated_at=1700000030.0)
+
+
+class TestLeaderboardFrame:
+    """Test suite for the leaderboard table."""
+
+    def test_columns_and_levels(self):
+        """Test that rows keep their order and the level follows the ranking score."""
+        entries = [make_entry("a", 160.0, 90.0), make_entry("b", 40.0, 220.0)]
+
+        frame = leaderboard_frame(entries, by='current')
+
+        assert list(frame['Rank']) == [1, 2]
+        assert list(frame['Site']) == ["a", "b"]
+        assert list(frame['Level']) == ['Unhealthy', 'Good']
+        assert list(leaderboard_frame(entries, by='peak')['Level']) == ['Moderate', 'Very Unhealthy']
+        assert str(frame['Peak at'][0]) == '2023-11-14 23:13:20'
+
+    def test_empty(self):
+        """Test that no entries give an empty table."""
+        assert len(leaderboard_frame([])) == 0
+
+
+class TestDisplayLeaderboardMode:
+    """Test suite for the leaderboard page."""
+
+    def test_missing_store_is_an_error(self, tmp_path):
+        """Test that a missing store file is reported, not created."""
+        with patch('module.streamlit_ui.leaderboard.st') as mock_st:
+            mock_st.radio.return_value = 'current'
+            mock_st.slider.return_value = 20
+            load = Mock()
+
+            display_leaderboard_mode(load, store_path=str(tmp_path / "missing.sqlite"))
+
+            mock_st.error.assert_called_once()
+            mock_st.text_input.assert_not_called()
+            load.assert_not_called()
+            assert not (tmp_path / "missing.sqlite").exists()
+
+    def test_invalid_store_is_an_error(self, tmp_path):
+        """Test that a file that is not a store shows an error instead of raising."""
+        path = tmp_path / "notes.txt"
+        path.write_text("not a database\n" * 100)
+        with patch('module.streamlit_ui.leaderboard.st') as mock_st:
+            mock_st.radio.return_value = 'current'
+            mock_st.slider.return_value = 20
+
+            display_leaderboard_mode(lambda store_path: TimeSeriesStore(store_path, read_only=True),
+                                     store_path=str(path))
+
+            mock_st.error.assert_called_once()
+            mock_st.dataframe.assert_not_called()
+
+    def test_store_path_comes_from_the_environment(self, tmp_path, monkeypatch):
+        """Test that the store is server configuration with a default."""
+        monkeypatch.delenv(STORE_PATH_ENV, raising=False)
+        assert configured_store_path() == DEFAULT_STORE_PATH
+        monkeypatch.setenv(STORE_PATH_ENV, str(tmp_path / "readings.sqlite"))
+        assert configured_store_path() == str(tmp_path / "readings.sqlite")
+
+    def test_renders_top_sites(self, tmp_path, monkeypatch):
+        """Test that the top k sites of the chosen ranking are shown."""
+        path = tmp_path / "readings.sqlite"
+        path.touch()
+        monkeypatch.setenv(STORE_PATH_ENV, str(path))
+        board = Mock(spec=Leaderboard)
+        board.__len__ = Mock(return_value=30)
+        board.top.return_value = [make_entry("a", 160.0, 90.0)]
+        load = Mock(return_value=board)
+        with patch('module.streamlit_ui.leaderboard.st') as mock_st:
+            mock_st.radio.return_value = 'peak'
+            mock_st.slider.return_value = 10
+
+            display_leaderboard_mode(load)
+
+            load.assert_called_once_with(str(path))
+            board.top.assert_called_once_with(10, 'peak')
+            frame = mock_st.dataframe.call_args.args[0]
+            assert list(frame['Site']) == ["a"]
+            mock_st.caption.assert_called_once_with("30 sites ranked; times in UTC")
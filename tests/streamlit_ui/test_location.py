@@ -5,7 +5,7 @@ Focuses on testing get_coordinates_from_location function.
 
 import pytest
 from unittest.mock import Mock, patch
-from module.streamlit_ui.location import get_coordinates_from_location
+from module.streamlit_ui.location import get_coordinates_from_location, get_location_data
 
 
 class TestLocation:
@@ -122,3 +122,37 @@ class TestLocation:
             assert lat == 51.5074
             assert lon == -0.1278
             assert display_name == 'Unknown'
+
+
+class TestGetLocationData:
+    """Test suite for the location input flow."""
+
+    def test_on_coordinates_called_before_map_render(self):
+        """Test that the prefetch hook fires before the location is displayed."""
+        order = []
+        with patch('module.streamlit_ui.location.st') as mock_st, \
+             patch('module.streamlit_ui.location.get_coordinates_from_location') as mock_geo, \
+             patch('module.streamlit_ui.location.display_location_info') as mock_display:
+            mock_st.session_state = {'location_input': 'Paris'}
+            mock_st.text_input.return_value = 'Paris'
+            mock_geo.return_value = ((48.85, 2.35), 'Paris, France')
+            mock_display.side_effect = lambda *args: order.append('display')
+            
+            result = get_location_data(on_coordinates=lambda lat, lon: order.append(('fetch', lat, lon)))
+        
+        assert result == (48.85, 2.35, 'Paris, France')
+        assert order == [('fetch', 48.85, 2.35), 'display']
+
+    def test_on_coordinates_not_called_when_not_found(self):
+        """Test that no prefetch starts for an unknown location."""
+        callback = Mock()
+        with patch('module.streamlit_ui.location.st') as mock_st, \
+             patch('module.streamlit_ui.location.get_coordinates_from_location') as mock_geo:
+            mock_st.session_state = {'location_input': 'Nowhere'}
+            mock_st.text_input.return_value = 'Nowhere'
+            mock_geo.return_value = ((None, None), None)
+            
+            result = get_location_data(on_coordinates=callback)
+        
+        assert result == (None, None, None)
+        callback.assert_not_called()
@@ -4,7 +4,7 @@ Focuses on testing the display_air_quality_data function.
 """
 
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, MagicMock, patch
 from module.streamlit_ui.main_display import display_air_quality_data
 
 
@@ -39,3 +39,45 @@ class TestMainDisplay:
             mock_pollutant.assert_not_called()
             mock_category.assert_not_called()
             mock_forecast.assert_not_called()
+
+    def test_display_air_quality_data_shares_one_analysis(self):
+        """Test that all panels receive the same analysis, computed once."""
+        with patch('module.streamlit_ui.main_display.st') as mock_st, \
+             patch('module.streamlit_ui.main_display.analyze_air_quality') as mock_analyze, \
+             patch('module.streamlit_ui.main_display.display_pollutant_details') as mock_pollutant, \
+             patch('module.streamlit_ui.main_display.display_aqi_category') as mock_category, \
+             patch('module.streamlit_ui.main_display.display_aqi_forecast') as mock_forecast:
+            mock_st.columns.return_value = [MagicMock(), MagicMock()]
+            analysis = Mock()
+            analysis.max_aqi = [72.5]
+            analysis.labels = ['Moderate']
+            analysis.colors = ['#ffff00']
+            mock_analyze.return_value = analysis
+            data = Mock()
+            data.list = [Mock()]
+            mock_calc = Mock()
+            
+            display_air_quality_data(data, "Test Location", mock_calc)
+            
+            mock_analyze.assert_called_once_with(data.list)
+            mock_calc.assert_not_called()
+            assert mock_pollutant.call_args[0][2] is analysis
+            assert mock_forecast.call_args[0][3] is analysis
+            mock_category.assert_called_once_with(72.5, ('Moderate', '#ffff00'))
+
+    def test_display_air_quality_data_reuses_given_analysis(self):
+        """Test that a cached analysis is used instead of analyzing again."""
+        with patch('module.streamlit_ui.main_display.st') as mock_st, \
+             patch('module.streamlit_ui.main_display.analyze_air_quality') as mock_analyze, \
+             patch('module.streamlit_ui.main_display.display_pollutant_details'), \
+             patch('module.streamlit_ui.main_display.display_aqi_category'), \
+             patch('module.streamlit_ui.main_display.display_aqi_forecast'):
+            mock_st.columns.return_value = [MagicMock(), MagicMock()]
+            analysis = Mock(max_aqi=[10.0], labels=['Good'], colors=['#00e400'])
+            
+            data = Mock()
+            data.list = [Mock()]
+            
+            display_air_quality_data(data, "Test Location", Mock(), analysis)
+            
+            mock_analyze.assert_not_called()
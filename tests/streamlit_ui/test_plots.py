@@ -4,75 +4,28 @@ Focuses on testing main plotting and calculation functions.
 """
 
 import pytest
+import numpy as np
+import pandas as pd
 from unittest.mock import Mock, patch
 from datetime import datetime
+from module.core.aqi_analysis import AQI_CATEGORY_COLORS
+from module.core.figure_cache import FigureCache
 from module.streamlit_ui.plots import (
-    calculate_aqi_over_time,
     get_aqi_ranges,
     create_aqi_plot,
-    display_aqi_forecast
+    display_aqi_forecast,
+    display_current_air_quality,
+    select_zoom_window
 )
 
 
-class TestPlots:
-    """Test suite for plotting functions."""
-
-    def test_calculate_aqi_over_time_returns_tuple(self):
-        """Test calculate_aqi_over_time returns tuple of lists."""
-        # Mock air quality data
-        data = Mock()
-        data.dt = 1700000000
-        data.components = Mock()
-        
-        mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
-        
-        dates, max_aqi = calculate_aqi_over_time([data], mock_calc)
-        
-        assert isinstance(dates, list)
-        assert isinstance(max_aqi, list)
+def make_components(pm2_5=5.0, pm10=15.0, no2=20.0, so2=10.0, co=300.0, o3=40.0):
+    """Mock PollutantComponents with numeric concentrations."""
+    return Mock(pm2_5=pm2_5, pm10=pm10, no2=no2, so2=so2, co=co, o3=o3)
 
-    def test_calculate_aqi_over_time_equal_lengths(self):
-        """Test that dates and AQI lists have equal length."""
-        data1 = Mock()
-        data1.dt = 1700000000
-        data1.components = Mock()
-        
-        data2 = Mock()
-        data2.dt = 1700003600
-        data2.components = Mock()
-        
-        mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
-        
-        dates, max_aqi = calculate_aqi_over_time([data1, data2], mock_calc)
-        
-        assert len(dates) == len(max_aqi)
-        assert len(dates) == 2
 
-    def test_calculate_aqi_over_time_returns_maximum(self):
-        """Test that maximum AQI is returned for each entry."""
-        data = Mock()
-        data.dt = 1700000000
-        data.components = Mock()
-        
-        mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
-        
-        dates, max_aqi = calculate_aqi_over_time([data], mock_calc)
-        
-        # Max of [50, 40, 30, 20, 10, 60] is 60
-        assert max_aqi[0] == 60
-
-    def test_calculate_aqi_over_time_converts_timestamps(self):
-        """Test that Unix timestamps are converted to datetime."""
-        data = Mock()
-        data.dt = 1700000000
-        data.components = Mock()
-        
-        mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
-        
-        dates, max_aqi = calculate_aqi_over_time([data], mock_calc)
-        
-        assert isinstance(dates[0], datetime)
-        assert dates[0] == datetime.fromtimestamp(1700000000)
+class TestPlots:
+    """Test suite for plotting functions."""
 
     def test_get_aqi_ranges_returns_six_ranges(self):
         """Test get_aqi_ranges returns six AQI ranges."""
@@ -168,7 +121,7 @@ class TestPlots:
             data.list = [Mock(), Mock()]
             for item in data.list:
                 item.dt = 1700000000
-                item.components = Mock()
+                item.components = make_components()
             
             mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
             mock_plot.return_value = Mock()
@@ -177,8 +130,8 @@ class TestPlots:
             
             mock_st.subheader.assert_called()
 
-    def test_display_aqi_forecast_calls_calculate_aqi_over_time(self):
-        """Test display_aqi_forecast calculates AQI over time."""
+    def test_display_aqi_forecast_builds_timeseries_in_batch(self):
+        """Test display_aqi_forecast builds the series with the batch engine."""
         with patch('module.streamlit_ui.plots.st') as mock_st, \
              patch('module.streamlit_ui.plots.create_aqi_plot') as mock_plot:
             
@@ -186,15 +139,17 @@ class TestPlots:
             data.list = [Mock(), Mock()]
             for item in data.list:
                 item.dt = 1700000000
-                item.components = Mock()
+                item.components = make_components()
             
             mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
             mock_plot.return_value = Mock()
             
             display_aqi_forecast(data, "Test Location", mock_calc)
             
-            # Should be called once per item in data.list
-            assert mock_calc.call_count == 2
+            # The batch engine scores every item; the scalar calculator is not used
+            mock_calc.assert_not_called()
+            dates, max_aqi = mock_plot.call_args.args[:2]
+            assert len(dates) == len(max_aqi) == 2
 
     def test_display_aqi_forecast_displays_plotly_chart(self):
         """Test display_aqi_forecast displays plotly chart."""
@@ -204,7 +159,7 @@ class TestPlots:
             data = Mock()
             data.list = [Mock()]
             data.list[0].dt = 1700000000
-            data.list[0].components = Mock()
+            data.list[0].components = make_components()
             
             mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
             mock_fig = Mock()
@@ -225,7 +180,7 @@ class TestPlots:
             for i in range(3):
                 item = Mock()
                 item.dt = 1700000000 + i * 3600
-                item.components = Mock()
+                item.components = make_components()
                 data.list.append(item)
             
             mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
@@ -237,6 +192,211 @@ class TestPlots:
             
             # Verify all components called
             assert mock_st.subheader.called
-            assert mock_calc.call_count == 3
+            mock_calc.assert_not_called()
             mock_plot.assert_called_once()
             mock_st.plotly_chart.assert_called_once()
+
+    def test_display_aqi_forecast_uses_analysis_without_recomputing(self):
+        """Test that a precomputed analysis is plotted and the calculator is not called."""
+        with patch('module.streamlit_ui.plots.st') as mock_st, \
+             patch('module.streamlit_ui.plots.create_aqi_plot') as mock_plot:
+            analysis = Mock()
+            analysis.dates = [datetime(2024, 1, 1, h) for h in range(3)]
+            analysis.max_aqi = np.array([10.0, 60.0, 120.0])
+            analysis.category = np.array([0, 1, 2])
+            mock_calc = Mock()
+            
+            display_aqi_forecast(Mock(), "Test Location", mock_calc, analysis)
+            
+            mock_calc.assert_not_called()
+            args, kwargs = mock_plot.call_args
+            assert args[1] is analysis.max_aqi
+            assert kwargs['categories'] is analysis.category
+            mock_st.plotly_chart.assert_called_once()
+
+    def test_create_aqi_plot_uses_precomputed_categories(self):
+        """Test that a given category index array is used as-is."""
+        dates = [datetime(2024, 1, 1, h) for h in range(2)]
+        
+        fig = create_aqi_plot(dates, [10.0, 60.0], "X", categories=[3, 5])
+        
+        line = fig.data[-1]
+        assert list(line.customdata) == ['Unhealthy', 'Hazardous']
+        assert list(line.marker.color) == [3, 5]
+
+    def test_create_aqi_plot_categorizes_values_at_boundaries(self):
+        """Test that colouring uses inclusive EPA upper bounds."""
+        dates = [datetime(2024, 1, 1, h) for h in range(4)]
+        
+        fig = create_aqi_plot(dates, [50.0, 50.5, 300.0, 301.0], "X")
+        
+        line = fig.data[-1]
+        assert list(line.customdata) == ['Good', 'Moderate', 'Very Unhealthy', 'Hazardous']
+        assert list(line.marker.color) == [0, 1, 4, 5]
+
+    def test_create_aqi_plot_marker_colours_resolve_to_their_category(self):
+        """Test that every category code falls inside its own colour band, not on a stop between two."""
+        dates = [datetime(2024, 1, 1, h) for h in range(6)]
+        
+        marker = create_aqi_plot(dates, [10.0] * 6, "X", categories=list(range(6))).data[-1].marker
+        
+        stops = [position for position, _ in marker.colorscale]
+        for code in range(6):
+            position = (code - marker.cmin) / (marker.cmax - marker.cmin)
+            assert position not in stops
+            band = np.searchsorted(stops, position)
+            assert marker.colorscale[band - 1][1] == marker.colorscale[band][1] == AQI_CATEGORY_COLORS[code]
+
+    def test_create_aqi_plot_draws_zones_as_layout_shapes(self):
+        """Test that zones are rectangles clipped at the y-axis maximum, not polygon traces."""
+        dates = [datetime(2024, 1, 1, h) for h in range(3)]
+        
+        fig = create_aqi_plot(dates, [20.0, 80.0, 120.0], "X")
+        
+        y_max = 120.0 * 1.1
+        assert len(fig.layout.shapes) == 3
+        assert [s.y0 for s in fig.layout.shapes] == [0, 50, 100]
+        assert fig.layout.shapes[-1].y1 == pytest.approx(y_max)
+        assert all(trace.fill is None for trace in fig.data)
+        assert all(len(trace.x) == 1 for trace in fig.data[:-1])
+
+    def test_create_aqi_plot_zone_payload_independent_of_length(self):
+        """Test that zone shapes and legend traces do not grow with the series."""
+        short = create_aqi_plot([datetime(2024, 1, 1)] * 2, [10.0, 250.0], "X")
+        long_dates = [datetime(2024, 1, 1)] * 1000
+        long = create_aqi_plot(long_dates, [10.0] * 999 + [250.0], "X")
+        
+        assert len(short.layout.shapes) == len(long.layout.shapes)
+        assert len(short.data) == len(long.data)
+
+    def test_create_aqi_plot_downsamples_to_width(self):
+        """Test that long series are reduced to a payload bounded by the plot width."""
+        n = 20_000
+        dates = pd.date_range('2024-01-01', periods=n, freq='h')
+        values = np.clip(80 + np.cumsum(np.random.default_rng(0).normal(0, 4, n)), 0, 450)
+        values[777] = 480.0
+        
+        fig = create_aqi_plot(dates, values, "X", categories=np.zeros(n, dtype=int), width_px=400)
+        
+        line = fig.data[-1]
+        assert len(line.y) <= 3 * 400
+        assert len(line.marker.color) == len(line.y)
+        assert max(line.y) == 480.0
+
+    def test_create_aqi_plot_uses_webgl_for_large_series(self):
+        """Test that large series switch to Scattergl, keeping colours and hover labels."""
+        dates = pd.date_range('2024-01-01', periods=5000, freq='h')
+        values = np.linspace(10, 400, 5000)
+        
+        fig = create_aqi_plot(dates, values, "X", width_px=None)
+        
+        line = fig.data[-1]
+        assert line.type == 'scattergl'
+        assert line.customdata[-1] == 'Hazardous'
+        assert line.marker.color[0] == 0
+
+    def test_create_aqi_plot_small_series_stays_svg(self):
+        """Test that short forecasts keep the SVG scatter trace."""
+        dates = [datetime(2024, 1, 1, h) for h in range(24)]
+        
+        fig = create_aqi_plot(dates, [42.0] * 24, "X")
+        
+        assert fig.data[-1].type == 'scatter'
+
+    def test_create_aqi_plot_width_none_keeps_all_points(self):
+        """Test that width_px=None disables downsampling."""
+        dates = pd.date_range('2024-01-01', periods=2000, freq='h')
+        
+        fig = create_aqi_plot(dates, np.full(2000, 42.0), "X", width_px=None)
+        
+        assert len(fig.data[-1].y) == 2000
+
+    def test_select_zoom_window_hidden_for_short_series(self):
+        """Test that no zoom control is shown when every point fits."""
+        with patch('module.streamlit_ui.plots.st') as mock_st:
+            dates = [datetime(2024, 1, 1, h) for h in range(24)]
+            
+            assert select_zoom_window(dates, "X") is None
+            mock_st.slider.assert_not_called()
+
+    def test_display_aqi_forecast_plots_zoom_window(self):
+        """Test that the zoomed range is re-plotted from full-resolution data."""
+        with patch('module.streamlit_ui.plots.st') as mock_st, \
+             patch('module.streamlit_ui.plots.create_aqi_plot') as mock_plot:
+            n = 5000
+            analysis = Mock()
+            analysis.dates = pd.date_range('2024-01-01', periods=n, freq='h')
+            analysis.max_aqi = np.arange(n, dtype=float)
+            analysis.category = np.zeros(n, dtype=int)
+            mock_st.slider.return_value = (datetime(2024, 1, 2), datetime(2024, 1, 3))
+            
+            display_aqi_forecast(Mock(), "Test Location", Mock(), analysis)
+            
+            args, kwargs = mock_plot.call_args
+            assert list(args[1]) == list(np.arange(24, 49, dtype=float))
+            assert len(kwargs['categories']) == 25
+
+    def test_display_aqi_forecast_widens_empty_zoom_window(self):
+        """Test that a zoom range narrower than one sample still plots the points around it."""
+        with patch('module.streamlit_ui.plots.st') as mock_st, \
+             patch('module.streamlit_ui.plots.create_aqi_plot', wraps=create_aqi_plot) as mock_plot:
+            n = 5000
+            analysis = Mock()
+            analysis.dates = pd.date_range('2024-01-01', periods=n, freq='h')
+            analysis.max_aqi = np.arange(n, dtype=float)
+            analysis.category = np.zeros(n, dtype=int)
+            mock_st.slider.return_value = (datetime(2024, 1, 2, 5, 10), datetime(2024, 1, 2, 5, 40))
+            
+            display_aqi_forecast(Mock(), "Test Location", Mock(), analysis)
+            
+            args, _ = mock_plot.call_args
+            assert list(args[1]) == [29.0, 30.0]
+            mock_st.plotly_chart.assert_called_once()
+
+    def test_display_aqi_forecast_reuses_cached_figure(self):
+        """Test that an unchanged chart is served from the figure cache."""
+        with patch('module.streamlit_ui.plots.st') as mock_st, \
+             patch('module.streamlit_ui.plots.create_aqi_plot', wraps=create_aqi_plot) as mock_plot:
+            analysis = Mock()
+            analysis.dates = [datetime(2024, 1, 1, h) for h in range(3)]
+            analysis.max_aqi = np.array([10.0, 60.0, 120.0])
+            analysis.category = np.array([0, 1, 2])
+            cache = FigureCache()
+            
+            display_aqi_forecast(Mock(), "Test Location", Mock(), analysis, cache)
+            display_aqi_forecast(Mock(), "Test Location", Mock(), analysis, cache)
+            
+            assert mock_plot.call_count == 1
+            assert (cache.hits, cache.misses) == (1, 1)
+            first, second = (c.args[0] for c in mock_st.plotly_chart.call_args_list)
+            assert first.to_json() == second.to_json()
+
+    def test_display_aqi_forecast_cache_key_includes_location(self):
+        """Test that the same data for another location is a different chart."""
+        with patch('module.streamlit_ui.plots.st'):
+            analysis = Mock()
+            analysis.dates = [datetime(2024, 1, 1, h) for h in range(3)]
+            analysis.max_aqi = np.array([10.0, 60.0, 120.0])
+            analysis.category = np.array([0, 1, 2])
+            cache = FigureCache()
+            
+            display_aqi_forecast(Mock(), "Ames", Mock(), analysis, cache)
+            display_aqi_forecast(Mock(), "Boone", Mock(), analysis, cache)
+            
+            assert len(cache) == 2
+
+    def test_display_current_air_quality_batched(self):
+        """Test that batched mode replaces six st.metric calls with one element."""
+        with patch('module.streamlit_ui.plots.st') as mock_st:
+            data = Mock()
+            data.list = [Mock()]
+            data.list[0].components = Mock(pm2_5=1.0, pm10=2.0, no2=3.0, so2=4.0, co=5.0, o3=6.0)
+            mock_calc = Mock(return_value=[50, 40, 30, 20, 10, 60])
+            
+            display_current_air_quality(data, mock_calc, batched=True)
+            
+            mock_st.metric.assert_not_called()
+            mock_st.markdown.assert_called_once()
+            html = mock_st.markdown.call_args[0][0]
+            assert "AQI: 60.0" in html
+            assert "Raw: 6.00" in html
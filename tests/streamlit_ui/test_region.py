@@ -0,0 +1,103 @@
+"""
+Test suite for module.streamlit_ui.region module.
+"""
+
+import numpy as np
+import pydeck as pdk
+from unittest.mock import Mock, patch
+from module.core.region_sampling import RegionSample
+from module.streamlit_ui.region import (
+    create_region_deck,
+    display_region_mode,
+    interpolated_cells_frame,
+    region_points_frame,
+    zoom_for_radius
+)
+
+
+def make_sample(aqi=(20.0, 80.0, np.nan, 160.0)):
+    """RegionSample with one point per AQI value along a diagonal."""
+    points = np.array([(i * 0.1, i * 0.1, value) for i, value in enumerate(aqi)])
+    return RegionSample(bbox=(0.0, 0.0, 1.0, 1.0), points=points, api_calls=len(aqi), uniform_calls=25)
+
+
+class TestRegionPointsFrame:
+    """Test suite for heatmap point data."""
+
+    def test_drops_failed_points_and_adds_levels(self):
+        """Test that NaN samples are removed and categories are labelled."""
+        frame = region_points_frame(make_sample())
+        
+        assert list(frame['aqi']) == [20.0, 80.0, 160.0]
+        assert list(frame['level']) == ['Good', 'Moderate', 'Unhealthy']
+        assert list(frame['color'][0]) == [0, 228, 0]
+
+
+class TestCreateRegionDeck:
+    """Test suite for the pydeck map."""
+
+    def test_heatmap_with_optional_points(self):
+        """Test that the heatmap is always drawn and sample points are optional."""
+        deck = create_region_deck(make_sample(), 0.15, 0.15, 25)
+        
+        assert isinstance(deck, pdk.Deck)
+        assert [layer.type for layer in deck.layers] == ['HeatmapLayer', 'ScatterplotLayer']
+        assert len(create_region_deck(make_sample(), 0.15, 0.15, 25, show_points=False).layers) == 1
+
+    def test_interpolated_surface(self):
+        """Test that the interpolated surface replaces the heatmap with grid cells."""
+        deck = create_region_deck(make_sample(), 0.15, 0.15, 25, surface='Interpolated')
+        cells, cell_size = interpolated_cells_frame(make_sample(), size=10)
+        
+        assert deck.layers[0].type == 'GridCellLayer'
+        assert len(cells) == 100 and not cells['aqi'].isna().any()
+        assert (cells['lat'].min(), cells['lon'].min()) == (0.0, 0.0)
+        assert round(cell_size) == 11132
+
+    def test_zoom_decreases_with_radius(self):
+        """Test that larger regions are shown further out."""
+        assert zoom_for_radius(5) > zoom_for_radius(50) > zoom_for_radius(500)
+
+
+class TestDisplayRegionMode:
+    """Test suite for the region page."""
+
+    def test_empty_input_does_nothing(self):
+        """Test that no lookups happen before a place is entered."""
+        with patch('module.streamlit_ui.region.st') as mock_st:
+            mock_st.text_input.return_value = ""
+            geocode, sample = Mock(), Mock()
+            
+            display_region_mode(geocode, sample)
+            
+            geocode.assert_not_called()
+            sample.assert_not_called()
+
+    def test_renders_map_and_call_metrics(self):
+        """Test that the sampled region is drawn with its call savings."""
+        with patch('module.streamlit_ui.region.st') as mock_st:
+            mock_st.text_input.return_value = "Ames"
+            mock_st.slider.side_effect = [25, 4, 3, 25]
+            mock_st.number_input.return_value = 150
+            columns = [Mock(), Mock(), Mock()]
+            mock_st.columns.return_value = columns
+            sample = Mock(return_value=make_sample())
+            
+            display_region_mode(Mock(return_value=((42.0, -93.6), 'Ames, IA')), sample)
+            
+            bbox, coarse, depth, threshold, max_calls = sample.call_args.args
+            assert bbox[0] < 42.0 < bbox[2] and (coarse, depth, threshold, max_calls) == (4, 3, 25, 150)
+            columns[2].metric.assert_called_once_with("Calls saved", "84%")
+            mock_st.pydeck_chart.assert_called_once()
+
+    def test_unknown_location_shows_error(self):
+        """Test that a failed geocode stops before sampling."""
+        with patch('module.streamlit_ui.region.st') as mock_st:
+            mock_st.text_input.return_value = "Nowhere"
+            mock_st.slider.side_effect = [25, 4, 3, 25]
+            sample = Mock()
+            
+            display_region_mode(Mock(return_value=((None, None), None)), sample)
+            
+            mock_st.error.assert_called_once()
+            sample.assert_not_called()